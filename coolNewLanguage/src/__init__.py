@@ -1,4 +1,6 @@
 from .tool import Tool
+from .engine_profile import EngineProfile
+from .storage_backend import DuckDBBackend, PostgresBackend, SQLiteBackend, StorageBackend
 
 from .component.column_selector_component import ColumnSelectorComponent
 from .component.file_upload_component import FileUploadComponent
@@ -10,6 +12,7 @@ from .component.user_input_component import UserInputComponent
 from .component.pdf_viewer_component import PDFViewerComponent
 
 from .stage import results
+from .stage import jobs
 
 from .approvals import approvals
 
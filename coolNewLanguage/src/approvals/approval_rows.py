@@ -0,0 +1,155 @@
+import html
+from typing import Any, Callable, Iterator, Optional
+
+import pandas as pd
+
+from coolNewLanguage.src import consts
+from coolNewLanguage.src.approvals.approve_result import ApproveResult
+from coolNewLanguage.src.approvals.approve_state import ApproveState, APPROVE_STATE_STRINGS
+from coolNewLanguage.src.approvals.table_approve_result import TableApproveResult
+from coolNewLanguage.src.approvals.table_diff_approve_result import TableDiffApproveResult
+from coolNewLanguage.src.approvals.table_row_addition_approve_result import TableRowAdditionApproveResult
+from coolNewLanguage.src.approvals.table_schema_change_approve_result import TableSchemaChangeApproveResult
+from coolNewLanguage.src.util.table_page_utils import TablePage
+
+"""
+The decisions which can be made for a row, and the labels of their radio buttons, in the order they're shown
+"""
+ROW_DECISIONS = (
+    (ApproveState.APPROVED, '✓'),
+    (ApproveState.REJECTED, '✘'),
+    (ApproveState.PENDING, '?')
+)
+
+"""
+The headers of the decision columns at the start of each approval table
+"""
+DECISION_COLUMNS = ['Approve', 'Reject', 'Pending']
+
+
+def get_approval_rows_page(
+        approve_result: ApproveResult,
+        decisions: dict[str, str],
+        offset: int = 0,
+        limit: int = consts.DEFAULT_TABLE_PAGE_SIZE
+) -> TablePage:
+    """
+    Renders a single page of the rows of an ApproveResult, as shown in its table on the approval page, so that the page
+    only has to hold the rows the user is looking at
+    Each row is a list of HTML cells: a radio button for each decision, with the row's current decision checked,
+    followed by the row's values. A row's current decision is the one recorded for it, or else the one recorded for
+    all of the ApproveResult's rows, or else pending.
+    :param approve_result: A TableApproveResult, TableSchemaChangeApproveResult, TableRowAdditionApproveResult or
+    TableDiffApproveResult
+    :param decisions: The decisions recorded for the ApproveResult, as a dictionary mapping approval form field names
+    to decision strings
+    :param offset: The number of rows to skip
+    :param limit: The maximum number of rows to return, capped at consts.MAX_TABLE_PAGE_SIZE
+    :return: A TablePage of HTML cells
+    """
+    if not isinstance(decisions, dict):
+        raise TypeError("Expected decisions to be a dict")
+    if not isinstance(offset, int):
+        raise TypeError("Expected offset to be an int")
+    if offset < 0:
+        raise ValueError("Expected offset to be non-negative")
+    if not isinstance(limit, int):
+        raise TypeError("Expected limit to be an int")
+    if limit < 0:
+        raise ValueError("Expected limit to be non-negative")
+
+    stop = offset + min(limit, consts.MAX_TABLE_PAGE_SIZE)
+    default_decision = decisions.get(
+        f'approve_{approve_result.id}_{consts.APPROVAL_BULK_DECISION_SUFFIX}',
+        APPROVE_STATE_STRINGS[ApproveState.PENDING]
+    )
+
+    def decision_cells(row_id: Any) -> list[str]:
+        field_name = f'approve_{approve_result.id}_{row_id}'
+        return _decision_cells(field_name, decisions.get(field_name, default_decision))
+
+    match approve_result:
+        case TableApproveResult() | TableSchemaChangeApproveResult():
+            df = approve_result.dataframe
+            highlighted_columns = set(getattr(approve_result, 'cols_added', []))
+            rows = [
+                decision_cells(row_id) + [
+                    _value_cell(value, 'added_value' if column in highlighted_columns else None)
+                    for column, value in zip(approve_result.column_names, values)
+                ]
+                for row_id, values in _rows(df.iloc[offset:stop], approve_result.column_names)
+            ]
+            columns = DECISION_COLUMNS + approve_result.column_names
+            total_rows = len(df)
+        case TableRowAdditionApproveResult():
+            df = approve_result.dataframe
+            rows = []
+            for row_id, values in _rows(df.iloc[offset:stop], approve_result.column_names):
+                was_added = row_id in approve_result.rows_added
+                cells = decision_cells(row_id) if was_added else ['-'] * len(DECISION_COLUMNS)
+                css_class = 'added_value' if was_added else None
+                rows.append(cells + [_value_cell(value, css_class) for value in values])
+            columns = DECISION_COLUMNS + approve_result.column_names
+            total_rows = len(df)
+        case TableDiffApproveResult():
+            rows = _diff_rows(approve_result, offset, stop, decision_cells)
+            columns = DECISION_COLUMNS + ['Change'] + approve_result.column_names
+            total_rows = approve_result.num_changed_rows
+        case _:
+            raise ValueError("Expected approve_result to have rows to approve")
+
+    return TablePage(columns, rows, total_rows, total_rows)
+
+
+def _diff_rows(
+        approve_result: TableDiffApproveResult,
+        offset: int,
+        stop: int,
+        decision_cells: Callable[[Any], list[str]]
+) -> list[list[str]]:
+    """
+    Renders the rows of a TableDiffApproveResult between offset and stop, taking the inserted, then the updated, then
+    the deleted rows. Changed values of updated rows are shown alongside the values they replace.
+    """
+    rows = []
+    sections = [
+        ('Inserted', approve_result.inserted, 'added_value'),
+        ('Updated', approve_result.updated, None),
+        ('Deleted', approve_result.deleted, 'removed_value')
+    ]
+    for change, df, css_class in sections:
+        section_rows = df.iloc[max(offset, 0):max(stop, 0)]
+        offset, stop = offset - len(df), stop - len(df)
+        for row_id, values in _rows(section_rows, approve_result.column_names):
+            cells = decision_cells(row_id) + [_value_cell(change, css_class)]
+            for column, value in zip(approve_result.column_names, values):
+                if change == 'Updated' and approve_result.changed_cells.at[row_id, column]:
+                    previous = _value_cell(approve_result.previous.at[row_id, column], 'removed_value', tag='s')
+                    cells.append(f'{previous} {_value_cell(value, "added_value")}')
+                else:
+                    cells.append(_value_cell(value, css_class))
+            rows.append(cells)
+    return rows
+
+
+def _rows(df: pd.DataFrame, column_names: list[str]) -> Iterator[tuple[Any, tuple]]:
+    return zip(df.index.tolist(), df[column_names].itertuples(index=False, name=None))
+
+
+def _decision_cells(field_name: str, decision: str) -> list[str]:
+    field_name = html.escape(field_name)
+    cells = []
+    for state, label in ROW_DECISIONS:
+        value = APPROVE_STATE_STRINGS[state]
+        checked = ' checked' if value == decision else ''
+        cells.append(
+            f'<label>{label} <input type="radio" name="{field_name}" class="input" value="{value}"{checked}></label>'
+        )
+    return cells
+
+
+def _value_cell(value: Any, css_class: Optional[str] = None, tag: str = 'span') -> str:
+    escaped = html.escape(str(value))
+    if css_class is None:
+        return escaped
+    return f'<{tag} class="{css_class}">{escaped}</{tag}>'
@@ -0,0 +1,57 @@
+import secrets
+from typing import Optional
+
+from coolNewLanguage.src.approvals.approve_result import ApproveResult
+
+
+class ApprovalSession:
+    """
+    A set of changes awaiting the user's approval. It's created while handling the stage POST which calls
+    get_user_approvals, and consumed by the approval POST, which is a separate request and so can't see the first
+    request's state, and is persisted by the running Tool's ApprovalStore in between. The session's token is embedded in the approval form, so that each approval POST is matched with
+    the changes it was shown, even when several users are approving changes at once.
+
+    Attributes:
+        token: A random, unguessable string identifying this session
+        approve_results: The ApproveResults the user is asked to approve
+        stage_url: The url of the stage whose changes are being approved
+        stage_name: The name of the stage whose changes are being approved
+        cached_show_results: The results to show once the user's approvals have been handled
+        cached_show_results_title: The title of the results to show
+        decisions: The decisions recorded from the approval page before its form was posted, as a dictionary mapping
+            form field names to decision strings
+    """
+    __slots__ = (
+        'token', 'approve_results', 'stage_url', 'stage_name', 'cached_show_results', 'cached_show_results_title',
+        'decisions'
+    )
+
+    def __init__(
+            self,
+            approve_results: list[ApproveResult],
+            stage_url: str,
+            stage_name: str,
+            token: Optional[str] = None
+    ):
+        """
+        :param approve_results:
+        :param stage_url:
+        :param stage_name:
+        :param token: The session's token, when loading a persisted session, or None to generate a new one
+        """
+        if not isinstance(approve_results, list):
+            raise TypeError("Expected approve_results to be a list")
+        if not isinstance(stage_url, str):
+            raise TypeError("Expected stage_url to be a string")
+        if not isinstance(stage_name, str):
+            raise TypeError("Expected stage_name to be a string")
+        if token is not None and not isinstance(token, str):
+            raise TypeError("Expected token to be a string or None")
+
+        self.token = token if token is not None else secrets.token_urlsafe(16)
+        self.approve_results = approve_results
+        self.stage_url = stage_url
+        self.stage_name = stage_name
+        self.cached_show_results = []
+        self.cached_show_results_title = ""
+        self.decisions: dict[str, str] = {}
@@ -0,0 +1,281 @@
+import collections
+import datetime
+import os
+import pathlib
+import pickle
+import threading
+from typing import Any, Optional
+
+import sqlalchemy
+from sqlalchemy.orm import Session
+
+from coolNewLanguage.src import consts
+from coolNewLanguage.src.approvals.approval_session import ApprovalSession
+from coolNewLanguage.src.models import ApprovalDecision, PendingApproval
+
+"""
+How long an approval session is kept for by default before it expires, and its changes are discarded
+"""
+DEFAULT_APPROVAL_SESSION_MAX_AGE = datetime.timedelta(days=7)
+
+"""
+The number of sessions kept loaded in memory, so that the approval page fetching one page of rows after another doesn't
+load the session's file every time
+"""
+MAX_LOADED_SESSIONS = 4
+
+
+class ApprovalStore:
+    """
+    Persists the ApprovalSessions awaiting the user's approval, so that they survive the Tool restarting, and so that
+    the DataFrames of proposed changes don't stay in memory while the user decides
+    Each session is recorded in the __hls_approvals table of the Tool's database, keyed by its token, and its
+    ApproveResults, along with the results to show afterwards, are pickled to a file named after the token. The
+    approval POST then loads just the session whose token its form was rendered with. The decisions the user makes on
+    the approval page are recorded in the __hls_approval_decisions table as they're made, and handed to the approval
+    POST along with the session.
+
+    Attributes:
+        engine: The engine of the database holding the __hls_approvals table
+        directory: The directory session files are written to
+        max_age: How long a session is kept for. Older sessions are expired whenever a new one is saved.
+        _unpicklable_results: A dictionary mapping tokens to (results, title) pairs, for sessions whose results to show
+            couldn't be pickled, e.g. because they hold LazyTables. These are kept in memory, and so are lost if the
+            Tool restarts.
+        _loaded_sessions: An OrderedDict mapping tokens to the most recently loaded sessions, least recent first
+        _lock: A lock guarding _loaded_sessions, since sessions are saved from the threads stage functions run on
+    """
+    __slots__ = ('engine', 'directory', 'max_age', '_unpicklable_results', '_loaded_sessions', '_lock')
+
+    def __init__(
+            self,
+            engine: sqlalchemy.Engine,
+            directory: pathlib.Path,
+            max_age: datetime.timedelta = DEFAULT_APPROVAL_SESSION_MAX_AGE
+    ):
+        if not isinstance(engine, sqlalchemy.Engine):
+            raise TypeError("Expected engine to be a sqlalchemy Engine")
+        if not isinstance(directory, pathlib.Path):
+            raise TypeError("Expected directory to be a Path")
+        if not isinstance(max_age, datetime.timedelta):
+            raise TypeError("Expected max_age to be a timedelta")
+
+        self.engine = engine
+        self.directory = directory
+        self.max_age = max_age
+        self._unpicklable_results: dict[str, tuple[list, str]] = {}
+        self._loaded_sessions: collections.OrderedDict[str, ApprovalSession] = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def path_of(self, token: str) -> pathlib.Path:
+        return self.directory.joinpath(f'{token}.pkl')
+
+    def save(self, session: ApprovalSession):
+        """
+        Persists the passed session, so that it can be popped by the approval POST
+        :param session:
+        :return:
+        """
+        if not isinstance(session, ApprovalSession):
+            raise TypeError("Expected session to be an ApprovalSession")
+
+        self.expire()
+
+        state = {
+            'approve_results': session.approve_results,
+            'cached_show_results': session.cached_show_results,
+            'cached_show_results_title': session.cached_show_results_title
+        }
+        try:
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            # The results to show can hold objects bound to the running Tool, so keep them in memory instead
+            self._unpicklable_results[session.token] = (
+                session.cached_show_results, session.cached_show_results_title
+            )
+            state['cached_show_results'] = []
+            payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.path_of(session.token)
+        temp_path = path.with_suffix('.tmp')
+        temp_path.write_bytes(payload)
+        os.replace(temp_path, path)
+
+        with Session(self.engine) as orm_session, orm_session.begin():
+            orm_session.add(PendingApproval(
+                token=session.token,
+                stage_url=session.stage_url,
+                stage_name=session.stage_name,
+                created_at=datetime.datetime.now()
+            ))
+
+        # The approval page is about to fetch the session's rows
+        self._remember(session)
+
+    def get(self, token: Any) -> Optional[ApprovalSession]:
+        """
+        Returns the session with the passed token, leaving it to be popped by the approval POST
+        :param token:
+        :return: The session, or None if there's no unexpired session with the passed token
+        """
+        if not isinstance(token, str):
+            return None
+
+        with Session(self.engine) as orm_session:
+            pending_approval = orm_session.get(PendingApproval, token)
+            if pending_approval is None or self._is_expired(pending_approval.created_at):
+                return None
+            stage_url, stage_name = pending_approval.stage_url, pending_approval.stage_name
+
+        with self._lock:
+            session = self._loaded_sessions.get(token)
+            if session is not None:
+                self._loaded_sessions.move_to_end(token)
+                return session
+
+        session = self._load(token, stage_url, stage_name)
+        if session is not None:
+            self._remember(session)
+        return session
+
+    def record_decisions(self, token: str, decisions: dict[str, str]) -> bool:
+        """
+        Records decisions the user has made on the approval page of the session with the passed token, replacing any
+        earlier decisions for the same fields. A decision for an ApproveResult's bulk approve_{id}_all field replaces
+        the decisions for all of that ApproveResult's rows.
+        :param token: The session's token
+        :param decisions: A dictionary mapping approval form field names to decision strings
+        :return: Whether the decisions were recorded, which they aren't if there's no unexpired session with the token
+        """
+        if not isinstance(token, str):
+            raise TypeError("Expected token to be a string")
+        if not isinstance(decisions, dict):
+            raise TypeError("Expected decisions to be a dict")
+
+        with Session(self.engine) as orm_session, orm_session.begin():
+            pending_approval = orm_session.get(PendingApproval, token)
+            if pending_approval is None or self._is_expired(pending_approval.created_at):
+                return False
+
+            for field_name in decisions:
+                if field_name.endswith(f'_{consts.APPROVAL_BULK_DECISION_SUFFIX}'):
+                    prefix = field_name[:-len(consts.APPROVAL_BULK_DECISION_SUFFIX)]
+                    orm_session.execute(
+                        sqlalchemy.delete(ApprovalDecision).where(
+                            ApprovalDecision.token == token,
+                            ApprovalDecision.field_name.startswith(prefix, autoescape=True)
+                        )
+                    )
+            for field_name, decision in decisions.items():
+                orm_session.merge(ApprovalDecision(token=token, field_name=field_name, decision=decision))
+        return True
+
+    def get_decisions(self, token: str, prefix: str = '') -> dict[str, str]:
+        """
+        Returns the decisions recorded for the session with the passed token
+        :param token: The session's token
+        :param prefix: If not empty, only the decisions for fields whose names start with this are returned
+        :return: A dictionary mapping approval form field names to decision strings
+        """
+        if not isinstance(token, str):
+            raise TypeError("Expected token to be a string")
+
+        with Session(self.engine) as orm_session:
+            return self._get_decisions(orm_session, token, prefix)
+
+    def pop(self, token: Any) -> Optional[ApprovalSession]:
+        """
+        Removes and returns the session with the passed token. Each session can only be popped once, even by concurrent
+        requests, so that a set of changes can't be approved twice.
+        :param token: The token posted with the approval form
+        :return: The session, or None if there's no unexpired session with the passed token
+        """
+        if not isinstance(token, str):
+            return None
+
+        with Session(self.engine) as orm_session, orm_session.begin():
+            pending_approval = orm_session.get(PendingApproval, token)
+            if pending_approval is None or self._is_expired(pending_approval.created_at):
+                return None
+            stage_url, stage_name = pending_approval.stage_url, pending_approval.stage_name
+            # Only the request whose delete succeeds gets the session
+            deleted = orm_session.execute(
+                sqlalchemy.delete(PendingApproval).where(PendingApproval.token == token)
+            ).rowcount
+            if deleted != 1:
+                return None
+            decisions = self._get_decisions(orm_session, token)
+            orm_session.execute(sqlalchemy.delete(ApprovalDecision).where(ApprovalDecision.token == token))
+
+        with self._lock:
+            session = self._loaded_sessions.pop(token, None)
+        if session is None:
+            session = self._load(token, stage_url, stage_name)
+        self.path_of(token).unlink(missing_ok=True)
+        unpicklable_results = self._unpicklable_results.pop(token, None)
+        if session is None:
+            return None
+
+        if unpicklable_results is not None:
+            session.cached_show_results, session.cached_show_results_title = unpicklable_results
+        session.decisions = decisions
+        return session
+
+    def expire(self) -> int:
+        """
+        Deletes the sessions older than max_age, along with their files
+        :return: The number of sessions deleted
+        """
+        cutoff = datetime.datetime.now() - self.max_age
+        with Session(self.engine) as orm_session, orm_session.begin():
+            tokens = orm_session.scalars(
+                sqlalchemy.select(PendingApproval.token).where(PendingApproval.created_at < cutoff)
+            ).all()
+            orm_session.execute(sqlalchemy.delete(PendingApproval).where(PendingApproval.token.in_(tokens)))
+            orm_session.execute(sqlalchemy.delete(ApprovalDecision).where(ApprovalDecision.token.in_(tokens)))
+
+        for token in tokens:
+            self.path_of(token).unlink(missing_ok=True)
+            self._unpicklable_results.pop(token, None)
+            with self._lock:
+                self._loaded_sessions.pop(token, None)
+        return len(tokens)
+
+    def _load(self, token: str, stage_url: str, stage_name: str) -> Optional[ApprovalSession]:
+        """
+        Loads the session with the passed token from its file
+        :param token:
+        :param stage_url:
+        :param stage_name:
+        :return: The session, or None if its file doesn't exist
+        """
+        try:
+            state = pickle.loads(self.path_of(token).read_bytes())
+        except FileNotFoundError:
+            return None
+
+        session = ApprovalSession(state['approve_results'], stage_url, stage_name, token=token)
+        session.cached_show_results = state['cached_show_results']
+        session.cached_show_results_title = state['cached_show_results_title']
+        if token in self._unpicklable_results:
+            session.cached_show_results, session.cached_show_results_title = self._unpicklable_results[token]
+        return session
+
+    @staticmethod
+    def _get_decisions(orm_session: Session, token: str, prefix: str = '') -> dict[str, str]:
+        stmt = sqlalchemy.select(ApprovalDecision.field_name, ApprovalDecision.decision)\
+            .where(ApprovalDecision.token == token)
+        if prefix:
+            stmt = stmt.where(ApprovalDecision.field_name.startswith(prefix, autoescape=True))
+        return {field_name: decision for field_name, decision in orm_session.execute(stmt)}
+
+    def _remember(self, session: ApprovalSession):
+        with self._lock:
+            self._loaded_sessions[session.token] = session
+            self._loaded_sessions.move_to_end(session.token)
+            while len(self._loaded_sessions) > MAX_LOADED_SESSIONS:
+                self._loaded_sessions.popitem(last=False)
+
+    def _is_expired(self, created_at: datetime.datetime) -> bool:
+        return created_at < datetime.datetime.now() - self.max_age
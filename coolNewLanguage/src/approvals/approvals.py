@@ -1,29 +1,26 @@
 import jinja2
+import numpy as np
 import pandas as pd
 from aiohttp import web
 
 from coolNewLanguage.src import consts
+from coolNewLanguage.src.approvals import approval_rows
+from coolNewLanguage.src.approvals.approval_session import ApprovalSession
 from coolNewLanguage.src.approvals.approve_result import ApproveResult
 from coolNewLanguage.src.approvals.approve_result_type import ApproveResultType
-from coolNewLanguage.src.approvals.approve_state import ApproveState
+from coolNewLanguage.src.approvals.approve_state import ApproveState, APPROVE_STATE_STRINGS
 from coolNewLanguage.src.approvals.table_approve_result import TableApproveResult
 from coolNewLanguage.src.approvals.table_deletion_approve_result import TableDeletionApproveResult
+from coolNewLanguage.src.approvals.table_diff_approve_result import TableDiffApproveResult
 from coolNewLanguage.src.approvals.table_row_addition_approve_result import TableRowAdditionApproveResult
 from coolNewLanguage.src.approvals.table_schema_change_approve_result import TableSchemaChangeApproveResult
 from coolNewLanguage.src.exceptions.CNLError import CNLError
 from coolNewLanguage.src.stage import config, process, results
 from coolNewLanguage.src.stage.stage import Stage
 from coolNewLanguage.src.tool import Tool
+from coolNewLanguage.src.util.dataframe_diff_utils import diff_rows
 from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
-
-
-"""
-A list of ApproveResults to be inspected by the user
-This list is constructed by get_user_approvals when the approval page is being built, and then consumed by the approval
-handler when the user's approvals are being processed. It allows the two functions to communicate the list of results 
-that the user is being asked to approve.
-"""
-approve_results: list[ApproveResult] = []
+from coolNewLanguage.src.util.table_write_utils import has_valid_internal_ids, with_internal_ids
 
 
 def get_user_approvals():
@@ -51,7 +48,7 @@ def get_user_approvals():
         tool = process.running_tool
 
         # Construct approve_results from tool.tables
-        approve_results.clear()
+        approve_results = []
         # Create deletion results
         for table in tool.tables._tables_to_delete:
             approve_results.append(TableDeletionApproveResult(
@@ -60,8 +57,16 @@ def get_user_approvals():
         for table, df in tool.tables._tables_to_save.items():
             approve_results.append(get_table_approve_object(table, df))
 
+        # The session is persisted once the stage function has finished, and is then popped by the approval handler,
+        # which runs in a separate request
+        session = ApprovalSession(approve_results, process.curr_stage_url, process.stage_name)
+        process.approval_session = session
+
         Stage.approvals_template = template.render(
             approve_results=approve_results,
+            approval_session=session.token,
+            approval_session_field_name=consts.APPROVAL_SESSION_FIELD_NAME,
+            approval_url=f'{consts.APPROVALS_ROUTE}/{session.token}',
             form_action=approve_handler_url,
             form_method=form_method,
             form_enctype=form_enctype,
@@ -73,6 +78,8 @@ def get_table_approve_object(table_name: str, df: pd.DataFrame) -> ApproveResult
     """
     Depending on the difference between the passed df, and the associated prior version in the db, return the
     appropriate type of ApproveResult. Used during approval page construction for tables cached to be stored in the db.
+    If both versions have the same columns and their rows can be matched by internal id, the rows which were inserted,
+    updated or deleted are found by diffing the two, and only those are shown for approval.
     :param table_name: The name of the table being overwritten
     :param df: The new dataframe to be stored in the db
     :return: An instance of the appropriate subclass of ApproveResult
@@ -84,6 +91,18 @@ def get_table_approve_object(table_name: str, df: pd.DataFrame) -> ApproveResult
         # If the table is new, return a TableApproveResult
         return TableApproveResult(table_name, df)
 
+    # Work out the rows' ids as saving the table would, so that rows concatenated onto it are found to be new
+    if original_df.index.name == DB_INTERNAL_COLUMN_ID_NAME:
+        df = with_internal_ids(df, original_df.index)
+
+    if can_diff(original_df, df):
+        diff = diff_rows(original_df, df)
+        if len(diff.updated) == 0 and len(diff.deleted) == 0 and len(diff.inserted) > 0:
+            # Only show the rows which were added
+            return TableRowAdditionApproveResult(table_name, diff.inserted.tolist(), df.loc[diff.inserted])
+        # Return a TableDiffApproveResult, so that only the rows which changed are shown
+        return TableDiffApproveResult(table_name, original_df, df, diff)
+
     # Check if columns were added
     were_columns_added = len(original_df.columns) < len(df.columns)
 
@@ -99,33 +118,61 @@ def get_table_approve_object(table_name: str, df: pd.DataFrame) -> ApproveResult
     if not were_columns_added and were_rows_added:
         # We currently only support row additions
         # Return a TableRowAdditionApproveResult
-        # Compute the indices of the rows that were added
-        added_rows = list(range(original_df.shape[0], df.shape[0]))
-        print(added_rows)
+        # Compute the index labels of the rows that were added, which are the ones not in the original table
+        added_rows = df.index[~df.index.isin(original_df.index)].tolist()
         return TableRowAdditionApproveResult(table_name, added_rows, df)
 
     # Return default TableApproveResult
     return TableApproveResult(table_name, df)
 
 
+def can_diff(original_df: pd.DataFrame, df: pd.DataFrame) -> bool:
+    """
+    Whether the rows of df can be matched with those of original_df by internal id, so that the changes between them can
+    be approved row by row: the stored table is keyed by internal id, df's index holds valid internal ids, and both have
+    the same columns
+    :param original_df: The stored version of the table, as read by Tool._get_table_dataframe
+    :param df: The new version of the table
+    :return:
+    """
+    return original_df.index.name == DB_INTERNAL_COLUMN_ID_NAME \
+        and has_valid_internal_ids(df) \
+        and df.columns.is_unique \
+        and set(df.columns) == set(original_df.columns)
+
+
 async def approval_handler(request: web.Request) -> web.Response:
     """
     The handler for user approvals
-    Uses the post body to determine which ApproveResults were approved, and which were rejected, and commits those that
-    were approved to the database. Then, redirects back to the Tool landing page
+    Uses the post body, along with the decisions recorded from the approval page, to determine which ApproveResults
+    were approved, and which were rejected, and commits those that were approved to the database. Then, redirects back
+    to the Tool landing page
     :param request:
     :return:
     """
     if not isinstance(request, web.Request):
         raise TypeError("Expected request to be an aiohttp web.Request")
 
-    process.handling_user_approvals = True
-
     # Set the post results of the user's approvals on process
     process.approval_post_body = await request.post()
 
-    # Iterate through the cached ApproveResults, processing each one as appropriate
-    for approve_result in approve_results:
+    # Find the changes these approvals are for
+    session = process.running_tool.approval_store.pop(process.approval_post_body.get(consts.APPROVAL_SESSION_FIELD_NAME))
+    if session is None:
+        process.approval_post_body = None
+        raise web.HTTPNotFound(text="These changes were already approved, or the approval page has expired")
+
+    # Add the decisions recorded while the user paged through the changes, which the posted ones override
+    process.approval_post_body = {**session.decisions, **process.approval_post_body}
+
+    process.handling_user_approvals = True
+    process.curr_stage_url = session.stage_url
+    process.stage_name = session.stage_name
+    process.cached_show_results = session.cached_show_results
+    process.cached_show_results_title = session.cached_show_results_title
+
+    # Iterate through the session's ApproveResults, processing each one as appropriate
+    for approve_result in session.approve_results:
         match approve_result:
             case TableApproveResult():
                 handle_table_approve_result(approve_result)
@@ -135,6 +182,8 @@ async def approval_handler(request: web.Request) -> web.Response:
                 handle_table_deletion_approve_result(approve_result)
             case TableRowAdditionApproveResult():
                 handle_table_row_addition_approve_result(approve_result)
+            case TableDiffApproveResult():
+                handle_table_diff_approve_result(approve_result)
             case _:
                 raise ValueError(f"Unknown ApproveResult type")
 
@@ -165,6 +214,96 @@ async def approval_handler(request: web.Request) -> web.Response:
     raise web.HTTPFound(location='/')
 
 
+async def approval_rows_handler(request: web.Request) -> web.Response:
+    """
+    Serves a single page of the rows of an ApproveResult awaiting approval as JSON, for its table on the approval page,
+    so that the page doesn't have to render every row up front
+    Expects the approval session's token and the ApproveResult's id in the route, and optionally offset, limit and draw
+    in the request query, as for Tool.get_table_data
+    :param request:
+    :return: A JSON response of the shape returned by TablePage.to_json
+    """
+    if not isinstance(request, web.Request):
+        raise TypeError("Expected request to be an aiohttp web.Request")
+
+    approval_store = process.running_tool.approval_store
+    token = request.match_info['token']
+    session = approval_store.get(token)
+    if session is None:
+        raise web.HTTPNotFound(text="These changes were already approved, or the approval page has expired")
+    approve_result = next(
+        (r for r in session.approve_results if str(r.id) == request.match_info['approve_result_id']), None
+    )
+    if approve_result is None:
+        raise web.HTTPNotFound(text="No such change awaiting approval")
+
+    try:
+        offset = int(request.query.get("offset", 0))
+        limit = int(request.query.get("limit", consts.DEFAULT_TABLE_PAGE_SIZE))
+        draw = int(request.query.get("draw", 0))
+    except ValueError:
+        return web.Response(body="Expected offset, limit and draw to be integers", status=400)
+
+    decisions = approval_store.get_decisions(token, prefix=f'approve_{approve_result.id}_')
+    try:
+        page = approval_rows.get_approval_rows_page(approve_result, decisions, offset, limit)
+    except ValueError as e:
+        return web.Response(body=str(e), status=400)
+
+    return web.json_response(page.to_json(draw))
+
+
+async def approval_decisions_handler(request: web.Request) -> web.Response:
+    """
+    Records decisions the user makes on the approval page as they're made, so that they count once the approval form
+    is posted, even for rows which have since been paged away from
+    Expects the approval session's token in the route, and a post body mapping approval form field names to decision
+    strings
+    :param request:
+    :return: A JSON response with the number of decisions recorded
+    """
+    if not isinstance(request, web.Request):
+        raise TypeError("Expected request to be an aiohttp web.Request")
+
+    decisions = dict(await request.post())
+    for field_name, decision in decisions.items():
+        if not field_name.startswith('approve_') or decision not in APPROVE_STATE_STRINGS.values():
+            return web.Response(body=f"Unexpected decision {decision} for {field_name}", status=400)
+
+    if not process.running_tool.approval_store.record_decisions(request.match_info['token'], decisions):
+        raise web.HTTPNotFound(text="These changes were already approved, or the approval page has expired")
+
+    return web.json_response({'recorded': len(decisions)})
+
+
+def approved_rows_mask(approve_result: ApproveResult, row_ids: pd.Index) -> np.ndarray:
+    """
+    Parses the user's decisions for the passed rows of an ApproveResult out of the approval POST body, in one pass over
+    the body rather than a lookup per row
+    Each row's decision is taken from its own approve_{id}_{row id} field if it has one, and otherwise from the
+    ApproveResult's bulk approve_{id}_all field, which the approval page sets when the user approves or rejects every
+    row at once. Rows with neither, e.g. because they were never shown, are left pending.
+    :param approve_result: The ApproveResult the rows belong to
+    :param row_ids: The ids of the rows, as rendered into the approval page
+    :return: A boolean array which is True for the rows the user approved
+    """
+    prefix = f'approve_{approve_result.id}_'
+    decisions = {
+        name[len(prefix):]: value
+        for name, value in process.approval_post_body.items()
+        if isinstance(name, str) and name.startswith(prefix)
+    }
+    default = decisions.pop(consts.APPROVAL_BULK_DECISION_SUFFIX, APPROVE_STATE_STRINGS[ApproveState.PENDING])
+
+    states = pd.Series(row_ids.astype(str), dtype=object).map(decisions).fillna(default)
+    is_known = states.isin(APPROVE_STATE_STRINGS.values())
+    if not is_known.all():
+        # Raises a ValueError naming the unrecognized decision
+        ApproveState.of_string(states[~is_known].iloc[0])
+
+    return (states == APPROVE_STATE_STRINGS[ApproveState.APPROVED]).to_numpy()
+
+
 def handle_table_approve_result(table_approve_result: TableApproveResult):
     """
     Handles a user-processed TableApproveResult
@@ -172,22 +311,15 @@ def handle_table_approve_result(table_approve_result: TableApproveResult):
     :param table_approve_result:
     :return:
     """
-    # Filter the rows that were approved
-    approved_rows = []
-
-    for index, _ in table_approve_result.dataframe.iterrows():
-        approve_result_name = f'approve_{table_approve_result.id}_{index}'
-        raw_approval_state = process.approval_post_body[approve_result_name]
-        approval_state = ApproveState.of_string(raw_approval_state)
-        if approval_state == ApproveState.APPROVED:
-            approved_rows.append(index)
+    # Find the rows that were approved
+    approved = approved_rows_mask(table_approve_result, table_approve_result.dataframe.index)
 
     # If there were no approved rows, then return early
-    if len(approved_rows) == 0:
+    if not approved.any():
         return
 
     # Filter the dataframe to only include the approved rows
-    df = table_approve_result.dataframe.loc[approved_rows]
+    df = table_approve_result.dataframe[approved]
 
     # Save the dataframe using tool.tables
     process.running_tool.tables._save_table(
@@ -202,23 +334,19 @@ def handle_table_schema_change_approve_result(table_schema_change_approve_result
     :param table_schema_change_approve_result:
     :return:
     """
-    df = table_schema_change_approve_result.dataframe
+    df = table_schema_change_approve_result.dataframe.copy()
 
     # Compute the approved rows
-    approve_result_name = f'approve_{table_schema_change_approve_result.id}'
-
-    indices = df.index
-    approved_rows = [i for i in indices if ApproveState.of_string(
-        process.approval_post_body[f'{approve_result_name}_{i}']) == ApproveState.APPROVED]
+    approved = approved_rows_mask(table_schema_change_approve_result, df.index)
 
     # If no rows were approved, then return early. No changes will be committed
-    if len(approved_rows) == 0:
+    if not approved.any():
         return
 
-    # Keep values which were approved
-    for col in table_schema_change_approve_result.cols_added:
-        df[col] = df.apply(
-            lambda x: x[col] if x.name in approved_rows else '', axis=1)
+    # Keep values which were approved, blanking the new columns of the other rows
+    cols_added = table_schema_change_approve_result.cols_added
+    df[cols_added] = df[cols_added].astype(object)
+    df.loc[~approved, cols_added] = ''
 
     # Commit the final df
     process.running_tool.tables._save_table(
@@ -228,37 +356,60 @@ def handle_table_schema_change_approve_result(table_schema_change_approve_result
 def handle_table_row_addition_approve_result(table_row_addition_approve_result: TableRowAdditionApproveResult):
     """
     Handles a user-processed TableRowAdditionApproveResult
-    Filters rows that were approved by the user, and commits the new rows to the table if they were approved.
+    Filters rows that were approved by the user, and appends the approved rows to the table, without rewriting its
+    existing rows.
     :param table_row_addition_approve_result:
     :return:
     """
     df = table_row_addition_approve_result.dataframe
 
-    # Compute the approved rows
-    approve_result_name = f'approve_{table_row_addition_approve_result.id}'
-
-    indices = table_row_addition_approve_result.rows_added
-    approved_rows = [i for i in indices if ApproveState.of_string(
-        process.approval_post_body[f'{approve_result_name}_{i}']) == ApproveState.APPROVED]
+    # Compute the approved rows, out of the rows which were added
+    df = df[df.index.isin(list(table_row_addition_approve_result.rows_added))]
+    approved = approved_rows_mask(table_row_addition_approve_result, df.index)
 
     # If no rows were approved, then return early. No changes will be committed
-    if len(approved_rows) == 0:
+    if not approved.any():
         return
 
     # Filter the dataframe to only include the approved rows
-    df = df.loc[approved_rows]
+    df = df[approved]
+
+    # Append just the approved rows to the existing table
+    process.running_tool.tables._append_rows(table_row_addition_approve_result.table_name, df)
+
 
-    # Get the existing table
-    existing_df = process.running_tool._get_table_dataframe(
-        table_row_addition_approve_result.table_name)
+def handle_table_diff_approve_result(table_diff_approve_result: TableDiffApproveResult):
+    """
+    Handles a user-processed TableDiffApproveResult
+    Applies just the inserted, updated and deleted rows which the user approved to the stored table, and commits it.
+    :param table_diff_approve_result:
+    :return:
+    """
+    def approved(row_ids: pd.Index) -> pd.Index:
+        return row_ids[approved_rows_mask(table_diff_approve_result, row_ids)]
 
-    # Concatenate the approved rows to the existing table
-    if existing_df is not None:
-        df = pd.concat([existing_df, df])
+    approved_inserted = approved(table_diff_approve_result.inserted.index)
+    approved_updated = approved(table_diff_approve_result.updated.index)
+    approved_deleted = approved(table_diff_approve_result.deleted.index)
+
+    # If no rows were approved, then return early. No changes will be committed
+    if len(approved_inserted) == 0 and len(approved_updated) == 0 and len(approved_deleted) == 0:
+        return
+
+    table_name = table_diff_approve_result.table_name
+    df = process.running_tool._get_table_dataframe(table_name)
+    if df is None:
+        df = table_diff_approve_result.inserted.iloc[:0]
+
+    # Apply the approved changes to the table's current contents
+    df = df.drop(index=approved_deleted, errors='ignore')
+    approved_updated = df.index.intersection(approved_updated)
+    for column in table_diff_approve_result.column_names:
+        df.loc[approved_updated, column] = table_diff_approve_result.updated.loc[approved_updated, column]
+    df = pd.concat([df, table_diff_approve_result.inserted.loc[approved_inserted]])
 
     # Commit the final df
-    process.running_tool.tables._save_table(
-        table_row_addition_approve_result.table_name, df)
+    process.running_tool.tables._save_table(table_name, df)
 
 
 def handle_table_deletion_approve_result(table_deletion_approve_result: TableDeletionApproveResult):
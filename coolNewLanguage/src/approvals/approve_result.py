@@ -1,8 +1,13 @@
 from coolNewLanguage.src.approvals.approve_state import ApproveState
+from coolNewLanguage.src.stage.request_context import context_local_metaclass
 
 
-class ApproveResult:
-    num_approve_results = 0
+class ApproveResult(metaclass=context_local_metaclass('ApproveResult', num_approve_results=int)):
+    """
+    A change which the user is asked to approve
+    num_approve_results, which is used to give each ApproveResult created while handling a request a unique id, is kept
+    in a ContextVar, so that each request numbers its ApproveResults independently
+    """
     __slots__ = ('approve_state', 'approve_result_type', 'id')
 
     def __init__(self):
@@ -8,3 +8,4 @@ class ApproveResultType(Enum):
     TABLE_DELETION = "Table Deletion"
     TABLE_SCHEMA_CHANGE = "Table Schema Change"
     TABLE_ROW_ADDITION = "Table Row Addition"
+    TABLE_DIFF = "Table Diff"
@@ -17,4 +17,15 @@ class ApproveState(Enum):
             return ApproveState.PENDING
         elif s == "ignore":
             return ApproveState.IGNORE
-        raise ValueError("Unrecognized ApproveState string: " + s)
\ No newline at end of file
+        raise ValueError("Unrecognized ApproveState string: " + s)
+
+
+"""
+The strings the approval page uses for each ApproveState, as parsed by ApproveState.of_string
+"""
+APPROVE_STATE_STRINGS = {
+    ApproveState.APPROVED: "approve",
+    ApproveState.REJECTED: "reject",
+    ApproveState.PENDING: "pending",
+    ApproveState.IGNORE: "ignore"
+}
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from coolNewLanguage.src.approvals.approve_result import ApproveResult
+from coolNewLanguage.src.approvals.approve_result_type import ApproveResultType
+from coolNewLanguage.src.util.dataframe_diff_utils import RowDiff
+
+
+class TableDiffApproveResult(ApproveResult):
+    """
+    The changes made to a stored table, as a set of inserted, updated and deleted rows matched by internal id, so that
+    the user is only asked to approve the rows which actually changed rather than every row of the table
+    Each changed row is approved or rejected as a whole.
+
+    Attributes:
+        table_name: The name of the changed table
+        column_names: The columns of the new version of the table
+        inserted: The rows present only in the new version
+        updated: The new values of the rows whose values changed
+        previous: The old values of the updated rows
+        deleted: The old values of the rows present only in the old version
+        changed_cells: A boolean DataFrame, labelled like updated, marking which of its cells changed
+    """
+    __slots__ = ('table_name', 'column_names', 'inserted', 'updated', 'previous', 'deleted', 'changed_cells')
+
+    def __init__(self, table_name: str, old_df: pd.DataFrame, new_df: pd.DataFrame, diff: RowDiff):
+        """
+        :param table_name: The name of the changed table
+        :param old_df: The stored version of the table
+        :param new_df: The new version of the table
+        :param diff: The RowDiff between old_df and new_df
+        """
+        if not isinstance(table_name, str):
+            raise TypeError("Expected table_name to be a string")
+        if not isinstance(old_df, pd.DataFrame):
+            raise TypeError("Expected old_df to be a pandas DataFrame")
+        if not isinstance(new_df, pd.DataFrame):
+            raise TypeError("Expected new_df to be a pandas DataFrame")
+        if not isinstance(diff, RowDiff):
+            raise TypeError("Expected diff to be a RowDiff")
+
+        self.table_name = table_name
+        self.column_names = new_df.columns.tolist()
+        self.inserted = new_df.loc[diff.inserted]
+        self.updated = new_df.loc[diff.updated]
+        self.previous = old_df.loc[diff.updated, self.column_names]
+        self.deleted = old_df.loc[diff.deleted, self.column_names]
+        self.changed_cells = diff.changed_cells
+
+        super().__init__()
+        self.approve_result_type = ApproveResultType.TABLE_DIFF
+
+    @property
+    def num_changed_rows(self) -> int:
+        return len(self.inserted) + len(self.updated) + len(self.deleted)
@@ -0,0 +1,123 @@
+import importlib.util
+import os
+import pathlib
+import threading
+import urllib.parse
+from typing import Optional
+
+import pandas as pd
+
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+"""The extension of the files tables are stored in"""
+ARROW_FILE_EXTENSION = '.arrow'
+
+
+class ArrowTableStore:
+    """
+    A columnar copy of a Tool's user tables, kept as one Arrow IPC file per table alongside the Tool's database.
+    Reading a table from its file memory-maps it and hands back a DataFrame whose columns are Arrow arrays over the
+    mapped buffers, so that nothing is converted row by row and pages of the file are only loaded as they're touched.
+    The database remains the source of truth, and is still what SQL-based consumers such as LazyTable and the paginated
+    table endpoint query; the store only mirrors the tables Tables writes. Requires the pyarrow package.
+    Since the database can be changed by other processes, e.g. another Tool sharing a Postgres database, or by hand,
+    while no file records which version of a table it holds, a table's file is only trusted by the store which wrote
+    it. Files left behind by earlier processes are ignored, and replaced the next time the table is written.
+
+    Attributes:
+        directory: The directory the table files are kept in
+        _written: The names of the tables whose files were written by this store
+        _lock: Guards _written, since tables are written from the threads stage functions run on
+    """
+    __slots__ = ('directory', '_written', '_lock')
+
+    def __init__(self, directory: pathlib.Path | str):
+        """
+        :param directory: The directory to keep the table files in, which is created if it doesn't exist
+        """
+        if not isinstance(directory, (pathlib.Path, str)):
+            raise TypeError("Expected directory to be a Path or a string")
+        if importlib.util.find_spec('pyarrow') is None:
+            raise ImportError("The Arrow table store requires the pyarrow package to be installed")
+
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._written: set[str] = set()
+        self._lock = threading.Lock()
+
+    def path_of(self, table_name: str) -> pathlib.Path:
+        """
+        Returns the path of the file the passed table is stored in. Table names are percent-encoded, since they can
+        contain characters which aren't allowed in file names.
+        :param table_name:
+        :return:
+        """
+        return self.directory.joinpath(urllib.parse.quote(table_name, safe='') + ARROW_FILE_EXTENSION)
+
+    def has_table(self, table_name: str) -> bool:
+        with self._lock:
+            if table_name not in self._written:
+                return False
+        return self.path_of(table_name).exists()
+
+    def read(self, table_name: str) -> Optional[pd.DataFrame]:
+        """
+        Memory-maps the passed table's file and returns its contents as a DataFrame of Arrow-backed columns, indexed by
+        internal id
+        :param table_name:
+        :return: The table's DataFrame, or None if the table isn't in the store, or its file wasn't written by this
+        store
+        """
+        import pyarrow as pa
+        import pyarrow.ipc
+
+        if not self.has_table(table_name):
+            return None
+        path = self.path_of(table_name)
+
+        with pa.memory_map(str(path), 'r') as source:
+            arrow_table = pa.ipc.open_file(source).read_all()
+
+        df = arrow_table.to_pandas(types_mapper=pd.ArrowDtype)
+        # Keep the index as a plain int64 index, which is what the diff writes in table_write_utils expect
+        ids = df.pop(DB_INTERNAL_COLUMN_ID_NAME).to_numpy(dtype='int64')
+        df.index = pd.Index(ids, name=DB_INTERNAL_COLUMN_ID_NAME)
+        return df
+
+    def write(self, table_name: str, df: pd.DataFrame):
+        """
+        Stores the passed DataFrame, which must be indexed by internal id, as the contents of the passed table. The file
+        is written next to the old one and then moved over it, so that readers never see a partially written table.
+        :param table_name:
+        :param df:
+        :return:
+        """
+        import pyarrow as pa
+        import pyarrow.ipc
+
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("Expected df to be a pandas DataFrame")
+        if df.index.name != DB_INTERNAL_COLUMN_ID_NAME:
+            raise ValueError("Expected df to be indexed by internal id")
+
+        arrow_table = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+
+        path = self.path_of(table_name)
+        tmp_path = path.with_suffix(path.suffix + '.tmp')
+        with pa.OSFile(str(tmp_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, arrow_table.schema) as writer:
+                writer.write_table(arrow_table)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._written.add(table_name)
+
+    def delete(self, table_name: str):
+        """
+        Removes the passed table from the store, if it's there
+        :param table_name:
+        :return:
+        """
+        with self._lock:
+            self._written.discard(table_name)
+        self.path_of(table_name).unlink(missing_ok=True)
@@ -5,6 +5,12 @@ import sqlalchemy
 from coolNewLanguage.src.exceptions.CNLError import raise_type_casting_error
 from coolNewLanguage.src.stage import process
 
+"""
+The default val of a Cell, marking that its value wasn't passed and must be read from the database, since None is the
+value of NULL cells
+"""
+_UNREAD = object()
+
 
 class Cell:
     """
@@ -12,19 +18,18 @@ class Cell:
     Used to support updates to an existing table, as well as iteration over a column
     Even though Cell has an expected_type field, the responsibility of casting the value to that type rests on consumers
     of the value
+    Cells which have been set since they were read are marked dirty, so that saving their Row only writes them
     """
     def __init__(self, table: sqlalchemy.Table, col_name: str, row_id: int, expected_type: Optional[type] = None,
-                 val: Optional[Any] = None):
+                 val: Optional[Any] = _UNREAD):
         """
-        Initialize the cell, issuing a query if val is None to get the value from the passed table
+        Initialize the cell, issuing a query if val isn't passed to get the value from the passed table
         :param table: The sqlalchemy table containing the cell
         :param col_name: The name of the containing column
         :param row_id: The row id of the cell
         :param expected_type: The expected type of the cell's value
-        :param val: The value of the cell. If None, a query is issued to get the value
+        :param val: The value of the cell. If not passed, a query is issued to get the value
         """
-        from coolNewLanguage.src.util.db_utils import get_cell_value
-
         if not isinstance(table, sqlalchemy.Table):
             raise TypeError("Expected table to be a sqlalchemy Table")
         if not isinstance(col_name, str):
@@ -38,8 +43,9 @@ class Cell:
         self.col_name = col_name
         self.row_id = row_id
         self.expected_type = expected_type
+        self.dirty = False
 
-        if val is None:
+        if val is _UNREAD:
             val = get_cell_value(process.running_tool, table, col_name, row_id)
 
         if expected_type is not None:
@@ -58,8 +64,8 @@ class Cell:
 
     def set(self, value: Any):
         """
-        Update this cell's value
-        Overwrites data in the database by issuing an update statement
+        Update this cell's value, marking it dirty
+        The new value is written to the database when the containing Row is saved
         :param value:
         :return:
         """
@@ -69,10 +75,11 @@ class Cell:
             except Exception as e:
                 raise_type_casting_error(value, self.expected_type, e)
         self.val = value
+        self.dirty = True
 
     def __lshift__(self, other: Any):
         """
-        Set the value of this cell to other, executing an update statement too
+        Set the value of this cell to other
         :param other:
         :return:
         """
@@ -102,4 +109,20 @@ class Cell:
         return self.val
 
     def __hash__(self):
-        return hash(self.val)
\ No newline at end of file
+        return hash(self.val)
+
+
+def get_cell_value(tool: 'Tool', table: sqlalchemy.Table, column_name: str, row_id: int) -> Any:
+    """
+    Get the value of the given cell, identified by its table, column_name and row_id
+    :param tool: The Tool which owns the table with the cell to be read
+    :param table: The table with the cell to be read
+    :param column_name: The name of the column containing the cell to be read
+    :param row_id: The row containing the cell to be read
+    :return: The value of the cell
+    """
+    from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+    stmt = sqlalchemy.select(table.c[column_name]).where(table.c[DB_INTERNAL_COLUMN_ID_NAME] == row_id)
+    with tool.db_engine.connect() as conn:
+        return conn.execute(stmt).scalar_one()
@@ -1,6 +1,7 @@
-from typing import Any, Optional, Union
+from typing import Any, Iterator, Optional, Union
 
 from coolNewLanguage.src.cnl_type.field import Field
+from coolNewLanguage.src.cnl_type.link import Link
 from coolNewLanguage.src.cnl_type.link_metatype import LinkMetatype
 from coolNewLanguage.src.component.column_selector_component import ColumnSelectorComponent
 from coolNewLanguage.src.exceptions.CNLError import raise_type_casting_error
@@ -162,6 +163,90 @@ class CNLType:
 
         return self._hls_backing_row.link(link_dst, link_metatype, get_user_approvals)
 
+    def get_links(self, link_metatype: LinkMetatype) -> list[Link]:
+        """
+        Returns the links of the passed metatype from this CNLType instance's backing row, or an empty list if it has
+        no backing row
+        :param link_metatype:
+        :return:
+        """
+        if self._hls_backing_row is None:
+            return []
+
+        return self._hls_backing_row.get_links(link_metatype)
+
+    def get_backlinks(self, link_metatype: LinkMetatype) -> list[Link]:
+        """
+        Returns the links of the passed metatype to this CNLType instance's backing row, or an empty list if it has no
+        backing row
+        :param link_metatype:
+        :return:
+        """
+        if self._hls_backing_row is None:
+            return []
+
+        return self._hls_backing_row.get_backlinks(link_metatype)
+
+    def get_neighbors(self, link_metatype: LinkMetatype, direction: str = 'forward') -> list['Row']:
+        """
+        Returns the rows linked to this CNLType instance's backing row by links of the passed metatype, or an empty list
+        if it has no backing row. Acts as a wrapper around the running Tool's get_neighbors.
+        :param link_metatype:
+        :param direction: Which way to follow links: 'forward', 'backward' or 'both'
+        :return:
+        """
+        from coolNewLanguage.src.stage import process
+
+        if self._hls_backing_row is None or not process.handling_post:
+            return []
+
+        return process.running_tool.get_neighbors(self, link_metatype, direction)
+
+    def expand_links(
+            self,
+            link_metatypes: Union[LinkMetatype, list[LinkMetatype]],
+            max_hops: int,
+            direction: str = 'forward'
+    ) -> Iterator[list['Row']]:
+        """
+        Finds the rows reachable from this CNLType instance's backing row by following at most max_hops links of the
+        passed metatypes, in batches. Yields nothing if it has no backing row. Acts as a wrapper around the running
+        Tool's expand_links.
+        :param link_metatypes:
+        :param max_hops:
+        :param direction: Which way to follow links: 'forward', 'backward' or 'both'
+        :return:
+        """
+        from coolNewLanguage.src.stage import process
+
+        if self._hls_backing_row is None or not process.handling_post:
+            return iter(())
+
+        return process.running_tool.expand_links(self, link_metatypes, max_hops, direction)
+
+    def find_link_path(
+            self,
+            dst: Union['Row', 'CNLType'],
+            link_metatypes: Union[LinkMetatype, list[LinkMetatype]],
+            max_hops: int,
+            direction: str = 'forward'
+    ) -> Optional[list[Link]]:
+        """
+        Finds a shortest path of links of the passed metatypes from this CNLType instance's backing row to dst. Returns
+        None if it has no backing row. Acts as a wrapper around the running Tool's find_link_path.
+        :param dst:
+        :param link_metatypes:
+        :param max_hops:
+        :param direction: Which way to follow links: 'forward', 'backward' or 'both'
+        :return:
+        """
+        from coolNewLanguage.src.stage import process
+
+        if self._hls_backing_row is None or not process.handling_post:
+            return None
+
+        return process.running_tool.find_link_path(self, dst, link_metatypes, max_hops, direction)
+
     def get_field_values(self) -> dict[str, Any]:
         """
         Returns a dictionary mapping programmer-defined attribute names to the values contained in the associated fields
@@ -1,7 +1,7 @@
 from typing import Optional
 
 from coolNewLanguage.src.stage import process
-from coolNewLanguage.src.util.link_utils import get_link_metatype_id_from_metaname, register_link_metatype_on_tool
+from coolNewLanguage.src.util.link_utils import register_link_metatype_on_tool
 
 
 class LinkMetatype:
@@ -29,14 +29,10 @@ class LinkMetatype:
         self.meta_name = name
 
         if process.handling_post:
-            tool = process.running_tool
-
-            meta_id = get_link_metatype_id_from_metaname(tool=tool, link_meta_name=name)
-
-            if meta_id is None:
-                meta_id = register_link_metatype_on_tool(tool=tool, link_meta_name=name)
-
-            self._hls_internal_link_meta_id = meta_id
+            # Registering an already registered metatype just returns its id
+            self._hls_internal_link_meta_id = register_link_metatype_on_tool(
+                tool=process.running_tool, link_meta_name=name
+            )
         else:
             self._hls_internal_link_meta_id = None
 
@@ -52,11 +48,8 @@ class LinkMetatype:
         if not process.handling_post:
             return None
 
-        tool = process.running_tool
-
-        self._hls_internal_link_meta_id = get_link_metatype_id_from_metaname(tool=tool, link_meta_name=self.meta_name)
-
-        if self._hls_internal_link_meta_id is None:
-            self._hls_internal_link_meta_id = register_link_metatype_on_tool(tool=tool, link_meta_name=self.meta_name)
+        self._hls_internal_link_meta_id = register_link_metatype_on_tool(
+            tool=process.running_tool, link_meta_name=self.meta_name
+        )
 
         return self._hls_internal_link_meta_id
@@ -3,6 +3,7 @@ import pandas as pd
 
 from coolNewLanguage.src import consts
 from coolNewLanguage.src.component.input_component import InputComponent
+from coolNewLanguage.src.lazy_table import LazyTable
 from coolNewLanguage.src.stage import process, config
 
 
@@ -22,7 +23,8 @@ class ColumnSelectorComponent(InputComponent):
         label: The label to paint onto this ColumnSelectorComponent
         num_columns: The number of columns to select
         table_name: The name of the table from which columns were selected
-        value: The names of the column this selector represents
+        column_names: The names of the columns which were selected
+        value: A LazyTable handle to the selected columns of the selected table
         
     Constants:
         NUM_PREVIEW_COLS: How many columns to show in each table preview
@@ -40,10 +42,11 @@ class ColumnSelectorComponent(InputComponent):
 
         super().__init__(expected_type=pd.DataFrame, multiple_values=True)
 
+        # replace value with a lazy handle to just the chosen columns, so that only those columns are ever read
         if process.handling_post:
             self.table_name: str = self.value[0]
             self.column_names = self.value[1:]
-            self.value: pd.DataFrame = process.running_tool.tables[self.table_name][self.value[1:]]
+            self.value: LazyTable = process.running_tool.tables.lazy(self.table_name)[self.column_names]
 
     def paint(self):
         # Load the jinja template
@@ -58,7 +61,7 @@ class ColumnSelectorComponent(InputComponent):
                 {
                     'name': table_name,
                     'cols': tool_tables.get_columns_of_table(table_name),
-                    'rows': tool_tables[table_name].head(self.NUM_PREVIEW_ROWS),
+                    'rows': tool_tables.get_preview(table_name, self.NUM_PREVIEW_ROWS),
                     'transient_id': i
                 }
             )
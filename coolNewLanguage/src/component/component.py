@@ -1,5 +1,8 @@
 
 
+from coolNewLanguage.src.stage.request_context import context_local_metaclass
+
+
 def get_component_id() -> str:
     """
     Get the id for the current component based on Component.num_components
@@ -8,7 +11,7 @@ def get_component_id() -> str:
     return f'component_{Component.num_components}'
 
 
-class Component:
+class Component(metaclass=context_local_metaclass('Component', num_components=int)):
     """
     Part of a stage's config
 
@@ -20,8 +23,8 @@ class Component:
             Since components are iterated over in the order in which they are
             defined within the stage function, this component id is guaranteed
             to be the same regardless of which time we are "initalizing" it
+            Kept in a ContextVar, so that each request numbers its components independently
     """
-    num_components = 0
 
     def __init__(self):
         from coolNewLanguage.src.stage import config
@@ -1,5 +1,6 @@
 import os.path
 import pathlib
+import shutil
 
 import aiohttp.web_request
 import jinja2
@@ -7,14 +8,18 @@ import jinja2
 from coolNewLanguage.src import consts
 from coolNewLanguage.src.component.input_component import InputComponent
 from coolNewLanguage.src.stage import config, process
+from coolNewLanguage.src.util.upload_utils import UPLOAD_CHUNK_BYTES, UploadedFile
 
 
 class FileUploadComponent(InputComponent):
     """
     A component used to accept user file uploads
-    If handling a post request, write a copy of the uploaded file, and set this component's value to be the path to
-    that copy
+    If handling a post request, move the uploaded file, which Stage.post_handler has already streamed to a temporary
+    file, into the Tool's file directory, and set this component's value to be the path to it. If the running Tool
+    hashes uploads, content_hash is set to the hex digest of the file.
     expected_ext is enforced by the browser by adding an accept attribute to the input component
+    Large CSV uploads should be turned into tables with tool.tables.load_csv(table_name, component.value), which streams
+    the file into the database, rather than by reading them into a DataFrame with pandas
     """
 
     def __init__(self, expected_ext: str, label: str = '', replace_existing: bool = True):
@@ -36,12 +41,13 @@ class FileUploadComponent(InputComponent):
         else:
             self.expected_ext = expected_ext
         self.label = label
+        self.content_hash = None
 
         super().__init__(pathlib.Path)
 
         if process.handling_post:
-            if not isinstance(self.value, aiohttp.web_request.FileField):
-                raise TypeError("Expected value to be an aiohttp FileField")
+            if not isinstance(self.value, (UploadedFile, aiohttp.web_request.FileField)):
+                raise TypeError("Expected value to be an aiohttp FileField or an UploadedFile")
             # Check file extension
             extension = pathlib.Path(self.value.filename).suffix
             if extension != (('.' + self.expected_ext) if self.expected_ext else ''):
@@ -56,11 +62,16 @@ class FileUploadComponent(InputComponent):
             if os.path.isfile(file_path) and not replace_existing:
                 raise ValueError(f"A file named {self.value.filename} already been uploaded. Please rename the file or "
                                  f"upload a file with a different name.")
-            # write our own copy of the file
-            with open(file_path, mode='wb') as f:
-                f.write(self.value.file.read())
+            if isinstance(self.value, UploadedFile):
+                # the upload was streamed to a temporary file in the same directory, so just rename it
+                os.replace(self.value.path, file_path)
+                self.content_hash = self.value.content_hash
+            else:
+                # copy the file a chunk at a time, rather than reading it into memory
+                with open(file_path, mode='wb') as f:
+                    shutil.copyfileobj(self.value.file, f, UPLOAD_CHUNK_BYTES)
+                self.value.file.close()
             # set this value to be the relative path to that file
-            self.value.file.close()
             self.value = str(file_path)
 
     def paint(self) -> str:
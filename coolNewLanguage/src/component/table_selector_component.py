@@ -31,10 +31,11 @@ class TableSelectorComponent(InputComponent):
 
         super().__init__(expected_type=pd.DataFrame)
 
-        # replace value with the chosen table's dataframe if handling post
+        # replace value with a lazy handle to the chosen table if handling post, so that the table is only read once
+        # the stage function actually uses it
         if process.handling_post:
             self.table_name = self.value
-            self.value = process.running_tool.tables[self.table_name]
+            self.value = process.running_tool.tables.lazy(self.table_name)
 
     def paint(self) -> str:
         """
@@ -57,7 +58,7 @@ class TableSelectorComponent(InputComponent):
                 {
                     'name': table_name,
                     'cols': tool_tables.get_columns_of_table(table_name),
-                    'rows': tool_tables[table_name].head(self.NUM_PREVIEW_ROWS),
+                    'rows': tool_tables.get_preview(table_name, self.NUM_PREVIEW_ROWS),
                     'transient_id': i
                 }
             )
@@ -16,6 +16,12 @@ STYLES_ROUTE = '/styles'
 
 GET_TABLE_ROUTE = '/_get_table'
 
+GET_TABLE_DATA_ROUTE = '/_get_table_data'
+
+JOBS_ROUTE = '/_jobs'
+
+APPROVALS_ROUTE = '/_approvals'
+
 CNL_DIR = Path('coolNewLanguage')
 
 WEB_DIR = CNL_DIR.joinpath('web')
@@ -52,6 +58,12 @@ COLUMN_SELECTOR_COMPONENT_TEMPLATE_FILENAME = 'column_selector.html'
 
 APPROVAL_PAGE_TEMPLATE_FILENAME = 'approval_page.html'
 
+APPROVAL_SESSION_FIELD_NAME = 'approval_session'
+
+APPROVAL_BULK_DECISION_SUFFIX = 'all'
+
+JOB_PAGE_TEMPLATE_FILENAME = 'job_page.html'
+
 LINKS_METATYPES_TABLE_NAME = "__hls_links_metatypes"
 LINKS_METATYPES_LINK_META_ID = "link_meta_id"
 LINKS_METATYPES_LINK_META_NAME = "meta_name"
@@ -75,3 +87,18 @@ METADATA_COLUMN_NAMES = set(["__hls_internal_id"])
 DATAFRAME_TABLE_TEMPLATE_FILENAME = "dataframe_table.html"
 
 CONTENT_REGISTRY_TABLE_NAME = "__hilt_content_registry"
+
+APPROVALS_TABLE_NAME = "__hls_approvals"
+
+APPROVAL_DECISIONS_TABLE_NAME = "__hls_approval_decisions"
+
+DEFAULT_TABLE_CACHE_MAX_BYTES = 512 * 1024**2
+
+"""
+The default number of rows fetched from the database at a time when iterating over a table's Rows
+"""
+DEFAULT_ITER_ROWS_BATCH_SIZE = 1000
+
+DEFAULT_TABLE_PAGE_SIZE = 10
+
+MAX_TABLE_PAGE_SIZE = 1000
@@ -0,0 +1,150 @@
+import pathlib
+from typing import Any, Optional
+
+import sqlalchemy
+
+
+class EngineProfile:
+    """
+    The settings used to create a Tool's SQLite engine: the PRAGMAs run on every new connection, the size of the
+    connection pool, and whether SQL statements are logged.
+    The defaults suit a single Tool process doing bulk reads and writes: the write-ahead log lets reads proceed while a
+    write is in progress, synchronous=NORMAL only syncs at checkpoints rather than on every commit (which is still safe
+    from corruption in WAL mode), and a larger page cache, memory-mapped I/O and in-memory temporary tables cut down on
+    disk reads.
+
+    Attributes:
+        journal_mode: The SQLite journal mode, e.g. 'WAL' or 'DELETE'
+        synchronous: The SQLite synchronous setting, one of 'OFF', 'NORMAL', 'FULL' or 'EXTRA'
+        cache_size: The SQLite page cache size. Negative values are in KiB, positive values in pages.
+        mmap_size: The maximum number of bytes of the database file to memory-map, or 0 to turn memory-mapping off
+        temp_store: Where SQLite keeps temporary tables and indices, one of 'DEFAULT', 'FILE' or 'MEMORY'
+        busy_timeout: How long, in milliseconds, a connection waits for a lock held by another connection
+        pool_size: The number of connections kept open in the engine's connection pool
+        max_overflow: The number of connections which may be opened beyond pool_size under load
+        echo: Whether every SQL statement is logged, which is useful when debugging but slow
+    """
+    __slots__ = (
+        'journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'temp_store', 'busy_timeout', 'pool_size',
+        'max_overflow', 'echo'
+    )
+
+    JOURNAL_MODES = {'DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'}
+    SYNCHRONOUS_SETTINGS = {'OFF', 'NORMAL', 'FULL', 'EXTRA'}
+    TEMP_STORES = {'DEFAULT', 'FILE', 'MEMORY'}
+
+    def __init__(
+            self,
+            journal_mode: str = 'WAL',
+            synchronous: str = 'NORMAL',
+            cache_size: int = -64 * 1024,
+            mmap_size: int = 256 * 1024**2,
+            temp_store: str = 'MEMORY',
+            busy_timeout: int = 5000,
+            pool_size: int = 5,
+            max_overflow: int = 10,
+            echo: bool = False
+    ):
+        if not isinstance(journal_mode, str) or journal_mode.upper() not in EngineProfile.JOURNAL_MODES:
+            raise ValueError(f"Expected journal_mode to be one of {sorted(EngineProfile.JOURNAL_MODES)}")
+        if not isinstance(synchronous, str) or synchronous.upper() not in EngineProfile.SYNCHRONOUS_SETTINGS:
+            raise ValueError(f"Expected synchronous to be one of {sorted(EngineProfile.SYNCHRONOUS_SETTINGS)}")
+        if not isinstance(cache_size, int):
+            raise TypeError("Expected cache_size to be an int")
+        if not isinstance(mmap_size, int):
+            raise TypeError("Expected mmap_size to be an int")
+        if mmap_size < 0:
+            raise ValueError("Expected mmap_size to be non-negative")
+        if not isinstance(temp_store, str) or temp_store.upper() not in EngineProfile.TEMP_STORES:
+            raise ValueError(f"Expected temp_store to be one of {sorted(EngineProfile.TEMP_STORES)}")
+        if not isinstance(busy_timeout, int):
+            raise TypeError("Expected busy_timeout to be an int")
+        if not isinstance(pool_size, int):
+            raise TypeError("Expected pool_size to be an int")
+        if pool_size < 1:
+            raise ValueError("Expected pool_size to be positive")
+        if not isinstance(max_overflow, int):
+            raise TypeError("Expected max_overflow to be an int")
+        if not isinstance(echo, bool):
+            raise TypeError("Expected echo to be a bool")
+
+        self.journal_mode = journal_mode.upper()
+        self.synchronous = synchronous.upper()
+        self.cache_size = cache_size
+        self.mmap_size = mmap_size
+        self.temp_store = temp_store.upper()
+        self.busy_timeout = busy_timeout
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.echo = echo
+
+    @staticmethod
+    def debug() -> 'EngineProfile':
+        """
+        Returns the default profile with SQL statement logging turned on
+        :return:
+        """
+        return EngineProfile(echo=True)
+
+    @staticmethod
+    def sqlite_defaults() -> 'EngineProfile':
+        """
+        Returns a profile which leaves SQLite's own defaults in place: a rollback journal, synchronous=FULL, a 2MiB page
+        cache, no memory-mapping and file-backed temporary tables
+        :return:
+        """
+        return EngineProfile(
+            journal_mode='DELETE',
+            synchronous='FULL',
+            cache_size=-2000,
+            mmap_size=0,
+            temp_store='DEFAULT',
+            busy_timeout=0
+        )
+
+    def pragmas(self) -> dict[str, Any]:
+        """
+        Returns the PRAGMAs run on each new connection, as a dictionary from PRAGMA names to values
+        :return:
+        """
+        return {
+            'journal_mode': self.journal_mode,
+            'synchronous': self.synchronous,
+            'cache_size': self.cache_size,
+            'mmap_size': self.mmap_size,
+            'temp_store': self.temp_store,
+            'busy_timeout': self.busy_timeout
+        }
+
+    def create_engine(self, db_path: pathlib.Path | str) -> sqlalchemy.Engine:
+        """
+        Creates an engine for the SQLite database at the passed path, configured according to this profile
+        :param db_path: The path of the database file, which is created if it doesn't exist
+        :return:
+        """
+        if not isinstance(db_path, (pathlib.Path, str)):
+            raise TypeError("Expected db_path to be a Path or a string")
+
+        engine = sqlalchemy.create_engine(
+            f'sqlite:///{str(db_path)}',
+            echo=self.echo,
+            poolclass=sqlalchemy.QueuePool,
+            pool_size=self.pool_size,
+            max_overflow=self.max_overflow
+        )
+        sqlalchemy.event.listen(engine, 'connect', self._set_pragmas)
+        return engine
+
+    def _set_pragmas(self, dbapi_connection: Any, connection_record: Optional[Any] = None):
+        """
+        Runs this profile's PRAGMAs on a newly opened DBAPI connection
+        :param dbapi_connection:
+        :param connection_record:
+        :return:
+        """
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas().items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+        finally:
+            cursor.close()
@@ -0,0 +1,256 @@
+import operator
+from typing import Any, Callable, Optional
+
+import pandas as pd
+import sqlalchemy
+
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+
+class LazyTable:
+    """
+    A handle to a table in a Tool's database which stands in for the table's pandas DataFrame, but doesn't read
+    anything from the database until it's used.
+    Column projections (lazy_table[['a', 'b']]), row filters (lazy_table.filter_rows('a', '>', 1)) and head() are
+    pushed down into the SQL query which is eventually issued, so that only the requested columns and rows are read.
+    Anything else, such as attribute accesses like lazy_table.assign(...), materializes the handle into a DataFrame
+    (once), and is forwarded to that DataFrame.
+    If the table has changes which are cached in Tables (i.e. it was modified earlier in the same stage), the cached
+    DataFrame is used in place of the database, and projections and filters are applied to it using pandas.
+
+    Attributes:
+        table_name: The name of the table this handle refers to
+        _tool: The Tool whose database contains the table
+        _columns: The names of the columns this handle is projected to, or None for all columns
+        _filters: A list of (column name, operator string, value) triples which rows must satisfy
+        _df: The materialized DataFrame, or None if this handle hasn't been materialized yet
+    """
+    __slots__ = ('table_name', '_tool', '_columns', '_filters', '_df')
+
+    FILTER_OPERATORS: dict[str, Callable[[Any, Any], Any]] = {
+        '==': operator.eq,
+        '!=': operator.ne,
+        '<': operator.lt,
+        '<=': operator.le,
+        '>': operator.gt,
+        '>=': operator.ge,
+        'in': lambda column, values: column.in_(values) if isinstance(column, sqlalchemy.ColumnElement)
+        else column.isin(values)
+    }
+
+    def __init__(
+            self,
+            tool: 'Tool',
+            table_name: str,
+            columns: Optional[list[str]] = None,
+            filters: Optional[list[tuple[str, str, Any]]] = None
+    ):
+        from coolNewLanguage.src.tool import Tool
+
+        if not isinstance(tool, Tool):
+            raise TypeError("Expected tool to be a Tool")
+        if not isinstance(table_name, str):
+            raise TypeError("Expected table_name to be a string")
+        if columns is not None and not (isinstance(columns, list) and all(isinstance(c, str) for c in columns)):
+            raise TypeError("Expected columns to be a list of strings or None")
+        if filters is not None and not isinstance(filters, list):
+            raise TypeError("Expected filters to be a list or None")
+
+        self.table_name = table_name
+        self._tool = tool
+        self._columns = columns
+        self._filters = filters if filters is not None else []
+        self._df: Optional[pd.DataFrame] = None
+
+    @property
+    def _name(self) -> str:
+        """The table name, under the same attribute Tables sets on the DataFrames it returns"""
+        return self.table_name
+
+    @property
+    def columns(self) -> pd.Index:
+        """
+        The column names of this handle. Read from the table's schema rather than its data, unless already materialized
+        :return:
+        """
+        if self._df is not None:
+            return self._df.columns
+        if self._columns is not None:
+            return pd.Index(self._columns)
+        pending_df = self._pending_dataframe()
+        if pending_df is not None:
+            return pending_df.columns
+        # The internal id column is read as the index, rather than as a column
+        return pd.Index([c for c in self._sqlalchemy_table().c.keys() if c != DB_INTERNAL_COLUMN_ID_NAME])
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self), len(self.columns)
+
+    def __len__(self) -> int:
+        """
+        Returns the number of rows in this handle, using a COUNT query if not already materialized
+        :return:
+        """
+        source_df = self._source_dataframe()
+        if source_df is not None:
+            return len(source_df)
+
+        stmt = sqlalchemy.select(sqlalchemy.func.count()).select_from(self._select().subquery())
+        with self._tool.db_engine.connect() as conn:
+            return conn.execute(stmt).scalar_one()
+
+    def __iter__(self):
+        """Iterate over the column names, as iterating over a DataFrame does"""
+        return iter(self.columns)
+
+    def __contains__(self, item) -> bool:
+        return item in self.columns
+
+    def __getitem__(self, key: Any) -> Any:
+        """
+        Index into this handle. A list of column names returns a new handle projected to those columns, and a single
+        column name returns that column as a Series, reading only that column. Any other key materializes this handle
+        and indexes into the resulting DataFrame.
+        :param key:
+        :return:
+        """
+        if self._df is None and isinstance(key, list) and all(isinstance(k, str) for k in key):
+            missing = [k for k in key if k not in self.columns]
+            if missing:
+                raise KeyError(f"Columns {missing} not found in table {self.table_name}")
+            return LazyTable(self._tool, self.table_name, columns=list(key), filters=list(self._filters))
+
+        if self._df is None and isinstance(key, str):
+            if key not in self.columns:
+                raise KeyError(key)
+            return self[[key]].materialize()[key]
+
+        return self.materialize()[key]
+
+    def __setitem__(self, key: Any, value: Any):
+        self.materialize()[key] = value
+
+    def __getattr__(self, item: str) -> Any:
+        if item.startswith('__'):
+            raise AttributeError(item)
+        return getattr(self.materialize(), item)
+
+    def __repr__(self) -> str:
+        if self._df is not None:
+            return repr(self._df)
+        return f"LazyTable(table_name={self.table_name!r}, columns={self._columns!r}, filters={self._filters!r})"
+
+    def filter_rows(self, column: str, op: str, value: Any) -> 'LazyTable':
+        """
+        Returns a new handle to the rows of this one whose value in column satisfies the passed comparison
+        :param column: The name of the column to compare
+        :param op: One of '==', '!=', '<', '<=', '>', '>=' or 'in'
+        :param value: The value to compare against, or a list of values if op is 'in'
+        :return: A new LazyTable, or a filtered DataFrame if this handle has already been materialized
+        """
+        if not isinstance(column, str):
+            raise TypeError("Expected column to be a string")
+        if op not in LazyTable.FILTER_OPERATORS:
+            raise ValueError(f"Expected op to be one of {list(LazyTable.FILTER_OPERATORS)}")
+
+        if self._df is not None:
+            return self._df[LazyTable.FILTER_OPERATORS[op](self._df[column], value)]
+
+        return LazyTable(self._tool, self.table_name, columns=self._columns, filters=self._filters + [(column, op, value)])
+
+    def head(self, n: int = 5) -> pd.DataFrame:
+        """
+        Returns the first n rows of this handle, using a LIMIT query if not already materialized
+        :param n: The number of rows to return
+        :return:
+        """
+        if not isinstance(n, int):
+            raise TypeError("Expected n to be an int")
+
+        source_df = self._source_dataframe()
+        if source_df is not None:
+            return source_df.head(n)
+
+        return self._read(self._select().limit(n))
+
+    def materialize(self) -> pd.DataFrame:
+        """
+        Reads the rows and columns this handle refers to into a DataFrame, which is kept and used to serve all further
+        operations on this handle
+        :return:
+        """
+        if self._df is not None:
+            return self._df
+
+        source_df = self._source_dataframe()
+        if source_df is not None:
+            self._df = source_df
+        elif self._columns is None and not self._filters:
+            # The whole table is being read, so go through Tables to take advantage of its cache
+            self._df = self._tool.tables[self.table_name]
+        else:
+            self._df = self._read(self._select())
+
+        return self._df
+
+    def _pending_dataframe(self) -> Optional[pd.DataFrame]:
+        """
+        Returns the DataFrame cached in Tables for this table, if it has changes which haven't been saved yet
+        :return:
+        """
+        return self._tool.tables._tables_to_save.get(self.table_name)
+
+    def _source_dataframe(self) -> Optional[pd.DataFrame]:
+        """
+        Returns the DataFrame this handle's operations should be applied to in pandas rather than in SQL, with
+        projections and filters applied. That is the materialized DataFrame if there is one, or else the table's pending
+        DataFrame if there is one, or else None
+        :return:
+        """
+        if self._df is not None:
+            return self._df
+
+        df = self._pending_dataframe()
+        if df is None:
+            return None
+
+        for column, op, value in self._filters:
+            df = df[LazyTable.FILTER_OPERATORS[op](df[column], value)]
+        if self._columns is not None:
+            df = df[self._columns]
+        return df
+
+    def _sqlalchemy_table(self) -> sqlalchemy.Table:
+        table = self._tool.get_table_from_table_name(self.table_name)
+        if table is None:
+            raise KeyError(f"Table {self.table_name} not found")
+        return table
+
+    def _select(self) -> sqlalchemy.Select:
+        """
+        Constructs the select statement which reads the rows and columns this handle refers to
+        :return:
+        """
+        table = self._sqlalchemy_table()
+
+        if self._columns is None:
+            stmt = sqlalchemy.select(table)
+        else:
+            # Keep the internal id column, which becomes the index, so that rows can still be matched to the table
+            id_columns = [table.c[DB_INTERNAL_COLUMN_ID_NAME]] if DB_INTERNAL_COLUMN_ID_NAME in table.c else []
+            stmt = sqlalchemy.select(*id_columns, *[table.c[column] for column in self._columns])
+
+        for column, op, value in self._filters:
+            stmt = stmt.where(LazyTable.FILTER_OPERATORS[op](table.c[column], value))
+
+        # Keep the table's row order, which not every backend returns rows in by default
+        if DB_INTERNAL_COLUMN_ID_NAME in table.c:
+            stmt = stmt.order_by(table.c[DB_INTERNAL_COLUMN_ID_NAME])
+
+        return stmt
+
+    def _read(self, stmt: sqlalchemy.Select) -> pd.DataFrame:
+        index_col = DB_INTERNAL_COLUMN_ID_NAME if DB_INTERNAL_COLUMN_ID_NAME in stmt.selected_columns.keys() else None
+        with self._tool.db_engine.connect() as conn:
+            return pd.read_sql_query(stmt, conn, index_col=index_col)
@@ -0,0 +1,100 @@
+import threading
+from collections import defaultdict
+from typing import Optional
+
+"""
+A row's identifying values: its table name and row id
+"""
+RowKey = tuple[str, int]
+
+"""
+A link as seen from one of its ends: the link's id, and the table name and row id of its other end
+"""
+LinkEnd = tuple[int, str, int]
+
+
+class LinkAdjacency:
+    """
+    The links of a single metatype, indexed by both of their ends, so that the links from or to a row can be found
+    without scanning every link
+
+    Attributes:
+        forward: A dictionary mapping source rows to the ends of the links from them
+        reverse: A dictionary mapping destination rows to the ends of the links to them
+    """
+    __slots__ = ('forward', 'reverse')
+
+    def __init__(self, links: list[tuple[int, str, int, str, int]]):
+        """
+        :param links: (link_id, src_table_name, src_row_id, dst_table_name, dst_row_id) tuples
+        """
+        forward: dict[RowKey, list[LinkEnd]] = defaultdict(list)
+        reverse: dict[RowKey, list[LinkEnd]] = defaultdict(list)
+        for link_id, src_table_name, src_row_id, dst_table_name, dst_row_id in links:
+            forward[(src_table_name, src_row_id)].append((link_id, dst_table_name, dst_row_id))
+            reverse[(dst_table_name, dst_row_id)].append((link_id, src_table_name, src_row_id))
+
+        self.forward = dict(forward)
+        self.reverse = dict(reverse)
+
+    def links_from(self, table_name: str, row_id: int) -> list[LinkEnd]:
+        return self.forward.get((table_name, row_id), [])
+
+    def links_to(self, table_name: str, row_id: int) -> list[LinkEnd]:
+        return self.reverse.get((table_name, row_id), [])
+
+
+class LinkCache:
+    """
+    An in-memory cache of LinkAdjacencies, owned by a Tool and keyed by link metatype id. Each metatype's adjacency is
+    built the first time its links are traversed, and dropped whenever links of that metatype are registered.
+    Each metatype also has a generation, which is bumped when it's invalidated, so that an adjacency built from links
+    read before a concurrent registration isn't cached.
+
+    Attributes:
+        _adjacencies: A dictionary mapping link metatype ids to their cached adjacencies
+        _generations: A dictionary mapping link metatype ids to the number of times they've been invalidated
+        _lock: Guards _adjacencies and _generations, since stage functions may run on several threads at once
+    """
+    __slots__ = ('_adjacencies', '_generations', '_lock')
+
+    def __init__(self):
+        self._adjacencies: dict[int, LinkAdjacency] = {}
+        self._generations: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._adjacencies)
+
+    def get(self, link_meta_id: int) -> Optional[LinkAdjacency]:
+        with self._lock:
+            return self._adjacencies.get(link_meta_id)
+
+    def generation(self, link_meta_id: int) -> int:
+        with self._lock:
+            return self._generations.get(link_meta_id, 0)
+
+    def put(self, link_meta_id: int, generation: int, adjacency: LinkAdjacency):
+        """
+        Caches the passed adjacency, unless the metatype has been invalidated since its links were read
+        :param link_meta_id: The id of the adjacency's link metatype
+        :param generation: The metatype's generation from before its links were read
+        :param adjacency: The adjacency to cache
+        :return:
+        """
+        if not isinstance(adjacency, LinkAdjacency):
+            raise TypeError("Expected adjacency to be a LinkAdjacency")
+
+        with self._lock:
+            if self._generations.get(link_meta_id, 0) == generation:
+                self._adjacencies[link_meta_id] = adjacency
+
+    def invalidate(self, link_meta_id: int):
+        """
+        Drops the cached adjacency of the passed link metatype, if any
+        :param link_meta_id:
+        :return:
+        """
+        with self._lock:
+            self._adjacencies.pop(link_meta_id, None)
+            self._generations[link_meta_id] = self._generations.get(link_meta_id, 0) + 1
@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Enum, Integer, String
+from sqlalchemy import Column, DateTime, Enum, Index, Integer, Sequence, String, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase
 
 from coolNewLanguage.src import consts
@@ -17,8 +17,91 @@ class ContentTypes(enum.Enum):
 class UserContent(Base):
     __tablename__ = consts.CONTENT_REGISTRY_TABLE_NAME
 
-    id = Column(Integer, primary_key=True, autoincrement=True)
+    # An explicit sequence, since not every backend supports SERIAL columns. SQLite ignores it.
+    id = Column(Integer, Sequence(f'{consts.CONTENT_REGISTRY_TABLE_NAME}_id_seq'), primary_key=True, autoincrement=True)
     content_name = Column(String, nullable=False, unique=True)
     content_file_name = Column(String, nullable=False)
     content_file_path = Column(String, nullable=False)
     content_type = Column(Enum(ContentTypes), nullable=False)
+
+
+class RegisteredLinkMetatype(Base):
+    """
+    A category of links, identified by its meta name
+    """
+    __tablename__ = consts.LINKS_METATYPES_TABLE_NAME
+
+    link_meta_id = Column(
+        consts.LINKS_METATYPES_LINK_META_ID,
+        Integer,
+        Sequence(f'{consts.LINKS_METATYPES_TABLE_NAME}_id_seq'),
+        primary_key=True,
+        autoincrement=True
+    )
+    meta_name = Column(consts.LINKS_METATYPES_LINK_META_NAME, String, nullable=False, unique=True)
+
+
+class RegisteredLink(Base):
+    """
+    A link of some metatype from a row of one table to a row of another. Each link is registered at most once, which
+    the unique constraint enforces even when links are registered in bulk.
+    """
+    __tablename__ = consts.LINKS_REGISTRY_TABLE_NAME
+    __table_args__ = (
+        UniqueConstraint(
+            consts.LINKS_REGISTRY_LINK_META_ID,
+            consts.LINKS_REGISTRY_SRC_TABLE_NAME,
+            consts.LINKS_REGISTRY_SRC_ROW_ID,
+            consts.LINKS_REGISTRY_DST_TABLE_NAME,
+            consts.LINKS_REGISTRY_DST_ROW_ID,
+            name=f'{consts.LINKS_REGISTRY_TABLE_NAME}_unique'
+        ),
+        # The unique constraint's index serves lookups by source row, and this one serves lookups by destination row.
+        # Both cover the row ids of the link's other end, so traversals needn't read the table itself.
+        Index(
+            f'{consts.LINKS_REGISTRY_TABLE_NAME}_dst_index',
+            consts.LINKS_REGISTRY_LINK_META_ID,
+            consts.LINKS_REGISTRY_DST_TABLE_NAME,
+            consts.LINKS_REGISTRY_DST_ROW_ID,
+            consts.LINKS_REGISTRY_SRC_TABLE_NAME,
+            consts.LINKS_REGISTRY_SRC_ROW_ID
+        ),
+    )
+
+    id = Column(
+        consts.LINKS_REGISTRY_LINK_ID,
+        Integer,
+        Sequence(f'{consts.LINKS_REGISTRY_TABLE_NAME}_id_seq'),
+        primary_key=True,
+        autoincrement=True
+    )
+    link_meta_id = Column(consts.LINKS_REGISTRY_LINK_META_ID, Integer, nullable=False)
+    src_table_name = Column(consts.LINKS_REGISTRY_SRC_TABLE_NAME, String, nullable=False)
+    src_row_id = Column(consts.LINKS_REGISTRY_SRC_ROW_ID, Integer, nullable=False)
+    dst_table_name = Column(consts.LINKS_REGISTRY_DST_TABLE_NAME, String, nullable=False)
+    dst_row_id = Column(consts.LINKS_REGISTRY_DST_ROW_ID, Integer, nullable=False)
+
+
+class PendingApproval(Base):
+    """
+    A set of changes awaiting the user's approval, whose ApproveResults are spilled to a file by the ApprovalStore
+    """
+    __tablename__ = consts.APPROVALS_TABLE_NAME
+
+    token = Column(String, primary_key=True)
+    stage_url = Column(String, nullable=False)
+    stage_name = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
+
+
+class ApprovalDecision(Base):
+    """
+    A decision the user has made on the approval page of a PendingApproval, recorded as soon as it's made so that rows
+    don't need to stay on the page, or be posted with the form, for their decisions to count
+    """
+    __tablename__ = consts.APPROVAL_DECISIONS_TABLE_NAME
+
+    token = Column(String, primary_key=True)
+    # The name of the approval form field the decision is for, e.g. approve_{approve result id}_{row id}
+    field_name = Column(String, primary_key=True)
+    decision = Column(String, nullable=False)
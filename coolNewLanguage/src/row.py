@@ -6,7 +6,7 @@ from coolNewLanguage.src.cell import Cell
 from coolNewLanguage.src.cnl_type.link import Link
 from coolNewLanguage.src.stage import process
 from coolNewLanguage.src.tool import Tool
-from coolNewLanguage.src.util.link_utils import get_link_id, register_new_link
+from coolNewLanguage.src.util.link_utils import get_link_id, get_links_from, get_links_to, register_new_link
 from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
 
 
@@ -106,31 +106,30 @@ class Row:
 
     def save(self, get_user_approvals: bool = False):
         """
-        Saves the current state of this row to the database, by updating values where the cell values differ from the
-        values in row_mapping.
-        :param get_user_approvals: Whether to get user approvals before saving changes to the database.
+        Saves the current state of this row to the database, by updating values where the dirty cell values differ
+        from the values in row_mapping.
+        Within a Stage, the update is staged with the running Tool's Tables, and written along with the rest of the
+        stage's changes, so that saving many rows doesn't issue a statement and commit per row.
+        :param get_user_approvals: Whether to get user approvals before saving changes to the database. All the rows of
+        a table saved this way during a stage are presented for approval together.
         :return:
         """
-        # Update row_mapping
+        # Update row_mapping, collecting the values which changed
+        values = {}
         for col_name, cell in self.cell_mapping.items():
-            self.row_mapping[col_name] = cell.get_val()
-
-        if get_user_approvals:
-            from coolNewLanguage.src.approvals.row_approve_result import RowApproveResult
-            table_name = self.table.name
-            approve_result = RowApproveResult(row=self.row_mapping, table_name=table_name, is_new_row=False)
-            process.approve_results.append(approve_result)
+            if not cell.dirty:
+                continue
+            val = cell.get_val()
+            if val != self.row_mapping[col_name]:
+                values[col_name] = val
+                self.row_mapping[col_name] = val
+            cell.dirty = False
+
+        if not values:
             return
 
-        # Create an update statement
-        id_column = self.table.c[DB_INTERNAL_COLUMN_ID_NAME]
-        stmt = sqlalchemy.update(self.table).where(id_column == self.row_id).values(self.row_mapping)
-
-        # Execute the update statement
         tool: Tool = process.running_tool
-        with tool.db_engine.connect() as conn:
-            conn.execute(stmt)
-            conn.commit()
+        tool.tables._stage_row_update(self.table.name, self.row_id, values, get_user_approvals)
 
     class RowIterator:
         """
@@ -237,3 +236,37 @@ class Row:
             dst_table_name=dst_table_name,
             dst_row_id=dst_row_id
         )
+
+    def get_links(self, link_metatype: 'LinkMetatype') -> list[Link]:
+        """
+        Returns the links of the passed metatype from this Row. If not handling_post, returns an empty list instead.
+        :param link_metatype: The metatype of the links to return
+        :return:
+        """
+        from coolNewLanguage.src.stage import process
+        from coolNewLanguage.src.cnl_type.link_metatype import LinkMetatype
+
+        if not isinstance(link_metatype, LinkMetatype):
+            raise TypeError("Expected link_metatype to be a LinkMetatype")
+
+        if not process.handling_post:
+            return []
+
+        return get_links_from(process.running_tool, link_metatype.get_link_meta_id(), self.table.name, self.row_id)
+
+    def get_backlinks(self, link_metatype: 'LinkMetatype') -> list[Link]:
+        """
+        Returns the links of the passed metatype to this Row. If not handling_post, returns an empty list instead.
+        :param link_metatype: The metatype of the links to return
+        :return:
+        """
+        from coolNewLanguage.src.stage import process
+        from coolNewLanguage.src.cnl_type.link_metatype import LinkMetatype
+
+        if not isinstance(link_metatype, LinkMetatype):
+            raise TypeError("Expected link_metatype to be a LinkMetatype")
+
+        if not process.handling_post:
+            return []
+
+        return get_links_to(process.running_tool, link_metatype.get_link_meta_id(), self.table.name, self.row_id)
@@ -0,0 +1,91 @@
+from typing import Optional
+
+import sqlalchemy
+
+
+class SchemaCatalog:
+    """
+    A cache of the schemas of the tables in a Tool's database, as reflected sqlalchemy Tables.
+    Each table is reflected the first time it's looked up, and the reflected Table is then reused until the table is
+    invalidated, which CNL does whenever it creates, alters or drops a table. Lookups of tables which don't exist aren't
+    cached, so tables created after a miss are still found.
+
+    Attributes:
+        _engine: The engine of the database whose tables are reflected
+        _metadata: The MetaData the reflected Tables belong to
+        _tables: A dictionary mapping table names to their reflected Tables
+    """
+    __slots__ = ('_engine', '_metadata', '_tables')
+
+    def __init__(self, engine: sqlalchemy.Engine, metadata: Optional[sqlalchemy.MetaData] = None):
+        """
+        :param engine: The engine of the database whose tables are reflected
+        :param metadata: The MetaData to reflect Tables into. If None, a new MetaData is used.
+        """
+        if not isinstance(engine, sqlalchemy.Engine):
+            raise TypeError("Expected engine to be a sqlalchemy Engine")
+        if metadata is not None and not isinstance(metadata, sqlalchemy.MetaData):
+            raise TypeError("Expected metadata to be a sqlalchemy MetaData or None")
+
+        self._engine = engine
+        self._metadata = metadata if metadata is not None else sqlalchemy.MetaData()
+        self._tables: dict[str, sqlalchemy.Table] = {}
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def get_table(self, table_name: str) -> Optional[sqlalchemy.Table]:
+        """
+        Returns the reflected Table with the passed name, reflecting it if it isn't cached
+        :param table_name: The name of the table to get
+        :return: The Table, or None if there is no table with the passed name in the database
+        """
+        if not isinstance(table_name, str):
+            raise TypeError("Expected table_name to be a string")
+
+        table = self._tables.get(table_name)
+        if table is not None:
+            return table
+
+        insp: sqlalchemy.Inspector = sqlalchemy.inspect(self._engine)
+        if not insp.has_table(table_name):
+            return None
+
+        # Drop any stale copy of the table from the MetaData, so it's reflected afresh
+        if table_name in self._metadata.tables:
+            self._metadata.remove(self._metadata.tables[table_name])
+        table = sqlalchemy.Table(table_name, self._metadata)
+        insp.reflect_table(table, None)
+
+        self._tables[table_name] = table
+        return table
+
+    def has_table(self, table_name: str) -> bool:
+        """
+        Whether there is a table with the passed name in the database
+        :param table_name:
+        :return:
+        """
+        return self.get_table(table_name) is not None
+
+    def invalidate(self, table_name: str):
+        """
+        Drops the cached Table with the passed name, so that it's reflected again the next time it's looked up. Should be
+        called whenever the table is created, altered or dropped.
+        :param table_name:
+        :return:
+        """
+        if not isinstance(table_name, str):
+            raise TypeError("Expected table_name to be a string")
+
+        table = self._tables.pop(table_name, None)
+        if table is not None and table_name in self._metadata.tables:
+            self._metadata.remove(table)
+
+    def clear(self):
+        """
+        Drops all cached Tables
+        :return:
+        """
+        for table_name in list(self._tables):
+            self.invalidate(table_name)
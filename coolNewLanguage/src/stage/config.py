@@ -1,11 +1,11 @@
-from typing import List
-
-from coolNewLanguage.src.component.component import Component
+from coolNewLanguage.src.stage.request_context import make_module_context_local
 
 """
 A module to hold state while constructing Configs
 Since state is not passed to each component as they are initialized,
 we put variables here so component __init__ functions know where to "find" them
+This state is per-request: each attribute is kept in a ContextVar, so that stages which are being painted concurrently
+each see their own values
 
 Attributes:
     template_list:
@@ -28,7 +28,10 @@ Attributes:
         The Tool whose config is currently being constructed
 """
 
-component_list: List[Component] = []
-submit_component_added: bool = False
-building_template: bool = False
-tool_under_construction: 'Tool' = None
+make_module_context_local(
+    __name__,
+    component_list=list,
+    submit_component_added=lambda: False,
+    building_template=lambda: False,
+    tool_under_construction=lambda: None
+)
@@ -0,0 +1,259 @@
+"""
+Background jobs, for stages whose stage_func takes too long to run while the user's browser waits on the request
+A background Stage's POST handler submits its stage_func to the running Tool's JobQueue and immediately redirects to
+the job's page, which polls the job's status until it finishes, and then shows its results. Jobs are held by the
+JobQueue rather than by the request which submitted them, so they keep running if the user closes the page.
+Stage functions report their progress with report_progress.
+"""
+import asyncio
+import collections
+import datetime
+import uuid
+from enum import Enum, auto
+from typing import Optional
+
+import jinja2
+from aiohttp import web
+from multidict import MultiDict, MultiDictProxy
+
+from coolNewLanguage.src import consts
+from coolNewLanguage.src.stage import process
+from coolNewLanguage.src.stage.stage_executor import StageExecutor
+
+"""
+The number of jobs a JobQueue runs at once by default
+"""
+DEFAULT_JOB_WORKERS = 2
+
+"""
+The number of finished jobs a JobQueue keeps by default, so that their results can still be viewed
+"""
+DEFAULT_MAX_FINISHED_JOBS = 100
+
+
+class JobStatus(Enum):
+    QUEUED = auto()
+    RUNNING = auto()
+    SUCCEEDED = auto()
+    FAILED = auto()
+
+    @property
+    def is_finished(self) -> bool:
+        return self in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+
+class Job:
+    """
+    A run of a background Stage's stage_func
+
+    Attributes:
+        id: A random hex string identifying this job, used in its page's URL
+        stage_name: The name of the Stage this job is running
+        status: The JobStatus of this job
+        progress: The fraction of this job which is done, between 0 and 1, as last reported by its stage_func
+        progress_message: A description of what this job is doing, as last reported by its stage_func
+        results_template: The rendered approvals or results page stage_func produced, if any
+        error: A description of the exception which made this job fail, if it did
+        submitted_at: When this job was submitted
+        finished_at: When this job finished, or None if it hasn't
+    """
+    __slots__ = (
+        'id', 'stage_name', 'status', 'progress', 'progress_message', 'results_template', 'error', 'submitted_at',
+        'finished_at'
+    )
+
+    def __init__(self, stage_name: str):
+        if not isinstance(stage_name, str):
+            raise TypeError("Expected stage_name to be a string")
+
+        self.id = uuid.uuid4().hex
+        self.stage_name = stage_name
+        self.status = JobStatus.QUEUED
+        self.progress = 0.0
+        self.progress_message = ''
+        self.results_template: Optional[str] = None
+        self.error: Optional[str] = None
+        self.submitted_at = datetime.datetime.now()
+        self.finished_at: Optional[datetime.datetime] = None
+
+    @property
+    def url(self) -> str:
+        return f'{consts.JOBS_ROUTE}/{self.id}'
+
+    def to_json(self) -> dict:
+        """
+        Returns this job's status, in the form returned to the job page when it polls
+        :return:
+        """
+        return {
+            'id': self.id,
+            'stage_name': self.stage_name,
+            'status': self.status.name.lower(),
+            'finished': self.status.is_finished,
+            'progress': self.progress,
+            'progress_message': self.progress_message,
+            'error': self.error
+        }
+
+
+class JobQueue:
+    """
+    Runs the jobs submitted by a Tool's background Stages, and keeps track of them so that their progress and results
+    can be viewed
+
+    Attributes:
+        executor: The StageExecutor jobs are run with. It has its own thread pool, so that long-running jobs don't hold
+            up requests to other stages. Per-stage limits can be set on it with limit_stage.
+        max_finished_jobs: The number of finished jobs to keep. Once there are more, the oldest are forgotten.
+        _jobs: An OrderedDict mapping job ids to Jobs, in the order they were submitted
+        _tasks: The asyncio tasks running jobs, referenced here so that they aren't garbage collected mid-run
+    """
+    __slots__ = ('executor', 'max_finished_jobs', '_jobs', '_tasks')
+
+    def __init__(
+            self,
+            max_workers: int = DEFAULT_JOB_WORKERS,
+            max_finished_jobs: int = DEFAULT_MAX_FINISHED_JOBS,
+            executor: Optional[StageExecutor] = None
+    ):
+        """
+        :param max_workers: The number of jobs to run at once. Ignored if executor is passed.
+        :param max_finished_jobs: The number of finished jobs to keep
+        :param executor: The StageExecutor to run jobs with, or None to create one with max_workers threads
+        """
+        if not isinstance(max_workers, int):
+            raise TypeError("Expected max_workers to be an int")
+        if not isinstance(max_finished_jobs, int):
+            raise TypeError("Expected max_finished_jobs to be an int")
+        if max_finished_jobs < 0:
+            raise ValueError("Expected max_finished_jobs to be non-negative")
+        if executor is not None and not isinstance(executor, StageExecutor):
+            raise TypeError("Expected executor to be a StageExecutor or None")
+
+        self.executor = executor if executor is not None else StageExecutor(max_workers=max_workers)
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs: collections.OrderedDict[str, Job] = collections.OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, stage: 'Stage', post_body: MultiDictProxy | MultiDict) -> Job:
+        """
+        Submits a job running the passed Stage's stage_func on the passed POST body. Must be called from the event
+        loop.
+        :param stage: The background Stage whose input was submitted
+        :param post_body: The body of the POST request submitting the input
+        :return: The submitted Job
+        """
+        job = Job(stage.name)
+        self._jobs[job.id] = job
+        self._forget_finished_jobs()
+
+        task = asyncio.get_running_loop().create_task(self._run_job(job, stage, post_body))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list[Job]:
+        """
+        Returns the jobs this queue knows of, most recently submitted first
+        :return:
+        """
+        return list(reversed(self._jobs.values()))
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+    async def _run_job(self, job: Job, stage: 'Stage', post_body: MultiDictProxy | MultiDict):
+        try:
+            job.results_template = await self.executor.run(stage.name, JobQueue._process_post, job, stage, post_body)
+        except TimeoutError:
+            job.error = f"The stage {stage.name} took too long to run"
+            job.status = JobStatus.FAILED
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = JobStatus.FAILED
+        else:
+            job.progress = 1.0
+            job.status = JobStatus.SUCCEEDED
+        finally:
+            job.finished_at = datetime.datetime.now()
+
+    @staticmethod
+    def _process_post(job: Job, stage: 'Stage', post_body: MultiDictProxy | MultiDict) -> Optional[str]:
+        job.status = JobStatus.RUNNING
+        process.current_job = job
+        return stage._process_post(post_body)
+
+    def _forget_finished_jobs(self):
+        finished_job_ids = [job_id for job_id, job in self._jobs.items() if job.status.is_finished]
+        for job_id in finished_job_ids[:max(len(finished_job_ids) - self.max_finished_jobs, 0)]:
+            del self._jobs[job_id]
+
+
+def report_progress(fraction: float, message: str = ''):
+    """
+    Reports the progress of the background job currently being run, to be shown on its page
+    Does nothing if called outside a background job, so stage functions can call it unconditionally
+    :param fraction: The fraction of the job which is done, between 0 and 1
+    :param message: A description of what the job is currently doing
+    :return:
+    """
+    if not isinstance(fraction, (int, float)):
+        raise TypeError("Expected fraction to be a number")
+    if not 0 <= fraction <= 1:
+        raise ValueError("Expected fraction to be between 0 and 1")
+    if not isinstance(message, str):
+        raise TypeError("Expected message to be a string")
+
+    job = process.current_job
+    if job is None:
+        return
+
+    job.progress = float(fraction)
+    job.progress_message = message
+
+
+async def job_page_handler(request: web.Request) -> web.Response:
+    """
+    The handler for a job's page
+    Once the job has finished, shows the page its stage_func produced, if any. Until then, shows its progress.
+    :param request:
+    :return:
+    """
+    if not isinstance(request, web.Request):
+        raise TypeError("Expected request to be an aiohttp web.Request")
+
+    job = _get_job(request)
+
+    if job.status == JobStatus.SUCCEEDED and job.results_template is not None:
+        return web.Response(body=job.results_template, content_type=consts.AIOHTTP_HTML)
+
+    template: jinja2.Template = process.running_tool.jinja_environment.get_template(
+        name=consts.JOB_PAGE_TEMPLATE_FILENAME
+    )
+    return web.Response(
+        body=template.render(job=job, status_url=f'{job.url}/status'),
+        content_type=consts.AIOHTTP_HTML
+    )
+
+
+async def job_status_handler(request: web.Request) -> web.Response:
+    """
+    The handler polled by a job's page for the job's status
+    :param request:
+    :return:
+    """
+    if not isinstance(request, web.Request):
+        raise TypeError("Expected request to be an aiohttp web.Request")
+
+    return web.json_response(_get_job(request).to_json())
+
+
+def _get_job(request: web.Request) -> Job:
+    job = process.running_tool.job_queue.get(request.match_info['job_id'])
+    if job is None:
+        raise web.HTTPNotFound(text="No such job. It may have been forgotten after finishing")
+    return job
@@ -2,6 +2,8 @@
 A module to hold state while running Tools
 Since some state isn't passed to processors as their tools run,
 we put that state here so that it can be accessed
+Apart from running_tool, which is shared by the whole server, this state is per-request: each attribute is kept in a
+ContextVar, so that requests which are handled concurrently each see their own values
 
 Attributes:
     running_tool: Tool
@@ -17,6 +19,10 @@ Attributes:
     approval_post_body: dict
         The body of the post request sent to the approval handler
         Used by the approval handler to determine which ApproveResults were approved and which were rejected
+    approval_session: ApprovalSession
+        The approval session created by get_user_approvals while handling the current post request, if any
+    approve_results: list[ApproveResult]
+        The ApproveResults created while handling the current request
     cached_show_results: list[Result]
         A list of cached results to show, cached when get_user_approvals is set to True, since we get user approvals to
         determine the values which are actually committed to the db
@@ -24,13 +30,26 @@ Attributes:
         The title of the cached results to show
     handling_user_approvals: bool
         Whether the results of the user's approvals are currently being handled
+    stage_name: str
+        The name of the stage currently being processed
+    current_job: Job
+        The background job currently being run, if any, whose progress report_progress updates
 """
+from coolNewLanguage.src.stage.request_context import make_module_context_local
+
 running_tool: 'Tool' = None
-handling_post: bool = False
-post_body: dict = None
-curr_stage_url: str = ""
-approval_post_body: dict = None
-cached_show_results: list['Result'] = []
-cached_show_results_title: str = ""
-handling_user_approvals: bool = False
-stage_name: str = ""
+
+make_module_context_local(
+    __name__,
+    handling_post=lambda: False,
+    post_body=lambda: None,
+    curr_stage_url=lambda: "",
+    approval_post_body=lambda: None,
+    approval_session=lambda: None,
+    approve_results=list,
+    cached_show_results=list,
+    cached_show_results_title=lambda: "",
+    handling_user_approvals=lambda: False,
+    stage_name=lambda: "",
+    current_job=lambda: None
+)
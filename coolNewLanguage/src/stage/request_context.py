@@ -0,0 +1,90 @@
+"""
+Support for per-request state
+aiohttp handles each request in its own asyncio task, and every task runs in its own copy of the contextvars context.
+State kept in ContextVars is therefore isolated between requests which are being handled at the same time, whereas
+state kept in module globals or class attributes would be shared between them, letting concurrent users corrupt each
+other's stages and approvals.
+The helpers here let the modules and classes which hold CNL's per-request state, such as stage.process and
+stage.config, keep exposing it as plain attributes, while storing it in ContextVars.
+"""
+import contextvars
+import sys
+import types
+from typing import Any, Callable
+
+
+class ContextLocal:
+    """
+    A data descriptor for an attribute whose value is kept in a ContextVar, so that setting it only affects the current
+    context. Reading the attribute in a context where it was never set sets it to a fresh default, and deleting it
+    resets it to a fresh default.
+
+    Attributes:
+        _var: The ContextVar holding the attribute's value
+        _default_factory: A function returning the attribute's default value, called for each context which reads the
+        attribute before setting it, so that mutable defaults such as lists aren't shared
+    """
+    __slots__ = ('_var', '_default_factory')
+
+    def __init__(self, name: str, default_factory: Callable[[], Any]):
+        """
+        :param name: The name of the ContextVar, used in its repr
+        :param default_factory: A function returning the attribute's default value
+        """
+        if not isinstance(name, str):
+            raise TypeError("Expected name to be a string")
+        if not callable(default_factory):
+            raise TypeError("Expected default_factory to be callable")
+
+        self._var: contextvars.ContextVar = contextvars.ContextVar(name)
+        self._default_factory = default_factory
+
+    def __get__(self, instance, owner=None) -> Any:
+        try:
+            return self._var.get()
+        except LookupError:
+            value = self._default_factory()
+            self._var.set(value)
+            return value
+
+    def __set__(self, instance, value: Any):
+        self._var.set(value)
+
+    def __delete__(self, instance):
+        self._var.set(self._default_factory())
+
+
+def context_local_metaclass(class_name: str, **default_factories: Callable[[], Any]) -> type:
+    """
+    Returns a metaclass which gives the classes using it the passed class attributes, kept in ContextVars. Reading and
+    assigning them, e.g. Component.num_components += 1, works as for ordinary class attributes.
+    :param class_name: The name of the class the metaclass is for, used to name it and its ContextVars
+    :param default_factories: Keyword arguments mapping each attribute's name to a function returning its default
+    :return:
+    """
+    namespace = {
+        attribute: ContextLocal(f'{class_name}.{attribute}', default_factory)
+        for attribute, default_factory in default_factories.items()
+    }
+    return type(f'{class_name}Meta', (type,), namespace)
+
+
+def make_module_context_local(module_name: str, **default_factories: Callable[[], Any]):
+    """
+    Makes the passed attributes of the passed module context-local, by moving them onto a ModuleType subclass as
+    ContextLocal descriptors. Reading and assigning them, e.g. process.handling_post = True, works as for ordinary
+    module attributes. Should be called at the end of the module, after any other module attributes are defined.
+    :param module_name: The __name__ of the module
+    :param default_factories: Keyword arguments mapping each attribute's name to a function returning its default
+    :return:
+    """
+    module = sys.modules[module_name]
+    namespace = {
+        attribute: ContextLocal(f'{module_name}.{attribute}', default_factory)
+        for attribute, default_factory in default_factories.items()
+    }
+    # Drop any plain globals of the same names, which would otherwise be read by code within the module itself
+    for attribute in default_factories:
+        module.__dict__.pop(attribute, None)
+
+    module.__class__ = type('ContextLocalModule', (types.ModuleType,), namespace)
@@ -9,6 +9,7 @@ from coolNewLanguage.src.cell import Cell
 from coolNewLanguage.src.cnl_type.link import Link
 from coolNewLanguage.src.component.input_component import InputComponent
 from coolNewLanguage.src.component.column_selector_component import ColumnSelectorComponent
+from coolNewLanguage.src.lazy_table import LazyTable
 from coolNewLanguage.src.row import Row
 from coolNewLanguage.src.stage import process
 from coolNewLanguage.src.stage.stage import Stage
@@ -116,10 +117,16 @@ def result_template_of_value(value) -> str:
             return result_template_of_list_list(rows)
         case InputComponent():
             return result_template_of_value(value.value)
+        case LazyTable(_df=None, _columns=None, _filters=[]) if is_stored_table(value.table_name):
+            return result_template_of_stored_table(value.table_name)
+        case LazyTable():
+            return result_template_of_value(value.materialize())
         case Link():
             return result_template_of_link(value)
         case [*links] if all(isinstance(l, Link) for l in links):
             return "\n".join(result_template_of_link(l) for l in links)
+        case pd.DataFrame(_name=table_name) if is_stored_table(table_name):
+            return result_template_of_stored_table(table_name)
         case pd.DataFrame(_name=table_name):
             try:
                 return result_template_of_dataframe(process.running_tool.tables[table_name])
@@ -141,16 +148,41 @@ def result_template_of_sql_alch_table(table: sqlalchemy.Table) -> str:
     :return: A string containing the HTML table the table with the table's data
     """
     # Check to see if the table exists in the db
-    process.running_tool.db_metadata_obj = sqlalchemy.MetaData()
-    process.running_tool.db_metadata_obj.reflect(
-        process.running_tool.db_engine)
-    if table._name not in process.running_tool.db_metadata_obj.tables:
+    if process.running_tool.get_table_from_table_name(table._name) is None:
         return ""
 
     template: jinja2.Template = process.running_tool.jinja_environment.get_template(
         name=consts.TABLE_RESULT_TEMPLATE_FILENAME
     )
-    return html_utils.html_of_table(table, template)
+    return html_utils.html_of_table(table, template, server_side=True)
+
+
+def is_stored_table(table_name: str) -> bool:
+    """
+    Whether the table with the passed name is in the running tool's database, with no changes waiting to be saved, so
+    that it can be shown by paging its rows in from the database
+    :param table_name:
+    :return:
+    """
+    tool_tables = process.running_tool.tables
+    return table_name in tool_tables and table_name not in tool_tables._tables_to_save
+
+
+def result_template_of_stored_table(table_name: str) -> str:
+    """
+    Construct an HTML snippet of a table in the running tool's database, which pages its rows in from the server
+    rather than including them all
+    :param table_name: The name of the table to show
+    :return:
+    """
+    if not isinstance(table_name, str):
+        raise TypeError("Expected table_name to be a string")
+
+    table = process.running_tool.get_table_from_table_name(table_name)
+    if table is None:
+        return ""
+
+    return result_template_of_sql_alch_table(table)
 
 
 def result_template_of_column_list(cols: ColumnSelectorComponent) -> str:
@@ -1,17 +1,24 @@
 import urllib.parse
-from typing import Callable
+from typing import Any, Callable, Optional
 
 import jinja2
 from aiohttp import web
+from multidict import MultiDict, MultiDictProxy
 
 from coolNewLanguage.src import consts
 from coolNewLanguage.src.approvals.approve_result import ApproveResult
 from coolNewLanguage.src.component.component import Component
 from coolNewLanguage.src.component.submit_component import SubmitComponent
 from coolNewLanguage.src.stage import process, config
+from coolNewLanguage.src.stage.request_context import context_local_metaclass
+from coolNewLanguage.src.util import upload_utils
 
 
-class Stage:
+class Stage(metaclass=context_local_metaclass(
+        'Stage',
+        approvals_template=lambda: None,
+        results_template=lambda: None
+)):
     """
     A stage of a data processing tool
     Provides two endpoints for the associated Tool's webapp
@@ -21,19 +28,23 @@ class Stage:
     displaying any results
 
     Attributes:
+        approvals_template:
+            The rendered Jinja template of the approvals page, if one was constructed
+            Set here by get_user_approvals() so that we have access to it outside the scope of the stage_func call
         results_template:
             The rendered Jinja template containing any relevant results
             Set here by show_results() so that we have access to it outside the scope of the stage_func call
+        Both are kept in ContextVars, so that concurrent requests don't see each other's templates
     """
-    approvals_template: str = None
-    results_template: str = None
 
-    def __init__(self, name: str, stage_func: Callable, description: str = ""):
+    def __init__(self, name: str, stage_func: Callable, description: str = "", background: bool = False):
         """
         Initialize this stage. The stage url is generated from the passed name
         :param name: This stage's name. Cannot begin with an underscore
         :param template: The pre-rendered template for this stage's Config
         :param stage_func: The function used to define this stage
+        :param background: Whether submitting this stage's input runs stage_func as a job on the running Tool's
+        JobQueue, immediately returning a page which shows the job's progress, rather than waiting for it to finish
         """
         if not isinstance(name, str):
             raise TypeError("Expected name to be a string")
@@ -52,15 +63,33 @@ class Stage:
 
         self.description = description
 
+        if not isinstance(background, bool):
+            raise TypeError("Expected background to be a bool")
+        self.background = background
+
     async def handle(self, request: web.Request) -> web.Response:
         """
         Handles get request for this stage by painting this stage and returning the rendered template
+        Painting runs stage_func, so it's done with the running Tool's StageExecutor
         :param request:
         :return:
         """
-        template = self.paint()
+        template = await self._run(self.paint)
         return web.Response(body=template, content_type=consts.AIOHTTP_HTML)
 
+    async def _run(self, func: Callable, *args) -> Any:
+        """
+        Runs func with the passed arguments using the running Tool's StageExecutor, so that stage_func doesn't block the
+        event loop
+        :param func:
+        :param args:
+        :return: What func returns
+        """
+        try:
+            return await process.running_tool.stage_executor.run(self.name, func, *args)
+        except TimeoutError:
+            raise web.HTTPGatewayTimeout(text=f"The stage {self.name} took too long to respond")
+
     def paint(self) -> str:
         """
         Returns the rendered Jinja template for this stage
@@ -69,8 +98,11 @@ class Stage:
         Finally, uses Jinja magic to render the HTML document using the template found at stage.html
         :return:
         """
+        config.component_list = []
         config.submit_component_added = False
         config.building_template = True
+        # Start this request with its own set of pending table changes
+        process.running_tool.tables._clear_changes()
         config.tool_under_construction = process.running_tool
         # num_components is used for id's in the HTML template
         Component.num_components = 0
@@ -112,19 +144,50 @@ class Stage:
     async def post_handler(self, request: web.Request) -> web.Response:
         """
         Handles post request with user input
-        First gets post body to make it available for InputComponents to bind their values
-        Then, re-runs stage_func with handling_post flag set to True
+        First gets post body to make it available for InputComponents to bind their values. Multipart bodies are
+        streamed, with any uploaded files written to temporary files in the running Tool's file directory chunk by chunk,
+        which FileUploadComponents then move into place
+        Then, re-runs stage_func with handling_post flag set to True, using the running Tool's StageExecutor
         This causes Processors to run, and for Components to try to get their values from the post body
         It also causes show_result to run, and to try to render the results template so that it can be returned in the
         response
         If results is not set, we just redirect back to the tool landing page
+        If this is a background stage, stage_func is instead run as a job, and we redirect to the job's page
         :param request:
         :return:
         """
         if not isinstance(request, web.Request):
             raise TypeError("Expected request to be a web Request")
 
-        process.post_body = await request.post()
+        if request.content_type == 'multipart/form-data':
+            tool = process.running_tool
+            post_body = await upload_utils.read_multipart_post_body(
+                request,
+                tool.file_dir,
+                max_upload_bytes=tool.max_upload_bytes,
+                hash_algorithm=tool.upload_hash_algorithm
+            )
+        else:
+            post_body = await request.post()
+
+        if self.background:
+            job = process.running_tool.job_queue.submit(self, post_body)
+            raise web.HTTPFound(f'{consts.JOBS_ROUTE}/{job.id}')
+
+        template = await self._run(self._process_post, post_body)
+        if template is None:
+            raise web.HTTPFound('/')
+        return web.Response(body=template, content_type=consts.AIOHTTP_HTML)
+
+    def _process_post(self, post_body: MultiDictProxy | MultiDict) -> Optional[str]:
+        """
+        Runs stage_func on the passed post body
+        The whole of this is run by a StageExecutor, since the state it sets in process and on Stage is context-local,
+        and so is only visible to code running in the same context
+        :param post_body:
+        :return: The rendered approvals or results page to respond with, or None if stage_func showed neither
+        """
+        process.post_body = post_body
         process.handling_post = True
         Component.num_components = 0
         process.curr_stage_url = self.url
@@ -134,9 +197,15 @@ class Stage:
 
         process.approve_results = []
         process.approval_post_body = None
+        process.approval_session = None
         ApproveResult.num_approve_results = 0
+        # Start this request with its own set of pending table changes
+        process.running_tool.tables._clear_changes()
 
-        self.stage_func()
+        try:
+            self.stage_func()
+        finally:
+            upload_utils.discard_uploads(process.post_body)
 
         process.post_body = None
         process.handling_post = False
@@ -148,19 +217,24 @@ class Stage:
             template = Stage.approvals_template
             Stage.approvals_template = None
 
-            # Clear the running Tool's pending changes since they're about to be presented for approval
+            # Keep the results to show once the user's approvals have been handled with the approval session, since
+            # the approval POST is a separate request
+            process.approval_session.cached_show_results = process.cached_show_results
+            process.approval_session.cached_show_results_title = process.cached_show_results_title
+            process.running_tool.approval_store.save(process.approval_session)
+            process.approval_session = None
+
+            # Row updates saved without asking for approval aren't presented, so write them before clearing the
+            # running Tool's pending changes, since the rest are about to be presented for approval
+            process.running_tool.tables._flush_row_updates()
             process.running_tool.tables._clear_changes()
 
-            return web.Response(body=template, content_type=consts.AIOHTTP_HTML)
+            return template
 
         # Flush changes cached in the running tool's Tables instance
         process.running_tool.tables._flush_changes()
 
-        # If the results template is set, redirect to that
-        if Stage.results_template is not None:
-            template = Stage.results_template
-            Stage.results_template = None
-
-            return web.Response(body=template, content_type=consts.AIOHTTP_HTML)
-        # Else redirect to the home page
-        raise web.HTTPFound('/')
+        # If the results template is set, return it
+        template = Stage.results_template
+        Stage.results_template = None
+        return template
@@ -0,0 +1,141 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+from typing import Any, Callable, Optional
+
+
+class StageExecutor:
+    """
+    Runs the synchronous work of handling a Stage's requests, i.e. calling its stage_func, off the aiohttp event loop,
+    so that a slow stage doesn't stop the server from handling every other request in the meantime.
+    In 'thread' mode, work runs on a thread pool, in a copy of the calling request's contextvars context, so that it
+    sees and sets the request's own stage state. In 'inline' mode, work runs directly on the event loop, as it did
+    before executors were introduced, which is simplest to debug.
+    Stage state lives in the Tool's process, so stage functions can't be run on a process pool.
+
+    Attributes:
+        mode: Either 'thread' or 'inline'
+        max_workers: The number of threads in the pool, or None for the concurrent.futures default
+        max_concurrent_per_stage: The number of requests to each stage which may run at once, or None for no limit.
+            Further requests wait their turn.
+        timeout: The number of seconds a request may run for before a TimeoutError is raised, or None for no limit.
+            Only applies in 'thread' mode. The stage function can't be interrupted, so it runs to completion in the
+            background, and still counts towards its stage's concurrency limit until it does.
+        _stage_limits: A dictionary mapping stage names to (max_concurrent, timeout) pairs overriding the defaults
+        _semaphores: A dictionary mapping stage names to the semaphores enforcing their concurrency limits
+        _pool: The thread pool, created on first use
+    """
+    __slots__ = ('mode', 'max_workers', 'max_concurrent_per_stage', 'timeout', '_stage_limits', '_semaphores', '_pool')
+
+    MODES = {'thread', 'inline'}
+
+    def __init__(
+            self,
+            mode: str = 'thread',
+            max_workers: Optional[int] = None,
+            max_concurrent_per_stage: Optional[int] = None,
+            timeout: Optional[float] = None
+    ):
+        if mode not in StageExecutor.MODES:
+            raise ValueError(f"Expected mode to be one of {sorted(StageExecutor.MODES)}")
+        if max_workers is not None and not isinstance(max_workers, int):
+            raise TypeError("Expected max_workers to be an int or None")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("Expected max_workers to be positive")
+        StageExecutor._check_limits(max_concurrent_per_stage, timeout)
+
+        self.mode = mode
+        self.max_workers = max_workers
+        self.max_concurrent_per_stage = max_concurrent_per_stage
+        self.timeout = timeout
+        self._stage_limits: dict[str, tuple[Optional[int], Optional[float]]] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._pool: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+    @staticmethod
+    def inline() -> 'StageExecutor':
+        """
+        Returns an executor which runs stage functions directly on the event loop
+        :return:
+        """
+        return StageExecutor(mode='inline')
+
+    def limit_stage(self, stage_name: str, max_concurrent: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        Overrides the concurrency limit and timeout for the stage with the passed name
+        :param stage_name: The name of the stage
+        :param max_concurrent: The number of requests to the stage which may run at once, or None for no limit
+        :param timeout: The number of seconds a request to the stage may run for, or None for no limit
+        :return:
+        """
+        if not isinstance(stage_name, str):
+            raise TypeError("Expected stage_name to be a string")
+        StageExecutor._check_limits(max_concurrent, timeout)
+
+        self._stage_limits[stage_name] = (max_concurrent, timeout)
+        self._semaphores.pop(stage_name, None)
+
+    async def run(self, stage_name: str, func: Callable, *args) -> Any:
+        """
+        Runs func with the passed arguments for a request to the stage with the passed name, waiting for a free slot
+        if the stage is at its concurrency limit
+        :param stage_name: The name of the stage the work is for
+        :param func: The synchronous function to run
+        :param args: The arguments to call func with
+        :return: What func returns. If func raises, the exception is re-raised here.
+        """
+        max_concurrent, timeout = self._stage_limits.get(stage_name, (self.max_concurrent_per_stage, self.timeout))
+
+        semaphore = None
+        if max_concurrent is not None:
+            semaphore = self._semaphores.setdefault(stage_name, asyncio.Semaphore(max_concurrent))
+            await semaphore.acquire()
+
+        if self.mode == 'inline':
+            try:
+                return func(*args)
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._get_pool(), functools.partial(contextvars.copy_context().run, func, *args)
+            )
+        except BaseException:
+            if semaphore is not None:
+                semaphore.release()
+            raise
+        # Only free the slot once the work has actually finished, even if the request times out first
+        if semaphore is not None:
+            future.add_done_callback(lambda _: semaphore.release())
+
+        return await asyncio.wait_for(asyncio.shield(future), timeout)
+
+    def shutdown(self):
+        """
+        Shuts down the thread pool, waiting for any running work to finish
+        :return:
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _get_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='cnl-stage'
+            )
+        return self._pool
+
+    @staticmethod
+    def _check_limits(max_concurrent: Optional[int], timeout: Optional[float]):
+        if max_concurrent is not None and not isinstance(max_concurrent, int):
+            raise TypeError("Expected max_concurrent to be an int or None")
+        if max_concurrent is not None and max_concurrent < 1:
+            raise ValueError("Expected max_concurrent to be positive")
+        if timeout is not None and not isinstance(timeout, (int, float)):
+            raise TypeError("Expected timeout to be a number or None")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("Expected timeout to be positive")
@@ -0,0 +1,111 @@
+import collections
+import threading
+from typing import Optional
+
+import pandas as pd
+
+
+class TableCache:
+    """
+    An in-memory, least-recently-used cache of table DataFrames, owned by a Tool's Tables instance.
+    Entries are keyed by table name and the table's write version, so that a write to a table makes any cached copy of
+    it unreachable. Callers are always handed a copy of the cached DataFrame, so that mutating the returned DataFrame
+    can't corrupt the cache. If pandas' copy-on-write mode is enabled, these copies are lazy, and so are essentially
+    free; otherwise, the copy is a deep one.
+
+    Attributes:
+        max_bytes: The memory budget of this cache, in bytes. Once the cached DataFrames exceed this budget, the least
+            recently used ones are evicted. A DataFrame which is larger than the entire budget is never cached.
+        _entries: An OrderedDict mapping (table name, version) pairs to (DataFrame, size in bytes) pairs, ordered from
+            least to most recently used
+        _num_bytes: The total size of the DataFrames currently cached
+        _lock: Guards _entries and _num_bytes, since stage functions may run on several threads at once
+    """
+    __slots__ = ('max_bytes', '_entries', '_num_bytes', '_lock')
+
+    def __init__(self, max_bytes: int):
+        if not isinstance(max_bytes, int):
+            raise TypeError("Expected max_bytes to be an int")
+        if max_bytes < 0:
+            raise ValueError("Expected max_bytes to be non-negative")
+
+        self.max_bytes = max_bytes
+        self._entries: collections.OrderedDict[tuple[str, int], tuple[pd.DataFrame, int]] = collections.OrderedDict()
+        self._num_bytes = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def num_bytes(self) -> int:
+        return self._num_bytes
+
+    def get(self, table_name: str, version: int) -> Optional[pd.DataFrame]:
+        """
+        Get a copy of the cached DataFrame for the passed table at the passed version, marking it as most recently used.
+        :param table_name: The name of the table to look up
+        :param version: The table's current write version
+        :return: A copy of the cached DataFrame, or None if it isn't cached
+        """
+        key = (table_name, version)
+        with self._lock:
+            if key not in self._entries:
+                return None
+
+            self._entries.move_to_end(key)
+            df, _ = self._entries[key]
+        return TableCache._copy(df)
+
+    def put(self, table_name: str, version: int, df: pd.DataFrame):
+        """
+        Cache a copy of the passed DataFrame for the passed table at the passed version, replacing any entries for the
+        same table, then evict least recently used entries until the cache is within its memory budget.
+        :param table_name: The name of the table being cached
+        :param version: The table's current write version
+        :param df: The DataFrame to cache
+        :return:
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("Expected df to be a pandas DataFrame")
+
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            self.invalidate(table_name)
+            return
+        df = TableCache._copy(df)
+
+        with self._lock:
+            self.invalidate(table_name)
+            self._entries[(table_name, version)] = (df, size)
+            self._num_bytes += size
+
+            while self._num_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._num_bytes -= evicted_size
+
+    def invalidate(self, table_name: str):
+        """
+        Drop every cached entry for the passed table, regardless of version
+        :param table_name: The name of the table whose entries should be dropped
+        :return:
+        """
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == table_name]:
+                _, size = self._entries.pop(key)
+                self._num_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._num_bytes = 0
+
+    @staticmethod
+    def _copy(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Copy the passed DataFrame so that the copy can be handed out or stored without sharing mutable state. Under
+        copy-on-write, a shallow copy suffices, since pandas defers the actual copy until either side is written to.
+        :param df:
+        :return:
+        """
+        return df.copy(deep=pd.options.mode.copy_on_write is not True)
@@ -1,11 +1,19 @@
+import contextvars
+import threading
 import typing
 
 import pandas as pd
 import sqlalchemy
 
+from coolNewLanguage.src import consts
 from coolNewLanguage.src.stage import config, process
+from coolNewLanguage.src.table_cache import TableCache
+from coolNewLanguage.src.lazy_table import LazyTable
 import coolNewLanguage.src.tool as toolModule
+from coolNewLanguage.src.arrow_table_store import ArrowTableStore
+import coolNewLanguage.src.util.csv_ingest_utils as csv_ingest_utils
 import coolNewLanguage.src.util.sql_alch_csv_utils as sql_alch_csv_utils
+import coolNewLanguage.src.util.table_write_utils as table_write_utils
 
 
 class Tables:
@@ -24,29 +32,101 @@ class Tables:
     _tables_to_save: A dictionary of the tables to be added/modified, with the table name as the keys and the pandas
     DataFrame as the values
     _tables_to_delete: A set of the table names to be deleted
+    _pending_changes: A ContextVar holding the (_tables_to_save, _tables_to_delete) pair. Pending changes belong to the
+    request which made them, so they're kept in a ContextVar, which each concurrently handled request has its own copy
+    of.
+    _pending_row_updates: A ContextVar holding the updates saved by Rows during the current request, as a dictionary
+    mapping table names to dictionaries mapping row ids to dictionaries mapping column names to new values. Updates to
+    the same row are coalesced, and they're all written together when the request's changes are flushed.
+    _versions: A dictionary mapping table names to their write version, which is bumped every time the table is saved
+    or deleted. Tables which have never been written to by this instance are at version 0.
+    _cache: A TableCache holding DataFrames previously read from the Tool's database, keyed by table name and version
+    _previews: A dictionary mapping table names to (number of rows, DataFrame) pairs, holding the previews returned by
+    get_preview until the table is next written to
+    _store: An ArrowTableStore mirroring the user tables, which tables are read from in preference to the database, or
+    None if the Tool doesn't keep one
+    _lock: Guards _versions and _previews, since stage functions may run on several threads at once
     """
-    __slots__ = ('_tables', '_tool', '_tables_to_save', '_tables_to_delete')
-
-    def __init__(self, tool):
+    __slots__ = (
+        '_tables', '_tool', '_pending_changes', '_pending_row_updates', '_versions', '_cache', '_previews', '_store',
+        '_lock'
+    )
+
+    def __init__(
+            self,
+            tool,
+            cache_max_bytes: int = consts.DEFAULT_TABLE_CACHE_MAX_BYTES,
+            store: typing.Optional[ArrowTableStore] = None
+    ):
+        """
+        :param tool: The Tool object to which the tables belong
+        :param cache_max_bytes: The memory budget, in bytes, of the cache of DataFrames read from the Tool's database
+        :param store: An ArrowTableStore to mirror user tables in and read them from, or None to only use the database
+        """
         if not isinstance(tool, toolModule.Tool):
             raise TypeError("Tool must be a Tool object")
+        if not isinstance(cache_max_bytes, int):
+            raise TypeError("Expected cache_max_bytes to be an int")
+        if store is not None and not isinstance(store, ArrowTableStore):
+            raise TypeError("Expected store to be an ArrowTableStore or None")
 
         # Fetch existing table names
         insp = sqlalchemy.inspect(tool.db_engine)
         self._tables: set[str] = set(insp.get_table_names())
 
         self._tool: toolModule.Tool = tool
-        self._tables_to_save: dict[str, pd.DataFrame] = {}
-        self._tables_to_delete: set[str] = set()
+        self._pending_changes: contextvars.ContextVar[tuple[dict[str, pd.DataFrame], set[str]]] = \
+            contextvars.ContextVar('pending_table_changes')
+        self._pending_row_updates: contextvars.ContextVar[dict[str, dict[int, dict[str, typing.Any]]]] = \
+            contextvars.ContextVar('pending_row_updates')
+        self._versions: dict[str, int] = {}
+        self._cache: TableCache = TableCache(cache_max_bytes)
+        self._previews: dict[str, tuple[int, pd.DataFrame]] = {}
+        self._store: typing.Optional[ArrowTableStore] = store
+        self._lock = threading.Lock()
 
     def __len__(self) -> int:
         return len(self._tables)
 
+    def _get_pending_changes(self) -> tuple[dict[str, pd.DataFrame], set[str]]:
+        try:
+            return self._pending_changes.get()
+        except LookupError:
+            pending_changes = ({}, set())
+            self._pending_changes.set(pending_changes)
+            return pending_changes
+
+    @property
+    def _tables_to_save(self) -> dict[str, pd.DataFrame]:
+        return self._get_pending_changes()[0]
+
+    @_tables_to_save.setter
+    def _tables_to_save(self, tables_to_save: dict[str, pd.DataFrame]):
+        self._pending_changes.set((tables_to_save, self._tables_to_delete))
+
+    @property
+    def _tables_to_delete(self) -> set[str]:
+        return self._get_pending_changes()[1]
+
+    @_tables_to_delete.setter
+    def _tables_to_delete(self, tables_to_delete: set[str]):
+        self._pending_changes.set((self._tables_to_save, tables_to_delete))
+
+    @property
+    def _row_updates(self) -> dict[str, dict[int, dict[str, typing.Any]]]:
+        try:
+            return self._pending_row_updates.get()
+        except LookupError:
+            row_updates = {}
+            self._pending_row_updates.set(row_updates)
+            return row_updates
+
     def __getitem__(self, table_name: str) -> pd.DataFrame:
         """
         Returns the pandas DataFrame containing the corresponding table. If the requested table isn't found, raises a
         KeyError. If the table was slated to be added/modified, returns the cached modified version. If the table was
-        slated to be deleted, raises a KeyError.
+        slated to be deleted, raises a KeyError. Otherwise, returns a copy of the table as it was last read from the
+        database, only querying the database again if the table has since been written to or evicted from the cache.
         :param table_name: A string representing the table name.
         :return:
         """
@@ -56,6 +136,9 @@ class Tables:
         if table_name in self._tables_to_delete:
             raise KeyError(f"Table {table_name} was deleted")
 
+        # Rows saved earlier in the request must be seen by the read, or writing the DataFrame back would revert them
+        self._flush_table_row_updates(table_name)
+
         # If the table was slated to be added/modified, return the cached version
         if table_name in self._tables_to_save:
             df = self._tables_to_save[table_name]
@@ -65,11 +148,123 @@ class Tables:
         if table_name not in self:
             raise KeyError(f"Table {table_name} not found")
 
-        df = self._tool._get_table_dataframe(table_name)
+        df = self._get_stored_dataframe(table_name)
         df._name = table_name
 
         return df
 
+    def _get_stored_dataframe(self, table_name: str) -> typing.Optional[pd.DataFrame]:
+        """
+        Returns a copy of the table as stored in the tool's database, ignoring any cached changes, going through the
+        DataFrame cache. If the tool keeps an ArrowTableStore, cache misses are read from it, and tables missing from it
+        are read from the database and then added to it. Intended to be used by internal HiLT code, and not by HiLT
+        programmers.
+        :param table_name:
+        :return: The table's DataFrame, or None if the table doesn't exist
+        """
+        version = self._version_of(table_name)
+        df = self._cache.get(table_name, version)
+        if df is not None:
+            return df
+
+        df = self._store.read(table_name) if self._uses_store(table_name) else None
+        if df is None:
+            df = self._tool._get_table_dataframe(table_name)
+            if df is not None and self._uses_store(table_name):
+                self._store.write(table_name, table_write_utils.with_internal_ids(df))
+
+        if df is not None:
+            self._cache.put(table_name, version, df)
+        return df
+
+    def _uses_store(self, table_name: str) -> bool:
+        """
+        Whether the passed table is mirrored in the ArrowTableStore. Metadata tables, whose names start with '__', are
+        only kept in the database.
+        :param table_name:
+        :return:
+        """
+        return self._store is not None and not table_name.startswith('__')
+
+    def lazy(self, table_name: str) -> LazyTable:
+        """
+        Returns a LazyTable handle to the corresponding table, which defers reading the table until it's used, and then
+        only reads the columns and rows that are actually needed. Raises a KeyError in the same cases as __getitem__.
+        :param table_name: A string representing the table name.
+        :return:
+        """
+        if not isinstance(table_name, str):
+            raise TypeError("Table name must be a string")
+
+        if table_name in self._tables_to_delete:
+            raise KeyError(f"Table {table_name} was deleted")
+
+        if table_name not in self:
+            raise KeyError(f"Table {table_name} not found")
+
+        self._flush_table_row_updates(table_name)
+
+        return LazyTable(self._tool, table_name)
+
+    def iter_rows(
+            self,
+            table_name: str,
+            columns: typing.Optional[list[str]] = None,
+            batch_size: int = consts.DEFAULT_ITER_ROWS_BATCH_SIZE
+    ) -> typing.Iterator['Row']:
+        """
+        Iterates over the Rows of the corresponding table, in the order they were added. Rows are streamed from a
+        server-side cursor batch_size at a time, so that tables which don't fit in memory can be processed Row by Row.
+        The database connection is held until the iterator is exhausted or closed. Raises a KeyError in the same cases
+        as __getitem__, and a ValueError if the table has changes which haven't been saved to the database yet.
+        :param table_name: A string representing the table name.
+        :param columns: The names of the columns to read, or None to read all of them. Each Row always has the table's
+        internal id column, so that it can be saved.
+        :param batch_size: The number of rows to fetch from the database at a time
+        :return:
+        """
+        if not isinstance(table_name, str):
+            raise TypeError("Table name must be a string")
+        if columns is not None and \
+                (not isinstance(columns, list) or not all(isinstance(column, str) for column in columns)):
+            raise TypeError("Expected columns to be a list of strings")
+        if not isinstance(batch_size, int):
+            raise TypeError("Expected batch_size to be an int")
+        if batch_size < 1:
+            raise ValueError("Expected batch_size to be positive")
+
+        if table_name in self._tables_to_delete:
+            raise KeyError(f"Table {table_name} was deleted")
+        if table_name not in self:
+            raise KeyError(f"Table {table_name} not found")
+        if table_name in self._tables_to_save:
+            raise ValueError(f"Table {table_name} has unsaved changes, so its rows can't be read from the database")
+
+        self._flush_table_row_updates(table_name)
+
+        table = self._tool.get_table_from_table_name(table_name)
+        id_column = table.c[sql_alch_csv_utils.DB_INTERNAL_COLUMN_ID_NAME]
+        if columns is None:
+            selected_columns = list(table.c)
+        else:
+            for column in columns:
+                if column not in table.c:
+                    raise KeyError(f"Column {column} not found in table {table_name}")
+            selected_columns = [id_column] + [table.c[column] for column in columns if column != id_column.name]
+
+        stmt = sqlalchemy.select(*selected_columns).order_by(id_column)
+        return self._stream_rows(table, stmt, batch_size)
+
+    def _stream_rows(self, table: sqlalchemy.Table, stmt: sqlalchemy.Select, batch_size: int) -> typing.Iterator['Row']:
+        from coolNewLanguage.src.row import Row
+
+        with self._tool.db_engine.connect() as conn:
+            # yield_per streams the results, using a server-side cursor on backends which have them
+            result = conn.execution_options(yield_per=batch_size).execute(stmt)
+            for partition in result.partitions():
+                for sqlalchemy_row in partition:
+                    yield Row(table=table, sqlalchemy_row=sqlalchemy_row)
+
     def __setitem__(self, table_name: str, value: pd.DataFrame):
         """
         Adds/updates a table in the tool. If the table was slated to be deleted, removes it from the deletion list. If
@@ -81,6 +276,8 @@ class Tables:
         """
         if not isinstance(table_name, str):
             raise TypeError("Table name must be a string")
+        if isinstance(value, LazyTable):
+            value = value.materialize()
         if not isinstance(value, pd.DataFrame):
             raise TypeError("Value must be a pandas DataFrame")
 
@@ -130,8 +327,13 @@ class Tables:
         """
         Saves a table to the tool, ignoring any potential cached changes. Intended to be used by internal HiLT code, and
         not by HiLT programmers.
+        The rows' internal ids are first worked out from the DataFrame's index and the stored table's ids, as described
+        in table_write_utils.with_internal_ids. If the table already exists with a compatible schema, only the rows which
+        differ from the stored version, as identified by their internal ids, are deleted, updated or inserted.
+        Otherwise, the whole table is rewritten.
         :param table_name:
         :param df:
+        :param conn: The connection to write with. If None, a new connection is opened.
         :return:
         """
         if not isinstance(table_name, str):
@@ -142,15 +344,242 @@ class Tables:
             raise TypeError(
                 "Expected conn to be a sqlalchemy Connection object or None")
 
+        stored_df = self._get_stored_dataframe(table_name) if table_name in self._tables else None
+        df = table_write_utils.with_internal_ids(df, Tables._stored_ids(stored_df))
+        wrote_diff = table_write_utils.can_write_diff(stored_df, df)
+
+        # Drop the stored copy first, so that if the database write fails the table is read from the database again
+        if self._uses_store(table_name):
+            self._store.delete(table_name)
+
         if conn:
-            df.to_sql(name=table_name, con=conn,
-                      if_exists='replace', index=False)
+            self._write_table(table_name, df, stored_df, wrote_diff, conn)
         else:
             with self._tool.db_engine.connect() as conn:
-                df.to_sql(name=table_name, con=conn,
-                          if_exists='replace', index=False)
+                self._write_table(table_name, df, stored_df, wrote_diff, conn)
+
+        self._tables.add(table_name)
+        version = self._bump_version(table_name)
+        # A full write replaces the table, possibly with a different schema
+        if not wrote_diff:
+            self._tool.schema_catalog.invalidate(table_name)
+
+        # A diff is only written when df has the same dtypes as the stored table, so df is exactly what would be read
+        # back, and can be cached as the new version
+        if wrote_diff:
+            self._cache.put(table_name, version, df)
+
+        if self._uses_store(table_name):
+            self._store.write(table_name, table_write_utils.with_internal_ids(df))
+
+    @staticmethod
+    def _stored_ids(stored_df: typing.Optional[pd.DataFrame]) -> typing.Optional[pd.Index]:
+        """
+        Returns the internal ids of the rows of a stored table, or None if the table doesn't exist or isn't keyed by
+        internal ids
+        :param stored_df: The table's contents, as read by _get_stored_dataframe
+        :return:
+        """
+        if stored_df is None or stored_df.index.name != sql_alch_csv_utils.DB_INTERNAL_COLUMN_ID_NAME:
+            return None
+        return stored_df.index
+
+    def _append_rows(self, table_name: str, df: pd.DataFrame):
+        """
+        Appends rows to a saved table, ignoring any potential cached changes. Intended to be used by internal HiLT code,
+        and not by HiLT programmers.
+        If the table's schema, as cached by the Tool's SchemaCatalog, accepts the rows as they are, only the new rows
+        are inserted. Otherwise, the table is read, and saved with the rows appended.
+        :param table_name:
+        :param df: The rows to append
+        :return:
+        """
+        if not isinstance(table_name, str):
+            raise TypeError("Expected table_name to be a string")
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("Expected df to be a pandas DataFrame")
+
+        table = self._tool.schema_catalog.get_table(table_name)
+        if not table_write_utils.can_append_rows(table, df):
+            existing_df = self._tool._get_table_dataframe(table_name)
+            if existing_df is not None:
+                df = pd.concat([existing_df, df])
+            self._save_table(table_name, df)
+            return
+
+        # Drop the stored copy first, so that if the database write fails the table is read from the database again
+        if self._uses_store(table_name):
+            self._store.delete(table_name)
+
+        with self._tool.db_engine.connect() as conn:
+            table_write_utils.append_rows(conn, table_name, df)
 
         self._tables.add(table_name)
+        self._bump_version(table_name)
+
+    def _stage_row_update(
+            self,
+            table_name: str,
+            row_id: int,
+            values: dict[str, typing.Any],
+            get_user_approvals: bool = False
+    ):
+        """
+        Stages an update to some of the cells of a saved row, as made by Row.save. Intended to be used by internal HiLT
+        code, and not by HiLT programmers.
+        Outside of a Stage, the update is written immediately. Otherwise, updates are coalesced per row, and written in
+        one transaction when the request's changes are flushed, so that saving many rows doesn't issue a statement and
+        commit per row. Reading the table before then writes its staged updates first.
+        If get_user_approvals is True, the update is instead applied to the table's pending version, so that all of a
+        stage's row updates are presented for approval together, as a diff of the table. A KeyError is raised if the
+        row isn't in the table.
+        :param table_name: The name of the table containing the row
+        :param row_id: The internal id of the row
+        :param values: A dictionary mapping the names of the columns to update to their new values
+        :param get_user_approvals: Whether the update must be approved by the user before it's written
+        :return:
+        """
+        if not isinstance(table_name, str):
+            raise TypeError("Expected table_name to be a string")
+        if not isinstance(row_id, int):
+            raise TypeError("Expected row_id to be an int")
+        if not isinstance(values, dict):
+            raise TypeError("Expected values to be a dict")
+
+        if not values:
+            return
+
+        if not config.building_template and not process.handling_post and not process.handling_user_approvals:
+            self._update_rows(table_name, {row_id: values})
+            return
+
+        if get_user_approvals:
+            df = self[table_name]
+            # Setting a missing label would add a row, which would be presented as an insert
+            if row_id not in df.index:
+                raise KeyError(f"Row {row_id} not found in table {table_name}")
+            for col_name, val in values.items():
+                df.loc[row_id, col_name] = val
+            self._tables_to_save[table_name] = df
+            return
+
+        self._row_updates.setdefault(table_name, {}).setdefault(row_id, {}).update(values)
+        # Keep the table's pending version in step, so that saving it doesn't revert the update
+        if table_name in self._tables_to_save:
+            df = self._tables_to_save[table_name]
+            if row_id in df.index:
+                for col_name, val in values.items():
+                    df.loc[row_id, col_name] = val
+
+    def _update_rows(self, table_name: str, updates: dict[int, dict[str, typing.Any]]):
+        """
+        Updates cells of a saved table, ignoring any potential cached changes. Intended to be used by internal HiLT
+        code, and not by HiLT programmers.
+        :param table_name:
+        :param updates: A dictionary mapping row ids to dictionaries mapping column names to new values
+        :return:
+        """
+        # Drop the stored copy first, so that if the database write fails the table is read from the database again
+        if self._uses_store(table_name):
+            self._store.delete(table_name)
+
+        with self._tool.db_engine.connect() as conn:
+            table_write_utils.update_rows(conn, table_name, updates)
+
+        self._bump_version(table_name)
+
+    def _flush_row_updates(self):
+        """
+        Writes the row updates staged during the current request, in a single transaction, and clears them. Intended to
+        be used by internal HiLT code, and not by HiLT programmers.
+        :return:
+        """
+        row_updates = self._row_updates
+        if row_updates:
+            # Drop the stored copies first, so that if the database write fails the tables are read from the database
+            for table_name in row_updates:
+                if self._uses_store(table_name):
+                    self._store.delete(table_name)
+
+            with self._tool.db_engine.begin() as conn:
+                for table_name, updates in row_updates.items():
+                    table_write_utils.update_rows(conn, table_name, updates)
+
+            # Only bump the versions once the updates are committed, so that a concurrent read can't cache the tables'
+            # previous contents under their new versions
+            for table_name in row_updates:
+                self._bump_version(table_name)
+
+        self._pending_row_updates.set({})
+
+    def _flush_table_row_updates(self, table_name: str):
+        """
+        Writes the row updates staged during the current request to the passed table, so that they're seen by reads of
+        it. Intended to be used by internal HiLT code, and not by HiLT programmers.
+        :param table_name:
+        :return:
+        """
+        updates = self._row_updates.pop(table_name, None)
+        if updates:
+            self._update_rows(table_name, updates)
+
+    @staticmethod
+    def _write_table(
+            table_name: str,
+            df: pd.DataFrame,
+            stored_df: typing.Optional[pd.DataFrame],
+            write_diff: bool,
+            conn: sqlalchemy.Connection
+    ):
+        if write_diff:
+            table_write_utils.write_table_diff(conn, table_name, stored_df, df)
+        else:
+            table_write_utils.write_full_table(conn, table_name, df)
+
+    def load_csv(
+            self,
+            table_name: str,
+            csv_path: str,
+            has_header: bool = True,
+            chunk_rows: int = csv_ingest_utils.DEFAULT_CHUNK_ROWS,
+            sample_rows: int = csv_ingest_utils.DEFAULT_SAMPLE_ROWS,
+            progress: typing.Optional[typing.Callable[[csv_ingest_utils.CsvIngestProgress], None]] = None
+    ) -> int:
+        """
+        Creates or replaces a table with the contents of a CSV file, such as the value of a FileUploadComponent, by
+        streaming the file into the tool's database a chunk of rows at a time. Unlike reading the file with pandas and
+        assigning the DataFrame, the file is never held in memory in full, so this should be used for large uploads.
+        Since the table isn't held in memory, it's written immediately, even when changes are being collected for user
+        approval, and replaces any pending change to the same table.
+        :param table_name: The name of the table to create or replace
+        :param csv_path: The path of the CSV file
+        :param has_header: Whether the file has a header row to read column names from
+        :param chunk_rows: The number of rows to read and insert at a time
+        :param sample_rows: The number of rows at the start of the file to infer column types from
+        :param progress: A function called with a CsvIngestProgress after each chunk is inserted
+        :return: The number of rows in the new table
+        """
+        if not isinstance(table_name, str):
+            raise TypeError("Expected table_name to be a string")
+
+        # Drop the stored copy first, so that if the database write fails the table is read from the database again
+        if self._uses_store(table_name):
+            self._store.delete(table_name)
+
+        with self._tool.db_engine.connect() as conn:
+            num_rows = csv_ingest_utils.ingest_csv_file(
+                conn, table_name, csv_path, has_header, chunk_rows, sample_rows, progress
+            )
+
+        self._tables_to_save.pop(table_name, None)
+        self._tables_to_delete.discard(table_name)
+        # Staged row updates were to the replaced rows, so mustn't be written over the loaded ones
+        self._row_updates.pop(table_name, None)
+        self._tables.add(table_name)
+        self._bump_version(table_name)
+        self._tool.schema_catalog.invalidate(table_name)
+
+        return num_rows
 
     def _delete_table(self, table_name: str):
         """
@@ -167,15 +596,39 @@ class Tables:
 
         table = self._tool.get_table_from_table_name(table_name)
         table.drop(self._tool.db_engine)
+        self._tool.schema_catalog.invalidate(table_name)
+        if self._uses_store(table_name):
+            self._store.delete(table_name)
 
         self._tables.remove(table_name)
+        self._bump_version(table_name)
+
+    def _version_of(self, table_name: str) -> int:
+        with self._lock:
+            return self._versions.get(table_name, 0)
+
+    def _bump_version(self, table_name: str) -> int:
+        """
+        Bumps the write version of the passed table, and drops any cached DataFrames of it, since they're now stale.
+        Intended to be used by internal HiLT code, and not by HiLT programmers.
+        :param table_name:
+        :return: The table's new version
+        """
+        with self._lock:
+            version = self._versions.get(table_name, 0) + 1
+            self._versions[table_name] = version
+            self._previews.pop(table_name, None)
+        self._cache.invalidate(table_name)
+        return version
 
     def _flush_changes(self):
         """
-        Flushes the changes to the underlying database. Tables to be added or modified are updated to the tool's
-        database, while tables to be deleted are dropped.
+        Flushes the changes to the underlying database. Staged row updates are written first, then tables to be added
+        or modified are updated to the tool's database, while tables to be deleted are dropped.
         :return:
         """
+        self._flush_row_updates()
+
         with self._tool.db_engine.connect() as conn:
             for table_name, table in self._tables_to_save.items():
                 self._save_table(table_name, table, conn)
@@ -188,10 +641,12 @@ class Tables:
     def _clear_changes(self):
         """
         Clears the cached changes to the tables. Intended to be used by internal HiLT code, and not by HiLT programmers.
+        The changes are replaced rather than emptied, since the current context may share them with the context it was
+        copied from.
         :return:
         """
-        self._tables_to_save.clear()
-        self._tables_to_delete.clear()
+        self._pending_changes.set(({}, set()))
+        self._pending_row_updates.set({})
 
     def get_table_names(self, only_user_tables: bool = True):
         """
@@ -221,8 +676,54 @@ class Tables:
         if table_name not in self:
             raise KeyError(f"Table {table_name} not found")
 
-        columns = self[table_name].columns.tolist()
+        # Read the column names from the table's schema, rather than reading the whole table
+        if table_name in self._tables_to_save:
+            columns = self._tables_to_save[table_name].columns.tolist()
+        else:
+            columns = self._tool.get_table_from_table_name(table_name).c.keys()
 
         if only_user_columns:
             return sql_alch_csv_utils.filter_to_user_columns(columns)
         return columns
+
+    def get_preview(self, table_name: str, num_rows: int) -> pd.DataFrame:
+        """
+        Get the first num_rows rows of the passed table, in internal id order, for use in previews. Only those rows are
+        read from the database, and the result is kept until the table is next written to, so that repeatedly painting
+        a preview of an unchanged table doesn't query the database again.
+        :param table_name: The name of the table to preview
+        :param num_rows: The number of rows to include in the preview
+        :return: A DataFrame containing the first num_rows rows of the table
+        """
+        if not isinstance(table_name, str):
+            raise TypeError("Expected table_name to be a string")
+        if not isinstance(num_rows, int):
+            raise TypeError("Expected num_rows to be an int")
+
+        if table_name not in self:
+            raise KeyError(f"Table {table_name} not found")
+
+        if table_name in self._tables_to_save:
+            return self._tables_to_save[table_name].head(num_rows)
+
+        self._flush_table_row_updates(table_name)
+
+        with self._lock:
+            version = self._versions.get(table_name, 0)
+            cached_preview = self._previews.get(table_name)
+        if cached_preview is not None and cached_preview[0] == num_rows:
+            return cached_preview[1]
+
+        stmt = sqlalchemy.select(sqlalchemy.text('*')).select_from(sqlalchemy.table(table_name)).limit(num_rows)
+        # Order by internal id, as tables are read, since databases such as Postgres otherwise return updated rows last
+        table = self._tool.schema_catalog.get_table(table_name)
+        if table is not None and sql_alch_csv_utils.DB_INTERNAL_COLUMN_ID_NAME in table.c:
+            stmt = stmt.order_by(table.c[sql_alch_csv_utils.DB_INTERNAL_COLUMN_ID_NAME])
+        with self._tool.db_engine.connect() as conn:
+            preview = pd.read_sql_query(stmt, conn)
+
+        # Don't keep the preview if the table was written to while it was read, since it may be stale
+        with self._lock:
+            if self._versions.get(table_name, 0) == version:
+                self._previews[table_name] = (num_rows, preview)
+        return preview
@@ -1,6 +1,9 @@
+import functools
+import hashlib
+import json
 import os
 import pathlib
-from typing import Callable, Optional
+from typing import Callable, Iterable, Iterator, Optional, Union
 
 import aiofiles
 import aiohttp_jinja2
@@ -14,10 +17,17 @@ from aiohttp import web
 import coolNewLanguage.src.tables as tables
 
 from coolNewLanguage.src import consts, models
+from coolNewLanguage.src.approvals.approval_store import ApprovalStore
+from coolNewLanguage.src.arrow_table_store import ArrowTableStore
 from coolNewLanguage.src.consts import DATA_DIR, STATIC_ROUTE, STATIC_FILE_DIR, TEMPLATES_DIR, \
     LANDING_PAGE_TEMPLATE_FILENAME, LANDING_PAGE_STAGES, STYLES_ROUTE, STYLES_DIR
-from coolNewLanguage.src.stage import process
+from coolNewLanguage.src.engine_profile import EngineProfile
+from coolNewLanguage.src.link_cache import LinkCache
+from coolNewLanguage.src.schema_catalog import SchemaCatalog
+from coolNewLanguage.src.stage import jobs, process
 from coolNewLanguage.src.stage.stage import Stage
+from coolNewLanguage.src.stage.stage_executor import StageExecutor
+from coolNewLanguage.src.storage_backend import SQLiteBackend, StorageBackend
 from coolNewLanguage.src.util.str_utils import check_has_only_alphanumerics_or_underscores
 from coolNewLanguage.src.web_app import WebApp
 from typing import List
@@ -33,10 +43,30 @@ class Tool:
     stages : list[Stage]
     web_app : WebApp
     file_dir : Pathlib.Path - A path to the directory in which to store files uploaded to this Tool
+    max_upload_bytes : Optional[int] - The largest file which may be uploaded to this Tool, or None for no limit
+    upload_hash_algorithm : Optional[str] - The hashlib algorithm uploaded files are hashed with, or None
+    stage_executor : StageExecutor - Runs Stages' stage functions off the event loop
+    job_queue : JobQueue - Runs the jobs submitted by background Stages
+    storage_backend : StorageBackend - The database this Tool's tables are stored in
+    schema_catalog : SchemaCatalog - A cache of the reflected schemas of the tables in this Tool's database
+    approval_store : ApprovalStore - Persists the changes awaiting the user's approval
     state : dict - A dictionary programmers can use to share state between Stages
     """
 
-    def __init__(self, tool_name: str, file_dir_path: str = '', description: str = ''):
+    def __init__(
+            self,
+            tool_name: str,
+            file_dir_path: str = '',
+            description: str = '',
+            table_cache_max_bytes: int = consts.DEFAULT_TABLE_CACHE_MAX_BYTES,
+            engine_profile: Optional[EngineProfile] = None,
+            storage_backend: Optional[StorageBackend] = None,
+            arrow_table_store: bool = False,
+            max_upload_bytes: Optional[int] = None,
+            upload_hash_algorithm: Optional[str] = None,
+            stage_executor: Optional[StageExecutor] = None,
+            job_queue: Optional[jobs.JobQueue] = None
+    ):
         """
         Initialize this tool
         Initializes the web_app which forms the back end of this tool
@@ -44,6 +74,24 @@ class Tool:
         :param tool_name: The name of this tool, can only contain alphanumeric characters or underscores
         :param url: The url path for this tool, to be used in the future for situations with multiple tools
         :param file_dir_path: A path to the directory in which to store files uploaded to this Tool
+        :param table_cache_max_bytes: The memory budget, in bytes, for caching tables read from this Tool's database
+        :param engine_profile: The settings to create this Tool's database engine with. If None, the default
+        EngineProfile is used, which turns on WAL and leaves SQL logging off; pass EngineProfile.debug() to log SQL.
+        Only applies to the default SQLite backend.
+        :param storage_backend: The database to store this Tool's tables in. If None, a SQLiteBackend is used, which
+        stores them in data/{tool_name}.db
+        :param arrow_table_store: Whether to also keep user tables as Arrow IPC files in data/{tool_name}_tables, which
+        tables are then read from by memory-mapping them. Requires the pyarrow package.
+        :param max_upload_bytes: The largest file which may be uploaded to this Tool, in bytes, or None to allow files of
+        any size
+        :param upload_hash_algorithm: The name of a hashlib algorithm, such as 'sha256', to hash uploaded files with as
+        they're streamed to disk, making the hash available as FileUploadComponent.content_hash. If None, uploads
+        aren't hashed.
+        :param stage_executor: The StageExecutor used to run stage functions, which sets the per-stage concurrency
+        limits and timeouts. If None, stage functions are run on a thread pool, without limits or timeouts; pass
+        StageExecutor.inline() to run them on the event loop instead.
+        :param job_queue: The JobQueue used to run background Stages. If None, a JobQueue with its own pool of
+        jobs.DEFAULT_JOB_WORKERS threads is used.
         """
         if not isinstance(tool_name, str):
             raise TypeError("Expected a string for Tool name")
@@ -55,6 +103,28 @@ class Tool:
             raise TypeError("Expected file_dir_path to be a string")
         if not isinstance(description, str):
             raise TypeError("Expected description to be a string")
+        if not isinstance(table_cache_max_bytes, int):
+            raise TypeError("Expected table_cache_max_bytes to be an int")
+        if engine_profile is not None and not isinstance(engine_profile, EngineProfile):
+            raise TypeError("Expected engine_profile to be an EngineProfile or None")
+        if storage_backend is not None and not isinstance(storage_backend, StorageBackend):
+            raise TypeError("Expected storage_backend to be a StorageBackend or None")
+        if storage_backend is None:
+            storage_backend = SQLiteBackend(engine_profile=engine_profile)
+        elif engine_profile is not None:
+            raise ValueError("Expected only one of engine_profile and storage_backend to be passed")
+        if not isinstance(arrow_table_store, bool):
+            raise TypeError("Expected arrow_table_store to be a bool")
+        if max_upload_bytes is not None and not isinstance(max_upload_bytes, int):
+            raise TypeError("Expected max_upload_bytes to be an int or None")
+        if upload_hash_algorithm is not None and not isinstance(upload_hash_algorithm, str):
+            raise TypeError("Expected upload_hash_algorithm to be a string or None")
+        if upload_hash_algorithm is not None and upload_hash_algorithm not in hashlib.algorithms_available:
+            raise ValueError(f"Expected upload_hash_algorithm to be one of {sorted(hashlib.algorithms_available)}")
+        if stage_executor is not None and not isinstance(stage_executor, StageExecutor):
+            raise TypeError("Expected stage_executor to be a StageExecutor or None")
+        if job_queue is not None and not isinstance(job_queue, jobs.JobQueue):
+            raise TypeError("Expected job_queue to be a JobQueue or None")
 
         self.tool_name = tool_name
         self.description_lines = description.strip().splitlines()
@@ -75,16 +145,25 @@ class Tool:
         # create the data directory if it doesn't exist
         DATA_DIR.mkdir(exist_ok=True)
 
-        db_path = DATA_DIR.joinpath(f'{tool_name}.db')
-        # create an engine with a sqlite database
-        self.db_engine: sqlalchemy.Engine = sqlalchemy.create_engine(
-            f'sqlite:///{str(db_path)}', echo=True)
-        # Connect to the engine, so that the sqlite db file is created if it doesn't exist already
-        self.db_engine.connect()
+        self.storage_backend: StorageBackend = storage_backend
+        # create an engine connected to the backend's database
+        self.db_engine: sqlalchemy.Engine = storage_backend.create_engine(tool_name, DATA_DIR)
+        # Connect to the engine, so that the database file is created if it doesn't exist already
+        with self.db_engine.connect():
+            pass
         self.db_metadata_obj: sqlalchemy.MetaData = sqlalchemy.MetaData()
+        # Reflected schemas of the database's tables, which CNL invalidates whenever it creates, alters or drops a table
+        self.schema_catalog: SchemaCatalog = SchemaCatalog(self.db_engine, self.db_metadata_obj)
+
+        # Links' adjacencies, built the first time links of each metatype are traversed
+        self.link_cache: LinkCache = LinkCache()
+        # Link metatypes' ids, keyed by their metanames, which are loaded by db_awaken and added to as they're registered
+        self.link_metatype_ids: dict[str, int] = {}
 
         # Awakening the db creates the necessary tables required to run the tool
         self.db_awaken()
+        # Changes awaiting approval are recorded in the database, with their data spilled to data/{tool_name}_approvals
+        self.approval_store = ApprovalStore(self.db_engine, DATA_DIR.joinpath(f'{tool_name}_approvals'))
 
         # Create a directory to store uploaded files
         if file_dir_path == '':
@@ -92,23 +171,33 @@ class Tool:
         else:
             self.file_dir = pathlib.Path(file_dir_path)
         self.file_dir.mkdir(parents=True, exist_ok=True)
+        self.max_upload_bytes = max_upload_bytes
+        self.upload_hash_algorithm = upload_hash_algorithm
+        self.stage_executor = stage_executor if stage_executor is not None else StageExecutor()
+        self.job_queue = job_queue if job_queue is not None else jobs.JobQueue()
 
         self.state = {}
 
-        self.tables = tables.Tables(self)
+        store = ArrowTableStore(DATA_DIR.joinpath(f'{tool_name}_tables')) if arrow_table_store else None
+        self.tables = tables.Tables(self, cache_max_bytes=table_cache_max_bytes, store=store)
 
-    def add_stage(self, stage_name: str, stage_func: Callable):
+    def add_stage(self, stage_name: str, stage_func: Callable, background: bool = False):
         """
         Add a stage to this tool
         :param stage_name: The name of this stage
         :param stage_func: The function used to define this stage
+        :param background: Whether to run this stage as a background job when its input is submitted, for stages which
+        take too long to run while the user waits. The user is shown a page with the job's progress, which stage_func
+        can report with jobs.report_progress, and then its results once it finishes.
         :return:
         """
         if not isinstance(stage_name, str):
             raise TypeError("Expected stage_name to be a string")
         if not callable(stage_func):
             raise TypeError("Expected stage_func to be callable")
-        new_stage = Stage(stage_name, stage_func)
+        if not isinstance(background, bool):
+            raise TypeError("Expected background to be a bool")
+        new_stage = Stage(stage_name, stage_func, background=background)
         self.stages.append(new_stage)
 
     def run(self, port: int = 8000):
@@ -125,7 +214,12 @@ class Tool:
         routes = [
             web.get('/', self.landing_page),
             web.get(consts.GET_TABLE_ROUTE, self.get_table),
-            web.get('/pdf/{filename}', self.serve_pdf)
+            web.get(consts.GET_TABLE_DATA_ROUTE, self.get_table_data),
+            web.get('/pdf/{filename}', self.serve_pdf),
+            web.get(f'{consts.JOBS_ROUTE}/{{job_id}}', jobs.job_page_handler),
+            web.get(f'{consts.JOBS_ROUTE}/{{job_id}}/status', jobs.job_status_handler),
+            web.get(f'{consts.APPROVALS_ROUTE}/{{token}}/{{approve_result_id}}/rows', approvals.approval_rows_handler),
+            web.post(f'{consts.APPROVALS_ROUTE}/{{token}}/decisions', approvals.approval_decisions_handler)
         ]
 
         for stage in self.stages:
@@ -135,11 +229,16 @@ class Tool:
                 web.post(f'/{stage.url}/approve', approvals.approval_handler))
 
         self.web_app.app.add_routes(routes)
+        self.web_app.app.on_cleanup.append(self._shutdown_executors)
 
         process.running_tool = self
 
         web.run_app(self.web_app.app, port=port)
 
+    async def _shutdown_executors(self, app: web.Application):
+        self.stage_executor.shutdown()
+        self.job_queue.shutdown()
+
     async def landing_page(self, request: web.Request) -> web.Response:
         """
         The landing page handler for this tool
@@ -155,6 +254,7 @@ class Tool:
             request=request,
             context={
                 LANDING_PAGE_STAGES: self.stages,
+                'jobs': self.job_queue.list_jobs(),
                 'tool_name': self.tool_name,
                 'description_lines': self.description_lines
             }
@@ -204,6 +304,245 @@ class Tool:
 
         return LinkMetatype(name=link_meta_name)
 
+    def register_links(
+            self,
+            links: Iterable[tuple['LinkMetatype', Union['Row', 'CNLType'], Union['Row', 'CNLType']]],
+            get_user_approvals: bool = False
+    ) -> list[Optional['Link']]:
+        """
+        Links many pairs of rows at once, as Row.link does for a single pair, but checking which of the links already
+        exist and registering the rest within a single transaction, rather than with several queries per link. If not
+        handling_post, does nothing and returns a None for each link instead.
+        :param links: (link_metatype, link_src, link_dst) tuples, whose sources and destinations are each a Row or a
+        CNLType instance
+        :param get_user_approvals: Whether to get user approvals before creating the links which don't exist yet
+        :return: The links, in the same order as links, with None for those with a CNLType end without a backing row
+        """
+        from coolNewLanguage.src.approvals.link_approve_result import LinkApproveResult
+        from coolNewLanguage.src.util import link_utils
+
+        link_keys = self._link_keys(links)
+        known_keys = [link_key for link_key in link_keys if link_key is not None]
+
+        if get_user_approvals:
+            registered_links = {}
+            found_links = self._links_of(known_keys, link_utils.get_link_ids(self, known_keys))
+            for link_key, link in zip(known_keys, found_links):
+                if link_key in registered_links:
+                    continue
+                if link.link_id is None:
+                    process.approve_results.append(LinkApproveResult(link=link))
+                registered_links[link_key] = link
+        else:
+            registered_links = dict(zip(known_keys, link_utils.register_new_links(self, known_keys)))
+
+        return [registered_links[link_key] if link_key is not None else None for link_key in link_keys]
+
+    def get_links(
+            self,
+            links: Iterable[tuple['LinkMetatype', Union['Row', 'CNLType'], Union['Row', 'CNLType']]]
+    ) -> list[Optional['Link']]:
+        """
+        Looks up many links at once, with a query per batch of source rows rather than per link. If not handling_post,
+        returns a None for each link instead.
+        :param links: (link_metatype, link_src, link_dst) tuples, whose sources and destinations are each a Row or a
+        CNLType instance
+        :return: The links, in the same order as links, with None for those which haven't been registered
+        """
+        from coolNewLanguage.src.util import link_utils
+
+        link_keys = self._link_keys(links)
+        known_keys = [link_key for link_key in link_keys if link_key is not None]
+        found_links = {
+            link_key: link
+            for link_key, link in zip(known_keys, self._links_of(known_keys, link_utils.get_link_ids(self, known_keys)))
+            if link.link_id is not None
+        }
+        return [found_links.get(link_key) for link_key in link_keys]
+
+    @staticmethod
+    def _link_keys(
+            links: Iterable[tuple['LinkMetatype', Union['Row', 'CNLType'], Union['Row', 'CNLType']]]
+    ) -> list[Optional[tuple[int, str, int, str, int]]]:
+        """
+        Validates the passed (link_metatype, link_src, link_dst) tuples, and returns the keys identifying their links
+        :param links:
+        :return: The (link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id) key of each link, or None
+        for links with a CNLType end without a backing row, or for every link if not handling_post
+        """
+        from coolNewLanguage.src.cnl_type.cnl_type import CNLType
+        from coolNewLanguage.src.cnl_type.link_metatype import LinkMetatype
+        from coolNewLanguage.src.row import Row
+
+        links = list(links)
+        for link in links:
+            if not isinstance(link, tuple) or len(link) != 3:
+                raise TypeError("Expected each link to be a (link_metatype, link_src, link_dst) tuple")
+            link_metatype, link_src, link_dst = link
+            if not isinstance(link_metatype, LinkMetatype):
+                raise TypeError("Expected link_metatype to be a LinkMetatype")
+            if not isinstance(link_src, (Row, CNLType)):
+                raise TypeError("Expected link_src to be a Row or a CNLType instance")
+            if not isinstance(link_dst, (Row, CNLType)):
+                raise TypeError("Expected link_dst to be a Row or a CNLType instance")
+
+        if not process.handling_post:
+            return [None] * len(links)
+
+        link_keys = []
+        for link_metatype, link_src, link_dst in links:
+            src_row = link_src if isinstance(link_src, Row) else link_src._hls_backing_row
+            dst_row = link_dst if isinstance(link_dst, Row) else link_dst._hls_backing_row
+            if src_row is None or dst_row is None:
+                link_keys.append(None)
+                continue
+            link_keys.append((
+                link_metatype.get_link_meta_id(),
+                src_row.table.name,
+                int(src_row.row_id),
+                dst_row.table.name,
+                int(dst_row.row_id)
+            ))
+        return link_keys
+
+    @staticmethod
+    def _links_of(link_keys: list[tuple[int, str, int, str, int]], link_ids: list[Optional[int]]) -> list['Link']:
+        from coolNewLanguage.src.cnl_type.link import Link
+
+        links = []
+        for link_key, link_id in zip(link_keys, link_ids):
+            link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id = link_key
+            links.append(Link(link_meta_id, link_id, src_table_name, src_row_id, dst_table_name, dst_row_id))
+        return links
+
+    def get_neighbors(
+            self,
+            rows: Union['Row', 'CNLType', Iterable[Union['Row', 'CNLType']]],
+            link_metatypes: Union['LinkMetatype', Iterable['LinkMetatype']],
+            direction: Union['LinkDirection', str] = 'forward'
+    ) -> list['Row']:
+        """
+        Returns the rows linked to the passed rows by links of the passed metatypes. If not handling_post, returns an
+        empty list instead.
+        :param rows: A Row or CNLType instance, or several of them
+        :param link_metatypes: A LinkMetatype, or several of them
+        :param direction: Which way to follow links: 'forward' from their sources, 'backward' from their destinations,
+        or 'both'
+        :return: The linked rows, each once, leaving out the passed rows themselves
+        """
+        neighbors = []
+        for batch in self.expand_links(rows, link_metatypes, max_hops=1, direction=direction):
+            neighbors.extend(batch)
+        return neighbors
+
+    def expand_links(
+            self,
+            rows: Union['Row', 'CNLType', Iterable[Union['Row', 'CNLType']]],
+            link_metatypes: Union['LinkMetatype', Iterable['LinkMetatype']],
+            max_hops: int,
+            direction: Union['LinkDirection', str] = 'forward',
+            batch_size: Optional[int] = None
+    ) -> Iterator[list['Row']]:
+        """
+        Finds the rows reachable from the passed rows by following at most max_hops links of the passed metatypes, e.g.
+        all the facilities linked to fires linked to a county. Rows are found breadth first, a hop at a time, and are
+        yielded in batches, so that expanding to many rows doesn't load them all at once. If not handling_post, yields
+        nothing.
+        :param rows: A Row or CNLType instance, or several of them, to expand from
+        :param link_metatypes: A LinkMetatype, or several of them
+        :param max_hops: The maximum number of links to follow from a passed row
+        :param direction: Which way to follow links: 'forward' from their sources, 'backward' from their destinations,
+        or 'both'
+        :param batch_size: The maximum number of rows in each batch, by default DEFAULT_TRAVERSAL_BATCH_SIZE
+        :return: An iterator over batches of rows, each reached once, in order of the number of links followed to them
+        """
+        from coolNewLanguage.src.util import link_traversal_utils
+
+        row_keys = self._row_keys(rows)
+        link_meta_ids = self._link_meta_ids(link_metatypes)
+        direction = link_traversal_utils.LinkDirection(direction)
+        if batch_size is None:
+            batch_size = link_traversal_utils.DEFAULT_TRAVERSAL_BATCH_SIZE
+        if not process.handling_post:
+            return iter(())
+
+        batches = link_traversal_utils.expand(self, row_keys, link_meta_ids, max_hops, direction, batch_size)
+        return (link_traversal_utils.get_rows(self, [row_key for row_key, _ in batch]) for batch in batches)
+
+    def find_link_path(
+            self,
+            src: Union['Row', 'CNLType'],
+            dst: Union['Row', 'CNLType'],
+            link_metatypes: Union['LinkMetatype', Iterable['LinkMetatype']],
+            max_hops: int,
+            direction: Union['LinkDirection', str] = 'forward'
+    ) -> Optional[list['Link']]:
+        """
+        Finds a shortest path of links of the passed metatypes from src to dst. If not handling_post, returns None.
+        :param src: The Row or CNLType instance the path starts at
+        :param dst: The Row or CNLType instance the path ends at
+        :param link_metatypes: A LinkMetatype, or several of them
+        :param max_hops: The maximum number of links in the path
+        :param direction: Which way to follow links: 'forward' from their sources, 'backward' from their destinations,
+        or 'both'
+        :return: The links along the path, in order, or None if there's no path of at most max_hops links
+        """
+        from coolNewLanguage.src.util import link_traversal_utils
+
+        src_row_keys = self._row_keys(src)
+        dst_row_keys = self._row_keys(dst)
+        link_meta_ids = self._link_meta_ids(link_metatypes)
+        direction = link_traversal_utils.LinkDirection(direction)
+        if not process.handling_post or not src_row_keys or not dst_row_keys:
+            return None
+
+        return link_traversal_utils.find_path(
+            self, src_row_keys[0], dst_row_keys[0], link_meta_ids, max_hops, direction
+        )
+
+    @staticmethod
+    def _row_keys(rows: Union['Row', 'CNLType', Iterable[Union['Row', 'CNLType']]]) -> list[tuple[str, int]]:
+        """
+        Validates the passed rows, and returns the (table_name, row_id) keys identifying them
+        :param rows: A Row or CNLType instance, or several of them
+        :return: The rows' keys, leaving out CNLType instances without a backing row
+        """
+        from coolNewLanguage.src.cnl_type.cnl_type import CNLType
+        from coolNewLanguage.src.row import Row
+
+        if isinstance(rows, (Row, CNLType)):
+            rows = [rows]
+        row_keys = []
+        for row in rows:
+            if not isinstance(row, (Row, CNLType)):
+                raise TypeError("Expected each row to be a Row or a CNLType instance")
+            if isinstance(row, CNLType):
+                row = row._hls_backing_row
+                if row is None:
+                    continue
+            row_keys.append((row.table.name, int(row.row_id)))
+        return row_keys
+
+    @staticmethod
+    def _link_meta_ids(link_metatypes: Union['LinkMetatype', Iterable['LinkMetatype']]) -> list[int]:
+        """
+        Validates the passed link metatypes, and returns their ids
+        :param link_metatypes: A LinkMetatype, or several of them
+        :return: The metatypes' ids, leaving out any without one, which is all of them if not handling_post
+        """
+        from coolNewLanguage.src.cnl_type.link_metatype import LinkMetatype
+
+        if isinstance(link_metatypes, LinkMetatype):
+            link_metatypes = [link_metatypes]
+        link_meta_ids = []
+        for link_metatype in link_metatypes:
+            if not isinstance(link_metatype, LinkMetatype):
+                raise TypeError("Expected each link metatype to be a LinkMetatype")
+            link_meta_id = link_metatype.get_link_meta_id()
+            if link_meta_id is not None:
+                link_meta_ids.append(link_meta_id)
+        return link_meta_ids
+
     async def get_table(self, request: web.Request) -> web.Response:
         from coolNewLanguage.src.util import html_utils
 
@@ -223,6 +562,8 @@ class Tool:
             raise ValueError(
                 "Expected table transient id to be in request query")
         table_transient_id = request.query["table_transient_id"]
+        # In server-side mode, only the table's header is rendered, and its rows are paged in from get_table_data
+        server_side = request.query.get("server_side", "false") == "true"
 
         sqlalchemy_table = self.get_table_from_table_name(table_name)
         if sqlalchemy_table is None:
@@ -247,11 +588,68 @@ class Tool:
             template=template,
             include_table_name=True,
             component_id=component_id,
-            table_transient_id=table_transient_id
+            table_transient_id=table_transient_id,
+            server_side=server_side
         )
 
         return web.Response(body=template, content_type=consts.AIOHTTP_HTML)
 
+    async def get_table_data(self, request: web.Request) -> web.Response:
+        """
+        Serves a single page of a table's rows as JSON, for client-side tables in server-side processing mode.
+        Expects the table name under "table" in the request query, and optionally:
+            offset, limit: Which rows to return, limit defaulting to consts.DEFAULT_TABLE_PAGE_SIZE
+            sort, order: The column to sort by, and "asc" or "desc"
+            search: A string which some value in each returned row must contain
+            filter[<column>]: A string which the named column's value in each returned row must contain
+            draw: A counter which is echoed back in the response
+        :param request:
+        :return: A JSON response of the shape returned by TablePage.to_json
+        """
+        from coolNewLanguage.src.util import table_page_utils
+
+        if not isinstance(request, web.Request):
+            raise TypeError("Expected request to be an aiohttp web Request")
+        if "table" not in request.query:
+            raise ValueError("Expected requested table name to be in request query")
+        table_name = request.query["table"]
+
+        try:
+            offset = int(request.query.get("offset", 0))
+            limit = int(request.query.get("limit", consts.DEFAULT_TABLE_PAGE_SIZE))
+            draw = int(request.query.get("draw", 0))
+        except ValueError:
+            return web.Response(body="Expected offset, limit and draw to be integers", status=400)
+        sort_column = request.query.get("sort") or None
+        descending = request.query.get("order", "asc") == "desc"
+        search = request.query.get("search", "")
+        column_filters = {
+            key[len("filter["):-1]: value
+            for key, value in request.query.items()
+            if key.startswith("filter[") and key.endswith("]")
+        }
+
+        sqlalchemy_table = self.get_table_from_table_name(table_name)
+        if sqlalchemy_table is None:
+            return web.Response(body="Table not found", status=404)
+
+        try:
+            with self.db_engine.connect() as conn:
+                page = table_page_utils.select_table_page(
+                    sqlalchemy_table,
+                    conn,
+                    offset=offset,
+                    limit=limit,
+                    sort_column=sort_column,
+                    descending=descending,
+                    search=search,
+                    column_filters=column_filters
+                )
+        except (KeyError, ValueError) as e:
+            return web.Response(body=str(e), status=400)
+
+        return web.json_response(page.to_json(draw), dumps=functools.partial(json.dumps, default=str))
+
     @staticmethod
     def user_input_received() -> bool:
         """
@@ -263,16 +661,14 @@ class Tool:
 
     def get_table_from_table_name(self, table_name: str) -> Optional[sqlalchemy.Table]:
         """
-        Get the sqlalchemy Table which has the given name
+        Get the sqlalchemy Table which has the given name. The table is only reflected from the database the first
+        time it's requested, or the first time after CNL has created, altered or dropped it.
         :param table_name: The name of the table which we try to get
         :return: The Table with matching name
         """
-        insp: sqlalchemy.Inspector = sqlalchemy.inspect(self.db_engine)
-
-        if not insp.has_table(table_name):
+        table = self.schema_catalog.get_table(table_name)
+        if table is None:
             return None
-        table = sqlalchemy.Table(table_name, self.db_metadata_obj)
-        insp.reflect_table(table, None)
 
         table._name = table_name
 
@@ -284,19 +680,42 @@ class Tool:
         Uses models.Base to create the tables, since we use an ORM to manage the metadata
         :return:
         """
+        from coolNewLanguage.src.util import link_utils
+
+        links_registry_existed = sqlalchemy.inspect(self.db_engine).has_table(consts.LINKS_REGISTRY_TABLE_NAME)
         models.Base.metadata.create_all(self.db_engine)
+        # create_all only indexes the tables it creates, so index link registries created before their indexes existed
+        if links_registry_existed:
+            for index in models.RegisteredLink.__table__.indexes:
+                index.create(self.db_engine, checkfirst=True)
+        self.schema_catalog.clear()
+        self.link_metatype_ids = link_utils.load_link_metatype_ids(self)
 
     def _get_table_dataframe(self, table_name: str) -> Optional[pd.DataFrame]:
+        """
+        Reads the table with the passed name into a DataFrame. If the table has an internal id column, it is used as the
+        DataFrame's index, so that rows can be matched back to the stored table when the DataFrame is saved.
+        :param table_name: The name of the table to read
+        :return: The table's DataFrame, or None if the table doesn't exist
+        """
+        from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
         if not isinstance(table_name, str):
             raise TypeError("Expected table_name to be a string")
 
-        insp: sqlalchemy.Inspector = sqlalchemy.inspect(self.db_engine)
-
-        if not insp.has_table(table_name):
+        table = self.get_table_from_table_name(table_name)
+        if table is None:
             return None
 
+        index_col = DB_INTERNAL_COLUMN_ID_NAME if DB_INTERNAL_COLUMN_ID_NAME in table.c else None
+
         with self.db_engine.connect() as conn:
-            return pd.read_sql_table(table_name, conn)
+            df = pd.read_sql_table(table_name, conn, index_col=index_col)
+
+        # Not every backend returns rows in insertion order, e.g. Postgres moves updated rows to the end of the table
+        if index_col is not None and not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        return df
 
     async def serve_pdf(self, request: web.Request) -> web.Response:
         """
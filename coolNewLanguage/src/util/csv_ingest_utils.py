@@ -0,0 +1,226 @@
+import contextlib
+import os
+import pathlib
+from typing import Callable, Optional
+
+import pandas as pd
+import sqlalchemy
+
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+"""
+The number of CSV rows read, and then inserted with a single executemany call, at a time. Memory use while ingesting a
+file is proportional to this rather than to the size of the file.
+"""
+DEFAULT_CHUNK_ROWS = 50_000
+
+"""
+The number of rows at the start of a CSV file which column types are inferred from
+"""
+DEFAULT_SAMPLE_ROWS = 10_000
+
+"""
+The prefix of the name of the table a CSV file is ingested into before it replaces the target table
+"""
+STAGING_TABLE_PREFIX = '__hls_ingest_'
+
+
+class CsvIngestProgress:
+    """
+    The progress of an ingest_csv_file call, passed to its progress callback after every chunk
+
+    Attributes:
+        rows_written: The number of rows inserted so far
+        bytes_read: The number of bytes of the file read so far
+        total_bytes: The size of the file
+    """
+    __slots__ = ('rows_written', 'bytes_read', 'total_bytes')
+
+    def __init__(self, rows_written: int, bytes_read: int, total_bytes: int):
+        self.rows_written = rows_written
+        self.bytes_read = bytes_read
+        self.total_bytes = total_bytes
+
+    @property
+    def fraction_read(self) -> float:
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+
+def infer_column_types(sample: pd.DataFrame) -> dict[str, tuple[str, sqlalchemy.types.TypeEngine]]:
+    """
+    Infers the type of each column of a CSV file from a sample of its rows, as read by pandas
+    :param sample: The first rows of the file
+    :return: A dictionary mapping each column name to a (pandas dtype, SQLAlchemy type) pair. The pandas dtypes are
+    nullable, so that missing values later in the file don't change the type of their column.
+    """
+    column_types = {}
+    for column in sample.columns:
+        dtype = sample[column].dtype
+        if pd.api.types.is_bool_dtype(dtype):
+            column_types[column] = ('boolean', sqlalchemy.Boolean())
+        elif pd.api.types.is_integer_dtype(dtype):
+            column_types[column] = ('Int64', sqlalchemy.BigInteger())
+        elif pd.api.types.is_float_dtype(dtype):
+            column_types[column] = ('float64', sqlalchemy.Float())
+        else:
+            column_types[column] = ('object', sqlalchemy.Text())
+    return column_types
+
+
+def ingest_csv_file(
+        conn: sqlalchemy.Connection,
+        table_name: str,
+        csv_path: pathlib.Path | str,
+        has_header: bool = True,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        sample_rows: int = DEFAULT_SAMPLE_ROWS,
+        progress: Optional[Callable[[CsvIngestProgress], None]] = None
+) -> int:
+    """
+    Replaces the table with the passed name with the contents of a CSV file, without reading the whole file into
+    memory. Column types are inferred from the first sample_rows rows, and then the file is read chunk_rows rows at a
+    time, each chunk being inserted with a single executemany call. The rows are inserted into a staging table, which
+    is only renamed over the target table once the whole file has been read, so that a failure part way through leaves
+    the previous table in place even on backends whose DDL isn't transactional, such as SQLite.
+    :param conn: The connection to write with. If it's already in a transaction, the caller is responsible for
+    committing; otherwise the writes are committed before returning.
+    :param table_name: The name of the table to replace
+    :param csv_path: The path of the CSV file
+    :param has_header: Whether the file has a header row to read column names from. If not, columns are named Col 0,
+    Col 1, etc.
+    :param chunk_rows: The number of rows to read and insert at a time
+    :param sample_rows: The number of rows to infer column types from
+    :param progress: A function called with a CsvIngestProgress after each chunk is inserted
+    :return: The number of rows inserted
+    """
+    if not isinstance(conn, sqlalchemy.Connection):
+        raise TypeError("Expected conn to be a sqlalchemy Connection")
+    if not isinstance(table_name, str):
+        raise TypeError("Expected table_name to be a string")
+    if not isinstance(csv_path, (pathlib.Path, str)):
+        raise TypeError("Expected csv_path to be a Path or a string")
+    if not isinstance(has_header, bool):
+        raise TypeError("Expected has_header to be a bool")
+    if not isinstance(chunk_rows, int):
+        raise TypeError("Expected chunk_rows to be an int")
+    if chunk_rows <= 0:
+        raise ValueError("Expected chunk_rows to be positive")
+    if not isinstance(sample_rows, int):
+        raise TypeError("Expected sample_rows to be an int")
+    if sample_rows <= 0:
+        raise ValueError("Expected sample_rows to be positive")
+    if progress is not None and not callable(progress):
+        raise TypeError("Expected progress to be callable or None")
+
+    header = 0 if has_header else None
+    sample = pd.read_csv(csv_path, header=header, nrows=sample_rows)
+    columns = _column_names(sample.columns, has_header)
+    column_types = infer_column_types(sample.set_axis(columns, axis='columns'))
+
+    staging_table = sqlalchemy.Table(
+        STAGING_TABLE_PREFIX + table_name,
+        sqlalchemy.MetaData(),
+        sqlalchemy.Column(DB_INTERNAL_COLUMN_ID_NAME, sqlalchemy.BigInteger()),
+        *[sqlalchemy.Column(column, sql_type) for column, (_, sql_type) in column_types.items()]
+    )
+    insert_stmt = sqlalchemy.insert(staging_table)
+
+    owns_transaction = not conn.in_transaction()
+    try:
+        with conn.begin() if owns_transaction else contextlib.nullcontext():
+            # Drop any staging table left behind by an earlier failed ingest
+            staging_table.drop(conn, checkfirst=True)
+            staging_table.create(conn)
+            rows_written = _insert_chunks(
+                conn, insert_stmt, csv_path, header, columns, column_types, chunk_rows, sample_rows, progress
+            )
+            _replace_table(conn, staging_table, table_name)
+    except Exception:
+        # If the caller owns the transaction, rolling it back is left to them
+        if owns_transaction:
+            with conn.begin():
+                staging_table.drop(conn, checkfirst=True)
+        raise
+
+    return rows_written
+
+
+def _insert_chunks(
+        conn: sqlalchemy.Connection,
+        insert_stmt: sqlalchemy.Insert,
+        csv_path: pathlib.Path | str,
+        header: Optional[int],
+        columns: list[str],
+        column_types: dict[str, tuple[str, sqlalchemy.types.TypeEngine]],
+        chunk_rows: int,
+        sample_rows: int,
+        progress: Optional[Callable[[CsvIngestProgress], None]]
+) -> int:
+    total_bytes = os.path.getsize(csv_path)
+    rows_written = 0
+
+    with open(csv_path, 'rb') as csv_file:
+        chunks = pd.read_csv(
+            csv_file,
+            header=header,
+            names=columns,
+            dtype={column: dtype for column, (dtype, _) in column_types.items()},
+            chunksize=chunk_rows
+        )
+        while True:
+            try:
+                chunk = next(chunks)
+            except StopIteration:
+                break
+            except (ValueError, TypeError) as e:
+                raise ValueError(
+                    f"A value after row {rows_written} of {csv_path} doesn't match the column types inferred from its "
+                    f"first {sample_rows} rows. Pass a larger sample_rows to infer them from more of the file."
+                ) from e
+
+            chunk = chunk.astype(object).where(chunk.notna(), None)
+            records = [
+                {DB_INTERNAL_COLUMN_ID_NAME: row_id, **dict(zip(columns, row))}
+                for row_id, row in enumerate(chunk.itertuples(index=False, name=None), start=rows_written)
+            ]
+            if records:
+                conn.execute(insert_stmt, records)
+            rows_written += len(records)
+
+            if progress is not None:
+                progress(CsvIngestProgress(rows_written, csv_file.tell(), total_bytes))
+
+    return rows_written
+
+
+def _replace_table(conn: sqlalchemy.Connection, staging_table: sqlalchemy.Table, table_name: str):
+    """
+    Renames the staging table over the table with the passed name, then indexes its internal id column, which is
+    cheaper once the rows are in place than while inserting them
+    :param conn:
+    :param staging_table:
+    :param table_name:
+    :return:
+    """
+    sqlalchemy.Table(table_name, sqlalchemy.MetaData()).drop(conn, checkfirst=True)
+
+    quote = conn.dialect.identifier_preparer.quote
+    conn.execute(sqlalchemy.text(f'ALTER TABLE {quote(staging_table.name)} RENAME TO {quote(table_name)}'))
+
+    table = sqlalchemy.Table(
+        table_name, sqlalchemy.MetaData(), sqlalchemy.Column(DB_INTERNAL_COLUMN_ID_NAME, sqlalchemy.BigInteger())
+    )
+    sqlalchemy.Index(f'ix_{table_name}_{DB_INTERNAL_COLUMN_ID_NAME}', table.c[DB_INTERNAL_COLUMN_ID_NAME]).create(conn)
+
+
+def _column_names(columns: pd.Index, has_header: bool) -> list[str]:
+    """
+    Returns the names to give the columns of a CSV file, naming columns without a header Col 0, Col 1, etc., as
+    sql_alch_csv_utils.sqlalchemy_table_from_csv_file does
+    :param columns: The columns pandas read from the file
+    :param has_header: Whether the file has a header row
+    :return:
+    """
+    if not has_header:
+        return [f'Col {i}' for i in range(len(columns))]
+    return [f'Col {i}' if str(column).startswith('Unnamed: ') else str(column) for i, column in enumerate(columns)]
@@ -0,0 +1,64 @@
+import pandas as pd
+
+
+class RowDiff:
+    """
+    The row-level difference between two versions of a table, each represented as a DataFrame indexed by row id
+
+    Attributes:
+        inserted: The ids of rows present only in the new version
+        deleted: The ids of rows present only in the old version
+        updated: The ids of rows present in both versions, with at least one differing value
+        changed_cells: A boolean DataFrame indexed by the updated row ids, with the new version's columns, marking which
+            cells of the updated rows differ
+    """
+    __slots__ = ('inserted', 'deleted', 'updated', 'changed_cells')
+
+    def __init__(self, inserted: pd.Index, deleted: pd.Index, updated: pd.Index, changed_cells: pd.DataFrame):
+        self.inserted = inserted
+        self.deleted = deleted
+        self.updated = updated
+        self.changed_cells = changed_cells
+
+    def is_empty(self) -> bool:
+        return len(self.inserted) == 0 and len(self.deleted) == 0 and len(self.updated) == 0
+
+
+def changed_cells(old_df: pd.DataFrame, new_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compares two identically labelled DataFrames cell by cell, treating two missing values as equal
+    :param old_df:
+    :param new_df:
+    :return: A boolean DataFrame which is True wherever the two DataFrames differ
+    """
+    if not isinstance(old_df, pd.DataFrame):
+        raise TypeError("Expected old_df to be a pandas DataFrame")
+    if not isinstance(new_df, pd.DataFrame):
+        raise TypeError("Expected new_df to be a pandas DataFrame")
+
+    # Comparisons involving a missing value are NA rather than False for nullable and Arrow-backed dtypes
+    equal = (old_df == new_df).fillna(False) | (old_df.isna() & new_df.isna())
+    return ~equal.astype(bool)
+
+
+def diff_rows(old_df: pd.DataFrame, new_df: pd.DataFrame) -> RowDiff:
+    """
+    Computes which rows were inserted, deleted or updated between old_df and new_df, matching rows by their index.
+    Both DataFrames are expected to have unique indices, and old_df is expected to have every column of new_df.
+    :param old_df: The old version of the table
+    :param new_df: The new version of the table
+    :return: A RowDiff describing the changes
+    """
+    if not isinstance(old_df, pd.DataFrame):
+        raise TypeError("Expected old_df to be a pandas DataFrame")
+    if not isinstance(new_df, pd.DataFrame):
+        raise TypeError("Expected new_df to be a pandas DataFrame")
+
+    inserted = new_df.index.difference(old_df.index, sort=False)
+    deleted = old_df.index.difference(new_df.index, sort=False)
+    common = new_df.index.intersection(old_df.index, sort=False)
+
+    cells = changed_cells(old_df.loc[common, new_df.columns], new_df.loc[common])
+    is_updated = cells.any(axis=1)
+
+    return RowDiff(inserted, deleted, common[is_updated.to_numpy()], cells[is_updated])
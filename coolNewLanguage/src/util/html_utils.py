@@ -1,3 +1,4 @@
+import urllib.parse
 from typing import Optional
 
 import jinja2
@@ -16,7 +17,8 @@ def template_from_select_statement(
         component_id: str = "",
         table_name: str = "",
         num_rows: Optional[int] = None,
-        table_transient_id: str = ""
+        table_transient_id: str = "",
+        server_side: bool = False
 ) -> str:
     """
     Construct an HTML table containing the results of the passed Select statement
@@ -26,6 +28,8 @@ def template_from_select_statement(
     :param table_name: The name of the table the select statement is selecting from, to be included as part of the
     template
     :param num_rows: The number of rows to include in the template. If None, all rows are included
+    :param server_side: Whether the rendered table pages its rows in from the server, in which case no rows are read
+    here and only the table's header is rendered
     :return: A string containing an HTML table containing the results
     """
     if not isinstance(stmt, sqlalchemy.sql.expression.Select):
@@ -34,6 +38,8 @@ def template_from_select_statement(
         raise TypeError("Expected table_name to be a string")
     if num_rows is not None and not isinstance(num_rows, int):
         raise TypeError("Expected num_rows to be an int or None")
+    if not isinstance(server_side, bool):
+        raise TypeError("Expected server_side to be a bool")
 
     col_names = stmt.selected_columns.keys()
 
@@ -42,8 +48,16 @@ def template_from_select_statement(
         stmt = stmt.limit(num_rows)
 
     # table contents
-    with process.running_tool.db_engine.connect() as conn:
-        rows = [row._mapping for row in conn.execute(stmt)]
+    if server_side:
+        rows = []
+        froms = stmt.get_final_froms()
+        if len(froms) != 1 or not isinstance(froms[0], sqlalchemy.Table):
+            raise ValueError("Expected stmt to select from a single table when server_side is True")
+        data_url = f"{consts.GET_TABLE_DATA_ROUTE}?{urllib.parse.urlencode({'table': froms[0].name})}"
+    else:
+        data_url = ""
+        with process.running_tool.db_engine.connect() as conn:
+            rows = [row._mapping for row in conn.execute(stmt)]
 
     # render and return it
     return template.render(
@@ -51,7 +65,8 @@ def template_from_select_statement(
         rows=rows,
         table_name=table_name,
         component_id=component_id,
-        table_transient_id=table_transient_id
+        table_transient_id=table_transient_id,
+        data_url=data_url
     )
 
 
@@ -62,7 +77,8 @@ def html_of_table(
         table_transient_id: str = "",
         num_rows: Optional[int] = None,
         include_table_name: bool = True,
-        no_metadata_cols: bool = True
+        no_metadata_cols: bool = True,
+        server_side: bool = False
 ) -> str:
     """
     Construct an HTML snippet of a sqlalchemy Table
@@ -72,6 +88,7 @@ def html_of_table(
     :param component_id: The id of the component that the table is being rendered for, if for a Config component
     :param num_rows: The number of rows to include in the template. If None, all rows are included
     :param include_table_name: Whether to include the table name in the template
+    :param server_side: Whether the rendered table pages its rows in from the server through the get_table_data route
     :return: A string containing the HTML table the table with the table's data
     """
     if not isinstance(table, sqlalchemy.Table):
@@ -80,10 +97,7 @@ def html_of_table(
         raise TypeError("Expected num_rows to be an int or None")
 
     # Check to see if the table exists in the db
-    process.running_tool.db_metadata_obj = sqlalchemy.MetaData()
-    process.running_tool.db_metadata_obj.reflect(
-        process.running_tool.db_engine)
-    if table._name not in process.running_tool.db_metadata_obj.tables:
+    if process.running_tool.get_table_from_table_name(table._name) is None:
         return ""
 
     if no_metadata_cols:
@@ -99,7 +113,8 @@ def html_of_table(
         component_id=component_id,
         table_name=table._name if include_table_name else "",
         num_rows=num_rows,
-        table_transient_id=table_transient_id
+        table_transient_id=table_transient_id,
+        server_side=server_side
     )
 
 
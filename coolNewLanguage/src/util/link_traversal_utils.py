@@ -0,0 +1,303 @@
+import enum
+from collections import defaultdict
+from typing import Iterable, Iterator, Optional, Sequence
+
+import sqlalchemy
+
+from coolNewLanguage.src import consts
+from coolNewLanguage.src.cnl_type.link import Link
+from coolNewLanguage.src.link_cache import RowKey
+from coolNewLanguage.src.tool import Tool
+from coolNewLanguage.src.util import link_utils
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+"""
+The default maximum number of rows in each batch yielded when expanding from a set of rows
+"""
+DEFAULT_TRAVERSAL_BATCH_SIZE = 1000
+
+
+class LinkDirection(enum.Enum):
+    """
+    Which way links are followed when traversing them: from their sources to their destinations, the reverse, or both
+    """
+    FORWARD = 'forward'
+    BACKWARD = 'backward'
+    BOTH = 'both'
+
+    @property
+    def follows_forward(self) -> bool:
+        return self in (LinkDirection.FORWARD, LinkDirection.BOTH)
+
+    @property
+    def follows_backward(self) -> bool:
+        return self in (LinkDirection.BACKWARD, LinkDirection.BOTH)
+
+
+def get_neighbors(
+        tool: Tool,
+        row_keys: Iterable[RowKey],
+        link_meta_ids: Sequence[int],
+        direction: LinkDirection = LinkDirection.FORWARD
+) -> dict[RowKey, list[tuple[Link, RowKey]]]:
+    """
+    Gets the links of the passed metatypes at each of the passed rows, along with the rows at their other ends. Links
+    of metatypes whose adjacencies are in the Tool's link cache are found there; the rest are looked up a batch of rows
+    at a time, using the links registry's indexes.
+    :param tool:
+    :param row_keys: The (table_name, row_id) pairs identifying the rows
+    :param link_meta_ids: The ids of the metatypes of the links to follow
+    :param direction: Which way to follow the links
+    :return: A dictionary mapping each row with links to (link, other row key) pairs
+    """
+    if not isinstance(tool, Tool):
+        raise TypeError("Expected tool to be a Tool")
+    _check_link_meta_ids(link_meta_ids)
+    if not isinstance(direction, LinkDirection):
+        raise TypeError("Expected direction to be a LinkDirection")
+
+    row_keys = list(dict.fromkeys(row_keys))
+    neighbors: dict[RowKey, list[tuple[Link, RowKey]]] = defaultdict(list)
+    if not row_keys or not link_meta_ids:
+        return neighbors
+
+    uncached_meta_ids = []
+    for link_meta_id in link_meta_ids:
+        adjacency = tool.link_cache.get(link_meta_id)
+        if adjacency is None:
+            uncached_meta_ids.append(link_meta_id)
+            continue
+        for table_name, row_id in row_keys:
+            if direction.follows_forward:
+                for link_id, dst_table_name, dst_row_id in adjacency.links_from(table_name, row_id):
+                    link = Link(link_meta_id, link_id, table_name, row_id, dst_table_name, dst_row_id)
+                    neighbors[(table_name, row_id)].append((link, (dst_table_name, dst_row_id)))
+            if direction.follows_backward:
+                for link_id, src_table_name, src_row_id in adjacency.links_to(table_name, row_id):
+                    link = Link(link_meta_id, link_id, src_table_name, src_row_id, table_name, row_id)
+                    neighbors[(table_name, row_id)].append((link, (src_table_name, src_row_id)))
+
+    if uncached_meta_ids:
+        links_registry = tool.get_table_from_table_name(consts.LINKS_REGISTRY_TABLE_NAME)
+        with tool.db_engine.connect() as conn:
+            if direction.follows_forward:
+                for link in _select_links(conn, links_registry, uncached_meta_ids, row_keys, forward=True):
+                    neighbors[(link.src_table_name, link.src_row_id)].append(
+                        (link, (link.dst_table_name, link.dst_row_id))
+                    )
+            if direction.follows_backward:
+                for link in _select_links(conn, links_registry, uncached_meta_ids, row_keys, forward=False):
+                    neighbors[(link.dst_table_name, link.dst_row_id)].append(
+                        (link, (link.src_table_name, link.src_row_id))
+                    )
+
+    return neighbors
+
+
+def expand(
+        tool: Tool,
+        start_row_keys: Iterable[RowKey],
+        link_meta_ids: Sequence[int],
+        max_hops: int,
+        direction: LinkDirection = LinkDirection.FORWARD,
+        batch_size: int = DEFAULT_TRAVERSAL_BATCH_SIZE
+) -> Iterator[list[tuple[RowKey, int]]]:
+    """
+    Finds the rows reachable from the passed rows by following at most max_hops links of the passed metatypes, breadth
+    first. Each row is reached once, at its fewest hops, and the start rows themselves aren't included. Each hop's
+    links are looked up a batch of rows at a time, so expanding never holds more than the rows reached so far in memory.
+    :param tool:
+    :param start_row_keys: The (table_name, row_id) pairs identifying the rows to expand from
+    :param link_meta_ids: The ids of the metatypes of the links to follow
+    :param max_hops: The maximum number of links to follow from a start row
+    :param direction: Which way to follow the links
+    :param batch_size: The maximum number of rows in each yielded batch
+    :return: An iterator over batches of (row key, number of hops) pairs, in order of increasing number of hops
+    """
+    if not isinstance(tool, Tool):
+        raise TypeError("Expected tool to be a Tool")
+    _check_link_meta_ids(link_meta_ids)
+    if not isinstance(direction, LinkDirection):
+        raise TypeError("Expected direction to be a LinkDirection")
+    if not isinstance(max_hops, int):
+        raise TypeError("Expected max_hops to be an int")
+    if max_hops < 0:
+        raise ValueError("Expected max_hops to be non-negative")
+    if not isinstance(batch_size, int):
+        raise TypeError("Expected batch_size to be an int")
+    if batch_size < 1:
+        raise ValueError("Expected batch_size to be positive")
+
+    return _expand(tool, list(dict.fromkeys(start_row_keys)), link_meta_ids, max_hops, direction, batch_size)
+
+
+def find_path(
+        tool: Tool,
+        src_row_key: RowKey,
+        dst_row_key: RowKey,
+        link_meta_ids: Sequence[int],
+        max_hops: int,
+        direction: LinkDirection = LinkDirection.FORWARD
+) -> Optional[list[Link]]:
+    """
+    Finds a shortest path of links of the passed metatypes from one row to another, searching breadth first
+    :param tool:
+    :param src_row_key: The (table_name, row_id) pair identifying the row the path starts at
+    :param dst_row_key: The (table_name, row_id) pair identifying the row the path ends at
+    :param link_meta_ids: The ids of the metatypes of the links to follow
+    :param max_hops: The maximum number of links in the path
+    :param direction: Which way to follow the links
+    :return: The links along the path, in order, or None if there's no path of at most max_hops links. If the rows are
+    the same, the path is empty.
+    """
+    if not isinstance(max_hops, int):
+        raise TypeError("Expected max_hops to be an int")
+    if max_hops < 0:
+        raise ValueError("Expected max_hops to be non-negative")
+
+    # Maps each reached row to the link it was reached by, and the row that link was followed from
+    parents: dict[RowKey, Optional[tuple[Link, RowKey]]] = {src_row_key: None}
+    frontier = [src_row_key]
+    for _ in range(max_hops):
+        if dst_row_key in parents:
+            break
+        next_frontier = []
+        for i in range(0, len(frontier), link_utils.LINK_LOOKUP_BATCH_SIZE):
+            neighbors = get_neighbors(tool, frontier[i:i + link_utils.LINK_LOOKUP_BATCH_SIZE], link_meta_ids, direction)
+            for row_key, row_neighbors in neighbors.items():
+                for link, neighbor_key in row_neighbors:
+                    if neighbor_key not in parents:
+                        parents[neighbor_key] = (link, row_key)
+                        next_frontier.append(neighbor_key)
+        if not next_frontier:
+            break
+        frontier = next_frontier
+
+    if dst_row_key not in parents:
+        return None
+
+    path = []
+    row_key = dst_row_key
+    while parents[row_key] is not None:
+        link, row_key = parents[row_key]
+        path.append(link)
+    path.reverse()
+    return path
+
+
+def get_rows(tool: Tool, row_keys: Sequence[RowKey]) -> list['Row']:
+    """
+    Loads the rows with the passed keys, with a query per batch of rows of each table
+    :param tool:
+    :param row_keys: The (table_name, row_id) pairs identifying the rows
+    :return: The rows, in the same order as row_keys, leaving out any which no longer exist
+    """
+    from coolNewLanguage.src.row import Row
+
+    if not isinstance(tool, Tool):
+        raise TypeError("Expected tool to be a Tool")
+
+    row_ids_by_table: dict[str, list[int]] = defaultdict(list)
+    for table_name, row_id in row_keys:
+        row_ids_by_table[table_name].append(row_id)
+
+    rows: dict[RowKey, Row] = {}
+    with tool.db_engine.connect() as conn:
+        for table_name, row_ids in row_ids_by_table.items():
+            table = tool.get_table_from_table_name(table_name)
+            if table is None:
+                continue
+            for i in range(0, len(row_ids), link_utils.LINK_LOOKUP_BATCH_SIZE):
+                stmt = sqlalchemy.select(table).where(
+                    table.c[DB_INTERNAL_COLUMN_ID_NAME].in_(row_ids[i:i + link_utils.LINK_LOOKUP_BATCH_SIZE])
+                )
+                for sqlalchemy_row in conn.execute(stmt):
+                    row = Row(table=table, sqlalchemy_row=sqlalchemy_row)
+                    rows[(table_name, row.row_id)] = row
+
+    return [rows[row_key] for row_key in row_keys if row_key in rows]
+
+
+def _expand(
+        tool: Tool,
+        frontier: list[RowKey],
+        link_meta_ids: Sequence[int],
+        max_hops: int,
+        direction: LinkDirection,
+        batch_size: int
+) -> Iterator[list[tuple[RowKey, int]]]:
+    visited = set(frontier)
+    batch = []
+    for hops in range(1, max_hops + 1):
+        next_frontier = []
+        for i in range(0, len(frontier), link_utils.LINK_LOOKUP_BATCH_SIZE):
+            neighbors = get_neighbors(tool, frontier[i:i + link_utils.LINK_LOOKUP_BATCH_SIZE], link_meta_ids, direction)
+            for row_neighbors in neighbors.values():
+                for _, row_key in row_neighbors:
+                    if row_key in visited:
+                        continue
+                    visited.add(row_key)
+                    next_frontier.append(row_key)
+                    batch.append((row_key, hops))
+                    if len(batch) == batch_size:
+                        yield batch
+                        batch = []
+        if not next_frontier:
+            break
+        frontier = next_frontier
+
+    if batch:
+        yield batch
+
+
+def _check_link_meta_ids(link_meta_ids: Sequence[int]):
+    if not isinstance(link_meta_ids, Sequence):
+        raise TypeError("Expected link_meta_ids to be a sequence")
+    for link_meta_id in link_meta_ids:
+        if not isinstance(link_meta_id, int):
+            raise TypeError("Expected link_meta_id to be an int")
+
+
+def _select_links(
+        conn: sqlalchemy.Connection,
+        links_registry: sqlalchemy.Table,
+        link_meta_ids: Sequence[int],
+        row_keys: Sequence[RowKey],
+        forward: bool
+) -> Iterator[Link]:
+    """
+    Selects the links of the passed metatypes from the passed rows, or to them if not forward. Rows are grouped by
+    table, and each group is looked up by its row ids, a batch at a time.
+    :param conn:
+    :param links_registry:
+    :param link_meta_ids:
+    :param row_keys:
+    :param forward:
+    :return:
+    """
+    c = links_registry.c
+    if forward:
+        table_name_column, row_id_column = c[consts.LINKS_REGISTRY_SRC_TABLE_NAME], c[consts.LINKS_REGISTRY_SRC_ROW_ID]
+    else:
+        table_name_column, row_id_column = c[consts.LINKS_REGISTRY_DST_TABLE_NAME], c[consts.LINKS_REGISTRY_DST_ROW_ID]
+
+    row_ids_by_table: dict[str, list[int]] = defaultdict(list)
+    for table_name, row_id in row_keys:
+        row_ids_by_table[table_name].append(row_id)
+
+    for table_name, row_ids in row_ids_by_table.items():
+        for i in range(0, len(row_ids), link_utils.LINK_LOOKUP_BATCH_SIZE):
+            stmt = sqlalchemy.select(
+                c[consts.LINKS_REGISTRY_LINK_META_ID],
+                c[consts.LINKS_REGISTRY_LINK_ID],
+                c[consts.LINKS_REGISTRY_SRC_TABLE_NAME],
+                c[consts.LINKS_REGISTRY_SRC_ROW_ID],
+                c[consts.LINKS_REGISTRY_DST_TABLE_NAME],
+                c[consts.LINKS_REGISTRY_DST_ROW_ID]
+            ).where(
+                c[consts.LINKS_REGISTRY_LINK_META_ID].in_(link_meta_ids),
+                table_name_column == table_name,
+                row_id_column.in_(row_ids[i:i + link_utils.LINK_LOOKUP_BATCH_SIZE])
+            ).order_by(c[consts.LINKS_REGISTRY_LINK_ID])
+            for link_meta_id, link_id, src_table_name, src_row_id, dst_table_name, dst_row_id in conn.execute(stmt):
+                yield Link(link_meta_id, link_id, src_table_name, src_row_id, dst_table_name, dst_row_id)
@@ -1,16 +1,50 @@
-from typing import Optional
+from collections import defaultdict
+from typing import Iterable, Optional, Sequence
 
 import sqlalchemy
+from sqlalchemy.dialects import postgresql, sqlite
 
 from coolNewLanguage.src import consts
 from coolNewLanguage.src.cnl_type.link import Link
+from coolNewLanguage.src.link_cache import LinkAdjacency
+from coolNewLanguage.src.models import RegisteredLinkMetatype
 from coolNewLanguage.src.tool import Tool
 
+"""
+A link's identifying values: its metatype id, source table name and row id, and destination table name and row id
+"""
+LinkKey = tuple[int, str, int, str, int]
+
+"""
+The maximum number of row ids bound in a single IN clause when looking links up, which keeps statements well under
+SQLite's limit on the number of bound parameters
+"""
+LINK_LOOKUP_BATCH_SIZE = 900
+
+
+def load_link_metatype_ids(tool: Tool) -> dict[str, int]:
+    """
+    Reads every registered link metatype's id
+    :param tool: The Tool whose link metatypes are to be read
+    :return: A dictionary mapping link metanames to their ids
+    """
+    if not isinstance(tool, Tool):
+        raise TypeError("Expected tool to be a Tool")
+
+    links_meta = RegisteredLinkMetatype.__table__
+    stmt = sqlalchemy.select(
+        links_meta.c[consts.LINKS_METATYPES_LINK_META_NAME], links_meta.c[consts.LINKS_METATYPES_LINK_META_ID]
+    )
+    with tool.db_engine.connect() as conn:
+        return {link_meta_name: link_meta_id for link_meta_name, link_meta_id in conn.execute(stmt)}
+
 
 def get_link_metatype_id_from_metaname(tool: Tool, link_meta_name: str) -> Optional[int]:
     """
     Gets the link metatype id associated with the passed link metaname. If no link metatype with the passed metaname
     exists, returns None
+    Metatypes never change once registered, so their ids are looked up in the Tool's link_metatype_ids, and only
+    queried for if they're missing from it, e.g. because another Tool sharing the database registered them.
     :param tool: The Tool whose link metatypes are to be searched
     :param link_meta_name: The meta_name to be matched
     :return:
@@ -20,24 +54,22 @@ def get_link_metatype_id_from_metaname(tool: Tool, link_meta_name: str) -> Optio
     if not isinstance(link_meta_name, str):
         raise TypeError("Expected link_meta_name to be a string")
 
-    links_meta = tool.get_table_from_table_name(consts.LINKS_METATYPES_TABLE_NAME)
-
-    stmt = sqlalchemy.select(links_meta.c[consts.LINKS_METATYPES_LINK_META_ID])\
-        .where(links_meta.c[consts.LINKS_METATYPES_LINK_META_NAME] == link_meta_name)
+    meta_id = tool.link_metatype_ids.get(link_meta_name)
+    if meta_id is not None:
+        return meta_id
 
     with tool.db_engine.connect() as conn:
-        result = conn.execute(stmt).first()
-
-    if result is None:
-        return None
+        meta_id = _select_link_metatype_id(conn, link_meta_name)
 
-    return result._mapping[consts.LINKS_METATYPES_LINK_META_ID]
+    if meta_id is not None:
+        tool.link_metatype_ids[link_meta_name] = meta_id
+    return meta_id
 
 
 def register_link_metatype_on_tool(tool: Tool, link_meta_name: str) -> Optional[int]:
     """
-    Registers a link metatype, by first checking to see if it exists in the metatype table before inserting a new row
-    into it. Returns the resulting meta id for the registered link metatype.
+    Registers a link metatype, by first checking to see if it exists already before inserting a new row into the
+    metatype table. Returns the resulting meta id for the registered link metatype.
     :param tool: The Tool for which to register the link metatype
     :param link_meta_name: The meta name for the metatype to be registered
     :return:
@@ -47,17 +79,23 @@ def register_link_metatype_on_tool(tool: Tool, link_meta_name: str) -> Optional[
     if not isinstance(link_meta_name, str):
         raise TypeError("Expected link_meta_name to be a string")
 
-    meta_id = get_link_metatype_id_from_metaname(tool, link_meta_name)
+    meta_id = tool.link_metatype_ids.get(link_meta_name)
     if meta_id is not None:
         return meta_id
 
-    table = tool.get_table_from_table_name(consts.LINKS_METATYPES_TABLE_NAME)
-    insert_stmt = sqlalchemy.insert(table).values({consts.LINKS_METATYPES_LINK_META_NAME: link_meta_name})
-    with tool.db_engine.connect() as conn:
-        result = conn.execute(insert_stmt)
-        conn.commit()
+    links_meta = RegisteredLinkMetatype.__table__
+    with tool.db_engine.begin() as conn:
+        meta_id = _select_link_metatype_id(conn, link_meta_name)
+        if meta_id is None:
+            conn.execute(
+                _insert_ignoring_conflicts(conn, links_meta),
+                {consts.LINKS_METATYPES_LINK_META_NAME: link_meta_name}
+            )
+            # Looked up rather than taken from the insert, in case the metatype was registered concurrently
+            meta_id = _select_link_metatype_id(conn, link_meta_name)
 
-    return result.first()[consts.LINKS_METATYPES_LINK_META_ID]
+    tool.link_metatype_ids[link_meta_name] = meta_id
+    return meta_id
 
 
 def get_link_id(
@@ -119,8 +157,8 @@ def register_new_link(
 ) -> Link:
     """
     Registers a new link, which is uniquely identified by its metatype, source table and row id, and destination table
-    and row id. Checks to see that the link doesn't already exist before issuing an insert statement. Returns the id of
-    the registered link.
+    and row id. Checks to see that the link doesn't already exist before issuing an insert statement. Returns the
+    registered link.
     :param tool:
     :param link_meta_id:
     :param src_table_name:
@@ -142,26 +180,232 @@ def register_new_link(
     if not isinstance(dst_row_id, int):
         raise TypeError("Expected dst_row_id to be an int")
 
-    link_id = get_link_id(tool, link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id)
-    if link_id is not None:
-        return Link(link_meta_id, link_id, src_table_name, src_row_id, dst_table_name, dst_row_id)
-
-    table = tool.get_table_from_table_name(consts.LINKS_REGISTRY_TABLE_NAME)
-    insert_stmt = sqlalchemy.insert(table)\
-        .values(
-        {
-            consts.LINKS_REGISTRY_LINK_META_ID: link_meta_id,
-            consts.LINKS_REGISTRY_SRC_TABLE_NAME: src_table_name,
-            consts.LINKS_REGISTRY_SRC_ROW_ID: src_row_id,
-            consts.LINKS_REGISTRY_DST_TABLE_NAME: dst_table_name,
-            consts.LINKS_REGISTRY_DST_ROW_ID: dst_row_id,
-        }
-    )
+    return register_new_links(tool, [(link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id)])[0]
+
+
+def get_link_ids(tool: Tool, link_keys: Sequence[LinkKey]) -> list[Optional[int]]:
+    """
+    Gets the ids of many links at once, with a query per batch of source rows rather than per link
+    :param tool:
+    :param link_keys: The (link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id) tuples identifying
+    the links
+    :return: The ids of the links, in the same order as link_keys, with None for links which haven't been registered
+    """
+    if not isinstance(tool, Tool):
+        raise TypeError("Expected tool to be a Tool")
+    _check_link_keys(link_keys)
+    if not link_keys:
+        return []
+
+    links_registry = tool.get_table_from_table_name(consts.LINKS_REGISTRY_TABLE_NAME)
+    with tool.db_engine.connect() as conn:
+        link_ids = _select_link_ids(conn, links_registry, link_keys)
+
+    return [link_ids.get(link_key) for link_key in link_keys]
+
+
+def register_new_links(tool: Tool, link_keys: Sequence[LinkKey]) -> list[Link]:
+    """
+    Registers many links at once, within a single transaction. Which links already exist is checked with a query per
+    batch of source rows, and the rest are inserted with a single executemany, ignoring any which are registered
+    concurrently.
+    :param tool:
+    :param link_keys: The (link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id) tuples identifying
+    the links
+    :return: The registered links, in the same order as link_keys
+    """
+    if not isinstance(tool, Tool):
+        raise TypeError("Expected tool to be a Tool")
+    _check_link_keys(link_keys)
+    if not link_keys:
+        return []
+
+    links_registry = tool.get_table_from_table_name(consts.LINKS_REGISTRY_TABLE_NAME)
+    with tool.db_engine.begin() as conn:
+        link_ids = _select_link_ids(conn, links_registry, link_keys)
+
+        # Deduplicate, keeping the order the links were passed in
+        missing_keys = [link_key for link_key in dict.fromkeys(link_keys) if link_key not in link_ids]
+        if missing_keys:
+            records = [
+                {
+                    consts.LINKS_REGISTRY_LINK_META_ID: link_meta_id,
+                    consts.LINKS_REGISTRY_SRC_TABLE_NAME: src_table_name,
+                    consts.LINKS_REGISTRY_SRC_ROW_ID: src_row_id,
+                    consts.LINKS_REGISTRY_DST_TABLE_NAME: dst_table_name,
+                    consts.LINKS_REGISTRY_DST_ROW_ID: dst_row_id,
+                }
+                for link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id in missing_keys
+            ]
+            conn.execute(_insert_ignoring_conflicts(conn, links_registry), records)
+            # executemany can't report the ids it inserted, so look them up
+            link_ids.update(_select_link_ids(conn, links_registry, missing_keys))
+
+    for link_meta_id in {link_key[0] for link_key in missing_keys}:
+        tool.link_cache.invalidate(link_meta_id)
+
+    links = []
+    for link_key in link_keys:
+        link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id = link_key
+        links.append(Link(link_meta_id, link_ids[link_key], src_table_name, src_row_id, dst_table_name, dst_row_id))
+    return links
+
+
+def get_links_from(tool: Tool, link_meta_id: int, src_table_name: str, src_row_id: int) -> list[Link]:
+    """
+    Gets the links of the passed metatype from the passed row, using the Tool's cached adjacency of the metatype
+    :param tool:
+    :param link_meta_id:
+    :param src_table_name:
+    :param src_row_id:
+    :return: The links, in the order they were registered
+    """
+    if not isinstance(tool, Tool):
+        raise TypeError("Expected tool to be a Tool")
+    if not isinstance(link_meta_id, int):
+        raise TypeError("Expected link_meta_id to be an int")
+    if not isinstance(src_table_name, str):
+        raise TypeError("Expected src_table_name to be a string")
+    if not isinstance(src_row_id, int):
+        raise TypeError("Expected src_row_id to be an int")
+
+    return [
+        Link(link_meta_id, link_id, src_table_name, src_row_id, dst_table_name, dst_row_id)
+        for link_id, dst_table_name, dst_row_id
+        in _get_adjacency(tool, link_meta_id).links_from(src_table_name, src_row_id)
+    ]
+
+
+def get_links_to(tool: Tool, link_meta_id: int, dst_table_name: str, dst_row_id: int) -> list[Link]:
+    """
+    Gets the links of the passed metatype to the passed row, using the Tool's cached adjacency of the metatype
+    :param tool:
+    :param link_meta_id:
+    :param dst_table_name:
+    :param dst_row_id:
+    :return: The links, in the order they were registered
+    """
+    if not isinstance(tool, Tool):
+        raise TypeError("Expected tool to be a Tool")
+    if not isinstance(link_meta_id, int):
+        raise TypeError("Expected link_meta_id to be an int")
+    if not isinstance(dst_table_name, str):
+        raise TypeError("Expected dst_table_name to be a string")
+    if not isinstance(dst_row_id, int):
+        raise TypeError("Expected dst_row_id to be an int")
+
+    return [
+        Link(link_meta_id, link_id, src_table_name, src_row_id, dst_table_name, dst_row_id)
+        for link_id, src_table_name, src_row_id
+        in _get_adjacency(tool, link_meta_id).links_to(dst_table_name, dst_row_id)
+    ]
+
+
+def _get_adjacency(tool: Tool, link_meta_id: int) -> LinkAdjacency:
+    """
+    Gets the adjacency of the passed link metatype from the Tool's link cache, building and caching it from the
+    metatype's links if it isn't cached
+    :param tool:
+    :param link_meta_id:
+    :return:
+    """
+    adjacency = tool.link_cache.get(link_meta_id)
+    if adjacency is not None:
+        return adjacency
+
+    generation = tool.link_cache.generation(link_meta_id)
+    c = tool.get_table_from_table_name(consts.LINKS_REGISTRY_TABLE_NAME).c
+    stmt = sqlalchemy.select(
+        c[consts.LINKS_REGISTRY_LINK_ID],
+        c[consts.LINKS_REGISTRY_SRC_TABLE_NAME],
+        c[consts.LINKS_REGISTRY_SRC_ROW_ID],
+        c[consts.LINKS_REGISTRY_DST_TABLE_NAME],
+        c[consts.LINKS_REGISTRY_DST_ROW_ID]
+    ).where(c[consts.LINKS_REGISTRY_LINK_META_ID] == link_meta_id).order_by(c[consts.LINKS_REGISTRY_LINK_ID])
 
     with tool.db_engine.connect() as conn:
-        result = conn.execute(insert_stmt)
-        conn.commit()
+        adjacency = LinkAdjacency([tuple(row) for row in conn.execute(stmt)])
+
+    tool.link_cache.put(link_meta_id, generation, adjacency)
+    return adjacency
+
+
+def _select_link_metatype_id(conn: sqlalchemy.Connection, link_meta_name: str) -> Optional[int]:
+    links_meta = RegisteredLinkMetatype.__table__
+    stmt = sqlalchemy.select(links_meta.c[consts.LINKS_METATYPES_LINK_META_ID])\
+        .where(links_meta.c[consts.LINKS_METATYPES_LINK_META_NAME] == link_meta_name)
+    return conn.execute(stmt).scalar_one_or_none()
+
+
+def _check_link_keys(link_keys: Sequence[LinkKey]):
+    if not isinstance(link_keys, Sequence):
+        raise TypeError("Expected link_keys to be a sequence")
+    for link_key in link_keys:
+        if not isinstance(link_key, tuple) or len(link_key) != 5:
+            raise TypeError("Expected each link key to be a tuple of 5 values")
+        link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id = link_key
+        if not isinstance(link_meta_id, int):
+            raise TypeError("Expected link_meta_id to be an int")
+        if not isinstance(src_table_name, str):
+            raise TypeError("Expected src_table_name to be a string")
+        if not isinstance(src_row_id, int):
+            raise TypeError("Expected src_row_id to be an int")
+        if not isinstance(dst_table_name, str):
+            raise TypeError("Expected dst_table_name to be a string")
+        if not isinstance(dst_row_id, int):
+            raise TypeError("Expected dst_row_id to be an int")
 
-    link_id = result.inserted_primary_key[0]
 
-    return Link(link_meta_id, link_id, src_table_name, src_row_id, dst_table_name, dst_row_id)
+def _select_link_ids(
+        conn: sqlalchemy.Connection,
+        links_registry: sqlalchemy.Table,
+        link_keys: Iterable[LinkKey]
+) -> dict[LinkKey, int]:
+    """
+    Looks up the ids of the registered links among link_keys. Links are grouped by metatype and table pair, and each
+    group is looked up by its source row ids, a batch at a time.
+    :param conn:
+    :param links_registry:
+    :param link_keys:
+    :return: A dictionary mapping the keys of the registered links to their ids
+    """
+    wanted_keys = set(link_keys)
+    src_row_ids_by_group: dict[tuple[int, str, str], set[int]] = defaultdict(set)
+    for link_meta_id, src_table_name, src_row_id, dst_table_name, _ in wanted_keys:
+        src_row_ids_by_group[(link_meta_id, src_table_name, dst_table_name)].add(src_row_id)
+
+    c = links_registry.c
+    link_ids = {}
+    for (link_meta_id, src_table_name, dst_table_name), src_row_ids in src_row_ids_by_group.items():
+        src_row_ids = sorted(src_row_ids)
+        for i in range(0, len(src_row_ids), LINK_LOOKUP_BATCH_SIZE):
+            stmt = sqlalchemy.select(
+                c[consts.LINKS_REGISTRY_LINK_ID], c[consts.LINKS_REGISTRY_SRC_ROW_ID], c[consts.LINKS_REGISTRY_DST_ROW_ID]
+            ).where(
+                c[consts.LINKS_REGISTRY_LINK_META_ID] == link_meta_id,
+                c[consts.LINKS_REGISTRY_SRC_TABLE_NAME] == src_table_name,
+                c[consts.LINKS_REGISTRY_DST_TABLE_NAME] == dst_table_name,
+                c[consts.LINKS_REGISTRY_SRC_ROW_ID].in_(src_row_ids[i:i + LINK_LOOKUP_BATCH_SIZE])
+            )
+            for link_id, src_row_id, dst_row_id in conn.execute(stmt):
+                link_key = (link_meta_id, src_table_name, src_row_id, dst_table_name, dst_row_id)
+                if link_key in wanted_keys:
+                    link_ids[link_key] = link_id
+
+    return link_ids
+
+
+def _insert_ignoring_conflicts(conn: sqlalchemy.Connection, table: sqlalchemy.Table) -> sqlalchemy.Insert:
+    """
+    An INSERT into the passed table which skips rows conflicting with a unique constraint, on backends which support
+    ON CONFLICT DO NOTHING. On other backends, it's a plain INSERT.
+    :param conn:
+    :param table:
+    :return:
+    """
+    dialect_name = conn.dialect.name
+    if dialect_name == 'sqlite':
+        return sqlite.insert(table).on_conflict_do_nothing()
+    if dialect_name in ('postgresql', 'duckdb'):
+        return postgresql.insert(table).on_conflict_do_nothing()
+    return sqlalchemy.insert(table)
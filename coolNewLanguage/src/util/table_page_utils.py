@@ -0,0 +1,129 @@
+from typing import Any, Optional
+
+import sqlalchemy
+
+from coolNewLanguage.src import consts
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+
+class TablePage:
+    """
+    One page of rows from a table, as served to client-side tables which page, sort and filter on the server
+
+    Attributes:
+        columns: The names of the columns in the page
+        rows: The page's rows, each a list of values in the same order as columns
+        total_rows: The number of rows in the whole table
+        filtered_rows: The number of rows in the table matching the page's filters
+    """
+    __slots__ = ('columns', 'rows', 'total_rows', 'filtered_rows')
+
+    def __init__(self, columns: list[str], rows: list[list[Any]], total_rows: int, filtered_rows: int):
+        self.columns = columns
+        self.rows = rows
+        self.total_rows = total_rows
+        self.filtered_rows = filtered_rows
+
+    def to_json(self, draw: int = 0) -> dict[str, Any]:
+        """
+        Returns this page in the shape expected by DataTables' server-side processing mode
+        :param draw: The draw counter sent by DataTables with the request, which it expects to be echoed back
+        :return:
+        """
+        return {
+            'draw': draw,
+            'recordsTotal': self.total_rows,
+            'recordsFiltered': self.filtered_rows,
+            'columns': self.columns,
+            'data': self.rows
+        }
+
+
+def select_table_page(
+        table: sqlalchemy.Table,
+        conn: sqlalchemy.Connection,
+        offset: int = 0,
+        limit: int = consts.DEFAULT_TABLE_PAGE_SIZE,
+        sort_column: Optional[str] = None,
+        descending: bool = False,
+        search: str = '',
+        column_filters: Optional[dict[str, str]] = None
+) -> TablePage:
+    """
+    Reads a single page of rows from the passed table, with sorting and filtering done by the database, so that the
+    work done and the size of the result depend on the page size rather than the size of the table.
+    Metadata columns aren't included in the page.
+    :param table: The table to read from
+    :param conn: The connection to read with
+    :param offset: The number of rows to skip
+    :param limit: The maximum number of rows to return, capped at consts.MAX_TABLE_PAGE_SIZE
+    :param sort_column: The name of the column to sort by, or None to keep the table's row order
+    :param descending: Whether to sort in descending order
+    :param search: If not empty, only rows with a value in any column containing this string are returned
+    :param column_filters: A mapping from column names to strings which that column's values must contain
+    :return: A TablePage
+    """
+    if not isinstance(table, sqlalchemy.Table):
+        raise TypeError("Expected table to be a sqlalchemy Table")
+    if not isinstance(conn, sqlalchemy.Connection):
+        raise TypeError("Expected conn to be a sqlalchemy Connection")
+    if not isinstance(offset, int):
+        raise TypeError("Expected offset to be an int")
+    if offset < 0:
+        raise ValueError("Expected offset to be non-negative")
+    if not isinstance(limit, int):
+        raise TypeError("Expected limit to be an int")
+    if limit < 0:
+        raise ValueError("Expected limit to be non-negative")
+    if sort_column is not None and not isinstance(sort_column, str):
+        raise TypeError("Expected sort_column to be a string or None")
+    if not isinstance(search, str):
+        raise TypeError("Expected search to be a string")
+    if column_filters is None:
+        column_filters = {}
+    if not isinstance(column_filters, dict):
+        raise TypeError("Expected column_filters to be a dict or None")
+
+    columns = [c for c in table.c.keys() if c not in consts.METADATA_COLUMN_NAMES]
+    requested_columns = list(column_filters) + ([sort_column] if sort_column is not None else [])
+    for column in requested_columns:
+        if column not in columns:
+            raise KeyError(f"Column {column} not found in table {table.name}")
+
+    conditions = []
+    if search:
+        conditions.append(sqlalchemy.or_(*[_contains(table.c[column], search) for column in columns]))
+    for column, value in column_filters.items():
+        if value:
+            conditions.append(_contains(table.c[column], value))
+
+    stmt = sqlalchemy.select(*[table.c[column] for column in columns]).where(*conditions)
+
+    order_by = []
+    if sort_column is not None:
+        order_by.append(table.c[sort_column].desc() if descending else table.c[sort_column].asc())
+    # Break ties on the internal id, so that pages don't overlap or skip rows
+    if DB_INTERNAL_COLUMN_ID_NAME in table.c:
+        order_by.append(table.c[DB_INTERNAL_COLUMN_ID_NAME])
+    stmt = stmt.order_by(*order_by).offset(offset).limit(min(limit, consts.MAX_TABLE_PAGE_SIZE))
+
+    total_rows = conn.execute(sqlalchemy.select(sqlalchemy.func.count()).select_from(table)).scalar_one()
+    if conditions:
+        count_stmt = sqlalchemy.select(sqlalchemy.func.count()).select_from(table).where(*conditions)
+        filtered_rows = conn.execute(count_stmt).scalar_one()
+    else:
+        filtered_rows = total_rows
+
+    rows = [list(row) for row in conn.execute(stmt)]
+
+    return TablePage(columns, rows, total_rows, filtered_rows)
+
+
+def _contains(column: sqlalchemy.Column, value: str) -> sqlalchemy.ColumnElement:
+    """
+    Case-insensitive substring match against the string form of the column's values
+    :param column:
+    :param value:
+    :return:
+    """
+    return sqlalchemy.cast(column, sqlalchemy.String).icontains(value, autoescape=True)
@@ -0,0 +1,334 @@
+import contextlib
+from typing import Any, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+from coolNewLanguage.src.util.dataframe_diff_utils import diff_rows
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME, filter_to_user_columns
+
+"""
+The number of rows sent to the database per executemany call when writing a table diff
+"""
+WRITE_BATCH_SIZE = 10_000
+
+"""
+The dtype kinds (bool, signed int, unsigned int, float, object and, for Arrow-backed columns, string) which are written
+by diff. Columns of any other dtype, such as datetimes or categoricals, are left to pandas' to_sql, which knows how to
+convert them.
+"""
+DIFFABLE_DTYPE_KINDS = set('biufOU')
+
+"""
+The Python types a stored column may hold for rows of each dtype kind to be appended to it as they are. Rows with
+columns of any other dtype, or bound for columns of any other type, are appended by rewriting the table instead.
+"""
+APPENDABLE_PYTHON_TYPES = {
+    'b': (bool,),
+    'i': (int,),
+    'u': (int,),
+    'f': (float,),
+    'O': (str,),
+    'U': (str,)
+}
+
+
+def with_internal_ids(df: pd.DataFrame, stored_ids: Optional[pd.Index] = None) -> pd.DataFrame:
+    """
+    Returns a version of the passed DataFrame indexed by internal row ids, in the DataFrame's row order, since tables are
+    read back in id order.
+    If stored_ids is passed, rows labelled with one of the stored table's ids keep it, so that links to them stay valid,
+    as long as these rows come first and in increasing id order. Every other row, such as a new row concatenated onto
+    the table, gets a fresh id above the table's largest, so that rows never take the id of a deleted row which links
+    may still refer to. If the stored rows have been reordered, every row gets a fresh id instead.
+    Otherwise, the DataFrame's ids are kept if it's already indexed by increasing internal ids, or carries the internal
+    id column, and the rows are numbered from 0 if not.
+    :param df:
+    :param stored_ids: The ids of the stored table's rows, or None if the table is new
+    :return:
+    """
+    if DB_INTERNAL_COLUMN_ID_NAME in df.columns:
+        df = df.set_index(DB_INTERNAL_COLUMN_ID_NAME)
+
+    if stored_ids is not None:
+        df = df.set_axis(_internal_ids(df.index, stored_ids), axis='index')
+    elif df.index.name != DB_INTERNAL_COLUMN_ID_NAME or not has_valid_internal_ids(df) \
+            or not df.index.is_monotonic_increasing:
+        df = df.set_axis(pd.RangeIndex(len(df)), axis='index')
+
+    return df.rename_axis(DB_INTERNAL_COLUMN_ID_NAME)
+
+
+def _internal_ids(index: pd.Index, stored_ids: pd.Index) -> pd.Index:
+    """
+    Returns internal ids for the rows with the passed index labels, keeping the labels which are stored ids if the rows
+    with them come first and in increasing order, and numbering every other row on from the largest stored id
+    :param index: The labels of the rows
+    :param stored_ids: The ids of the stored table's rows
+    :return:
+    """
+    if pd.api.types.is_integer_dtype(index.dtype):
+        is_integer = np.ones(len(index), dtype=bool)
+    else:
+        is_integer = np.array([
+            isinstance(label, (int, np.integer)) and not isinstance(label, (bool, np.bool_)) for label in index
+        ], dtype=bool)
+    keep = is_integer & index.isin(stored_ids) & ~index.duplicated()
+
+    num_kept = int(keep.sum())
+    kept_ids = index[keep].astype(np.int64)
+    # Kept rows must come first and in increasing id order, for the table to be read back in the same order
+    if not keep[:num_kept].all() or not kept_ids.is_monotonic_increasing:
+        num_kept = 0
+        kept_ids = kept_ids[:0]
+
+    next_id = int(stored_ids.max()) + 1 if len(stored_ids) > 0 else 0
+    return pd.Index(np.concatenate([kept_ids.to_numpy(), np.arange(next_id, next_id + len(index) - num_kept)]))
+
+
+def has_valid_internal_ids(df: pd.DataFrame) -> bool:
+    """
+    Whether the passed DataFrame's index can be used as the internal ids of its rows
+    :param df:
+    :return:
+    """
+    return pd.api.types.is_integer_dtype(df.index.dtype) and df.index.is_unique
+
+
+def can_write_diff(stored_df: Optional[pd.DataFrame], df: pd.DataFrame) -> bool:
+    """
+    Whether df can be written over stored_df by diff, rather than by rewriting the whole table. This is the case when
+    the stored table is keyed by internal ids, both versions have the same columns with the same dtypes, and the rows of
+    df are in increasing id order with any new rows at the end, so that the stored row order matches df after the write.
+    :param stored_df: The table's current contents, as read by Tool._get_table_dataframe, or None if it doesn't exist
+    :param df: The new contents of the table
+    :return:
+    """
+    if stored_df is None or stored_df.index.name != DB_INTERNAL_COLUMN_ID_NAME:
+        return False
+
+    if not df.columns.is_unique or set(df.columns) != set(stored_df.columns):
+        return False
+
+    for column in df.columns:
+        if df[column].dtype != stored_df[column].dtype or df[column].dtype.kind not in DIFFABLE_DTYPE_KINDS:
+            return False
+
+    if not has_valid_internal_ids(df) or not df.index.is_monotonic_increasing:
+        return False
+
+    new_ids = df.index.difference(stored_df.index)
+    return len(new_ids) == 0 or len(stored_df) == 0 or new_ids.min() > stored_df.index.max()
+
+
+def can_append_rows(table: Optional[sqlalchemy.Table], df: pd.DataFrame) -> bool:
+    """
+    Whether the rows of df can be inserted into the passed stored table as they are, rather than by rewriting it. This
+    is the case when the table is keyed by internal ids, and df has the same columns as the table, each with a dtype the
+    stored column's type holds.
+    :param table: The table's reflected schema, e.g. from the Tool's SchemaCatalog, or None if it doesn't exist
+    :param df: The rows to append
+    :return:
+    """
+    if table is None or DB_INTERNAL_COLUMN_ID_NAME not in table.c:
+        return False
+
+    if not df.columns.is_unique or set(df.columns) != set(filter_to_user_columns(table.c.keys())):
+        return False
+
+    for column in df.columns:
+        try:
+            python_type = table.c[column].type.python_type
+        except NotImplementedError:
+            return False
+        if python_type not in APPENDABLE_PYTHON_TYPES.get(df[column].dtype.kind, ()):
+            return False
+
+    return True
+
+
+def write_full_table(conn: sqlalchemy.Connection, table_name: str, df: pd.DataFrame):
+    """
+    Replaces the table with the passed name with the contents of df, adding an indexed internal id column
+    :param conn: The connection to write with
+    :param table_name: The name of the table to replace
+    :param df: The new contents of the table
+    :return:
+    """
+    df = with_internal_ids(df)
+    df.to_sql(name=table_name, con=conn, if_exists='replace', index=True, index_label=DB_INTERNAL_COLUMN_ID_NAME)
+
+
+def write_table_diff(
+        conn: sqlalchemy.Connection,
+        table_name: str,
+        stored_df: pd.DataFrame,
+        df: pd.DataFrame,
+        batch_size: int = WRITE_BATCH_SIZE
+):
+    """
+    Brings the table with the passed name from the contents of stored_df to the contents of df, by issuing batched
+    DELETE, UPDATE and INSERT statements for just the rows which differ, within a single transaction. Assumes that
+    can_write_diff(stored_df, df) holds.
+    :param conn: The connection to write with. If it's already in a transaction, the caller is responsible for
+    committing; otherwise the writes are committed before returning.
+    :param table_name: The name of the table to write to
+    :param stored_df: The table's current contents, indexed by internal id
+    :param df: The new contents of the table, indexed by internal id
+    :param batch_size: The number of rows to send per executemany call
+    :return:
+    """
+    diff = diff_rows(stored_df, df)
+    if diff.is_empty():
+        return
+
+    columns = df.columns.tolist()
+    table = sqlalchemy.table(
+        table_name,
+        sqlalchemy.column(DB_INTERNAL_COLUMN_ID_NAME),
+        *[sqlalchemy.column(column) for column in columns]
+    )
+    id_column = table.c[DB_INTERNAL_COLUMN_ID_NAME]
+
+    delete_stmt = sqlalchemy.delete(table).where(id_column == sqlalchemy.bindparam('_id'))
+    # Bind parameters are named by position, since they can't share names with the columns being updated
+    update_stmt = sqlalchemy.update(table)\
+        .where(id_column == sqlalchemy.bindparam('_id'))\
+        .values({table.c[column]: sqlalchemy.bindparam(f'_v{i}') for i, column in enumerate(columns)})
+    insert_stmt = sqlalchemy.insert(table)
+
+    transaction = contextlib.nullcontext() if conn.in_transaction() else conn.begin()
+    with transaction:
+        for batch in _batches([{'_id': row_id} for row_id in _python_values(diff.deleted)], batch_size):
+            conn.execute(delete_stmt, batch)
+
+        updated = df.loc[diff.updated]
+        update_records = (
+            {'_id': row[0], **{f'_v{i}': value for i, value in enumerate(row[1:])}}
+            for row in _python_rows(updated)
+        )
+        for batch in _batches(update_records, batch_size):
+            conn.execute(update_stmt, batch)
+
+        inserted = df.loc[diff.inserted]
+        insert_records = (
+            {DB_INTERNAL_COLUMN_ID_NAME: row[0], **dict(zip(columns, row[1:]))}
+            for row in _python_rows(inserted)
+        )
+        for batch in _batches(insert_records, batch_size):
+            conn.execute(insert_stmt, batch)
+
+
+def append_rows(
+        conn: sqlalchemy.Connection,
+        table_name: str,
+        df: pd.DataFrame,
+        batch_size: int = WRITE_BATCH_SIZE
+) -> pd.DataFrame:
+    """
+    Inserts the rows of df at the end of the table with the passed name, with batched INSERT statements within a single
+    transaction, leaving the table's existing rows untouched. Rows keep their ids if these all follow the table's
+    largest id; otherwise they're numbered on from it. Assumes that can_append_rows holds for the table and df.
+    :param conn: The connection to write with. If it's already in a transaction, the caller is responsible for
+    committing; otherwise the writes are committed before returning.
+    :param table_name: The name of the table to append to
+    :param df: The rows to append
+    :param batch_size: The number of rows to send per executemany call
+    :return: df, indexed by the internal ids its rows were inserted with
+    """
+    columns = df.columns.tolist()
+    table = sqlalchemy.table(
+        table_name,
+        sqlalchemy.column(DB_INTERNAL_COLUMN_ID_NAME),
+        *[sqlalchemy.column(column) for column in columns]
+    )
+    insert_stmt = sqlalchemy.insert(table)
+
+    transaction = contextlib.nullcontext() if conn.in_transaction() else conn.begin()
+    with transaction:
+        max_id = conn.execute(sqlalchemy.select(sqlalchemy.func.max(table.c[DB_INTERNAL_COLUMN_ID_NAME]))).scalar()
+        keeps_ids = has_valid_internal_ids(df) and (max_id is None or len(df) == 0 or df.index.min() > max_id)
+        if not keeps_ids:
+            first_id = 0 if max_id is None else max_id + 1
+            df = df.set_axis(pd.RangeIndex(first_id, first_id + len(df)))
+        df = df.rename_axis(DB_INTERNAL_COLUMN_ID_NAME)
+
+        insert_records = (
+            {DB_INTERNAL_COLUMN_ID_NAME: row[0], **dict(zip(columns, row[1:]))}
+            for row in _python_rows(df)
+        )
+        for batch in _batches(insert_records, batch_size):
+            conn.execute(insert_stmt, batch)
+
+    return df
+
+
+def update_rows(
+        conn: sqlalchemy.Connection,
+        table_name: str,
+        updates: dict[int, dict[str, Any]],
+        batch_size: int = WRITE_BATCH_SIZE
+):
+    """
+    Updates just the passed cells of the table with the passed name, within a single transaction. Rows which update the
+    same set of columns are coalesced into one batched UPDATE statement, so that saving many rows issues a statement per
+    set of columns rather than per row.
+    :param conn: The connection to write with. If it's already in a transaction, the caller is responsible for
+    committing; otherwise the writes are committed before returning.
+    :param table_name: The name of the table to update
+    :param updates: A dictionary mapping the internal ids of the rows to update to dictionaries mapping column names to
+    their new values
+    :param batch_size: The number of rows to send per executemany call
+    :return:
+    """
+    rows_by_columns: dict[tuple[str, ...], list[int]] = {}
+    for row_id, values in updates.items():
+        if values:
+            rows_by_columns.setdefault(tuple(sorted(values)), []).append(row_id)
+
+    transaction = contextlib.nullcontext() if conn.in_transaction() else conn.begin()
+    with transaction:
+        for columns, row_ids in rows_by_columns.items():
+            table = sqlalchemy.table(
+                table_name,
+                sqlalchemy.column(DB_INTERNAL_COLUMN_ID_NAME),
+                *[sqlalchemy.column(column) for column in columns]
+            )
+            # Bind parameters are named by position, since they can't share names with the columns being updated
+            update_stmt = sqlalchemy.update(table)\
+                .where(table.c[DB_INTERNAL_COLUMN_ID_NAME] == sqlalchemy.bindparam('_id'))\
+                .values({table.c[column]: sqlalchemy.bindparam(f'_v{i}') for i, column in enumerate(columns)})
+            update_records = (
+                {'_id': row_id, **{f'_v{i}': updates[row_id][column] for i, column in enumerate(columns)}}
+                for row_id in row_ids
+            )
+            for batch in _batches(update_records, batch_size):
+                conn.execute(update_stmt, batch)
+
+
+def _python_values(index: pd.Index) -> list:
+    return index.astype(object).tolist()
+
+
+def _python_rows(df: pd.DataFrame) -> Iterator[tuple]:
+    """
+    Iterates over the rows of df as (id, values...) tuples of plain Python objects, with missing values as None, so that
+    they can be bound as statement parameters
+    :param df:
+    :return:
+    """
+    df = df.astype(object)
+    df = df.where(df.notna(), None)
+    return zip(_python_values(df.index), *[df[column].tolist() for column in df.columns])
+
+
+def _batches(records: Iterator[dict[str, Any]] | list[dict[str, Any]], batch_size: int) -> Iterator[list[dict[str, Any]]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
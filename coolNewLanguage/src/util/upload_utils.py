@@ -0,0 +1,130 @@
+import hashlib
+import os
+import pathlib
+import uuid
+from typing import Optional
+
+import aiofiles
+from aiohttp import BodyPartReader, web
+from multidict import MultiDict
+
+"""
+The number of bytes of an uploaded file read from the request, and written to disk, at a time
+"""
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+"""
+The prefix of the names of the temporary files uploads are streamed to, before a FileUploadComponent moves them into
+place
+"""
+TEMP_UPLOAD_PREFIX = '.upload-'
+
+
+class UploadedFile:
+    """
+    A file from a multipart POST body, which has been streamed to a temporary file rather than read into memory
+
+    Attributes:
+        filename: The name of the file on the user's machine
+        path: The path of the temporary file the upload was streamed to
+        size: The size of the file, in bytes
+        content_type: The content type the browser sent for the file
+        content_hash: The hex digest of the file's contents, or None if uploads aren't being hashed
+    """
+    __slots__ = ('filename', 'path', 'size', 'content_type', 'content_hash')
+
+    def __init__(
+            self,
+            filename: str,
+            path: pathlib.Path,
+            size: int,
+            content_type: str,
+            content_hash: Optional[str] = None
+    ):
+        self.filename = filename
+        self.path = path
+        self.size = size
+        self.content_type = content_type
+        self.content_hash = content_hash
+
+
+async def read_multipart_post_body(
+        request: web.Request,
+        upload_dir: pathlib.Path,
+        max_upload_bytes: Optional[int] = None,
+        hash_algorithm: Optional[str] = None
+) -> MultiDict:
+    """
+    Reads a multipart/form-data POST body, streaming each uploaded file to a temporary file in upload_dir a chunk at a
+    time, so that neither the body nor any file in it is ever held in memory in full
+    :param request: The request whose body to read
+    :param upload_dir: The directory to stream uploaded files to
+    :param max_upload_bytes: The largest file which may be uploaded, in bytes, or None to allow files of any size. If a
+    file is larger, the request is rejected with a 413 error.
+    :param hash_algorithm: The name of the hashlib algorithm to hash uploaded files with as they're read, or None to not
+    hash them
+    :return: A MultiDict mapping field names to their values, in the same form as request.post(), except that files
+    are UploadedFiles
+    """
+    post_body = MultiDict()
+    reader = await request.multipart()
+    try:
+        while (part := await reader.next()) is not None:
+            if not part.filename:
+                post_body.add(part.name, await part.text())
+            else:
+                post_body.add(part.name, await _stream_part_to_file(part, upload_dir, max_upload_bytes, hash_algorithm))
+    except BaseException:
+        discard_uploads(post_body)
+        raise
+
+    return post_body
+
+
+async def _stream_part_to_file(
+        part: BodyPartReader,
+        upload_dir: pathlib.Path,
+        max_upload_bytes: Optional[int],
+        hash_algorithm: Optional[str]
+) -> UploadedFile:
+    path = upload_dir.joinpath(f'{TEMP_UPLOAD_PREFIX}{uuid.uuid4().hex}')
+    hasher = hashlib.new(hash_algorithm) if hash_algorithm is not None else None
+    size = 0
+
+    try:
+        async with aiofiles.open(path, mode='wb') as f:
+            while chunk := await part.read_chunk(UPLOAD_CHUNK_BYTES):
+                chunk = part.decode(chunk)
+                size += len(chunk)
+                if max_upload_bytes is not None and size > max_upload_bytes:
+                    raise web.HTTPRequestEntityTooLarge(max_size=max_upload_bytes, actual_size=size)
+                if hasher is not None:
+                    hasher.update(chunk)
+                await f.write(chunk)
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+    return UploadedFile(
+        filename=part.filename,
+        path=path,
+        size=size,
+        content_type=part.headers.get('Content-Type', 'application/octet-stream'),
+        content_hash=hasher.hexdigest() if hasher is not None else None
+    )
+
+
+def discard_uploads(post_body: Optional[MultiDict]):
+    """
+    Deletes the temporary files of any uploads in the passed POST body which weren't moved into place by a
+    FileUploadComponent
+    :param post_body:
+    :return:
+    """
+    # Only bodies read by read_multipart_post_body hold UploadedFiles
+    if not isinstance(post_body, MultiDict):
+        return
+
+    for value in post_body.values():
+        if isinstance(value, UploadedFile) and os.path.exists(value.path):
+            os.remove(value.path)
@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+
+from coolNewLanguage.src import consts
+from coolNewLanguage.src.approvals import approval_rows
+from coolNewLanguage.src.approvals.table_approve_result import TableApproveResult
+from coolNewLanguage.src.approvals.table_deletion_approve_result import TableDeletionApproveResult
+from coolNewLanguage.src.approvals.table_diff_approve_result import TableDiffApproveResult
+from coolNewLanguage.src.approvals.table_row_addition_approve_result import TableRowAdditionApproveResult
+from coolNewLanguage.src.util.dataframe_diff_utils import diff_rows
+
+
+class TestApprovalRows:
+    TABLE_NAME = 'table'
+
+    @staticmethod
+    def checked_decision(cells: list[str]) -> str:
+        """
+        Returns the value of the checked radio button among a row's decision cells
+        """
+        checked = [cell for cell in cells[:3] if ' checked' in cell]
+        assert len(checked) == 1
+        return checked[0].split('value="')[1].split('"')[0]
+
+    def test_get_approval_rows_page_happy_path(self):
+        # Setup
+        df = pd.DataFrame({'a': list(range(10)), 'b': ['<b>'] * 10})
+        approve_result = TableApproveResult(TestApprovalRows.TABLE_NAME, df)
+        decisions = {
+            f'approve_{approve_result.id}_{consts.APPROVAL_BULK_DECISION_SUFFIX}': 'approve',
+            f'approve_{approve_result.id}_5': 'reject'
+        }
+
+        # Do
+        page = approval_rows.get_approval_rows_page(approve_result, decisions, offset=4, limit=3)
+
+        # Check
+        assert page.columns == ['Approve', 'Reject', 'Pending', 'a', 'b']
+        assert page.total_rows == 10
+        assert len(page.rows) == 3
+        # Rows without a decision of their own take the bulk decision
+        assert [TestApprovalRows.checked_decision(row) for row in page.rows] == ['approve', 'reject', 'approve']
+        assert f'name="approve_{approve_result.id}_4"' in page.rows[0][0]
+        assert page.rows[0][3:] == ['4', '&lt;b&gt;']
+
+    def test_get_approval_rows_page_defaults_to_pending(self):
+        # Setup
+        approve_result = TableApproveResult(TestApprovalRows.TABLE_NAME, pd.DataFrame({'a': [1, 2]}))
+
+        # Do
+        page = approval_rows.get_approval_rows_page(approve_result, {})
+
+        # Check
+        assert [TestApprovalRows.checked_decision(row) for row in page.rows] == ['pending', 'pending']
+
+    def test_get_approval_rows_page_row_addition(self):
+        # Setup
+        df = pd.DataFrame({'a': [1, 2, 3]})
+        approve_result = TableRowAdditionApproveResult(TestApprovalRows.TABLE_NAME, [2], df)
+
+        # Do
+        page = approval_rows.get_approval_rows_page(approve_result, {})
+
+        # Check
+        # Only the added rows can be decided on
+        assert page.rows[0][:3] == ['-', '-', '-']
+        assert TestApprovalRows.checked_decision(page.rows[2]) == 'pending'
+        assert page.rows[2][3] == '<span class="added_value">3</span>'
+
+    def test_get_approval_rows_page_diff_across_changes(self):
+        # Setup
+        old_df = pd.DataFrame({'a': [1, 2, 3]}, index=[0, 1, 2])
+        new_df = pd.DataFrame({'a': [1, 20, 4, 5]}, index=[0, 1, 3, 4])
+        approve_result = TableDiffApproveResult(TestApprovalRows.TABLE_NAME, old_df, new_df, diff_rows(old_df, new_df))
+
+        # Do
+        page = approval_rows.get_approval_rows_page(approve_result, {}, offset=1, limit=2)
+
+        # Check
+        assert page.columns == ['Approve', 'Reject', 'Pending', 'Change', 'a']
+        assert page.total_rows == 4
+        # The second inserted row, and then the updated row
+        assert [row[3] for row in page.rows] == ['<span class="added_value">Inserted</span>', 'Updated']
+        assert page.rows[1][4] == '<s class="removed_value">2</s> <span class="added_value">20</span>'
+
+    def test_get_approval_rows_page_no_rows(self):
+        # Setup
+        approve_result = TableDeletionApproveResult(TestApprovalRows.TABLE_NAME, pd.DataFrame())
+
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected approve_result to have rows to approve"):
+            approval_rows.get_approval_rows_page(approve_result, {})
+
+    def test_get_approval_rows_page_negative_offset(self):
+        # Setup
+        approve_result = TableApproveResult(TestApprovalRows.TABLE_NAME, pd.DataFrame({'a': [1]}))
+
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected offset to be non-negative"):
+            approval_rows.get_approval_rows_page(approve_result, {}, offset=-1)
@@ -0,0 +1,163 @@
+import datetime
+import pathlib
+import threading
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src import models
+from coolNewLanguage.src.approvals.approval_session import ApprovalSession
+from coolNewLanguage.src.approvals.approval_store import ApprovalStore
+from coolNewLanguage.src.approvals.table_approve_result import TableApproveResult
+
+
+class TestApprovalStore:
+    STAGE_URL = 'stage_url'
+    STAGE_NAME = 'stage_name'
+    TABLE_NAME = 'table'
+    RESULTS_TITLE = 'results_title'
+
+    @pytest.fixture
+    def approval_store(self, tmp_path: pathlib.Path) -> ApprovalStore:
+        engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path.joinpath("test.db")}')
+        models.Base.metadata.create_all(engine)
+        return ApprovalStore(engine, tmp_path.joinpath('approvals'))
+
+    @staticmethod
+    def make_session() -> ApprovalSession:
+        approve_result = TableApproveResult(TestApprovalStore.TABLE_NAME, pd.DataFrame({'a': [1, 2]}))
+        session = ApprovalSession([approve_result], TestApprovalStore.STAGE_URL, TestApprovalStore.STAGE_NAME)
+        session.cached_show_results = ['result']
+        session.cached_show_results_title = TestApprovalStore.RESULTS_TITLE
+        return session
+
+    def test_save_and_pop(self, approval_store: ApprovalStore):
+        # Setup
+        session = TestApprovalStore.make_session()
+
+        # Do
+        approval_store.save(session)
+        popped_session = approval_store.pop(session.token)
+
+        # Check
+        assert popped_session.token == session.token
+        assert popped_session.stage_url == TestApprovalStore.STAGE_URL
+        assert popped_session.stage_name == TestApprovalStore.STAGE_NAME
+        approve_result = popped_session.approve_results[0]
+        assert approve_result.table_name == TestApprovalStore.TABLE_NAME
+        assert approve_result.dataframe.equals(session.approve_results[0].dataframe)
+        assert popped_session.cached_show_results == ['result']
+        assert popped_session.cached_show_results_title == TestApprovalStore.RESULTS_TITLE
+        # The session's file was removed
+        assert not approval_store.path_of(session.token).exists()
+
+    def test_pop_survives_new_store(self, approval_store: ApprovalStore):
+        # Setup
+        session = TestApprovalStore.make_session()
+        approval_store.save(session)
+        # A new store over the same database and directory, as after the Tool restarts
+        new_store = ApprovalStore(approval_store.engine, approval_store.directory)
+
+        # Do
+        popped_session = new_store.pop(session.token)
+
+        # Check
+        assert popped_session.approve_results[0].table_name == TestApprovalStore.TABLE_NAME
+
+    def test_pop_twice(self, approval_store: ApprovalStore):
+        # Setup
+        session = TestApprovalStore.make_session()
+        approval_store.save(session)
+
+        # Do
+        approval_store.pop(session.token)
+
+        # Check
+        assert approval_store.pop(session.token) is None
+
+    def test_pop_unknown_token(self, approval_store: ApprovalStore):
+        # Do, Check
+        assert approval_store.pop('unknown') is None
+        assert approval_store.pop(None) is None
+
+    def test_save_unpicklable_results(self, approval_store: ApprovalStore):
+        # Setup
+        session = TestApprovalStore.make_session()
+        unpicklable_result = threading.Lock()
+        session.cached_show_results = [unpicklable_result]
+
+        # Do
+        approval_store.save(session)
+        popped_session = approval_store.pop(session.token)
+
+        # Check
+        # The results were kept in memory instead
+        assert popped_session.cached_show_results == [unpicklable_result]
+        assert popped_session.approve_results[0].table_name == TestApprovalStore.TABLE_NAME
+
+    def test_expire(self, approval_store: ApprovalStore):
+        # Setup
+        session = TestApprovalStore.make_session()
+        approval_store.save(session)
+        approval_store.max_age = datetime.timedelta(0)
+
+        # Do
+        num_expired = approval_store.expire()
+
+        # Check
+        assert num_expired == 1
+        assert not approval_store.path_of(session.token).exists()
+        assert approval_store.pop(session.token) is None
+
+    def test_get_leaves_session(self, approval_store: ApprovalStore):
+        # Setup
+        session = TestApprovalStore.make_session()
+        approval_store.save(session)
+        # A new store, so the session is loaded from its file
+        new_store = ApprovalStore(approval_store.engine, approval_store.directory)
+
+        # Do
+        got_session = new_store.get(session.token)
+
+        # Check
+        assert got_session.approve_results[0].table_name == TestApprovalStore.TABLE_NAME
+        # The session is loaded once, and can still be popped
+        assert new_store.get(session.token) is got_session
+        assert new_store.pop(session.token) is got_session
+        assert new_store.get(session.token) is None
+
+    def test_record_decisions_happy_path(self, approval_store: ApprovalStore):
+        # Setup
+        session = TestApprovalStore.make_session()
+        approval_store.save(session)
+
+        # Do
+        assert approval_store.record_decisions(session.token, {'approve_0_0': 'reject', 'approve_0_1': 'approve'})
+        assert approval_store.record_decisions(session.token, {'approve_0_1': 'reject'})
+
+        # Check
+        assert approval_store.get_decisions(session.token) == {'approve_0_0': 'reject', 'approve_0_1': 'reject'}
+        popped_session = approval_store.pop(session.token)
+        assert popped_session.decisions == {'approve_0_0': 'reject', 'approve_0_1': 'reject'}
+        # The decisions are removed with the session
+        assert approval_store.get_decisions(session.token) == {}
+
+    def test_record_decisions_bulk_decision(self, approval_store: ApprovalStore):
+        # Setup
+        session = TestApprovalStore.make_session()
+        approval_store.save(session)
+        approval_store.record_decisions(session.token, {'approve_0_0': 'reject', 'approve_10_0': 'reject'})
+
+        # Do
+        approval_store.record_decisions(session.token, {'approve_0_all': 'approve'})
+
+        # Check
+        # Only the decisions for the same ApproveResult's rows are replaced
+        assert approval_store.get_decisions(session.token) == {'approve_10_0': 'reject', 'approve_0_all': 'approve'}
+        assert approval_store.get_decisions(session.token, prefix='approve_0_') == {'approve_0_all': 'approve'}
+
+    def test_record_decisions_unknown_token(self, approval_store: ApprovalStore):
+        # Do, Check
+        assert not approval_store.record_decisions('unknown', {'approve_0_0': 'approve'})
+        assert approval_store.get_decisions('unknown') == {}
@@ -1,16 +1,23 @@
 import asyncio
-from unittest.mock import patch, Mock, MagicMock, call
+import json
+from unittest.mock import patch, Mock, MagicMock, AsyncMock, call
 
+import pandas as pd
 import pytest
 from aiohttp import web
 
 from coolNewLanguage.src import consts
 from coolNewLanguage.src.approvals import approvals
+from coolNewLanguage.src.approvals.approval_session import ApprovalSession
 from coolNewLanguage.src.approvals.approvals import get_user_approvals
 from coolNewLanguage.src.approvals.approve_result_type import ApproveResultType
 from coolNewLanguage.src.approvals.table_approve_result import TableApproveResult
 from coolNewLanguage.src.approvals.table_deletion_approve_result import TableDeletionApproveResult
+from coolNewLanguage.src.approvals.table_diff_approve_result import TableDiffApproveResult
+from coolNewLanguage.src.approvals.table_row_addition_approve_result import TableRowAdditionApproveResult
 from coolNewLanguage.src.exceptions.CNLError import CNLError
+from coolNewLanguage.src.util.dataframe_diff_utils import diff_rows
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
 
 
 class TestApprovals:
@@ -40,8 +47,6 @@ class TestApprovals:
         mock_process.running_tool.jinja_environment.get_template.return_value = mock_template
         # Mock process.curr_stage_url
         mock_process.curr_stage_url = self.CURR_STAGE_URL
-        # Clear approve_results
-        approvals.approve_results = []
         # Mock tool.tables._tables_to_delete
         mock_process.running_tool.tables._tables_to_delete = {'table1', 'table2'}
         # Mock the TableDeletionApproveResult constructor
@@ -80,12 +85,17 @@ class TestApprovals:
             [call('table3', mock_tables_to_save['table3']), call('table4', mock_tables_to_save['table4'])],
             any_order=True
         )
-        # Check that the approve_results were constructed correctly
+        # Check that an approval session was created with the correct approve_results
         expected_approve_results = mock_table_deletion_approve_results + mock_table_approve_results
-        assert approvals.approve_results == expected_approve_results
+        session = mock_process.approval_session
+        assert isinstance(session, ApprovalSession)
+        assert session.approve_results == expected_approve_results
         # Check that the template was rendered correctly
         mock_template.render.assert_called_once_with(
             approve_results=expected_approve_results,
+            approval_session=session.token,
+            approval_session_field_name=consts.APPROVAL_SESSION_FIELD_NAME,
+            approval_url=f'{consts.APPROVALS_ROUTE}/{session.token}',
             form_action=f'/{self.CURR_STAGE_URL}/approve',
             form_method='post',
             form_enctype='multipart/form-data'
@@ -93,14 +103,10 @@ class TestApprovals:
         # Check that the rendered template was set correctly
         assert mock_Stage.approvals_template == mock_rendered_template
 
-        approvals.approve_results = []
-
     @patch('coolNewLanguage.src.approvals.approvals.process')
     @patch('coolNewLanguage.src.approvals.approvals.config')
     def test_get_user_approvals_building_template_happy_path(self, mock_config: Mock, mock_process: Mock):
         # Setup
-        # Clear approve_results
-        approvals.approve_results = []
         # Set config.building_template to True
         mock_config.building_template = True
 
@@ -109,10 +115,35 @@ class TestApprovals:
             get_user_approvals()
 
         # Check
-        # Check that approve_results was not modified
-        assert approvals.approve_results == []
+        # Check that no approval session was created
+        assert not isinstance(mock_process.approval_session, ApprovalSession)
 
     RESULTS_TITLE = 'results_title'
+    APPROVAL_SESSION_TOKEN = 'approval_session_token'
+
+    @staticmethod
+    def mock_approval_request(
+            mock_process: MagicMock,
+            approve_results: list,
+            cached_show_results: list,
+            cached_show_results_title: str = ''
+    ) -> Mock:
+        """
+        Has the mock running tool's approval store return an approval session with the passed values, and returns a
+        mock request whose POST body refers to it
+        """
+        session = ApprovalSession(
+            approve_results, TestApprovals.CURR_STAGE_URL, 'stage_name', token=TestApprovals.APPROVAL_SESSION_TOKEN
+        )
+        session.cached_show_results = cached_show_results
+        session.cached_show_results_title = cached_show_results_title
+        mock_process.running_tool.approval_store.pop.return_value = session
+
+        mock_request = Mock(spec=web.Request)
+        mock_request.post = AsyncMock(
+            return_value={consts.APPROVAL_SESSION_FIELD_NAME: TestApprovals.APPROVAL_SESSION_TOKEN}
+        )
+        return mock_request
 
     @patch('coolNewLanguage.src.approvals.approvals.web.Response')
     @patch('coolNewLanguage.src.approvals.approvals.ApproveResult')
@@ -132,14 +163,10 @@ class TestApprovals:
             mock_Response: MagicMock
     ):
         # Setup
-        # Mock request
-        mock_request = Mock(spec=web.Request)
-        # Mock approve_results
-        approvals.approve_results = [Mock(spec=TableDeletionApproveResult), Mock(spec=TableApproveResult)]
-        # Mock process.cached_show_results and process.cached_show_results_title
+        # Mock request, with an approval session holding approve_results and the cached results
+        approve_results = [Mock(spec=TableDeletionApproveResult), Mock(spec=TableApproveResult)]
         mock_cached_result = Mock()
-        mock_process.cached_show_results = [mock_cached_result]
-        mock_process.cached_show_results_title = self.RESULTS_TITLE
+        mock_request = TestApprovals.mock_approval_request(mock_process, approve_results, [mock_cached_result], self.RESULTS_TITLE)
         # Mock Stage.results_template
         mock_results_template = Mock()
         mock_Stage.results_template = mock_results_template
@@ -154,9 +181,9 @@ class TestApprovals:
         # Check that request.post was called
         mock_request.post.assert_called_once()
         # Check that handle_table_deletion_approve_result was called with the correct argument
-        mock_handle_table_deletion_approve_result.assert_called_once_with(approvals.approve_results[0])
+        mock_handle_table_deletion_approve_result.assert_called_once_with(approve_results[0])
         # Check that handle_table_approve_result was called with the correct argument
-        mock_handle_table_approve_result.assert_called_once_with(approvals.approve_results[1])
+        mock_handle_table_approve_result.assert_called_once_with(approve_results[1])
         # Check that show_results was called with the correct arguments
         mock_results.show_results.assert_called_once_with(mock_cached_result, results_title=self.RESULTS_TITLE)
         # Check that Stage.results_template was reset to None
@@ -174,8 +201,8 @@ class TestApprovals:
         # Verify returned response is as expected
         assert response == mock_response_instance
         mock_Response.assert_called_once_with(body=mock_results_template, content_type=consts.AIOHTTP_HTML)
-
-        approvals.approve_results = []
+        # Check that the approval session was popped from the approval store
+        mock_process.running_tool.approval_store.pop.assert_called_once_with(self.APPROVAL_SESSION_TOKEN)
 
     # Patch handle_result functions so they're not actually called
     @patch('coolNewLanguage.src.approvals.approvals.handle_table_deletion_approve_result')
@@ -190,14 +217,28 @@ class TestApprovals:
             mock_handle_table_deletion_approve_result: MagicMock
     ):
         # Setup
-        # Set process.cached_show_results to an empty list
+        # Mock request, with an approval session without cached results
+        mock_request = TestApprovals.mock_approval_request(mock_process, [Mock(spec=TableDeletionApproveResult)], [])
         mock_process.cached_show_results = []
 
         # Do/Check
         with pytest.raises(web.HTTPFound) as e:
-            asyncio.run(approvals.approval_handler(Mock(spec=web.Request)))
+            asyncio.run(approvals.approval_handler(mock_request))
             assert e.location == '/'
 
+    # Patch process so that no stateful changes are made
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_approval_handler_unknown_approval_session(self, mock_process: MagicMock):
+        # Setup
+        mock_process.running_tool.approval_store.pop.return_value = None
+        mock_request = Mock(spec=web.Request)
+        mock_request.post = AsyncMock(return_value={consts.APPROVAL_SESSION_FIELD_NAME: 'unknown'})
+
+        # Do/Check
+        with pytest.raises(web.HTTPNotFound):
+            asyncio.run(approvals.approval_handler(mock_request))
+        assert mock_process.approval_post_body is None
+
     def test_approval_handler_non_web_request_request(self):
         # Do/Check
         with pytest.raises(TypeError, match="Expected request to be an aiohttp web.Request"):
@@ -207,11 +248,109 @@ class TestApprovals:
     @patch('coolNewLanguage.src.approvals.approvals.process')
     def test_approval_handler_unrecognized_approve_result(self, mock_process: MagicMock):
         # Setup
-        approvals.approve_results = [Mock()]
+        mock_request = TestApprovals.mock_approval_request(mock_process, [Mock()], [])
 
         # Do/Check
         with pytest.raises(ValueError, match="Unknown ApproveResult type"):
-            asyncio.run(approvals.approval_handler(Mock(spec=web.Request)))
+            asyncio.run(approvals.approval_handler(mock_request))
+
+    @patch('coolNewLanguage.src.approvals.approvals.handle_table_approve_result')
+    @patch('coolNewLanguage.src.approvals.approvals.ApproveResult')
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_approval_handler_uses_recorded_decisions(
+            self,
+            mock_process: MagicMock,
+            mock_ApproveResult: MagicMock,
+            mock_handle_table_approve_result: MagicMock
+    ):
+        # Setup
+        mock_request = TestApprovals.mock_approval_request(mock_process, [Mock(spec=TableApproveResult)], [])
+        session = mock_process.running_tool.approval_store.pop.return_value
+        session.decisions = {'approve_0_0': 'approve', 'approve_0_1': 'approve'}
+        mock_request.post.return_value['approve_0_1'] = 'reject'
+        post_bodies = []
+        mock_handle_table_approve_result.side_effect = lambda _: post_bodies.append(mock_process.approval_post_body)
+
+        # Do
+        with pytest.raises(web.HTTPFound):
+            asyncio.run(approvals.approval_handler(mock_request))
+
+        # Check
+        # The posted decisions override the recorded ones
+        assert post_bodies[0]['approve_0_0'] == 'approve'
+        assert post_bodies[0]['approve_0_1'] == 'reject'
+
+    @staticmethod
+    def mock_rows_request(token: str, approve_result_id: str, query: dict) -> Mock:
+        mock_request = Mock(spec=web.Request)
+        mock_request.match_info = {'token': token, 'approve_result_id': approve_result_id}
+        mock_request.query = query
+        return mock_request
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_approval_rows_handler_happy_path(self, mock_process: MagicMock):
+        # Setup
+        approve_result = TableApproveResult('table', pd.DataFrame({'a': list(range(25))}))
+        session = ApprovalSession([approve_result], self.CURR_STAGE_URL, 'stage_name')
+        mock_process.running_tool.approval_store.get.return_value = session
+        mock_process.running_tool.approval_store.get_decisions.return_value = {f'approve_{approve_result.id}_21': 'reject'}
+        mock_request = TestApprovals.mock_rows_request(
+            session.token, str(approve_result.id), {'offset': '20', 'limit': '10', 'draw': '3'}
+        )
+
+        # Do
+        response = asyncio.run(approvals.approval_rows_handler(mock_request))
+
+        # Check
+        page = json.loads(response.text)
+        assert page['draw'] == 3
+        assert page['recordsTotal'] == 25
+        assert len(page['data']) == 5
+        assert 'value="reject" checked' in page['data'][1][1]
+        mock_process.running_tool.approval_store.get_decisions.assert_called_once_with(
+            session.token, prefix=f'approve_{approve_result.id}_'
+        )
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_approval_rows_handler_unknown_approve_result(self, mock_process: MagicMock):
+        # Setup
+        mock_process.running_tool.approval_store.get.return_value = ApprovalSession([], self.CURR_STAGE_URL, 'stage')
+        mock_request = TestApprovals.mock_rows_request('token', '7', {})
+
+        # Do/Check
+        with pytest.raises(web.HTTPNotFound):
+            asyncio.run(approvals.approval_rows_handler(mock_request))
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_approval_decisions_handler_happy_path(self, mock_process: MagicMock):
+        # Setup
+        mock_process.running_tool.approval_store.record_decisions.return_value = True
+        mock_request = Mock(spec=web.Request)
+        mock_request.match_info = {'token': self.APPROVAL_SESSION_TOKEN}
+        mock_request.post = AsyncMock(return_value={'approve_0_3': 'approve', 'approve_0_all': 'reject'})
+
+        # Do
+        response = asyncio.run(approvals.approval_decisions_handler(mock_request))
+
+        # Check
+        assert json.loads(response.text) == {'recorded': 2}
+        mock_process.running_tool.approval_store.record_decisions.assert_called_once_with(
+            self.APPROVAL_SESSION_TOKEN, {'approve_0_3': 'approve', 'approve_0_all': 'reject'}
+        )
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_approval_decisions_handler_unknown_decision(self, mock_process: MagicMock):
+        # Setup
+        mock_request = Mock(spec=web.Request)
+        mock_request.match_info = {'token': self.APPROVAL_SESSION_TOKEN}
+        mock_request.post = AsyncMock(return_value={'approve_0_3': 'maybe'})
+
+        # Do
+        response = asyncio.run(approvals.approval_decisions_handler(mock_request))
+
+        # Check
+        assert response.status == 400
+        mock_process.running_tool.approval_store.record_decisions.assert_not_called()
 
     TABLE_APPROVE_RESULT_ID = '0'
     TABLE_APPROVE_RESULT_TABLE_NAME = 'table_approve_result_table_name'
@@ -219,20 +358,15 @@ class TestApprovals:
     @patch('coolNewLanguage.src.approvals.approvals.process')
     def test_handle_table_approve_result_happy_path(self, mock_process: MagicMock):
         # Setup
-        # Mock a dataframe
-        mock_iterrows_iterator = iter([(0, None), (1, None), (2, None)])
-        mock_dataframe = Mock(iterrows=Mock(return_value=mock_iterrows_iterator))
+        df = pd.DataFrame({'a': [1, 2, 3]})
         mock_process.approval_post_body = {
             f'approve_{self.TABLE_APPROVE_RESULT_ID}_0': 'approve',
             f'approve_{self.TABLE_APPROVE_RESULT_ID}_1': 'reject',
             f'approve_{self.TABLE_APPROVE_RESULT_ID}_2': 'approve'
         }
-        # Mock the filtered dataframe
-        mock_filtered_dataframe = Mock()
-        mock_dataframe.loc = MagicMock(__getitem__=Mock(return_value=mock_filtered_dataframe))
         # Mock the TableApproveResult
         mock_table_approve_result = Mock(
-            dataframe=mock_dataframe,
+            dataframe=df,
             id=self.TABLE_APPROVE_RESULT_ID,
             table_name=self.TABLE_APPROVE_RESULT_TABLE_NAME
         )
@@ -241,20 +375,15 @@ class TestApprovals:
         approvals.handle_table_approve_result(mock_table_approve_result)
 
         # Check
-        expected_approved_rows = [0, 2]
-        mock_dataframe.loc.__getitem__.assert_called_once_with(expected_approved_rows)
-
-        mock_process.running_tool.tables._save_table.assert_called_once_with(
-            self.TABLE_APPROVE_RESULT_TABLE_NAME,
-            mock_filtered_dataframe
-        )
+        table_name, saved_df = mock_process.running_tool.tables._save_table.call_args.args
+        assert table_name == self.TABLE_APPROVE_RESULT_TABLE_NAME
+        assert saved_df.index.tolist() == [0, 2]
+        assert saved_df['a'].tolist() == [1, 3]
 
     @patch('coolNewLanguage.src.approvals.approvals.process')
     def test_handle_table_approve_result_no_approved_rows(self, mock_process: MagicMock):
         # Setup
-        # Mock a dataframe
-        mock_iterrows_iterator = iter([(0, None), (1, None), (2, None)])
-        mock_dataframe = Mock(iterrows=Mock(return_value=mock_iterrows_iterator))
+        df = pd.DataFrame({'a': [1, 2, 3]})
         mock_process.approval_post_body = {
             f'approve_{self.TABLE_APPROVE_RESULT_ID}_0': 'reject',
             f'approve_{self.TABLE_APPROVE_RESULT_ID}_1': 'reject',
@@ -262,14 +391,84 @@ class TestApprovals:
         }
         # Mock the TableApproveResult
         mock_table_approve_result = Mock(
-            dataframe=mock_dataframe,
+            dataframe=df,
+            id=self.TABLE_APPROVE_RESULT_ID,
+        )
+
+        # Do
+        approvals.handle_table_approve_result(mock_table_approve_result)
+
+        # Check
+        mock_process.running_tool.tables._save_table.assert_not_called()
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_handle_table_approve_result_approve_all(self, mock_process: MagicMock):
+        # Setup
+        df = pd.DataFrame({'a': [1, 2, 3]})
+        # Every row is approved at once, except for row 1, which was then rejected on its own
+        mock_process.approval_post_body = {
+            f'approve_{self.TABLE_APPROVE_RESULT_ID}_{consts.APPROVAL_BULK_DECISION_SUFFIX}': 'approve',
+            f'approve_{self.TABLE_APPROVE_RESULT_ID}_1': 'reject'
+        }
+        mock_table_approve_result = Mock(
+            dataframe=df,
             id=self.TABLE_APPROVE_RESULT_ID,
+            table_name=self.TABLE_APPROVE_RESULT_TABLE_NAME
         )
 
         # Do
         approvals.handle_table_approve_result(mock_table_approve_result)
 
         # Check
+        _, saved_df = mock_process.running_tool.tables._save_table.call_args.args
+        assert saved_df.index.tolist() == [0, 2]
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_approved_rows_mask_missing_rows_are_pending(self, mock_process: MagicMock):
+        # Setup
+        mock_process.approval_post_body = {
+            f'approve_{self.TABLE_APPROVE_RESULT_ID}_0': 'approve',
+            # Decisions for other results are ignored
+            'approve_1_1': 'approve',
+            consts.APPROVAL_SESSION_FIELD_NAME: 'token'
+        }
+        approve_result = Mock(id=self.TABLE_APPROVE_RESULT_ID)
+
+        # Do
+        mask = approvals.approved_rows_mask(approve_result, pd.Index([0, 1, 2]))
+
+        # Check
+        assert mask.tolist() == [True, False, False]
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_approved_rows_mask_unknown_decision(self, mock_process: MagicMock):
+        # Setup
+        mock_process.approval_post_body = {f'approve_{self.TABLE_APPROVE_RESULT_ID}_0': 'maybe'}
+        approve_result = Mock(id=self.TABLE_APPROVE_RESULT_ID)
+
+        # Do, Check
+        with pytest.raises(ValueError, match="Unrecognized ApproveState string: maybe"):
+            approvals.approved_rows_mask(approve_result, pd.Index([0]))
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_handle_table_row_addition_approve_result_appends_approved_rows(self, mock_process: MagicMock):
+        # Setup
+        df = pd.DataFrame({'a': [1, 2, 3, 4]})
+        approve_result = TableRowAdditionApproveResult(self.TABLE_APPROVE_RESULT_TABLE_NAME, [2, 3], df)
+        mock_process.approval_post_body = {
+            f'approve_{approve_result.id}_2': 'reject',
+            f'approve_{approve_result.id}_3': 'approve'
+        }
+
+        # Do
+        approvals.handle_table_row_addition_approve_result(approve_result)
+
+        # Check
+        # Only the approved row is passed on, without the existing table
+        table_name, appended_df = mock_process.running_tool.tables._append_rows.call_args.args
+        assert table_name == self.TABLE_APPROVE_RESULT_TABLE_NAME
+        assert appended_df.index.tolist() == [3]
+        mock_process.running_tool._get_table_dataframe.assert_not_called()
         mock_process.running_tool.tables._save_table.assert_not_called()
 
     TABLE_DELETE_APPROVE_RESULT_ID = 'table_delete_approve_result_id'
@@ -306,3 +505,115 @@ class TestApprovals:
         # Check
         mock_process.running_tool.tables._delete_table.assert_not_called()
 
+
+    DIFF_TABLE_NAME = 'diff_table_name'
+
+    @staticmethod
+    def stored_df(data: dict, index: list) -> pd.DataFrame:
+        return pd.DataFrame(data, index=pd.Index(index, name=DB_INTERNAL_COLUMN_ID_NAME))
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_get_table_approve_object_diff(self, mock_process: MagicMock):
+        # Setup
+        original_df = TestApprovals.stored_df({'a': [1, 2, 3]}, [0, 1, 2])
+        mock_process.running_tool._get_table_dataframe.return_value = original_df
+        df = TestApprovals.stored_df({'a': [1, 20, 4]}, [0, 1, 3])
+
+        # Do
+        approve_result = approvals.get_table_approve_object(self.DIFF_TABLE_NAME, df)
+
+        # Check
+        # Only the changed rows are included
+        assert isinstance(approve_result, TableDiffApproveResult)
+        assert approve_result.inserted.index.tolist() == [3]
+        assert approve_result.updated.index.tolist() == [1]
+        assert approve_result.deleted.index.tolist() == [2]
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_get_table_approve_object_diff_only_insertions(self, mock_process: MagicMock):
+        # Setup
+        original_df = TestApprovals.stored_df({'a': [1, 2]}, [0, 1])
+        mock_process.running_tool._get_table_dataframe.return_value = original_df
+        df = TestApprovals.stored_df({'a': [1, 2, 3]}, [0, 1, 2])
+
+        # Do
+        approve_result = approvals.get_table_approve_object(self.DIFF_TABLE_NAME, df)
+
+        # Check
+        # Only the added rows are included
+        assert isinstance(approve_result, TableRowAdditionApproveResult)
+        assert approve_result.rows_added == {2}
+        assert approve_result.dataframe.index.tolist() == [2]
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_get_table_approve_object_plain_concat(self, mock_process: MagicMock):
+        # Setup
+        original_df = TestApprovals.stored_df({'a': [1, 2, 3]}, [0, 1, 2])
+        mock_process.running_tool._get_table_dataframe.return_value = original_df
+        # The new rows' labels repeat the ids of existing rows
+        df = pd.concat([original_df, pd.DataFrame({'a': [4, 5]})])
+
+        # Do
+        approve_result = approvals.get_table_approve_object(self.DIFF_TABLE_NAME, df)
+
+        # Check
+        # The new rows get the ids saving the table would give them, and are the ones shown for approval
+        assert isinstance(approve_result, TableRowAdditionApproveResult)
+        assert approve_result.rows_added == {3, 4}
+        assert approve_result.dataframe['a'].tolist() == [4, 5]
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_get_table_approve_object_row_addition(self, mock_process: MagicMock):
+        # Setup
+        # A table which isn't keyed by internal ids, so the rows can't be diffed
+        original_df = pd.DataFrame({'a': [1, 3]}, index=[0, 2])
+        mock_process.running_tool._get_table_dataframe.return_value = original_df
+        df = pd.concat([pd.DataFrame({'a': [5]}, index=['new']), original_df])
+
+        # Do
+        approve_result = approvals.get_table_approve_object(self.DIFF_TABLE_NAME, df)
+
+        # Check
+        # The added rows are the ones which aren't in the original table, wherever they are
+        assert isinstance(approve_result, TableRowAdditionApproveResult)
+        assert approve_result.rows_added == {'new'}
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_handle_table_diff_approve_result(self, mock_process: MagicMock):
+        # Setup
+        original_df = TestApprovals.stored_df({'a': [1, 2, 3, 5]}, [0, 1, 2, 4])
+        df = TestApprovals.stored_df({'a': [10, 20, 5, 6, 7]}, [0, 1, 4, 5, 6])
+        approve_result = TableDiffApproveResult(self.DIFF_TABLE_NAME, original_df, df, diff_rows(original_df, df))
+        mock_process.running_tool._get_table_dataframe.return_value = original_df.copy()
+        # Approve the update to row 0, the deletion of row 2 and the insertion of row 5, and reject the rest
+        prefix = f'approve_{approve_result.id}'
+        mock_process.approval_post_body = {
+            f'{prefix}_0': 'approve',
+            f'{prefix}_1': 'reject',
+            f'{prefix}_2': 'approve',
+            f'{prefix}_5': 'approve',
+            f'{prefix}_6': 'pending'
+        }
+
+        # Do
+        approvals.handle_table_diff_approve_result(approve_result)
+
+        # Check
+        table_name, saved_df = mock_process.running_tool.tables._save_table.call_args.args
+        assert table_name == self.DIFF_TABLE_NAME
+        assert saved_df.index.tolist() == [0, 1, 4, 5]
+        assert saved_df['a'].tolist() == [10, 2, 5, 6]
+
+    @patch('coolNewLanguage.src.approvals.approvals.process')
+    def test_handle_table_diff_approve_result_none_approved(self, mock_process: MagicMock):
+        # Setup
+        original_df = TestApprovals.stored_df({'a': [1]}, [0])
+        df = TestApprovals.stored_df({'a': [10]}, [0])
+        approve_result = TableDiffApproveResult(self.DIFF_TABLE_NAME, original_df, df, diff_rows(original_df, df))
+        mock_process.approval_post_body = {f'approve_{approve_result.id}_0': 'reject'}
+
+        # Do
+        approvals.handle_table_diff_approve_result(approve_result)
+
+        # Check
+        mock_process.running_tool.tables._save_table.assert_not_called()
@@ -0,0 +1,43 @@
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+
+from coolNewLanguage.src.approvals.approve_result_type import ApproveResultType
+from coolNewLanguage.src.approvals.table_diff_approve_result import TableDiffApproveResult
+from coolNewLanguage.src.util.dataframe_diff_utils import diff_rows, RowDiff
+
+
+class TestTableDiffApproveResult:
+
+    TABLE_NAME = 'table_name'
+
+    def test_init_happy_path(self):
+        # Setup
+        old_df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']}, index=[0, 1, 2])
+        new_df = pd.DataFrame({'a': [1, 20, 4], 'b': ['x', 'y', 'w']}, index=[0, 1, 3])
+
+        # Do
+        approve_result = TableDiffApproveResult(self.TABLE_NAME, old_df, new_df, diff_rows(old_df, new_df))
+
+        # Check
+        assert approve_result.approve_result_type == ApproveResultType.TABLE_DIFF
+        assert approve_result.table_name == self.TABLE_NAME
+        assert approve_result.column_names == ['a', 'b']
+        assert approve_result.inserted.index.tolist() == [3]
+        assert approve_result.updated.index.tolist() == [1]
+        assert approve_result.updated.at[1, 'a'] == 20
+        assert approve_result.previous.at[1, 'a'] == 2
+        assert approve_result.deleted.index.tolist() == [2]
+        assert approve_result.changed_cells.loc[1].tolist() == [True, False]
+        assert approve_result.num_changed_rows == 3
+
+    def test_init_non_string_table_name(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected table_name to be a string"):
+            TableDiffApproveResult(Mock(), pd.DataFrame(), pd.DataFrame(), Mock(spec=RowDiff))
+
+    def test_init_non_row_diff_diff(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected diff to be a RowDiff"):
+            TableDiffApproveResult(self.TABLE_NAME, pd.DataFrame(), pd.DataFrame(), Mock())
@@ -22,9 +22,9 @@ class TestColumnSelectorComponent:
             getall=Mock(return_value=[TestColumnSelectorComponent.TABLE_NAME, TestColumnSelectorComponent.COLUMN_NAME])
         )
         # Mock running_tool's tables
-        mock_filtered_dataframe = MagicMock()
-        mock_dataframe = MagicMock(__getitem__=Mock(return_value=mock_filtered_dataframe))
-        mock_process.running_tool.tables = MagicMock(__getitem__=Mock(return_value=mock_dataframe))
+        mock_projected_lazy_table = Mock()
+        mock_lazy_table = MagicMock(__getitem__=Mock(return_value=mock_projected_lazy_table))
+        mock_process.running_tool.tables.lazy.return_value = mock_lazy_table
 
         # Do
         column_selector_component = ColumnSelectorComponent(TestColumnSelectorComponent.LABEL)
@@ -34,7 +34,11 @@ class TestColumnSelectorComponent:
         assert column_selector_component.label == TestColumnSelectorComponent.LABEL
         assert column_selector_component.num_columns == 1
         assert column_selector_component.table_name == TestColumnSelectorComponent.TABLE_NAME
-        assert column_selector_component.value == mock_filtered_dataframe
+        assert column_selector_component.column_names == [TestColumnSelectorComponent.COLUMN_NAME]
+        # Check that the value is a lazy handle projected to the selected column
+        assert column_selector_component.value == mock_projected_lazy_table
+        mock_process.running_tool.tables.lazy.assert_called_once_with(TestColumnSelectorComponent.TABLE_NAME)
+        mock_lazy_table.__getitem__.assert_called_once_with([TestColumnSelectorComponent.COLUMN_NAME])
 
         process.handling_post = False
 
@@ -67,9 +71,9 @@ class TestColumnSelectorComponent:
         mock_tables.get_table_names.return_value = ['table1']
         # Mock get_column_of_table
         mock_tables.get_columns_of_table.return_value = ['col1', 'col2']
-        # Mock tables.__getitem__
+        # Mock get_preview
         mock_rows = Mock()
-        mock_tables.__getitem__.return_value = Mock(head=Mock(return_value=mock_rows))
+        mock_tables.get_preview.return_value = mock_rows
         # Mock template.render
         mock_rendered_template = Mock()
         mock_template.render.return_value = mock_rendered_template
@@ -91,3 +95,6 @@ class TestColumnSelectorComponent:
             component_id=column_selector_component.component_id,
             context=consts.GET_TABLE_COLUMN_SELECT
         )
+        # Check that only a preview of the table was read
+        mock_tables.get_preview.assert_called_once_with('table1', ColumnSelectorComponent.NUM_PREVIEW_ROWS)
+        mock_tables.__getitem__.assert_not_called()
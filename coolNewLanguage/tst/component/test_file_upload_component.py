@@ -10,6 +10,7 @@ import pytest
 import coolNewLanguage.src.component.input_component
 from coolNewLanguage.src import consts
 from coolNewLanguage.src.component.file_upload_component import FileUploadComponent
+from coolNewLanguage.src.util.upload_utils import UploadedFile
 
 
 class TestFileUploadComponent:
@@ -19,18 +20,14 @@ class TestFileUploadComponent:
     LABEL = "gimme a file"
     COMPONENT_ID = "da real component"
 
+    CONTENT_HASH = "da real hash"
+
     def mock_input_component_init(self, _: type):
-        # Mock an IOBase instance to attach to the mocked FileField
-        mock_file = Mock(
-            spec=io.IOBase,
-            read=Mock(return_value=bytes(TestFileUploadComponent.FILE_CONTENTS, 'utf-8')),
-            close=Mock()
-        )
-        # Mock a FileField and attach it as self.value
+        # Mock a FileField, wrapping an in-memory file, and attach it as self.value
         self.value = Mock(
             spec=aiohttp.web_request.FileField,
             filename=TestFileUploadComponent.FILENAME,
-            file=mock_file
+            file=io.BytesIO(bytes(TestFileUploadComponent.FILE_CONTENTS, 'utf-8'))
         )
 
     @patch.object(
@@ -38,10 +35,11 @@ class TestFileUploadComponent:
         '__init__',
         new=mock_input_component_init
     )
-    def test_file_upload_component_happy_path(self, tmp_path: pathlib.Path):
+    @patch('coolNewLanguage.src.component.file_upload_component.process')
+    def test_file_upload_component_happy_path(self, mock_process: Mock, tmp_path: pathlib.Path):
         # Setup
-        # Mock FILES_DIR to be tmp_path
-        consts.FILES_DIR = tmp_path
+        mock_process.handling_post = True
+        mock_process.running_tool.file_dir = tmp_path
 
         # Do
         file_upload_component = FileUploadComponent(TestFileUploadComponent.EXPECTED_EXT, TestFileUploadComponent.LABEL)
@@ -55,7 +53,46 @@ class TestFileUploadComponent:
         assert os.path.exists(expected_file_path)
         with open(expected_file_path) as f:
             assert f.read() == TestFileUploadComponent.FILE_CONTENTS
-        assert file_upload_component.value == expected_file_path
+        assert file_upload_component.value == str(expected_file_path)
+        assert file_upload_component.content_hash is None
+
+    @patch('coolNewLanguage.src.component.file_upload_component.process')
+    def test_file_upload_component_uploaded_file(self, mock_process: Mock, tmp_path: pathlib.Path):
+        # Setup
+        mock_process.handling_post = True
+        mock_process.running_tool.file_dir = tmp_path
+        temp_path = tmp_path.joinpath('.upload-file')
+        temp_path.write_text(TestFileUploadComponent.FILE_CONTENTS)
+        uploaded_file = UploadedFile(
+            TestFileUploadComponent.FILENAME,
+            temp_path,
+            len(TestFileUploadComponent.FILE_CONTENTS),
+            'text/plain',
+            TestFileUploadComponent.CONTENT_HASH
+        )
+
+        def mock_input_component_init(self, _: type):
+            self.value = uploaded_file
+
+        # Do
+        with patch.object(
+                coolNewLanguage.src.component.input_component.InputComponent,
+                '__init__',
+                new=mock_input_component_init
+        ):
+            file_upload_component = FileUploadComponent(
+                TestFileUploadComponent.EXPECTED_EXT,
+                TestFileUploadComponent.LABEL
+            )
+
+        # Check
+        # Check the temporary file was moved into place
+        expected_file_path = tmp_path.joinpath(TestFileUploadComponent.FILENAME)
+        assert not os.path.exists(temp_path)
+        with open(expected_file_path) as f:
+            assert f.read() == TestFileUploadComponent.FILE_CONTENTS
+        assert file_upload_component.value == str(expected_file_path)
+        assert file_upload_component.content_hash == TestFileUploadComponent.CONTENT_HASH
 
     def mock_input_component_init_none_value(self, _: type):
         self.value = None
@@ -97,7 +134,9 @@ class TestFileUploadComponent:
         '__init__',
         new=mock_input_component_init_non_aiohttp_file_field_value
     )
-    def test_file_upload_component_value_is_not_an_aiohttp_file_field(self):
+    @patch('coolNewLanguage.src.component.file_upload_component.process')
+    def test_file_upload_component_value_is_not_an_aiohttp_file_field(self, mock_process: Mock):
+        mock_process.handling_post = True
         with pytest.raises(TypeError, match="Expected value to be an aiohttp FileField"):
             FileUploadComponent(TestFileUploadComponent.EXPECTED_EXT, TestFileUploadComponent.LABEL)
 
@@ -31,8 +31,8 @@ class TestTableSelectorComponent:
         process.handling_post = True
         process.post_body = Mock(getall=Mock(return_value=[TestTableSelectorComponent.TABLE_NAME]))
         # Mock running_tool's tables
-        mock_dataframe = Mock()
-        mock_process.running_tool.tables = MagicMock(__getitem__=Mock(return_value=mock_dataframe))
+        mock_lazy_table = Mock()
+        mock_process.running_tool.tables.lazy.return_value = mock_lazy_table
 
         # Do
         table_selector_component = TableSelectorComponent(TestTableSelectorComponent.LABEL)
@@ -42,8 +42,9 @@ class TestTableSelectorComponent:
         assert table_selector_component.label == TestTableSelectorComponent.LABEL
         assert table_selector_component.only_user_tables
         assert table_selector_component.table_name == TestTableSelectorComponent.TABLE_NAME
-        # Check that the value was set to the dataframe of the table
-        assert table_selector_component.value == mock_dataframe
+        # Check that the value was set to a lazy handle to the table
+        assert table_selector_component.value == mock_lazy_table
+        mock_process.running_tool.tables.lazy.assert_called_once_with(TestTableSelectorComponent.TABLE_NAME)
 
     def test_table_selector_component_non_string_label(self):
         with pytest.raises(TypeError, match="Expected label to be a string"):
@@ -73,9 +74,9 @@ class TestTableSelectorComponent:
         mock_tables.get_table_names.return_value = ['table1']
         # Mock get_column_of_table
         mock_tables.get_columns_of_table.return_value = ['col1', 'col2']
-        # Mock tables.__getitem__
+        # Mock get_preview
         mock_rows = Mock()
-        mock_tables.__getitem__.return_value = Mock(head=Mock(return_value=mock_rows))
+        mock_tables.get_preview.return_value = mock_rows
         # Mock template.render
         mock_rendered_template = Mock()
         mock_template.render.return_value = mock_rendered_template
@@ -98,3 +99,6 @@ class TestTableSelectorComponent:
             component_id=table_selector_component.component_id,
             context=consts.GET_TABLE_TABLE_SELECT
         )
+        # Check that only a preview of the table was read
+        mock_tables.get_preview.assert_called_once_with('table1', TableSelectorComponent.NUM_PREVIEW_ROWS)
+        mock_tables.__getitem__.assert_not_called()
@@ -0,0 +1,143 @@
+import asyncio
+import json
+from unittest.mock import Mock, MagicMock, patch
+
+import pytest
+from aiohttp import web
+
+from coolNewLanguage.src import consts
+from coolNewLanguage.src.stage import jobs, process
+from coolNewLanguage.src.stage.jobs import Job, JobQueue, JobStatus
+from coolNewLanguage.src.stage.stage_executor import StageExecutor
+
+
+class TestJobs:
+    STAGE_NAME = 'stage'
+    RESULTS_TEMPLATE = '<html>results</html>'
+
+    @pytest.fixture
+    def job_queue(self) -> JobQueue:
+        job_queue = JobQueue()
+        yield job_queue
+        job_queue.shutdown()
+
+    @staticmethod
+    def run_job(job_queue: JobQueue, stage: Mock) -> Job:
+        """
+        Submits a job for the passed stage, and waits for it to finish
+        """
+        async def submit_and_wait() -> Job:
+            job = job_queue.submit(stage, {})
+            while not job.status.is_finished:
+                await asyncio.sleep(0.01)
+            return job
+
+        return asyncio.run(submit_and_wait())
+
+    def test_job_queue_submit_happy_path(self, job_queue: JobQueue):
+        # Setup
+        def process_post(post_body: dict) -> str:
+            jobs.report_progress(0.5, 'halfway')
+            return TestJobs.RESULTS_TEMPLATE
+        stage = Mock(_process_post=Mock(side_effect=process_post))
+        stage.name = TestJobs.STAGE_NAME
+
+        # Do
+        job = TestJobs.run_job(job_queue, stage)
+
+        # Check
+        assert job.status == JobStatus.SUCCEEDED
+        assert job.results_template == TestJobs.RESULTS_TEMPLATE
+        assert job.progress == 1.0
+        assert job.progress_message == 'halfway'
+        assert job.finished_at is not None
+        assert job_queue.get(job.id) is job
+        assert job_queue.list_jobs() == [job]
+
+    def test_job_queue_submit_failed_job(self, job_queue: JobQueue):
+        # Setup
+        stage = Mock(_process_post=Mock(side_effect=ValueError("bad input")))
+        stage.name = TestJobs.STAGE_NAME
+
+        # Do
+        job = TestJobs.run_job(job_queue, stage)
+
+        # Check
+        assert job.status == JobStatus.FAILED
+        assert job.error == "ValueError: bad input"
+        assert job.results_template is None
+
+    def test_job_queue_forgets_oldest_finished_jobs(self):
+        # Setup
+        job_queue = JobQueue(max_finished_jobs=1, executor=StageExecutor.inline())
+        stage = Mock(_process_post=Mock(return_value=None))
+        stage.name = TestJobs.STAGE_NAME
+
+        # Do
+        first_job = TestJobs.run_job(job_queue, stage)
+        second_job = TestJobs.run_job(job_queue, stage)
+        third_job = TestJobs.run_job(job_queue, stage)
+
+        # Check
+        assert job_queue.get(first_job.id) is None
+        assert job_queue.list_jobs() == [third_job, second_job]
+
+    def test_report_progress_outside_job(self):
+        # Do
+        jobs.report_progress(0.5)
+
+        # Check
+        assert process.current_job is None
+
+    def test_report_progress_out_of_range(self):
+        # Do, Check
+        with pytest.raises(ValueError, match="Expected fraction to be between 0 and 1"):
+            jobs.report_progress(1.5)
+
+    @patch.object(web, 'Response')
+    @patch('coolNewLanguage.src.stage.jobs.process')
+    def test_job_page_handler_finished_with_results(self, mock_process: MagicMock, mock_Response: MagicMock):
+        # Setup
+        job = Job(TestJobs.STAGE_NAME)
+        job.status = JobStatus.SUCCEEDED
+        job.results_template = TestJobs.RESULTS_TEMPLATE
+        mock_process.running_tool.job_queue.get.return_value = job
+        request = Mock(spec=web.Request)
+        request.match_info = {'job_id': job.id}
+
+        # Do
+        response = asyncio.run(jobs.job_page_handler(request))
+
+        # Check
+        mock_process.running_tool.job_queue.get.assert_called_with(job.id)
+        mock_Response.assert_called_with(body=TestJobs.RESULTS_TEMPLATE, content_type=consts.AIOHTTP_HTML)
+        assert response == mock_Response.return_value
+
+    @patch('coolNewLanguage.src.stage.jobs.process')
+    def test_job_status_handler(self, mock_process: MagicMock):
+        # Setup
+        job = Job(TestJobs.STAGE_NAME)
+        job.progress = 0.25
+        mock_process.running_tool.job_queue.get.return_value = job
+        request = Mock(spec=web.Request)
+        request.match_info = {'job_id': job.id}
+
+        # Do
+        response = asyncio.run(jobs.job_status_handler(request))
+
+        # Check
+        status = json.loads(response.text)
+        assert status['status'] == 'queued'
+        assert status['progress'] == 0.25
+        assert not status['finished']
+
+    @patch('coolNewLanguage.src.stage.jobs.process')
+    def test_job_status_handler_unknown_job(self, mock_process: MagicMock):
+        # Setup
+        mock_process.running_tool.job_queue.get.return_value = None
+        request = Mock(spec=web.Request)
+        request.match_info = {'job_id': 'unknown'}
+
+        # Do, Check
+        with pytest.raises(web.HTTPNotFound):
+            asyncio.run(jobs.job_status_handler(request))
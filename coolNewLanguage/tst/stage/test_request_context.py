@@ -0,0 +1,80 @@
+import contextvars
+import sys
+import types
+
+import pytest
+
+from coolNewLanguage.src.stage import request_context
+from coolNewLanguage.src.stage.request_context import ContextLocal
+
+
+class TestRequestContext:
+
+    def test_context_local_default_is_per_context(self):
+        # Setup
+        class Holder:
+            values = ContextLocal('values', list)
+
+        # Do
+        contextvars.copy_context().run(lambda: Holder.values.append(1))
+
+        # Check
+        # The append in the other context didn't affect this one
+        assert Holder.values == []
+
+    def test_context_local_set_does_not_leak(self):
+        # Setup
+        class Holder:
+            value = ContextLocal('value', int)
+        holder = Holder()
+        holder.value = 1
+
+        def set_value() -> int:
+            holder.value = 2
+            return holder.value
+
+        # Do
+        other_value = contextvars.copy_context().run(set_value)
+
+        # Check
+        assert other_value == 2
+        assert holder.value == 1
+
+    def test_context_local_non_callable_default_factory(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected default_factory to be callable"):
+            ContextLocal('value', 0)
+
+    def test_context_local_metaclass(self):
+        # Setup
+        class Counter(metaclass=request_context.context_local_metaclass('Counter', count=int)):
+            pass
+
+        def increment() -> int:
+            Counter.count += 1
+            return Counter.count
+
+        # Do
+        other_count = contextvars.copy_context().run(increment)
+
+        # Check
+        assert other_count == 1
+        assert Counter.count == 0
+
+    def test_make_module_context_local(self):
+        # Setup
+        module = types.ModuleType('context_local_test_module')
+        module.flag = False
+        module.shared = 'shared'
+        sys.modules[module.__name__] = module
+
+        try:
+            # Do
+            request_context.make_module_context_local(module.__name__, flag=bool)
+            contextvars.copy_context().run(setattr, module, 'flag', True)
+
+            # Check
+            assert module.flag is False
+            assert module.shared == 'shared'
+        finally:
+            del sys.modules[module.__name__]
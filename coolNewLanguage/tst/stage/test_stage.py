@@ -1,4 +1,5 @@
 import asyncio
+import threading
 import urllib.parse
 from unittest.mock import Mock, patch, NonCallableMock, AsyncMock, MagicMock
 
@@ -10,6 +11,7 @@ from coolNewLanguage.src import consts
 from coolNewLanguage.src.component.component import Component
 from coolNewLanguage.src.stage import config
 from coolNewLanguage.src.stage.stage import Stage
+from coolNewLanguage.src.stage.stage_executor import StageExecutor
 
 
 class TestStage:
@@ -123,6 +125,8 @@ class TestStage:
             mock_request: Mock
     ):
         # Setup
+        # Run stage_func on the event loop
+        mock_process.running_tool.stage_executor = StageExecutor.inline()
         # Mock the mock request's post method
         mock_post = AsyncMock()
         mock_request.post = mock_post
@@ -154,6 +158,8 @@ class TestStage:
     @patch('coolNewLanguage.src.stage.stage.process')
     def test_post_handler_no_results_set_happy_path(self, mock_process: MagicMock, stage: Stage, mock_request: Mock):
         # Setup
+        # Run stage_func on the event loop
+        mock_process.running_tool.stage_executor = StageExecutor.inline()
         # Mock the mock request's post method
         mock_post = AsyncMock()
         mock_request.post = mock_post
@@ -174,6 +180,41 @@ class TestStage:
         # Check raised redirect's location
         assert e.value.location == '/'
 
+    @patch('coolNewLanguage.src.stage.stage.upload_utils')
+    @patch('coolNewLanguage.src.stage.stage.process')
+    def test_post_handler_multipart_body(
+            self,
+            mock_process: MagicMock,
+            mock_upload_utils: MagicMock,
+            stage: Stage,
+            mock_request: Mock
+    ):
+        # Setup
+        # Run stage_func on the event loop
+        mock_process.running_tool.stage_executor = StageExecutor.inline()
+        mock_request.content_type = 'multipart/form-data'
+        mock_request.post = AsyncMock()
+        mock_post_body = Mock()
+        mock_upload_utils.read_multipart_post_body = AsyncMock(return_value=mock_post_body)
+        Stage.results_template = None
+
+        # Do, Check
+        with pytest.raises(web.HTTPFound):
+            asyncio.run(stage.post_handler(mock_request))
+
+        # Check
+        # Check the body was streamed rather than read with post
+        mock_request.post.assert_not_called()
+        mock_upload_utils.read_multipart_post_body.assert_called_with(
+            mock_request,
+            mock_process.running_tool.file_dir,
+            max_upload_bytes=mock_process.running_tool.max_upload_bytes,
+            hash_algorithm=mock_process.running_tool.upload_hash_algorithm
+        )
+        # Check uploads which weren't moved into place are discarded
+        mock_upload_utils.discard_uploads.assert_called_with(mock_post_body)
+        assert mock_process.post_body is None
+
     @patch.object(web, 'Response')
     @patch('coolNewLanguage.src.stage.stage.process')
     def test_post_handler_approvals_template_set_happy_path(
@@ -184,6 +225,8 @@ class TestStage:
             mock_request: Mock
     ):
         # Setup
+        # Run stage_func on the event loop
+        mock_process.running_tool.stage_executor = StageExecutor.inline()
         # Mock Stage.approvals_template
         mock_approvals_template = Mock()
         Stage.approvals_template = mock_approvals_template
@@ -199,10 +242,47 @@ class TestStage:
         assert Stage.approvals_template is None
         # Check that cached table changes were cleared
         mock_process.running_tool.tables._clear_changes.assert_called_once()
+        # Check that the approval session was persisted
+        mock_process.running_tool.approval_store.save.assert_called_once()
         # Check that web.Response was called and returned
         mock_Response.assert_called_with(body=mock_approvals_template, content_type=consts.AIOHTTP_HTML)
         assert response == mock_response_instance
 
+    @patch('coolNewLanguage.src.stage.stage.process')
+    def test_post_handler_background(self, mock_process: MagicMock, mock_request: Mock):
+        # Setup
+        stage_func = Mock()
+        stage = Stage(TestStage.STAGE_NAME, stage_func, background=True)
+        mock_post_body = Mock()
+        mock_request.post = AsyncMock(return_value=mock_post_body)
+        mock_job = mock_process.running_tool.job_queue.submit.return_value
+        mock_job.id = 'job_id'
+
+        # Do, Check
+        with pytest.raises(web.HTTPFound) as e:
+            asyncio.run(stage.post_handler(mock_request))
+
+        # Check
+        # Check that a job was submitted rather than stage_func being run
+        mock_process.running_tool.job_queue.submit.assert_called_once_with(stage, mock_post_body)
+        stage_func.assert_not_called()
+        # Check that the redirect is to the job's page
+        assert e.value.location == f'{consts.JOBS_ROUTE}/job_id'
+
+    @patch('coolNewLanguage.src.stage.stage.process')
+    def test_post_handler_stage_timeout(self, mock_process: MagicMock, mock_request: Mock):
+        # Setup
+        stage = Stage(TestStage.STAGE_NAME, lambda: threading.Event().wait(1))
+        mock_request.post = AsyncMock()
+        mock_process.running_tool.stage_executor = StageExecutor(timeout=0.01)
+
+        # Do, Check
+        try:
+            with pytest.raises(web.HTTPGatewayTimeout):
+                asyncio.run(stage.post_handler(mock_request))
+        finally:
+            mock_process.running_tool.stage_executor.shutdown()
+
     def test_post_handler_request_is_not_web_request(self, stage: Stage):
         # Do, Check
         with pytest.raises(TypeError, match="Expected request to be a web Request"):
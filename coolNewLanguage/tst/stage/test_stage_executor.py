@@ -0,0 +1,101 @@
+import asyncio
+import contextvars
+import threading
+
+import pytest
+
+from coolNewLanguage.src.stage.stage_executor import StageExecutor
+
+
+class TestStageExecutor:
+    STAGE_NAME = 'stage'
+
+    @pytest.fixture
+    def executor(self) -> StageExecutor:
+        executor = StageExecutor()
+        yield executor
+        executor.shutdown()
+
+    def test_run_on_thread(self, executor: StageExecutor):
+        # Do
+        thread_name = asyncio.run(executor.run(TestStageExecutor.STAGE_NAME, lambda: threading.current_thread().name))
+
+        # Check
+        assert thread_name.startswith('cnl-stage')
+
+    def test_run_in_copy_of_context(self, executor: StageExecutor):
+        # Setup
+        var = contextvars.ContextVar('var')
+
+        async def run() -> str:
+            var.set('request value')
+            return await executor.run(TestStageExecutor.STAGE_NAME, var.get)
+
+        # Do
+        value = asyncio.run(run())
+
+        # Check
+        assert value == 'request value'
+
+    def test_run_reraises(self, executor: StageExecutor):
+        # Setup
+        def fail():
+            raise ValueError("stage failed")
+
+        # Do, Check
+        with pytest.raises(ValueError, match="stage failed"):
+            asyncio.run(executor.run(TestStageExecutor.STAGE_NAME, fail))
+
+    def test_run_inline(self):
+        # Setup
+        executor = StageExecutor.inline()
+
+        # Do
+        thread = asyncio.run(executor.run(TestStageExecutor.STAGE_NAME, threading.current_thread))
+
+        # Check
+        assert thread is threading.current_thread()
+
+    def test_run_timeout(self, executor: StageExecutor):
+        # Setup
+        executor.limit_stage(TestStageExecutor.STAGE_NAME, timeout=0.01)
+        event = threading.Event()
+
+        # Do, Check
+        with pytest.raises(TimeoutError):
+            asyncio.run(executor.run(TestStageExecutor.STAGE_NAME, event.wait, 1))
+        event.set()
+
+    def test_run_max_concurrent(self, executor: StageExecutor):
+        # Setup
+        executor.limit_stage(TestStageExecutor.STAGE_NAME, max_concurrent=1)
+        running = []
+        max_running = []
+        lock = threading.Lock()
+
+        def work():
+            with lock:
+                running.append(1)
+                max_running.append(len(running))
+            threading.Event().wait(0.02)
+            with lock:
+                running.pop()
+
+        async def run_all():
+            await asyncio.gather(*[executor.run(TestStageExecutor.STAGE_NAME, work) for _ in range(3)])
+
+        # Do
+        asyncio.run(run_all())
+
+        # Check
+        assert max(max_running) == 1
+
+    def test_stage_executor_invalid_mode(self):
+        # Do, Check
+        with pytest.raises(ValueError, match="Expected mode to be one of"):
+            StageExecutor(mode='process')
+
+    def test_limit_stage_non_positive_timeout(self, executor: StageExecutor):
+        # Do, Check
+        with pytest.raises(ValueError, match="Expected timeout to be positive"):
+            executor.limit_stage(TestStageExecutor.STAGE_NAME, timeout=0)
@@ -0,0 +1,177 @@
+import pathlib
+from typing import Iterator
+from unittest.mock import Mock, patch
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src.arrow_table_store import ArrowTableStore
+from coolNewLanguage.src.tool import Tool
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+pytest.importorskip('pyarrow')
+
+
+class TestArrowTableStore:
+    TABLE_NAME = "table/name"
+    DATAFRAME = pd.DataFrame(
+        {'a': [1, 2, 3], 'b': ['x', None, 'z'], 'c': [1.5, None, 3.5]},
+        index=pd.Index([0, 1, 5], name=DB_INTERNAL_COLUMN_ID_NAME)
+    )
+
+    def test_write_and_read(self, tmp_path: pathlib.Path):
+        # Setup
+        store = ArrowTableStore(tmp_path)
+
+        # Do
+        store.write(TestArrowTableStore.TABLE_NAME, TestArrowTableStore.DATAFRAME)
+        df = store.read(TestArrowTableStore.TABLE_NAME)
+
+        # Check
+        assert store.has_table(TestArrowTableStore.TABLE_NAME)
+        assert store.path_of(TestArrowTableStore.TABLE_NAME).parent == tmp_path
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+        assert df.index.dtype == 'int64'
+        pd.testing.assert_frame_equal(
+            df.astype(object).where(df.notna(), None),
+            TestArrowTableStore.DATAFRAME.astype(object).where(TestArrowTableStore.DATAFRAME.notna(), None)
+        )
+
+    def test_read_missing_table(self, tmp_path: pathlib.Path):
+        # Do/Check
+        assert ArrowTableStore(tmp_path).read(TestArrowTableStore.TABLE_NAME) is None
+
+    def test_read_file_written_by_other_store(self, tmp_path: pathlib.Path):
+        # Setup
+        ArrowTableStore(tmp_path).write(TestArrowTableStore.TABLE_NAME, TestArrowTableStore.DATAFRAME)
+        # A new store over the same directory, as after the Tool restarts
+        store = ArrowTableStore(tmp_path)
+
+        # Do/Check
+        # The file may be stale, so it isn't read
+        assert not store.has_table(TestArrowTableStore.TABLE_NAME)
+        assert store.read(TestArrowTableStore.TABLE_NAME) is None
+
+    def test_delete(self, tmp_path: pathlib.Path):
+        # Setup
+        store = ArrowTableStore(tmp_path)
+        store.write(TestArrowTableStore.TABLE_NAME, TestArrowTableStore.DATAFRAME)
+
+        # Do
+        store.delete(TestArrowTableStore.TABLE_NAME)
+
+        # Check
+        assert not store.has_table(TestArrowTableStore.TABLE_NAME)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_write_non_internal_id_index(self, tmp_path: pathlib.Path):
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected df to be indexed by internal id"):
+            ArrowTableStore(tmp_path).write(TestArrowTableStore.TABLE_NAME, pd.DataFrame({'a': [1]}))
+
+    def test_non_path_directory(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected directory to be a Path or a string"):
+            ArrowTableStore(Mock())
+
+    @patch('importlib.util.find_spec', Mock(return_value=None))
+    def test_missing_package(self, tmp_path: pathlib.Path):
+        # Do/Check
+        with pytest.raises(ImportError, match="requires the pyarrow package"):
+            ArrowTableStore(tmp_path)
+
+
+class TestToolArrowTableStore:
+    TOOL_NAME = "arrow_tool"
+    TABLE_NAME = "table"
+    DATAFRAME = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+
+    @pytest.fixture
+    def tool(self, tmp_path: pathlib.Path, monkeypatch) -> Iterator[Tool]:
+        monkeypatch.setattr('coolNewLanguage.src.tool.DATA_DIR', tmp_path)
+
+        with patch('coolNewLanguage.src.tool.WebApp'), patch('aiohttp_jinja2.setup'):
+            tool = Tool(TestToolArrowTableStore.TOOL_NAME, file_dir_path=str(tmp_path), arrow_table_store=True)
+
+        yield tool
+
+        tool.db_engine.dispose()
+
+    def test_save_table_writes_store(self, tool: Tool):
+        # Do
+        tool.tables._save_table(TestToolArrowTableStore.TABLE_NAME, TestToolArrowTableStore.DATAFRAME)
+        tool.tables._cache.clear()
+        df = tool.tables[TestToolArrowTableStore.TABLE_NAME]
+
+        # Check
+        assert tool.tables._store.has_table(TestToolArrowTableStore.TABLE_NAME)
+        assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+        assert df['a'].tolist() == [1, 2, 3]
+        assert df['b'].tolist() == ['x', 'y', 'z']
+
+    def test_save_edited_table_updates_database_and_store(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestToolArrowTableStore.TABLE_NAME, TestToolArrowTableStore.DATAFRAME)
+        tool.tables._cache.clear()
+        df = tool.tables[TestToolArrowTableStore.TABLE_NAME]
+        df.loc[df.index[1], 'b'] = 'edited'
+
+        # Do
+        tool.tables._save_table(TestToolArrowTableStore.TABLE_NAME, df)
+
+        # Check
+        assert tool.tables._store.read(TestToolArrowTableStore.TABLE_NAME)['b'].tolist() == ['x', 'edited', 'z']
+        assert tool._get_table_dataframe(TestToolArrowTableStore.TABLE_NAME)['b'].tolist() == ['x', 'edited', 'z']
+
+    def test_read_backfills_store(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestToolArrowTableStore.TABLE_NAME, TestToolArrowTableStore.DATAFRAME)
+        tool.tables._store.delete(TestToolArrowTableStore.TABLE_NAME)
+        tool.tables._cache.clear()
+
+        # Do
+        df = tool.tables[TestToolArrowTableStore.TABLE_NAME]
+
+        # Check
+        assert df['a'].tolist() == [1, 2, 3]
+        assert tool.tables._store.has_table(TestToolArrowTableStore.TABLE_NAME)
+
+    def test_restart_reads_database_changes(self, tool: Tool, tmp_path: pathlib.Path):
+        # Setup
+        tool.tables._save_table(TestToolArrowTableStore.TABLE_NAME, TestToolArrowTableStore.DATAFRAME)
+        # Edit the table outside of the Tool, as another process sharing the database might
+        with tool.db_engine.begin() as conn:
+            table = sqlalchemy.table(TestToolArrowTableStore.TABLE_NAME, sqlalchemy.column('b'))
+            conn.execute(sqlalchemy.update(table).values(b='edited'))
+        tool.db_engine.dispose()
+
+        # Do
+        with patch('coolNewLanguage.src.tool.WebApp'), patch('aiohttp_jinja2.setup'):
+            restarted_tool = Tool(
+                TestToolArrowTableStore.TOOL_NAME, file_dir_path=str(tmp_path), arrow_table_store=True
+            )
+        df = restarted_tool.tables[TestToolArrowTableStore.TABLE_NAME]
+
+        # Check
+        # The database's version is read, and replaces the stale file
+        assert df['b'].tolist() == ['edited', 'edited', 'edited']
+        assert restarted_tool.tables._store.read(TestToolArrowTableStore.TABLE_NAME)['b'].tolist() == ['edited'] * 3
+        restarted_tool.db_engine.dispose()
+
+    def test_delete_table_deletes_store(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestToolArrowTableStore.TABLE_NAME, TestToolArrowTableStore.DATAFRAME)
+
+        # Do
+        tool.tables._delete_table(TestToolArrowTableStore.TABLE_NAME)
+
+        # Check
+        assert not tool.tables._store.has_table(TestToolArrowTableStore.TABLE_NAME)
+
+    def test_metadata_tables_not_stored(self, tool: Tool):
+        # Do
+        tool.tables._save_table('__metadata', TestToolArrowTableStore.DATAFRAME)
+
+        # Check
+        assert not tool.tables._store.has_table('__metadata')
@@ -139,9 +139,7 @@ class TestCell:
         # Check
         assert res == TestCell.YEAR_VAL + TestCell.OTHER_INT_VAL
 
-    @patch('coolNewLanguage.src.stage.process.running_tool')
-    @patch('coolNewLanguage.src.cell.update_cell')
-    def test_set(self, mock_update_cell: Mock, mock_running_tool: Mock, str_val_cell: Cell):
+    def test_set(self, str_val_cell: Cell):
         # Setup
         mock_type = Mock(spec=type, return_value=str(TestCell.OTHER_STR_VAL))
         str_val_cell.expected_type = mock_type
@@ -154,14 +152,8 @@ class TestCell:
         mock_type.assert_called_with(TestCell.OTHER_STR_VAL)
         # Check cell's val was updated
         assert str_val_cell.val == str(TestCell.OTHER_STR_VAL)
-        # Check update_cell was called
-        mock_update_cell.assert_called_with(
-            tool=mock_running_tool,
-            table=str_val_cell.table,
-            column_name=str_val_cell.col_name,
-            row_id=str_val_cell.row_id,
-            value=str(TestCell.OTHER_STR_VAL)
-        )
+        # Check the cell was marked dirty, to be written when its Row is saved
+        assert str_val_cell.dirty
 
     def test_set_type_cast_fails(self, str_val_cell: Cell):
         # Setup
@@ -173,9 +165,7 @@ class TestCell:
                            match=f"An error occurred while trying to cast {TestCell.OTHER_STR_VAL} to {mock_type}"):
             str_val_cell.set(TestCell.OTHER_STR_VAL)
 
-    @patch('coolNewLanguage.src.stage.process.running_tool')
-    @patch('coolNewLanguage.src.cell.update_cell')
-    def test_lshift(self, mock_update_cell: Mock, mock_running_tool: Mock, str_val_cell: Cell):
+    def test_lshift(self, str_val_cell: Cell):
         # lshift for cells is syntactic sugar for set, so just check for the same things
 
         # Setup
@@ -190,14 +180,8 @@ class TestCell:
         mock_type.assert_called_with(TestCell.OTHER_STR_VAL)
         # Check cell's val was updated
         assert str_val_cell.val == str(TestCell.OTHER_STR_VAL)
-        # Check update_cell was called
-        mock_update_cell.assert_called_with(
-            tool=mock_running_tool,
-            table=str_val_cell.table,
-            column_name=str_val_cell.col_name,
-            row_id=str_val_cell.row_id,
-            value=str(TestCell.OTHER_STR_VAL)
-        )
+        # Check the cell was marked dirty, to be written when its Row is saved
+        assert str_val_cell.dirty
 
     @pytest.fixture
     def str_val_cell_part_two(self, sqlalchemy_table: Mock) -> Cell:
@@ -0,0 +1,81 @@
+import pathlib
+from unittest.mock import Mock
+
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src.engine_profile import EngineProfile
+
+
+class TestEngineProfile:
+    @staticmethod
+    def read_pragma(engine: sqlalchemy.Engine, name: str):
+        with engine.connect() as conn:
+            return conn.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+    def test_create_engine_default_profile(self, tmp_path: pathlib.Path):
+        # Do
+        engine = EngineProfile().create_engine(tmp_path.joinpath('test.db'))
+
+        # Check
+        assert engine.echo is False
+        assert isinstance(engine.pool, sqlalchemy.QueuePool)
+        assert engine.pool.size() == 5
+        assert TestEngineProfile.read_pragma(engine, 'journal_mode') == 'wal'
+        # NORMAL
+        assert TestEngineProfile.read_pragma(engine, 'synchronous') == 1
+        assert TestEngineProfile.read_pragma(engine, 'cache_size') == -64 * 1024
+        # MEMORY
+        assert TestEngineProfile.read_pragma(engine, 'temp_store') == 2
+        assert TestEngineProfile.read_pragma(engine, 'busy_timeout') == 5000
+
+    def test_create_engine_sqlite_defaults(self, tmp_path: pathlib.Path):
+        # Do
+        engine = EngineProfile.sqlite_defaults().create_engine(tmp_path.joinpath('test.db'))
+
+        # Check
+        assert TestEngineProfile.read_pragma(engine, 'journal_mode') == 'delete'
+        # FULL
+        assert TestEngineProfile.read_pragma(engine, 'synchronous') == 2
+        assert TestEngineProfile.read_pragma(engine, 'mmap_size') == 0
+
+    def test_debug_profile_echoes(self, tmp_path: pathlib.Path):
+        # Do
+        engine = EngineProfile.debug().create_engine(tmp_path.joinpath('test.db'))
+
+        # Check
+        assert engine.echo is True
+
+    def test_engine_profile_lowercase_settings(self):
+        # Do
+        profile = EngineProfile(journal_mode='wal', synchronous='off', temp_store='file')
+
+        # Check
+        assert profile.pragmas()['journal_mode'] == 'WAL'
+        assert profile.pragmas()['synchronous'] == 'OFF'
+        assert profile.pragmas()['temp_store'] == 'FILE'
+
+    def test_engine_profile_invalid_journal_mode(self):
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected journal_mode to be one of"):
+            EngineProfile(journal_mode='fast')
+
+    def test_engine_profile_non_int_cache_size(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected cache_size to be an int"):
+            EngineProfile(cache_size=Mock())
+
+    def test_engine_profile_non_positive_pool_size(self):
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected pool_size to be positive"):
+            EngineProfile(pool_size=0)
+
+    def test_engine_profile_non_bool_echo(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected echo to be a bool"):
+            EngineProfile(echo=Mock())
+
+    def test_create_engine_non_path_db_path(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected db_path to be a Path or a string"):
+            EngineProfile().create_engine(Mock())
@@ -0,0 +1,131 @@
+import pathlib
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+import coolNewLanguage.src.tool as toolModule
+from coolNewLanguage.src.lazy_table import LazyTable
+from coolNewLanguage.src.schema_catalog import SchemaCatalog
+
+
+class TestLazyTable:
+    TABLE_NAME = "table_name"
+    DATAFRAME = pd.DataFrame({'a': [1, 2, 3, 4], 'b': ['w', 'x', 'y', 'z'], 'c': [1.0, 2.0, 3.0, 4.0]})
+
+    @pytest.fixture
+    def tool(self, tmp_path: pathlib.Path) -> Mock:
+        mock_tool = Mock(spec=toolModule.Tool)
+        mock_tool.db_engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path.joinpath("test.db")}')
+        mock_tool.db_metadata_obj = sqlalchemy.MetaData()
+        mock_tool.schema_catalog = SchemaCatalog(mock_tool.db_engine, mock_tool.db_metadata_obj)
+        mock_tool.get_table_from_table_name = lambda table_name: \
+            toolModule.Tool.get_table_from_table_name(mock_tool, table_name)
+        mock_tool.tables = Mock(_tables_to_save={})
+
+        with mock_tool.db_engine.connect() as conn:
+            TestLazyTable.DATAFRAME.to_sql(TestLazyTable.TABLE_NAME, conn, index=False)
+            conn.commit()
+
+        return mock_tool
+
+    @pytest.fixture
+    def lazy_table(self, tool: Mock) -> LazyTable:
+        return LazyTable(tool, TestLazyTable.TABLE_NAME)
+
+    def test_lazy_table_non_tool_tool(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected tool to be a Tool"):
+            LazyTable(Mock(), TestLazyTable.TABLE_NAME)
+
+    def test_lazy_table_non_string_table_name(self, tool: Mock):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected table_name to be a string"):
+            LazyTable(tool, Mock())
+
+    def test_columns_does_not_materialize(self, lazy_table: LazyTable):
+        # Do/Check
+        assert lazy_table.columns.tolist() == ['a', 'b', 'c']
+        assert lazy_table._df is None
+
+    def test_len(self, lazy_table: LazyTable):
+        # Do/Check
+        assert len(lazy_table) == 4
+        assert lazy_table.shape == (4, 3)
+        assert lazy_table._df is None
+
+    def test_get_item_column_list_projects(self, lazy_table: LazyTable):
+        # Do
+        projected = lazy_table[['a', 'c']]
+
+        # Check
+        assert isinstance(projected, LazyTable)
+        assert projected.columns.tolist() == ['a', 'c']
+        pd.testing.assert_frame_equal(projected.materialize(), TestLazyTable.DATAFRAME[['a', 'c']])
+
+    def test_get_item_column_list_unknown_column(self, lazy_table: LazyTable):
+        # Do/Check
+        with pytest.raises(KeyError):
+            lazy_table[['a', 'd']]
+
+    def test_get_item_single_column(self, lazy_table: LazyTable):
+        # Do
+        column = lazy_table['b']
+
+        # Check
+        pd.testing.assert_series_equal(column, TestLazyTable.DATAFRAME['b'])
+        assert lazy_table._df is None
+
+    def test_filter_rows(self, lazy_table: LazyTable):
+        # Do
+        filtered = lazy_table.filter_rows('a', '>', 2)[['b']]
+
+        # Check
+        assert len(filtered) == 2
+        assert filtered.materialize()['b'].tolist() == ['y', 'z']
+
+    def test_filter_rows_in(self, lazy_table: LazyTable):
+        # Do
+        filtered = lazy_table.filter_rows('b', 'in', ['w', 'z'])
+
+        # Check
+        assert filtered.materialize()['a'].tolist() == [1, 4]
+
+    def test_filter_rows_unknown_op(self, lazy_table: LazyTable):
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected op to be one of"):
+            lazy_table.filter_rows('a', '~', 2)
+
+    def test_head(self, lazy_table: LazyTable):
+        # Do
+        head = lazy_table.head(2)
+
+        # Check
+        pd.testing.assert_frame_equal(head, TestLazyTable.DATAFRAME.head(2))
+        assert lazy_table._df is None
+
+    def test_materialize_whole_table_uses_tables(self, tool: Mock, lazy_table: LazyTable):
+        # Setup
+        mock_dataframe = Mock()
+        tool.tables.__getitem__ = Mock(return_value=mock_dataframe)
+
+        # Do/Check
+        assert lazy_table.materialize() is mock_dataframe
+        tool.tables.__getitem__.assert_called_once_with(TestLazyTable.TABLE_NAME)
+
+    def test_get_attr_forwards_to_dataframe(self, lazy_table: LazyTable):
+        # Do
+        assigned = lazy_table[['a']].assign(d=lambda df: df['a'] * 2)
+
+        # Check
+        assert assigned['d'].tolist() == [2, 4, 6, 8]
+
+    def test_pending_changes_are_used(self, tool: Mock, lazy_table: LazyTable):
+        # Setup
+        tool.tables._tables_to_save[TestLazyTable.TABLE_NAME] = pd.DataFrame({'a': [10, 20], 'b': ['p', 'q']})
+
+        # Do/Check
+        assert lazy_table.columns.tolist() == ['a', 'b']
+        assert len(lazy_table) == 2
+        assert lazy_table.filter_rows('a', '==', 20)['b'].tolist() == ['q']
@@ -0,0 +1,62 @@
+import pytest
+
+from coolNewLanguage.src.link_cache import LinkAdjacency, LinkCache
+
+
+class TestLinkCache:
+    LINK_META_ID = 1
+    LINKS = [(1, 'a', 1, 'b', 10), (2, 'a', 1, 'b', 11), (3, 'a', 2, 'b', 10)]
+
+    @pytest.fixture
+    def link_cache(self) -> LinkCache:
+        return LinkCache()
+
+    def test_link_adjacency(self):
+        # Do
+        adjacency = LinkAdjacency(TestLinkCache.LINKS)
+
+        # Check
+        assert adjacency.links_from('a', 1) == [(1, 'b', 10), (2, 'b', 11)]
+        assert adjacency.links_to('b', 10) == [(1, 'a', 1), (3, 'a', 2)]
+        assert adjacency.links_from('b', 10) == []
+        assert adjacency.links_to('a', 1) == []
+
+    def test_put_and_get(self, link_cache: LinkCache):
+        # Setup
+        adjacency = LinkAdjacency(TestLinkCache.LINKS)
+
+        # Do
+        link_cache.put(TestLinkCache.LINK_META_ID, link_cache.generation(TestLinkCache.LINK_META_ID), adjacency)
+
+        # Check
+        assert link_cache.get(TestLinkCache.LINK_META_ID) is adjacency
+        assert link_cache.get(TestLinkCache.LINK_META_ID + 1) is None
+        assert len(link_cache) == 1
+
+    def test_invalidate(self, link_cache: LinkCache):
+        # Setup
+        link_cache.put(TestLinkCache.LINK_META_ID, 0, LinkAdjacency(TestLinkCache.LINKS))
+
+        # Do
+        link_cache.invalidate(TestLinkCache.LINK_META_ID)
+
+        # Check
+        assert link_cache.get(TestLinkCache.LINK_META_ID) is None
+        assert link_cache.generation(TestLinkCache.LINK_META_ID) == 1
+
+    def test_put_stale_adjacency(self, link_cache: LinkCache):
+        # Setup
+        generation = link_cache.generation(TestLinkCache.LINK_META_ID)
+        # Links are registered while the adjacency is being built
+        link_cache.invalidate(TestLinkCache.LINK_META_ID)
+
+        # Do
+        link_cache.put(TestLinkCache.LINK_META_ID, generation, LinkAdjacency(TestLinkCache.LINKS))
+
+        # Check
+        assert link_cache.get(TestLinkCache.LINK_META_ID) is None
+
+    def test_put_non_adjacency(self, link_cache: LinkCache):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected adjacency to be a LinkAdjacency"):
+            link_cache.put(TestLinkCache.LINK_META_ID, 0, TestLinkCache.LINKS)
@@ -7,7 +7,7 @@ import coolNewLanguage.src.cnl_type.cnl_type
 from coolNewLanguage.src.cell import Cell
 from coolNewLanguage.src.cnl_type.cnl_type import CNLType
 from coolNewLanguage.src.cnl_type.link_metatype import LinkMetatype
-from coolNewLanguage.src.component.table_selector_component import ColumnSelectorComponent
+from coolNewLanguage.src.component.column_selector_component import ColumnSelectorComponent
 from coolNewLanguage.src.row import Row
 from coolNewLanguage.src.stage import process
 from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
@@ -114,6 +114,7 @@ class TestRow:
         )
         assert cell1 == expected_cell_val
 
+    @pytest.mark.skip(reason="Row no longer accepts ColumnSelectorComponents as keys")
     def test_getitem_item_is_column_selector_component_cell_not_in_cell_mapping(self, row_1):
         # Setup
         # Check cell not in row's cell_mapping
@@ -159,7 +160,7 @@ class TestRow:
 
     def test_getitem_item_is_not_string_or_column_selector_component(self, row_1):
         # Do, Check
-        with pytest.raises(TypeError, match="Expected item to be a string or ColumnSelectorComponent"):
+        with pytest.raises(TypeError, match="Expected item to be a string"):
             _ = row_1[Mock()]
 
     @patch('coolNewLanguage.src.row.Cell')
@@ -185,12 +186,12 @@ class TestRow:
             table=row_1.table,
             col_name=TestRow.NAME_COLUMN,
             row_id=row_1.row_id,
-            expected_type=None,
             val=row_1.row_mapping[TestRow.NAME_COLUMN]
         )
         # Check that cell.set was called
         mock_cell_set.assert_called_with(TestRow.OSKI_BEAR)
 
+    @pytest.mark.skip(reason="Row no longer accepts ColumnSelectorComponents as keys")
     @patch('coolNewLanguage.src.row.Cell')
     def test_setitem_key_is_column_selector_component_happy_path(self, mock_cell: Mock, row_1):
         # Setup
@@ -239,6 +240,7 @@ class TestRow:
         # Check that the mock cell's set method was called
         mock_cell.set.assert_called_with(TestRow.OSKI_BEAR)
 
+    @pytest.mark.skip(reason="Row no longer accepts ColumnSelectorComponents as keys")
     def test_setitem_key_is_column_selector_component_key_in_cell_mapping_happy_path(self, row_1):
         # Setup
         # Put a mock cell in row's cell_mapping
@@ -266,6 +268,7 @@ class TestRow:
         with pytest.raises(ValueError, match=f"Key {TestRow.INVALID_COLUMN_NAME} is not a valid column name"):
             row_1[TestRow.INVALID_COLUMN_NAME] = TestRow.OSKI
 
+    @pytest.mark.skip(reason="Row no longer accepts ColumnSelectorComponents as keys")
     def test_setitem_key_is_column_selector_component_key_is_not_valid_column_name(self, row_1):
         # Setup
         column_selector_component = Mock(spec=ColumnSelectorComponent)
@@ -278,7 +281,7 @@ class TestRow:
 
     def test_setitem_key_is_not_string_or_column_selector_component(self, row_1):
         # Do, Check
-        with pytest.raises(TypeError, match="Expected key to be a string or a ColumnSelectorComponent"):
+        with pytest.raises(TypeError, match="Expected key to be a string"):
             row_1[Mock()] = Mock()
 
     def test_keys_happy_path(self, row_1):
@@ -437,7 +440,7 @@ class TestRow:
         mock_get_link_id.return_value = TestRow.LINK_ID
 
         # Do
-        link_id = row_1.link(link_dst=row_2, link_metatype=TestRow.LINK)
+        link = row_1.link(link_dst=row_2, link_metatype=TestRow.LINK)
 
         # Check
         # Check that get_link_id was called
@@ -451,7 +454,7 @@ class TestRow:
         )
         # Check that register_new_link wasn't called
         mock_register_new_link.assert_not_called()
-        assert link_id == TestRow.LINK_ID
+        assert link.link_id == TestRow.LINK_ID
 
     @patch('coolNewLanguage.src.row.register_new_link')
     @patch('coolNewLanguage.src.row.get_link_id')
@@ -470,3 +473,47 @@ class TestRow:
         mock_get_link_id.assert_not_called()
         mock_register_new_link.assert_not_called()
         assert link_id is None
+
+    @patch('coolNewLanguage.src.stage.process.running_tool')
+    @patch('coolNewLanguage.src.row.get_links_from')
+    def test_get_links_happy_path(self, mock_get_links_from: Mock, mock_running_tool: Mock, row_1: Row):
+        # Setup
+        process.handling_post = True
+
+        # Do
+        links = row_1.get_links(TestRow.LINK)
+
+        # Check
+        mock_get_links_from.assert_called_with(
+            mock_running_tool, TestRow.LINK_META_ID, TestRow.TABLE_NAME_1, TestRow.ROW_ID_1
+        )
+        assert links == mock_get_links_from.return_value
+
+    @patch('coolNewLanguage.src.stage.process.running_tool')
+    @patch('coolNewLanguage.src.row.get_links_to')
+    def test_get_backlinks_happy_path(self, mock_get_links_to: Mock, mock_running_tool: Mock, row_2: Row):
+        # Setup
+        process.handling_post = True
+
+        # Do
+        links = row_2.get_backlinks(TestRow.LINK)
+
+        # Check
+        mock_get_links_to.assert_called_with(
+            mock_running_tool, TestRow.LINK_META_ID, TestRow.TABLE_NAME_2, TestRow.ROW_ID_2
+        )
+        assert links == mock_get_links_to.return_value
+
+    @patch('coolNewLanguage.src.row.get_links_from')
+    def test_get_links_not_handling_post(self, mock_get_links_from: Mock, row_1: Row):
+        # Do
+        links = row_1.get_links(TestRow.LINK)
+
+        # Check
+        mock_get_links_from.assert_not_called()
+        assert links == []
+
+    def test_get_links_non_link_metatype(self, row_1: Row):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected link_metatype to be a LinkMetatype"):
+            row_1.get_links(Mock())
@@ -0,0 +1,80 @@
+import pathlib
+from unittest.mock import Mock
+
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src.schema_catalog import SchemaCatalog
+
+
+class TestSchemaCatalog:
+    TABLE_NAME = "table_name"
+
+    @pytest.fixture
+    def engine(self, tmp_path: pathlib.Path) -> sqlalchemy.Engine:
+        engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path.joinpath("test.db")}')
+        with engine.connect() as conn:
+            conn.execute(sqlalchemy.text(f'CREATE TABLE {TestSchemaCatalog.TABLE_NAME} (a INTEGER, b TEXT)'))
+            conn.commit()
+        return engine
+
+    @pytest.fixture
+    def schema_catalog(self, engine: sqlalchemy.Engine) -> SchemaCatalog:
+        return SchemaCatalog(engine)
+
+    @pytest.fixture
+    def statements(self, engine: sqlalchemy.Engine) -> list[str]:
+        statements = []
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+        return statements
+
+    def test_schema_catalog_non_engine_engine(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected engine to be a sqlalchemy Engine"):
+            SchemaCatalog(Mock())
+
+    def test_get_table_reflects_once(self, schema_catalog: SchemaCatalog, statements: list[str]):
+        # Do
+        first = schema_catalog.get_table(TestSchemaCatalog.TABLE_NAME)
+        num_statements = len(statements)
+        second = schema_catalog.get_table(TestSchemaCatalog.TABLE_NAME)
+
+        # Check
+        assert first.c.keys() == ['a', 'b']
+        assert second is first
+        assert num_statements > 0
+        assert len(statements) == num_statements
+
+    def test_get_table_not_found(self, schema_catalog: SchemaCatalog):
+        # Do/Check
+        assert schema_catalog.get_table('other_table') is None
+        assert not schema_catalog.has_table('other_table')
+        assert len(schema_catalog) == 0
+
+    def test_get_table_non_string_table_name(self, schema_catalog: SchemaCatalog):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected table_name to be a string"):
+            schema_catalog.get_table(Mock())
+
+    def test_invalidate_reflects_new_schema(self, engine: sqlalchemy.Engine, schema_catalog: SchemaCatalog):
+        # Setup
+        schema_catalog.get_table(TestSchemaCatalog.TABLE_NAME)
+        with engine.connect() as conn:
+            conn.execute(sqlalchemy.text(f'ALTER TABLE {TestSchemaCatalog.TABLE_NAME} ADD COLUMN c REAL'))
+            conn.commit()
+
+        # Do
+        schema_catalog.invalidate(TestSchemaCatalog.TABLE_NAME)
+
+        # Check
+        assert schema_catalog.get_table(TestSchemaCatalog.TABLE_NAME).c.keys() == ['a', 'b', 'c']
+
+    def test_clear(self, schema_catalog: SchemaCatalog):
+        # Setup
+        schema_catalog.get_table(TestSchemaCatalog.TABLE_NAME)
+
+        # Do
+        schema_catalog.clear()
+
+        # Check
+        assert len(schema_catalog) == 0
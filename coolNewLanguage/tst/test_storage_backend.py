@@ -0,0 +1,49 @@
+import pathlib
+from unittest.mock import Mock, patch
+
+import pytest
+
+from coolNewLanguage.src.engine_profile import EngineProfile
+from coolNewLanguage.src.storage_backend import DuckDBBackend, PostgresBackend, SQLiteBackend
+
+
+class TestStorageBackend:
+    TOOL_NAME = "tool_name"
+
+    def test_sqlite_backend_default_path(self, tmp_path: pathlib.Path):
+        # Setup
+        backend = SQLiteBackend()
+
+        # Do
+        engine = backend.create_engine(TestStorageBackend.TOOL_NAME, tmp_path)
+
+        # Check
+        assert engine.url.database == str(tmp_path.joinpath(f'{TestStorageBackend.TOOL_NAME}.db'))
+
+    def test_sqlite_backend_uses_engine_profile(self, tmp_path: pathlib.Path):
+        # Setup
+        db_path = tmp_path.joinpath('custom.db')
+        engine_profile = EngineProfile.debug()
+
+        # Do
+        engine = SQLiteBackend(db_path, engine_profile).create_engine(TestStorageBackend.TOOL_NAME, tmp_path)
+
+        # Check
+        assert engine.url.database == str(db_path)
+        assert engine.echo is True
+
+    def test_sqlite_backend_non_engine_profile_engine_profile(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected engine_profile to be an EngineProfile or None"):
+            SQLiteBackend(engine_profile=Mock())
+
+    @patch('importlib.util.find_spec', Mock(return_value=None))
+    def test_duckdb_backend_missing_package(self):
+        # Do/Check
+        with pytest.raises(ImportError, match="requires the duckdb-engine package"):
+            DuckDBBackend()
+
+    def test_postgres_backend_non_postgres_url(self):
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected url to be a postgresql:// URL"):
+            PostgresBackend('sqlite:///tool.db')
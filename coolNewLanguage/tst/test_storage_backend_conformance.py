@@ -0,0 +1,367 @@
+import importlib.util
+import os
+import pathlib
+from typing import Iterator
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src import models
+from coolNewLanguage.src.storage_backend import DuckDBBackend, PostgresBackend, SQLiteBackend, StorageBackend
+from coolNewLanguage.src.tool import Tool
+from coolNewLanguage.src.util import table_page_utils
+
+"""
+The URL of a Postgres database to run the Postgres conformance tests against. If unset, a throwaway local server is
+started with pgserver if it's installed, and the Postgres tests are skipped otherwise.
+"""
+POSTGRES_URL_ENV_VAR = 'HILT_TEST_POSTGRES_URL'
+
+
+@pytest.fixture(scope='session')
+def postgres_url(tmp_path_factory: pytest.TempPathFactory) -> Iterator[str]:
+    if os.environ.get(POSTGRES_URL_ENV_VAR):
+        yield os.environ[POSTGRES_URL_ENV_VAR]
+        return
+
+    if importlib.util.find_spec('pgserver') is None or importlib.util.find_spec('psycopg2') is None:
+        pytest.skip(f"Set {POSTGRES_URL_ENV_VAR} or install pgserver and psycopg2 to run the Postgres conformance tests")
+
+    import pgserver
+    server = pgserver.get_server(tmp_path_factory.mktemp('postgres'), cleanup_mode='stop')
+    yield server.get_uri()
+    server.cleanup()
+
+
+def make_sqlite_backend(tmp_path: pathlib.Path, request: pytest.FixtureRequest) -> StorageBackend:
+    return SQLiteBackend()
+
+
+def make_duckdb_backend(tmp_path: pathlib.Path, request: pytest.FixtureRequest) -> StorageBackend:
+    if importlib.util.find_spec('duckdb_engine') is None:
+        pytest.skip("Install duckdb-engine to run the DuckDB conformance tests")
+    return DuckDBBackend()
+
+
+def make_postgres_backend(tmp_path: pathlib.Path, request: pytest.FixtureRequest) -> StorageBackend:
+    url = request.getfixturevalue('postgres_url')
+    # Start every test from an empty database
+    engine = sqlalchemy.create_engine(url)
+    metadata = sqlalchemy.MetaData()
+    metadata.reflect(engine)
+    metadata.drop_all(engine)
+    engine.dispose()
+    return PostgresBackend(url)
+
+
+class TestStorageBackendConformance:
+    """
+    Runs the operations exercised by test_tables.py, whose tests mock out the database, against a real database on each
+    backend
+    """
+    TOOL_NAME = "conformance_tool"
+    TABLE_NAME = "conformance table"
+    DATAFRAME = pd.DataFrame({
+        'a': [1, 2, 3, 4],
+        'b': ['w', 'x', 'y', 'z'],
+        'c': [1.5, 2.5, None, 4.5]
+    })
+
+    @pytest.fixture(params=[make_sqlite_backend, make_duckdb_backend, make_postgres_backend],
+                    ids=['sqlite', 'duckdb', 'postgres'])
+    def tool(self, request: pytest.FixtureRequest, tmp_path: pathlib.Path, monkeypatch) -> Iterator[Tool]:
+        # Monkey patch DATA_DIR so that file-backed databases are created in tmp_path
+        monkeypatch.setattr('coolNewLanguage.src.tool.DATA_DIR', tmp_path)
+        backend = request.param(tmp_path, request)
+
+        with patch('coolNewLanguage.src.tool.WebApp'), patch('aiohttp_jinja2.setup'):
+            tool = Tool(TestStorageBackendConformance.TOOL_NAME, file_dir_path=str(tmp_path), storage_backend=backend)
+
+        yield tool
+
+        tool.db_engine.dispose()
+
+    @staticmethod
+    def read_back(tool: Tool, table_name: str = TABLE_NAME) -> pd.DataFrame:
+        tool.tables._cache.clear()
+        return tool.tables[table_name]
+
+    @staticmethod
+    def assert_same_rows(df: pd.DataFrame, expected: pd.DataFrame):
+        pd.testing.assert_frame_equal(
+            df.reset_index(drop=True),
+            expected.reset_index(drop=True),
+            check_dtype=False
+        )
+
+    def test_save_and_read_table(self, tool: Tool):
+        # Do
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+
+        # Check
+        assert TestStorageBackendConformance.TABLE_NAME in tool.tables
+        assert TestStorageBackendConformance.TABLE_NAME in tool.tables.get_table_names()
+        TestStorageBackendConformance.assert_same_rows(
+            TestStorageBackendConformance.read_back(tool),
+            TestStorageBackendConformance.DATAFRAME
+        )
+
+    def test_save_edited_table(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+        df = tool.tables[TestStorageBackendConformance.TABLE_NAME]
+        df.loc[df.index[1], 'b'] = 'edited'
+        df = df.drop(index=df.index[0])
+        df.loc[df.index.max() + 1] = [5, 'v', 5.5]
+
+        # Do
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, df)
+
+        # Check
+        result = TestStorageBackendConformance.read_back(tool)
+        assert result['a'].tolist() == [2, 3, 4, 5]
+        assert result['b'].tolist() == ['edited', 'y', 'z', 'v']
+
+    def test_save_table_with_new_schema(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+        df = tool.tables[TestStorageBackendConformance.TABLE_NAME].assign(d=['p', 'q', 'r', 's'])
+
+        # Do
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, df)
+
+        # Check
+        assert tool.tables.get_columns_of_table(TestStorageBackendConformance.TABLE_NAME) == ['a', 'b', 'c', 'd']
+        assert TestStorageBackendConformance.read_back(tool)['d'].tolist() == ['p', 'q', 'r', 's']
+
+    def test_delete_table(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+
+        # Do
+        tool.tables._delete_table(TestStorageBackendConformance.TABLE_NAME)
+
+        # Check
+        assert TestStorageBackendConformance.TABLE_NAME not in tool.tables
+        assert tool.get_table_from_table_name(TestStorageBackendConformance.TABLE_NAME) is None
+
+    def test_flush_changes(self, tool: Tool):
+        # Setup
+        tool.tables._save_table('to delete', TestStorageBackendConformance.DATAFRAME)
+        tool.tables._tables_to_save[TestStorageBackendConformance.TABLE_NAME] = TestStorageBackendConformance.DATAFRAME
+        tool.tables._tables_to_delete.add('to delete')
+
+        # Do
+        tool.tables._flush_changes()
+
+        # Check
+        assert set(tool.tables.get_table_names()) == {TestStorageBackendConformance.TABLE_NAME}
+        TestStorageBackendConformance.assert_same_rows(
+            TestStorageBackendConformance.read_back(tool),
+            TestStorageBackendConformance.DATAFRAME
+        )
+
+    def test_get_columns_and_preview(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+
+        # Do
+        columns = tool.tables.get_columns_of_table(TestStorageBackendConformance.TABLE_NAME)
+        preview = tool.tables.get_preview(TestStorageBackendConformance.TABLE_NAME, 2)
+
+        # Check
+        assert columns == ['a', 'b', 'c']
+        assert len(preview) == 2
+
+    def test_preview_after_update(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+        df = tool.tables[TestStorageBackendConformance.TABLE_NAME]
+        df.loc[df.index[0], 'b'] = 'edited'
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, df)
+
+        # Do
+        preview = tool.tables.get_preview(TestStorageBackendConformance.TABLE_NAME, 2)
+
+        # Check
+        # The preview shows the same first rows as the table, even though the updated row may be stored last
+        assert preview['b'].tolist() == ['edited', 'x']
+
+    def test_lazy_table(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+        lazy_table = tool.tables.lazy(TestStorageBackendConformance.TABLE_NAME)
+
+        # Do
+        filtered = lazy_table.filter_rows('a', '>', 2)[['b']]
+
+        # Check
+        assert len(lazy_table) == 4
+        assert lazy_table.columns.tolist() == ['a', 'b', 'c']
+        assert len(filtered) == 2
+        assert sorted(filtered.materialize()['b'].tolist()) == ['y', 'z']
+        assert lazy_table.filter_rows('b', 'in', ['w', 'z'])['a'].tolist() == [1, 4]
+
+    def test_iter_rows(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+
+        # Do
+        rows = list(tool.tables.iter_rows(TestStorageBackendConformance.TABLE_NAME, columns=['b', 'c'], batch_size=3))
+
+        # Check
+        assert [row['b'].get_val() for row in rows] == ['w', 'x', 'y', 'z']
+        assert rows[2]['c'].get_val() is None
+        assert all('a' not in row for row in rows)
+        assert len({row.row_id for row in rows}) == 4
+
+    def test_save_rows_in_stage(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+        rows = list(tool.tables.iter_rows(TestStorageBackendConformance.TABLE_NAME))
+
+        # Do
+        with patch('coolNewLanguage.src.stage.process.running_tool', tool), \
+                patch('coolNewLanguage.src.stage.process.handling_post', True):
+            for row in rows:
+                row['a'] = row['a'].get_val() * 10
+                row.save()
+            rows[0]['b'] = 'edited'
+            rows[0].save()
+            # Saved rows are only written when the stage's changes are flushed
+            assert len(tool.tables._row_updates[TestStorageBackendConformance.TABLE_NAME]) == 4
+            tool.tables._flush_changes()
+
+        # Check
+        expected = TestStorageBackendConformance.DATAFRAME.copy()
+        expected['a'] = expected['a'] * 10
+        expected.loc[0, 'b'] = 'edited'
+        TestStorageBackendConformance.assert_same_rows(TestStorageBackendConformance.read_back(tool), expected)
+
+    def test_save_row_then_write_table_in_stage(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+        row = next(iter(tool.tables.iter_rows(TestStorageBackendConformance.TABLE_NAME)))
+
+        # Do
+        with patch('coolNewLanguage.src.stage.process.running_tool', tool), \
+                patch('coolNewLanguage.src.stage.process.handling_post', True):
+            row['a'] << 100
+            row.save()
+            df = tool.tables[TestStorageBackendConformance.TABLE_NAME]
+            df['b'] += '!'
+            tool.tables[TestStorageBackendConformance.TABLE_NAME] = df
+            tool.tables._flush_changes()
+
+        # Check
+        # Writing back the table read after the save keeps the saved value
+        expected = TestStorageBackendConformance.DATAFRAME.copy()
+        expected.loc[0, 'a'] = 100
+        expected['b'] += '!'
+        TestStorageBackendConformance.assert_same_rows(TestStorageBackendConformance.read_back(tool), expected)
+
+    def test_save_sorted_table(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+        df = tool.tables[TestStorageBackendConformance.TABLE_NAME]
+
+        # Do
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, df.sort_values('b', ascending=False))
+
+        # Check
+        # The rows are read back in their new order
+        assert TestStorageBackendConformance.read_back(tool)['b'].tolist() == ['z', 'y', 'x', 'w']
+
+    def test_save_concatenated_rows_after_delete(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+        df = tool.tables[TestStorageBackendConformance.TABLE_NAME]
+        deleted_id = df.index[0]
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, df.drop(index=deleted_id))
+        df = tool.tables[TestStorageBackendConformance.TABLE_NAME]
+
+        # Do
+        tool.tables._save_table(
+            TestStorageBackendConformance.TABLE_NAME,
+            pd.concat([df, pd.DataFrame({'a': [99], 'b': ['v'], 'c': [9.5]})])
+        )
+
+        # Check
+        # The new row doesn't take the deleted row's id, and is read back last
+        result = TestStorageBackendConformance.read_back(tool)
+        assert result['a'].tolist() == [2, 3, 4, 99]
+        assert deleted_id not in result.index
+        assert result.index[-1] > df.index.max()
+
+    def test_select_table_page(self, tool: Tool):
+        # Setup
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+        table = tool.get_table_from_table_name(TestStorageBackendConformance.TABLE_NAME)
+
+        # Do
+        with tool.db_engine.connect() as conn:
+            page = table_page_utils.select_table_page(
+                table, conn, offset=1, limit=2, sort_column='a', descending=True, search='Y'
+            )
+
+        # Check
+        assert page.columns == ['a', 'b', 'c']
+        assert page.total_rows == 4
+        assert page.filtered_rows == 1
+        assert page.rows == []
+
+    def test_load_csv(self, tool: Tool, tmp_path: pathlib.Path):
+        # Setup
+        csv_path = tmp_path.joinpath('upload.csv')
+        TestStorageBackendConformance.DATAFRAME.to_csv(csv_path, index=False)
+        tool.tables._save_table(
+            TestStorageBackendConformance.TABLE_NAME,
+            TestStorageBackendConformance.DATAFRAME.head(1)
+        )
+
+        # Do
+        num_rows = tool.tables.load_csv(TestStorageBackendConformance.TABLE_NAME, str(csv_path), chunk_rows=3)
+
+        # Check
+        assert num_rows == 4
+        assert tool.tables.get_columns_of_table(TestStorageBackendConformance.TABLE_NAME) == ['a', 'b', 'c']
+        TestStorageBackendConformance.assert_same_rows(
+            TestStorageBackendConformance.read_back(tool),
+            TestStorageBackendConformance.DATAFRAME
+        )
+
+    def test_load_csv_discards_staged_row_updates(self, tool: Tool, tmp_path: pathlib.Path):
+        # Setup
+        csv_path = tmp_path.joinpath('upload.csv')
+        TestStorageBackendConformance.DATAFRAME.to_csv(csv_path, index=False)
+        tool.tables._save_table(TestStorageBackendConformance.TABLE_NAME, TestStorageBackendConformance.DATAFRAME)
+
+        # Do
+        with patch('coolNewLanguage.src.stage.process.running_tool', tool), \
+                patch('coolNewLanguage.src.stage.process.handling_post', True):
+            for row in tool.tables.iter_rows(TestStorageBackendConformance.TABLE_NAME):
+                row['b'] << 'ZZ'
+                row.save()
+            tool.tables.load_csv(TestStorageBackendConformance.TABLE_NAME, str(csv_path))
+            tool.tables._flush_changes()
+
+        # Check
+        # The updates to the replaced rows aren't written over the loaded ones
+        assert TestStorageBackendConformance.read_back(tool)['b'].tolist() == ['w', 'x', 'y', 'z']
+
+    def test_save_content(self, tool: Tool):
+        # Setup
+        content = models.UserContent(
+            content_name='content',
+            content_file_path='path/to/file.pdf',
+            content_type=models.ContentTypes.PDF
+        )
+
+        # Do
+        tool.save_content(content)
+
+        # Check
+        assert content.id is not None
+        assert [c.content_name for c in tool.get_content()] == ['content']
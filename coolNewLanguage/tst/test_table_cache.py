@@ -0,0 +1,120 @@
+import pandas as pd
+import pytest
+
+from coolNewLanguage.src.table_cache import TableCache
+
+
+class TestTableCache:
+    TABLE_NAME = "table_name"
+    MAX_BYTES = 1024**2
+
+    @pytest.fixture
+    def table_cache(self) -> TableCache:
+        return TableCache(TestTableCache.MAX_BYTES)
+
+    @pytest.fixture
+    def dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+
+    def test_table_cache_non_int_max_bytes(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected max_bytes to be an int"):
+            TableCache(None)
+
+    def test_table_cache_negative_max_bytes(self):
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected max_bytes to be non-negative"):
+            TableCache(-1)
+
+    def test_get_miss(self, table_cache: TableCache):
+        # Do/Check
+        assert table_cache.get(TestTableCache.TABLE_NAME, 0) is None
+
+    def test_put_then_get_happy_path(self, table_cache: TableCache, dataframe: pd.DataFrame):
+        # Do
+        table_cache.put(TestTableCache.TABLE_NAME, 0, dataframe)
+        cached = table_cache.get(TestTableCache.TABLE_NAME, 0)
+
+        # Check
+        pd.testing.assert_frame_equal(cached, dataframe)
+        assert cached is not dataframe
+        assert len(table_cache) == 1
+        assert table_cache.num_bytes > 0
+
+    def test_get_stale_version(self, table_cache: TableCache, dataframe: pd.DataFrame):
+        # Setup
+        table_cache.put(TestTableCache.TABLE_NAME, 0, dataframe)
+
+        # Do/Check
+        assert table_cache.get(TestTableCache.TABLE_NAME, 1) is None
+
+    def test_mutating_returned_dataframe_does_not_corrupt_cache(self, table_cache: TableCache, dataframe: pd.DataFrame):
+        # Setup
+        table_cache.put(TestTableCache.TABLE_NAME, 0, dataframe)
+
+        # Do
+        cached = table_cache.get(TestTableCache.TABLE_NAME, 0)
+        cached.loc[0, 'a'] = 100
+        dataframe.loc[1, 'a'] = 200
+
+        # Check
+        assert table_cache.get(TestTableCache.TABLE_NAME, 0)['a'].tolist() == [1, 2, 3]
+
+    def test_put_replaces_older_version(self, table_cache: TableCache, dataframe: pd.DataFrame):
+        # Setup
+        table_cache.put(TestTableCache.TABLE_NAME, 0, dataframe)
+
+        # Do
+        table_cache.put(TestTableCache.TABLE_NAME, 1, dataframe)
+
+        # Check
+        assert len(table_cache) == 1
+        assert table_cache.get(TestTableCache.TABLE_NAME, 0) is None
+        assert table_cache.get(TestTableCache.TABLE_NAME, 1) is not None
+
+    def test_put_evicts_least_recently_used(self, dataframe: pd.DataFrame):
+        # Setup
+        size = int(dataframe.memory_usage(index=True, deep=True).sum())
+        table_cache = TableCache(2 * size)
+        table_cache.put('1', 0, dataframe)
+        table_cache.put('2', 0, dataframe)
+        # Mark '1' as most recently used
+        table_cache.get('1', 0)
+
+        # Do
+        table_cache.put('3', 0, dataframe)
+
+        # Check
+        assert table_cache.get('1', 0) is not None
+        assert table_cache.get('2', 0) is None
+        assert table_cache.get('3', 0) is not None
+        assert table_cache.num_bytes == 2 * size
+
+    def test_put_dataframe_larger_than_budget(self, dataframe: pd.DataFrame):
+        # Setup
+        table_cache = TableCache(1)
+
+        # Do
+        table_cache.put(TestTableCache.TABLE_NAME, 0, dataframe)
+
+        # Check
+        assert len(table_cache) == 0
+        assert table_cache.num_bytes == 0
+
+    def test_put_non_dataframe_df(self, table_cache: TableCache):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected df to be a pandas DataFrame"):
+            table_cache.put(TestTableCache.TABLE_NAME, 0, None)
+
+    def test_invalidate(self, table_cache: TableCache, dataframe: pd.DataFrame):
+        # Setup
+        table_cache.put(TestTableCache.TABLE_NAME, 0, dataframe)
+        table_cache.put('other_table', 0, dataframe)
+
+        # Do
+        table_cache.invalidate(TestTableCache.TABLE_NAME)
+
+        # Check
+        assert table_cache.get(TestTableCache.TABLE_NAME, 0) is None
+        assert table_cache.get('other_table', 0) is not None
+        assert len(table_cache) == 1
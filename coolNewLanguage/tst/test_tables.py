@@ -1,4 +1,5 @@
 import random
+import threading
 from unittest.mock import Mock, MagicMock, patch, call
 
 import pandas as pd
@@ -45,7 +46,7 @@ class TestTables:
     @pytest.fixture
     @patch('coolNewLanguage.src.tables.sqlalchemy')
     def tables(self, mock_sqlalchemy: Mock) -> Tables:
-        mock_tool = Mock(spec=tool.Tool, db_engine=Mock())
+        mock_tool = Mock(spec=tool.Tool, db_engine=Mock(), schema_catalog=Mock())
 
         tables = Tables(mock_tool)
         tables._tables = MagicMock()
@@ -79,6 +80,40 @@ class TestTables:
         assert dataframe.name == TestTables.TABLE_NAME
         mock_get_table_dataframe.assert_called_once_with(TestTables.TABLE_NAME)
 
+    def test_tables_get_item_cached(self, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+
+        dataframe = pd.DataFrame({'a': [1, 2, 3]})
+        mock_get_table_dataframe = Mock(return_value=dataframe)
+        tables._tool._get_table_dataframe = mock_get_table_dataframe
+
+        # Do
+        first = tables[TestTables.TABLE_NAME]
+        second = tables[TestTables.TABLE_NAME]
+
+        # Check
+        mock_get_table_dataframe.assert_called_once_with(TestTables.TABLE_NAME)
+        pd.testing.assert_frame_equal(first, dataframe)
+        pd.testing.assert_frame_equal(second, dataframe)
+        assert second._name == TestTables.TABLE_NAME
+
+    def test_tables_get_item_reread_after_write(self, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+
+        mock_get_table_dataframe = Mock(return_value=pd.DataFrame({'a': [1, 2, 3]}))
+        tables._tool._get_table_dataframe = mock_get_table_dataframe
+        tables[TestTables.TABLE_NAME]
+
+        # Do
+        tables._bump_version(TestTables.TABLE_NAME)
+        tables[TestTables.TABLE_NAME]
+
+        # Check
+        assert mock_get_table_dataframe.call_count == 2
+        assert tables._versions[TestTables.TABLE_NAME] == 1
+
     def test_tables_get_item_non_string_table_name(self, tables: Tables):
         # Do/Check
         with pytest.raises(TypeError, match="Table name must be a string"):
@@ -194,42 +229,130 @@ class TestTables:
         # Do/Check
         assert TestTables.TABLE_NAME not in tables
 
-    def test_save_table_with_connection_happy_path(self, tables: Tables):
+    @patch('coolNewLanguage.src.tables.table_write_utils')
+    def test_save_table_with_connection_happy_path(self, mock_table_write_utils: Mock, tables: Tables):
         # Setup
+        tables._tables.__contains__.return_value = False
         mock_connection = Mock(spec=sqlalchemy.Connection)
         mock_dataframe = Mock(spec=pd.DataFrame)
+        mock_table_write_utils.with_internal_ids.side_effect = lambda df, stored_ids: df
+        mock_table_write_utils.can_write_diff.return_value = False
 
         # Do
         tables._save_table(TestTables.TABLE_NAME, mock_dataframe, mock_connection)
 
         # Check
-        mock_dataframe.to_sql.assert_called_once_with(
-            name=TestTables.TABLE_NAME,
-            con=mock_connection,
-            if_exists='replace'
+        # A new table's rows are numbered without regard to any stored ids
+        mock_table_write_utils.with_internal_ids.assert_called_once_with(mock_dataframe, None)
+        mock_table_write_utils.can_write_diff.assert_called_once_with(None, mock_dataframe)
+        mock_table_write_utils.write_full_table.assert_called_once_with(
+            mock_connection, TestTables.TABLE_NAME, mock_dataframe
         )
+        mock_table_write_utils.write_table_diff.assert_not_called()
+        tables._tool.schema_catalog.invalidate.assert_called_once_with(TestTables.TABLE_NAME)
 
         tables._tables.add.assert_called_once_with(TestTables.TABLE_NAME)
+        assert tables._versions[TestTables.TABLE_NAME] == 1
 
-    def test_save_table_no_connection_happy_path(self, tables: Tables):
+    @patch('coolNewLanguage.src.tables.table_write_utils')
+    def test_save_table_no_connection_happy_path(self, mock_table_write_utils: Mock, tables: Tables):
         # Setup
+        tables._tables.__contains__.return_value = False
         # Mock tables._tool._db_engine.connect
         mock_connection = MagicMock()
         tables._tool.db_engine.connect.return_value = mock_connection
         mock_dataframe = Mock(spec=pd.DataFrame)
+        mock_table_write_utils.with_internal_ids.side_effect = lambda df, stored_ids: df
+        mock_table_write_utils.can_write_diff.return_value = False
 
         # Do
         tables._save_table(TestTables.TABLE_NAME, mock_dataframe)
 
         # Check
-        mock_dataframe.to_sql.assert_called_once_with(
-            name=TestTables.TABLE_NAME,
-            con=mock_connection.__enter__.return_value,
-            if_exists='replace'
+        mock_table_write_utils.write_full_table.assert_called_once_with(
+            mock_connection.__enter__.return_value, TestTables.TABLE_NAME, mock_dataframe
         )
 
         tables._tables.add.assert_called_once_with(TestTables.TABLE_NAME)
 
+    @patch('coolNewLanguage.src.tables.table_write_utils')
+    def test_save_table_existing_table_writes_diff(self, mock_table_write_utils: Mock, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+        stored_dataframe = pd.DataFrame({'a': [1, 2]})
+        tables._tool._get_table_dataframe = Mock(return_value=stored_dataframe)
+        mock_connection = Mock(spec=sqlalchemy.Connection)
+        dataframe = pd.DataFrame({'a': [1, 3]})
+        mock_table_write_utils.with_internal_ids.side_effect = lambda df, stored_ids: df
+        mock_table_write_utils.can_write_diff.return_value = True
+
+        # Do
+        tables._save_table(TestTables.TABLE_NAME, dataframe, mock_connection)
+
+        # Check
+        mock_table_write_utils.write_table_diff.assert_called_once()
+        conn, table_name, passed_stored_dataframe, passed_dataframe = \
+            mock_table_write_utils.write_table_diff.call_args.args
+        assert conn is mock_connection
+        assert table_name == TestTables.TABLE_NAME
+        pd.testing.assert_frame_equal(passed_stored_dataframe, stored_dataframe)
+        assert passed_dataframe is dataframe
+        mock_table_write_utils.write_full_table.assert_not_called()
+        # A diff doesn't change the table's schema
+        tables._tool.schema_catalog.invalidate.assert_not_called()
+        # Check that the written DataFrame is cached as the new version, so reading it back doesn't query the database
+        pd.testing.assert_frame_equal(tables[TestTables.TABLE_NAME], dataframe)
+        tables._tool._get_table_dataframe.assert_called_once()
+
+    @patch('coolNewLanguage.src.tables.table_write_utils')
+    def test_append_rows_inserts_rows(self, mock_table_write_utils: Mock, tables: Tables):
+        # Setup
+        mock_connection = MagicMock()
+        tables._tool.db_engine.connect.return_value = mock_connection
+        tables._tool._get_table_dataframe = Mock()
+        dataframe = pd.DataFrame({'a': [3]})
+        mock_table_write_utils.can_append_rows.return_value = True
+
+        # Do
+        tables._append_rows(TestTables.TABLE_NAME, dataframe)
+
+        # Check
+        tables._tool.schema_catalog.get_table.assert_called_once_with(TestTables.TABLE_NAME)
+        mock_table_write_utils.can_append_rows.assert_called_once_with(
+            tables._tool.schema_catalog.get_table.return_value, dataframe
+        )
+        mock_table_write_utils.append_rows.assert_called_once_with(
+            mock_connection.__enter__.return_value, TestTables.TABLE_NAME, dataframe
+        )
+        # The existing rows aren't read or rewritten
+        tables._tool._get_table_dataframe.assert_not_called()
+        mock_table_write_utils.write_full_table.assert_not_called()
+        mock_table_write_utils.write_table_diff.assert_not_called()
+        tables._tool.schema_catalog.invalidate.assert_not_called()
+        assert tables._versions[TestTables.TABLE_NAME] == 1
+
+    @patch('coolNewLanguage.src.tables.table_write_utils')
+    def test_append_rows_incompatible_schema(self, mock_table_write_utils: Mock, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = False
+        stored_dataframe = pd.DataFrame({'a': [1, 2]})
+        tables._tool._get_table_dataframe = Mock(return_value=stored_dataframe)
+        tables._tool.db_engine.connect.return_value = MagicMock()
+        dataframe = pd.DataFrame({'a': ['three']}, index=[2])
+        mock_table_write_utils.can_append_rows.return_value = False
+        mock_table_write_utils.with_internal_ids.side_effect = lambda df, stored_ids: df
+        mock_table_write_utils.can_write_diff.return_value = False
+
+        # Do
+        tables._append_rows(TestTables.TABLE_NAME, dataframe)
+
+        # Check
+        # The table is rewritten with the rows appended
+        mock_table_write_utils.append_rows.assert_not_called()
+        _, table_name, written_dataframe = mock_table_write_utils.write_full_table.call_args.args
+        assert table_name == TestTables.TABLE_NAME
+        assert written_dataframe['a'].tolist() == [1, 2, 'three']
+
     def test_save_table_non_string_table_name(self, tables: Tables):
         # Do/Check
         with pytest.raises(TypeError, match="Expected table_name to be a string"):
@@ -258,7 +381,9 @@ class TestTables:
         # Check
         tables._tool.get_table_from_table_name.assert_called_once_with(TestTables.TABLE_NAME)
         mock_table.drop.assert_called_once_with(tables._tool.db_engine)
+        tables._tool.schema_catalog.invalidate.assert_called_once_with(TestTables.TABLE_NAME)
         tables._tables.remove.assert_called_once_with(TestTables.TABLE_NAME)
+        assert tables._versions[TestTables.TABLE_NAME] == 1
 
     def test_tables_delete_table_non_string_table_name(self, tables: Tables):
         # Do/Check
@@ -309,10 +434,125 @@ class TestTables:
 
         mock_clear_changes.assert_called_once()
 
+    @patch('coolNewLanguage.src.tables.config')
+    def test_stage_row_update_coalesces_updates(self, mock_config: Mock, tables: Tables):
+        # Setup
+        mock_config.building_template = True
+
+        # Do
+        tables._stage_row_update(TestTables.TABLE_NAME, 1, {'a': 10})
+        tables._stage_row_update(TestTables.TABLE_NAME, 1, {'a': 11, 'b': 'x'})
+        tables._stage_row_update(TestTables.TABLE_NAME, 2, {'a': 20})
+
+        # Check
+        assert tables._row_updates == {TestTables.TABLE_NAME: {1: {'a': 11, 'b': 'x'}, 2: {'a': 20}}}
+        tables._tool.db_engine.connect.assert_not_called()
+
+    @patch('coolNewLanguage.src.tables.Tables._update_rows')
+    @patch('coolNewLanguage.src.tables.process')
+    @patch('coolNewLanguage.src.tables.config')
+    def test_stage_row_update_outside_stage(
+            self,
+            mock_config: Mock,
+            mock_process: Mock,
+            mock_update_rows: Mock,
+            tables: Tables
+    ):
+        # Setup
+        mock_config.building_template = False
+        mock_process.handling_post = False
+        mock_process.handling_user_approvals = False
+
+        # Do
+        tables._stage_row_update(TestTables.TABLE_NAME, 1, {'a': 10})
+
+        # Check
+        mock_update_rows.assert_called_once_with(TestTables.TABLE_NAME, {1: {'a': 10}})
+        assert tables._row_updates == {}
+
+    @patch('coolNewLanguage.src.tables.config')
+    def test_stage_row_update_get_user_approvals(self, mock_config: Mock, tables: Tables):
+        # Setup
+        mock_config.building_template = True
+        tables._tables_to_save[TestTables.TABLE_NAME] = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']}, index=[1, 2])
+
+        # Do
+        tables._stage_row_update(TestTables.TABLE_NAME, 1, {'a': 10}, get_user_approvals=True)
+        tables._stage_row_update(TestTables.TABLE_NAME, 2, {'b': 'z'}, get_user_approvals=True)
+
+        # Check
+        # The updates are applied to the pending table, to be approved along with it
+        df = tables._tables_to_save[TestTables.TABLE_NAME]
+        assert df['a'].tolist() == [10, 2]
+        assert df['b'].tolist() == ['x', 'z']
+        assert tables._row_updates == {}
+
+    @patch('coolNewLanguage.src.tables.config')
+    def test_stage_row_update_get_user_approvals_row_not_found(self, mock_config: Mock, tables: Tables):
+        # Setup
+        mock_config.building_template = True
+        tables._tables_to_save[TestTables.TABLE_NAME] = pd.DataFrame({'a': [1, 2]}, index=[1, 2])
+
+        # Do/Check
+        with pytest.raises(KeyError, match=f"Row 3 not found in table {TestTables.TABLE_NAME}"):
+            tables._stage_row_update(TestTables.TABLE_NAME, 3, {'a': 30}, get_user_approvals=True)
+        assert tables._tables_to_save[TestTables.TABLE_NAME].index.tolist() == [1, 2]
+
+    def test_stage_row_update_non_dict_values(self, tables: Tables):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected values to be a dict"):
+            tables._stage_row_update(TestTables.TABLE_NAME, 1, Mock())
+
+    @patch('coolNewLanguage.src.tables.Tables._update_rows')
+    @patch('coolNewLanguage.src.tables.config')
+    def test_stage_row_update_updates_pending_table(self, mock_config: Mock, mock_update_rows: Mock, tables: Tables):
+        # Setup
+        mock_config.building_template = True
+        tables._tables.__contains__.return_value = True
+        tables._tables_to_save[TestTables.TABLE_NAME] = pd.DataFrame({'a': [1, 2]}, index=[1, 2])
+
+        # Do
+        tables._stage_row_update(TestTables.TABLE_NAME, 1, {'a': 10})
+        df = tables[TestTables.TABLE_NAME]
+
+        # Check
+        # The pending table sees the update, and reading the table writes it
+        assert df['a'].tolist() == [10, 2]
+        mock_update_rows.assert_called_once_with(TestTables.TABLE_NAME, {1: {'a': 10}})
+        assert tables._row_updates == {}
+
+    @patch('coolNewLanguage.src.tables.table_write_utils')
+    def test_flush_row_updates(self, mock_table_write_utils: Mock, tables: Tables):
+        # Setup
+        tables._row_updates['1'] = {1: {'a': 10}}
+        tables._row_updates['2'] = {2: {'b': 'x'}}
+        tables._tool.db_engine = MagicMock()
+        mock_connection = tables._tool.db_engine.begin.return_value.__enter__.return_value
+        # Record the versions when the transaction is committed
+        versions_at_commit = []
+        tables._tool.db_engine.begin.return_value.__exit__.side_effect = \
+            lambda *args: versions_at_commit.append(dict(tables._versions))
+
+        # Do
+        tables._flush_row_updates()
+
+        # Check
+        # All the updates are written in the same transaction
+        tables._tool.db_engine.begin.assert_called_once()
+        mock_table_write_utils.update_rows.assert_has_calls([
+            call(mock_connection, '1', {1: {'a': 10}}),
+            call(mock_connection, '2', {2: {'b': 'x'}})
+        ])
+        # The versions are only bumped once the updates are committed
+        assert versions_at_commit == [{}]
+        assert tables._versions == {'1': 1, '2': 1}
+        assert tables._row_updates == {}
+
     def test_clear_changes(self, tables: Tables):
         # Setup
         tables._tables_to_save = {'1': Mock(), '2': Mock()}
         tables._tables_to_delete = {'3', '4'}
+        tables._row_updates['5'] = {1: {'a': 10}}
 
         # Do
         tables._clear_changes()
@@ -320,6 +560,7 @@ class TestTables:
         # Check
         assert tables._tables_to_save == {}
         assert tables._tables_to_delete == set()
+        assert tables._row_updates == {}
 
     def test_tables_get_table_names_happy_path(self, tables: Tables):
         # Setup
@@ -391,4 +632,171 @@ class TestTables:
     def test_get_columns_of_table_table_not_found(self, tables: Tables):
         # Do/Check
         with pytest.raises(KeyError, match="Table table_name not found"):
-            tables.get_columns_of_table('table_name')
\ No newline at end of file
+            tables.get_columns_of_table('table_name')
+
+    def test_get_columns_of_table_reads_schema(self, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+        mock_table = Mock()
+        mock_table.c.keys.return_value = ['__hls_internal_id', 'col1', 'col2']
+        tables._tool.get_table_from_table_name.return_value = mock_table
+        tables._tool._get_table_dataframe = Mock()
+
+        # Do
+        columns = tables.get_columns_of_table('table_name')
+
+        # Check
+        assert columns == ['col1', 'col2']
+        tables._tool.get_table_from_table_name.assert_called_once_with('table_name')
+        tables._tool._get_table_dataframe.assert_not_called()
+
+    @patch('coolNewLanguage.src.tables.pd.read_sql_query')
+    def test_get_preview_happy_path(self, mock_read_sql_query: Mock, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+        mock_preview = Mock()
+        mock_read_sql_query.return_value = mock_preview
+        tables._tool.db_engine.connect.return_value = MagicMock()
+        tables._tool.schema_catalog.get_table.return_value = sqlalchemy.Table(
+            TestTables.TABLE_NAME,
+            sqlalchemy.MetaData(),
+            sqlalchemy.Column('__hls_internal_id', sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column('a', sqlalchemy.Integer)
+        )
+
+        # Do
+        first = tables.get_preview(TestTables.TABLE_NAME, 5)
+        second = tables.get_preview(TestTables.TABLE_NAME, 5)
+
+        # Check
+        assert first is mock_preview
+        assert second is mock_preview
+        mock_read_sql_query.assert_called_once()
+        stmt = mock_read_sql_query.call_args.args[0]
+        assert stmt._limit == 5
+        # The rows are ordered by internal id, as the table is read
+        assert [str(clause) for clause in stmt._order_by_clauses] == [f'{TestTables.TABLE_NAME}.__hls_internal_id']
+
+    @patch('coolNewLanguage.src.tables.pd.read_sql_query')
+    def test_get_preview_reread_after_write(self, mock_read_sql_query: Mock, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+        tables._tool.db_engine.connect.return_value = MagicMock()
+        tables._tool.schema_catalog.get_table.return_value = None
+        tables.get_preview(TestTables.TABLE_NAME, 5)
+
+        # Do
+        tables._bump_version(TestTables.TABLE_NAME)
+        tables.get_preview(TestTables.TABLE_NAME, 5)
+
+        # Check
+        assert mock_read_sql_query.call_count == 2
+
+    @patch('coolNewLanguage.src.tables.pd.read_sql_query')
+    def test_get_preview_written_while_read(self, mock_read_sql_query: Mock, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+        tables._tool.db_engine.connect.return_value = MagicMock()
+        tables._tool.schema_catalog.get_table.return_value = None
+        # Another thread writes to the table while the preview is read
+        mock_read_sql_query.side_effect = lambda *args: tables._bump_version(TestTables.TABLE_NAME)
+
+        # Do
+        tables.get_preview(TestTables.TABLE_NAME, 5)
+
+        # Check
+        # The preview may be stale, so it isn't kept
+        assert TestTables.TABLE_NAME not in tables._previews
+
+    def test_bump_version_concurrent(self, tables: Tables):
+        # Setup
+        num_threads = 8
+        num_bumps = 500
+        versions = []
+
+        def bump():
+            thread_versions = [tables._bump_version(TestTables.TABLE_NAME) for _ in range(num_bumps)]
+            versions.extend(thread_versions)
+
+        threads = [threading.Thread(target=bump) for _ in range(num_threads)]
+
+        # Do
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Check
+        # Every bump got its own version
+        assert sorted(versions) == list(range(1, num_threads * num_bumps + 1))
+        assert tables._versions[TestTables.TABLE_NAME] == num_threads * num_bumps
+
+    def test_get_preview_table_in_tables_to_save(self, tables: Tables):
+        # Setup
+        tables._tables_to_save[TestTables.TABLE_NAME] = pd.DataFrame({'a': range(10)})
+
+        # Do
+        preview = tables.get_preview(TestTables.TABLE_NAME, 3)
+
+        # Check
+        assert preview['a'].tolist() == [0, 1, 2]
+
+    def test_get_preview_table_not_found(self, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = False
+
+        # Do/Check
+        with pytest.raises(KeyError, match=f"Table {TestTables.TABLE_NAME} not found"):
+            tables.get_preview(TestTables.TABLE_NAME, 5)
+
+    def test_iter_rows_happy_path(self, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+        table = sqlalchemy.Table(
+            TestTables.TABLE_NAME,
+            sqlalchemy.MetaData(),
+            sqlalchemy.Column('__hls_internal_id', sqlalchemy.Integer, primary_key=True),
+            sqlalchemy.Column('a', sqlalchemy.Integer),
+            sqlalchemy.Column('b', sqlalchemy.String)
+        )
+        tables._tool.get_table_from_table_name.return_value = table
+        engine = sqlalchemy.create_engine('sqlite://')
+        table.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(sqlalchemy.insert(table), [{'a': i, 'b': str(i)} for i in range(5)])
+        tables._tool.db_engine = engine
+
+        # Do
+        rows = tables.iter_rows(TestTables.TABLE_NAME, columns=['b'], batch_size=2)
+
+        # Check
+        assert [(row.row_id, row.row_mapping) for row in rows] == [
+            (i + 1, {'__hls_internal_id': i + 1, 'b': str(i)}) for i in range(5)
+        ]
+
+    def test_iter_rows_unknown_column(self, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+        tables._tool.get_table_from_table_name.return_value = sqlalchemy.Table(
+            TestTables.TABLE_NAME,
+            sqlalchemy.MetaData(),
+            sqlalchemy.Column('__hls_internal_id', sqlalchemy.Integer, primary_key=True)
+        )
+
+        # Do/Check
+        with pytest.raises(KeyError, match="Column a not found"):
+            tables.iter_rows(TestTables.TABLE_NAME, columns=['a'])
+
+    def test_iter_rows_unsaved_changes(self, tables: Tables):
+        # Setup
+        tables._tables.__contains__.return_value = True
+        tables._tables_to_save[TestTables.TABLE_NAME] = pd.DataFrame()
+
+        # Do/Check
+        with pytest.raises(ValueError, match="has unsaved changes"):
+            tables.iter_rows(TestTables.TABLE_NAME)
+
+    def test_iter_rows_non_positive_batch_size(self, tables: Tables):
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected batch_size to be positive"):
+            tables.iter_rows(TestTables.TABLE_NAME, batch_size=0)
@@ -1,8 +1,10 @@
 import asyncio
+import json
 import os.path
 import pathlib
 from unittest.mock import patch, Mock, NonCallableMock, call, MagicMock
 
+import pandas as pd
 import pytest
 import sqlalchemy
 from aiohttp import web
@@ -12,6 +14,9 @@ from coolNewLanguage.src.consts import TEMPLATES_DIR, LANDING_PAGE_TEMPLATE_FILE
     LANDING_PAGE_STAGES
 import coolNewLanguage.src.tool as toolModule
 Tool = toolModule.Tool
+from coolNewLanguage.src.engine_profile import EngineProfile
+from coolNewLanguage.src.storage_backend import SQLiteBackend
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
 from coolNewLanguage.src.web_app import WebApp
 
 
@@ -74,8 +79,9 @@ class TestTool:
         mock_aiohttp_jinja2_setup.assert_called_with(tool.web_app.app, loader=mock_file_system_loader)
         # data directory exists
         assert os.path.exists(tmp_path)
-        # db engine was created
+        # db engine was created, with the default engine profile
         assert isinstance(tool.db_engine, sqlalchemy.Engine)
+        assert tool.db_engine.echo is False
         # sqlite file was created
         expected_db_path = tmp_path.joinpath(f'{TestTool.TOOL_NAME}.db')
         assert os.path.exists(expected_db_path)
@@ -92,7 +98,11 @@ class TestTool:
         assert tool.state == {}
         # tool has a Tables instance
         assert tool.tables is mock_tables
-        mock_tables_module.Tables.assert_called_with(tool)
+        mock_tables_module.Tables.assert_called_with(
+            tool,
+            cache_max_bytes=consts.DEFAULT_TABLE_CACHE_MAX_BYTES,
+            store=None
+        )
 
     def test_tool_non_string_tool_name(self):
         # Do, Check
@@ -129,6 +139,16 @@ class TestTool:
         expected_file_dir = pathlib.Path(TestTool.FILE_DIR_PATH)
         assert expected_file_dir == tool.file_dir
 
+    def test_tool_non_engine_profile_engine_profile(self):
+        # Do, Check
+        with pytest.raises(TypeError, match="Expected engine_profile to be an EngineProfile or None"):
+            Tool(tool_name=TestTool.TOOL_NAME, engine_profile=Mock())
+
+    def test_tool_engine_profile_and_storage_backend(self):
+        # Do, Check
+        with pytest.raises(ValueError, match="Expected only one of engine_profile and storage_backend to be passed"):
+            Tool(tool_name=TestTool.TOOL_NAME, engine_profile=EngineProfile(), storage_backend=SQLiteBackend())
+
     def test_tool_non_string_file_dir_path(self):
         # Do, Check
         with pytest.raises(TypeError, match="Expected file_dir_path to be a string"):
@@ -157,10 +177,18 @@ class TestTool:
         tool.add_stage(TestTool.STAGE_NAME, TestTool.STAGE_FUNC)
 
         # Check
-        mock_Stage.assert_called_with(TestTool.STAGE_NAME, TestTool.STAGE_FUNC)
+        mock_Stage.assert_called_with(TestTool.STAGE_NAME, TestTool.STAGE_FUNC, background=False)
         assert len(tool.stages) == length_before + 1
         assert tool.stages[-1] is mock_stage
 
+    @patch('coolNewLanguage.src.tool.Stage')
+    def test_add_stage_background(self, mock_Stage: Mock, tool: Tool):
+        # Do
+        tool.add_stage(TestTool.STAGE_NAME, TestTool.STAGE_FUNC, background=True)
+
+        # Check
+        mock_Stage.assert_called_with(TestTool.STAGE_NAME, TestTool.STAGE_FUNC, background=True)
+
     def test_add_stage_non_string_stage_name(self, tool: Tool):
         # Do, Check
         with pytest.raises(TypeError, match="Expected stage_name to be a string"):
@@ -194,6 +222,7 @@ class TestTool:
         routes = [
             web.get('/', tool.landing_page),
             web.get(consts.GET_TABLE_ROUTE, tool.get_table),
+            web.get(consts.GET_TABLE_DATA_ROUTE, tool.get_table_data),
             web.get(f'/{TestTool.STAGE_URL}', mock_stage.handle),
             web.post(f'/{TestTool.STAGE_URL}/post', mock_stage.post_handler),
             web.post(f'/{TestTool.STAGE_URL}/approve', mock_approval_handler)
@@ -287,7 +316,8 @@ class TestTool:
             template=mock_jinja_template,
             include_table_name=True,
             component_id=TestTool.COMPONENT_ID,
-            table_transient_id=TestTool.TABLE_TRANSIENT_ID
+            table_transient_id=TestTool.TABLE_TRANSIENT_ID,
+            server_side=False
         )
         # Check that the response has the expected body and content type
         mock_Response.assert_called_with(body=mock_template, content_type=consts.AIOHTTP_HTML)
@@ -441,6 +471,77 @@ class TestTool:
         with pytest.raises(TypeError, match="Expected request to be an aiohttp web Request"):
             asyncio.run(tool.get_table(Mock()))
 
+    @pytest.fixture
+    def tool_with_table(self, tool: Tool) -> Tool:
+        with tool.db_engine.connect() as conn:
+            pd.DataFrame({'a': range(30), 'b': [f'row {i}' for i in range(30)]}).to_sql(
+                TestTool.TABLE_NAME, conn, index=True, index_label=DB_INTERNAL_COLUMN_ID_NAME
+            )
+            conn.commit()
+        return tool
+
+    @staticmethod
+    def get_table_data(tool: Tool, query: dict) -> web.Response:
+        request = Mock(spec=web.Request)
+        request.query = {'table': TestTool.TABLE_NAME, **query}
+        return asyncio.run(tool.get_table_data(request))
+
+    def test_get_table_data_happy_path(self, tool_with_table: Tool):
+        # Do
+        response = TestTool.get_table_data(
+            tool_with_table,
+            {'offset': '5', 'limit': '3', 'sort': 'a', 'order': 'desc', 'draw': '2'}
+        )
+
+        # Check
+        assert response.status == 200
+        body = json.loads(response.body)
+        assert body['draw'] == 2
+        assert body['recordsTotal'] == 30
+        assert body['recordsFiltered'] == 30
+        assert body['columns'] == ['a', 'b']
+        assert body['data'] == [[24, 'row 24'], [23, 'row 23'], [22, 'row 22']]
+
+    def test_get_table_data_search_and_filter(self, tool_with_table: Tool):
+        # Do
+        response = TestTool.get_table_data(tool_with_table, {'search': 'ROW 1', 'filter[a]': '2'})
+
+        # Check
+        body = json.loads(response.body)
+        assert body['recordsTotal'] == 30
+        assert body['recordsFiltered'] == 1
+        assert body['data'] == [[12, 'row 12']]
+
+    def test_get_table_data_unknown_sort_column(self, tool_with_table: Tool):
+        # Do
+        response = TestTool.get_table_data(tool_with_table, {'sort': 'c'})
+
+        # Check
+        assert response.status == 400
+
+    def test_get_table_data_non_int_offset(self, tool_with_table: Tool):
+        # Do
+        response = TestTool.get_table_data(tool_with_table, {'offset': 'x'})
+
+        # Check
+        assert response.status == 400
+
+    def test_get_table_data_table_not_found(self, tool: Tool):
+        # Do
+        response = TestTool.get_table_data(tool, {})
+
+        # Check
+        assert response.status == 404
+
+    def test_get_table_data_missing_table_name_query_param(self, tool: Tool):
+        # Setup
+        request = Mock(spec=web.Request)
+        request.query = {}
+
+        # Do, Check
+        with pytest.raises(ValueError, match="Expected requested table name to be in request query"):
+            asyncio.run(tool.get_table_data(request))
+
     @patch('coolNewLanguage.src.tool.process')
     def test_user_input_received(self, mock_process: Mock, tool: Tool):
         # Setup
@@ -451,4 +552,150 @@ class TestTool:
         user_input_received = tool.user_input_received()
 
         # Check
-        assert user_input_received == mock_handling_post
\ No newline at end of file
+        assert user_input_received == mock_handling_post
+    @staticmethod
+    def make_link_rows(num_links: int) -> list[tuple]:
+        from coolNewLanguage.src.cnl_type.link_metatype import LinkMetatype
+        from coolNewLanguage.src.row import Row
+
+        link_metatype = Mock(spec=LinkMetatype)
+        link_metatype.get_link_meta_id.return_value = 1
+        links = []
+        for i in range(num_links):
+            src_row = Mock(spec=Row, row_id=i, table=Mock())
+            src_row.table.name = 'src_table'
+            dst_row = Mock(spec=Row, row_id=i + 10, table=Mock())
+            dst_row.table.name = 'dst_table'
+            links.append((link_metatype, src_row, dst_row))
+        return links
+
+    @patch('coolNewLanguage.src.util.link_utils.register_new_links')
+    @patch('coolNewLanguage.src.tool.process')
+    def test_register_links_happy_path(self, mock_process: Mock, mock_register_new_links: Mock, tool: Tool):
+        # Setup
+        mock_process.handling_post = True
+        links = TestTool.make_link_rows(2)
+        mock_links = [Mock(), Mock()]
+        mock_register_new_links.return_value = mock_links
+
+        # Do
+        registered_links = tool.register_links(links)
+
+        # Check
+        mock_register_new_links.assert_called_with(
+            tool, [(1, 'src_table', 0, 'dst_table', 10), (1, 'src_table', 1, 'dst_table', 11)]
+        )
+        assert registered_links == mock_links
+
+    @patch('coolNewLanguage.src.approvals.link_approve_result.LinkApproveResult')
+    @patch('coolNewLanguage.src.util.link_utils.get_link_ids')
+    @patch('coolNewLanguage.src.tool.process')
+    def test_register_links_get_user_approvals(
+            self,
+            mock_process: Mock,
+            mock_get_link_ids: Mock,
+            mock_LinkApproveResult: Mock,
+            tool: Tool
+    ):
+        # Setup
+        mock_process.handling_post = True
+        mock_process.approve_results = []
+        links = TestTool.make_link_rows(2)
+        # The second link is asked for twice, but only needs approving once
+        links.append(links[1])
+        mock_get_link_ids.return_value = [5, None, None]
+
+        # Do
+        registered_links = tool.register_links(links, get_user_approvals=True)
+
+        # Check
+        assert [link.link_id for link in registered_links] == [5, None, None]
+        assert mock_process.approve_results == [mock_LinkApproveResult.return_value]
+        mock_LinkApproveResult.assert_called_once_with(link=registered_links[1])
+
+    @patch('coolNewLanguage.src.tool.process')
+    def test_register_links_not_handling_post(self, mock_process: Mock, tool: Tool):
+        # Setup
+        mock_process.handling_post = False
+
+        # Do, Check
+        assert tool.register_links(TestTool.make_link_rows(2)) == [None, None]
+
+    def test_register_links_non_tuple_link(self, tool: Tool):
+        # Do, Check
+        with pytest.raises(TypeError, match="Expected each link to be a"):
+            tool.register_links([Mock()])
+
+    @patch('coolNewLanguage.src.util.link_utils.get_link_ids')
+    @patch('coolNewLanguage.src.tool.process')
+    def test_get_links_happy_path(self, mock_process: Mock, mock_get_link_ids: Mock, tool: Tool):
+        # Setup
+        mock_process.handling_post = True
+        mock_get_link_ids.return_value = [None, 7]
+
+        # Do
+        links = tool.get_links(TestTool.make_link_rows(2))
+
+        # Check
+        assert links[0] is None
+        assert links[1].link_id == 7
+        assert links[1].dst_row_id == 11
+
+    @patch('coolNewLanguage.src.util.link_traversal_utils.get_rows')
+    @patch('coolNewLanguage.src.util.link_traversal_utils.expand')
+    @patch('coolNewLanguage.src.tool.process')
+    def test_expand_links_happy_path(self, mock_process: Mock, mock_expand: Mock, mock_get_rows: Mock, tool: Tool):
+        # Setup
+        from coolNewLanguage.src.util.link_traversal_utils import LinkDirection
+
+        mock_process.handling_post = True
+        link_metatype, src_row, _ = TestTool.make_link_rows(1)[0]
+        mock_expand.return_value = iter([[(('dst_table', 10), 1)], [(('dst_table', 11), 2)]])
+
+        # Do
+        batches = list(tool.expand_links(src_row, link_metatype, max_hops=2, direction='backward'))
+
+        # Check
+        mock_expand.assert_called_with(tool, [('src_table', 0)], [1], 2, LinkDirection.BACKWARD, 1000)
+        mock_get_rows.assert_has_calls([call(tool, [('dst_table', 10)]), call(tool, [('dst_table', 11)])])
+        assert batches == [mock_get_rows.return_value, mock_get_rows.return_value]
+
+    @patch('coolNewLanguage.src.util.link_traversal_utils.expand')
+    @patch('coolNewLanguage.src.tool.process')
+    def test_expand_links_not_handling_post(self, mock_process: Mock, mock_expand: Mock, tool: Tool):
+        # Setup
+        mock_process.handling_post = False
+        link_metatype, src_row, _ = TestTool.make_link_rows(1)[0]
+
+        # Do
+        batches = list(tool.expand_links(src_row, link_metatype, max_hops=2))
+
+        # Check
+        mock_expand.assert_not_called()
+        assert batches == []
+
+    def test_expand_links_invalid_direction(self, tool: Tool):
+        # Setup
+        link_metatype, src_row, _ = TestTool.make_link_rows(1)[0]
+
+        # Do/Check
+        with pytest.raises(ValueError):
+            tool.expand_links(src_row, link_metatype, max_hops=2, direction='sideways')
+
+    @patch('coolNewLanguage.src.util.link_traversal_utils.find_path')
+    @patch('coolNewLanguage.src.tool.process')
+    def test_find_link_path_happy_path(self, mock_process: Mock, mock_find_path: Mock, tool: Tool):
+        # Setup
+        from coolNewLanguage.src.util.link_traversal_utils import LinkDirection
+
+        mock_process.handling_post = True
+        link_metatype, src_row, dst_row = TestTool.make_link_rows(1)[0]
+
+        # Do
+        path = tool.find_link_path(src_row, dst_row, [link_metatype], max_hops=3)
+
+        # Check
+        mock_find_path.assert_called_with(
+            tool, ('src_table', 0), ('dst_table', 10), [1], 3, LinkDirection.FORWARD
+        )
+        assert path == mock_find_path.return_value
@@ -0,0 +1,114 @@
+import pathlib
+from unittest.mock import Mock
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src.util import csv_ingest_utils
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+
+class TestCsvIngestUtils:
+    TABLE_NAME = "table"
+    CSV = "a,b,c,\n1,x,1.5,True\n2,,2.5,False\n3,z,,True\n"
+
+    @pytest.fixture
+    def engine(self, tmp_path: pathlib.Path) -> sqlalchemy.Engine:
+        return sqlalchemy.create_engine(f'sqlite:///{tmp_path.joinpath("test.db")}')
+
+    @pytest.fixture
+    def csv_path(self, tmp_path: pathlib.Path) -> pathlib.Path:
+        csv_path = tmp_path.joinpath('test.csv')
+        csv_path.write_text(TestCsvIngestUtils.CSV)
+        return csv_path
+
+    @staticmethod
+    def read_table(engine: sqlalchemy.Engine) -> pd.DataFrame:
+        with engine.connect() as conn:
+            return pd.read_sql_table(TestCsvIngestUtils.TABLE_NAME, conn, index_col=DB_INTERNAL_COLUMN_ID_NAME)
+
+    def test_infer_column_types(self):
+        # Setup
+        sample = pd.DataFrame({'i': [1, 2], 'f': [1.5, None], 'b': [True, False], 's': ['x', None]})
+
+        # Do
+        column_types = csv_ingest_utils.infer_column_types(sample)
+
+        # Check
+        assert {column: dtype for column, (dtype, _) in column_types.items()} == \
+            {'i': 'Int64', 'f': 'float64', 'b': 'boolean', 's': 'object'}
+        assert isinstance(column_types['i'][1], sqlalchemy.BigInteger)
+        assert isinstance(column_types['s'][1], sqlalchemy.Text)
+
+    def test_ingest_csv_file_in_chunks(self, engine: sqlalchemy.Engine, csv_path: pathlib.Path):
+        # Setup
+        progress = Mock()
+
+        # Do
+        with engine.connect() as conn:
+            num_rows = csv_ingest_utils.ingest_csv_file(
+                conn, TestCsvIngestUtils.TABLE_NAME, csv_path, chunk_rows=2, progress=progress
+            )
+
+        # Check
+        assert num_rows == 3
+        df = TestCsvIngestUtils.read_table(engine)
+        assert df.index.tolist() == [0, 1, 2]
+        assert df.columns.tolist() == ['a', 'b', 'c', 'Col 3']
+        assert df['a'].tolist() == [1, 2, 3]
+        assert df['b'].tolist() == ['x', None, 'z']
+        assert df['Col 3'].tolist() == [True, False, True]
+        assert [call.args[0].rows_written for call in progress.call_args_list] == [2, 3]
+        assert progress.call_args_list[-1].args[0].fraction_read == 1.0
+
+    def test_ingest_csv_file_without_header(self, engine: sqlalchemy.Engine, csv_path: pathlib.Path):
+        # Do
+        with engine.connect() as conn:
+            num_rows = csv_ingest_utils.ingest_csv_file(conn, TestCsvIngestUtils.TABLE_NAME, csv_path, has_header=False)
+
+        # Check
+        assert num_rows == 4
+        assert TestCsvIngestUtils.read_table(engine).columns.tolist() == ['Col 0', 'Col 1', 'Col 2', 'Col 3']
+
+    def test_ingest_csv_file_replaces_table(self, engine: sqlalchemy.Engine, csv_path: pathlib.Path):
+        # Setup
+        with engine.connect() as conn:
+            pd.DataFrame({'old': [1]}).to_sql(TestCsvIngestUtils.TABLE_NAME, conn)
+            conn.commit()
+
+        # Do
+        with engine.connect() as conn:
+            csv_ingest_utils.ingest_csv_file(conn, TestCsvIngestUtils.TABLE_NAME, csv_path)
+
+        # Check
+        assert TestCsvIngestUtils.read_table(engine).columns.tolist() == ['a', 'b', 'c', 'Col 3']
+
+    def test_ingest_csv_file_type_mismatch_after_sample(
+            self, engine: sqlalchemy.Engine, csv_path: pathlib.Path):
+        # Setup
+        with engine.connect() as conn:
+            pd.DataFrame({'old': [1]}).to_sql(TestCsvIngestUtils.TABLE_NAME, conn)
+            conn.commit()
+        csv_path.write_text(TestCsvIngestUtils.CSV + "not a number,w,4.5,True\n")
+
+        # Do/Check
+        with engine.connect() as conn:
+            with pytest.raises(ValueError, match="Pass a larger sample_rows"):
+                csv_ingest_utils.ingest_csv_file(conn, TestCsvIngestUtils.TABLE_NAME, csv_path, sample_rows=3)
+
+        # The previous table is left in place
+        with engine.connect() as conn:
+            assert pd.read_sql_table(TestCsvIngestUtils.TABLE_NAME, conn).columns.tolist() == ['index', 'old']
+
+    def test_ingest_csv_file_non_positive_chunk_rows(self, engine: sqlalchemy.Engine, csv_path: pathlib.Path):
+        # Do/Check
+        with engine.connect() as conn:
+            with pytest.raises(ValueError, match="Expected chunk_rows to be positive"):
+                csv_ingest_utils.ingest_csv_file(conn, TestCsvIngestUtils.TABLE_NAME, csv_path, chunk_rows=0)
+
+    def test_ingest_csv_file_non_callable_progress(self, engine: sqlalchemy.Engine, csv_path: pathlib.Path):
+        # Do/Check
+        with engine.connect() as conn:
+            with pytest.raises(TypeError, match="Expected progress to be callable or None"):
+                csv_ingest_utils.ingest_csv_file(conn, TestCsvIngestUtils.TABLE_NAME, csv_path, progress=1)
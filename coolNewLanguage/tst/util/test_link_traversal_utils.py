@@ -0,0 +1,138 @@
+import pathlib
+from unittest.mock import Mock
+
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src import models
+from coolNewLanguage.src.link_cache import LinkCache
+from coolNewLanguage.src.row import Row
+from coolNewLanguage.src.schema_catalog import SchemaCatalog
+from coolNewLanguage.src.tool import Tool
+from coolNewLanguage.src.util import link_traversal_utils, link_utils
+from coolNewLanguage.src.util.link_traversal_utils import LinkDirection
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+
+class TestLinkTraversalUtils:
+    NEAR = 1
+    SERVES = 2
+    COUNTY = ('counties', 1)
+    FIRES = [('fires', 1), ('fires', 2)]
+    FACILITIES = [('facilities', 1), ('facilities', 2)]
+
+    @pytest.fixture
+    def tool(self, tmp_path: pathlib.Path) -> Mock:
+        engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path.joinpath("test.db")}')
+        models.Base.metadata.create_all(engine)
+        metadata = sqlalchemy.MetaData()
+        for table_name in ('counties', 'fires', 'facilities'):
+            table = sqlalchemy.Table(
+                table_name,
+                metadata,
+                sqlalchemy.Column(DB_INTERNAL_COLUMN_ID_NAME, sqlalchemy.Integer, primary_key=True),
+                sqlalchemy.Column('name', sqlalchemy.String)
+            )
+            metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(sqlalchemy.insert(table), [{'name': f'{table_name}_{i}'} for i in (1, 2)])
+
+        tool = Mock(spec=Tool)
+        tool.db_engine = engine
+        tool.get_table_from_table_name = SchemaCatalog(engine).get_table
+        tool.link_cache = LinkCache()
+
+        # Both fires are near the county, and each serves a facility, the second of which is also near the county
+        link_utils.register_new_links(tool, [
+            (TestLinkTraversalUtils.NEAR, 'fires', 1, 'counties', 1),
+            (TestLinkTraversalUtils.NEAR, 'fires', 2, 'counties', 1),
+            (TestLinkTraversalUtils.SERVES, 'facilities', 1, 'fires', 1),
+            (TestLinkTraversalUtils.SERVES, 'facilities', 2, 'fires', 2),
+            (TestLinkTraversalUtils.NEAR, 'facilities', 2, 'counties', 1),
+        ])
+        return tool
+
+    @pytest.mark.parametrize('cached', [False, True])
+    def test_get_neighbors_happy_path(self, tool: Mock, cached: bool):
+        # Setup
+        if cached:
+            link_utils.get_links_from(tool, self.NEAR, 'fires', 1)
+
+        # Do
+        neighbors = link_traversal_utils.get_neighbors(tool, [self.COUNTY], [self.NEAR], LinkDirection.BACKWARD)
+
+        # Check
+        assert [row_key for _, row_key in neighbors[self.COUNTY]] == self.FIRES + [self.FACILITIES[1]]
+        assert all(link.dst_table_name == 'counties' for link, _ in neighbors[self.COUNTY])
+        assert len(tool.link_cache) == int(cached)
+
+    def test_get_neighbors_both_directions(self, tool: Mock):
+        # Do
+        neighbors = link_traversal_utils.get_neighbors(
+            tool, [self.FIRES[0]], [self.NEAR, self.SERVES], LinkDirection.BOTH
+        )
+
+        # Check
+        assert {row_key for _, row_key in neighbors[self.FIRES[0]]} == {self.COUNTY, self.FACILITIES[0]}
+
+    def test_expand_happy_path(self, tool: Mock):
+        # Do
+        batches = list(link_traversal_utils.expand(
+            tool, [self.COUNTY], [self.NEAR, self.SERVES], max_hops=2, direction=LinkDirection.BACKWARD, batch_size=2
+        ))
+
+        # Check
+        # The second facility is reached once, in one hop, and rows come in batches of at most 2
+        assert batches == [
+            [(self.FIRES[0], 1), (self.FIRES[1], 1)],
+            [(self.FACILITIES[1], 1), (self.FACILITIES[0], 2)]
+        ]
+
+    def test_expand_max_hops(self, tool: Mock):
+        # Do
+        batches = list(link_traversal_utils.expand(
+            tool, [self.COUNTY], [self.NEAR, self.SERVES], max_hops=1, direction=LinkDirection.BACKWARD
+        ))
+
+        # Check
+        assert batches == [[(self.FIRES[0], 1), (self.FIRES[1], 1), (self.FACILITIES[1], 1)]]
+
+    def test_expand_negative_max_hops(self, tool: Mock):
+        # Do/Check
+        with pytest.raises(ValueError, match="Expected max_hops to be non-negative"):
+            link_traversal_utils.expand(tool, [self.COUNTY], [self.NEAR], max_hops=-1)
+
+    def test_find_path_happy_path(self, tool: Mock):
+        # Do
+        path = link_traversal_utils.find_path(
+            tool, self.FACILITIES[0], self.COUNTY, [self.NEAR, self.SERVES], max_hops=3
+        )
+
+        # Check
+        assert [(link.src_table_name, link.src_row_id, link.dst_table_name, link.dst_row_id) for link in path] == [
+            ('facilities', 1, 'fires', 1),
+            ('fires', 1, 'counties', 1)
+        ]
+
+    def test_find_path_too_far(self, tool: Mock):
+        # Do/Check
+        assert link_traversal_utils.find_path(
+            tool, self.FACILITIES[0], self.COUNTY, [self.NEAR, self.SERVES], max_hops=1
+        ) is None
+        # Links aren't followed backwards unless asked to be
+        assert link_traversal_utils.find_path(
+            tool, self.COUNTY, self.FACILITIES[0], [self.NEAR, self.SERVES], max_hops=3
+        ) is None
+
+    def test_find_path_same_row(self, tool: Mock):
+        # Do/Check
+        assert link_traversal_utils.find_path(tool, self.COUNTY, self.COUNTY, [self.NEAR], max_hops=0) == []
+
+    def test_get_rows(self, tool: Mock):
+        # Do
+        rows = link_traversal_utils.get_rows(tool, [self.FACILITIES[1], self.COUNTY, ('fires', 3), ('deleted', 1)])
+
+        # Check
+        assert all(isinstance(row, Row) for row in rows)
+        assert [(row.table.name, row.row_id) for row in rows] == [self.FACILITIES[1], self.COUNTY]
+        assert rows[0].row_mapping['name'] == 'facilities_2'
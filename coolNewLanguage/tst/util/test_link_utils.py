@@ -0,0 +1,189 @@
+import pathlib
+from unittest.mock import Mock
+
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src import models
+from coolNewLanguage.src.link_cache import LinkCache
+from coolNewLanguage.src.schema_catalog import SchemaCatalog
+from coolNewLanguage.src.tool import Tool
+from coolNewLanguage.src.util import link_utils
+
+
+class TestLinkUtils:
+    LINK_META_ID = 1
+    SRC_TABLE_NAME = 'src_table'
+    DST_TABLE_NAME = 'dst_table'
+
+    @pytest.fixture
+    def tool(self, tmp_path: pathlib.Path) -> Mock:
+        engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path.joinpath("test.db")}')
+        models.Base.metadata.create_all(engine)
+        tool = Mock(spec=Tool)
+        tool.db_engine = engine
+        tool.get_table_from_table_name = SchemaCatalog(engine).get_table
+        tool.link_cache = LinkCache()
+        tool.link_metatype_ids = {}
+        return tool
+
+    @staticmethod
+    def link_key(src_row_id: int, dst_row_id: int) -> tuple:
+        return (
+            TestLinkUtils.LINK_META_ID, TestLinkUtils.SRC_TABLE_NAME, src_row_id, TestLinkUtils.DST_TABLE_NAME, dst_row_id
+        )
+
+    @staticmethod
+    def count_links(tool: Mock) -> int:
+        with tool.db_engine.connect() as conn:
+            return conn.execute(
+                sqlalchemy.select(sqlalchemy.func.count()).select_from(models.RegisteredLink)
+            ).scalar_one()
+
+    def test_register_new_links_happy_path(self, tool: Mock):
+        # Setup
+        link_utils.register_new_link(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1, self.DST_TABLE_NAME, 10)
+        link_keys = [self.link_key(2, 20), self.link_key(1, 10), self.link_key(2, 20), self.link_key(1, 11)]
+        statements = []
+        sqlalchemy.event.listen(tool.db_engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        # Do
+        links = link_utils.register_new_links(tool, link_keys)
+
+        # Check
+        # The links are returned in order, with duplicates sharing an id
+        assert [(link.src_row_id, link.dst_row_id) for link in links] == [(2, 20), (1, 10), (2, 20), (1, 11)]
+        assert links[0].link_id == links[2].link_id
+        assert len({link.link_id for link in links}) == 3
+        assert all(link.link_meta_id == self.LINK_META_ID for link in links)
+        assert TestLinkUtils.count_links(tool) == 3
+        # One lookup, one insert of both new links, and one lookup of their ids
+        inserts = [s for s in statements if s.lstrip().upper().startswith('INSERT')]
+        assert len(inserts) == 1
+        assert 'ON CONFLICT DO NOTHING' in inserts[0].upper()
+        assert link_utils.get_link_ids(tool, link_keys) == [link.link_id for link in links]
+
+    def test_register_new_links_batches_lookups(self, tool: Mock, monkeypatch):
+        # Setup
+        monkeypatch.setattr(link_utils, 'LINK_LOOKUP_BATCH_SIZE', 2)
+        link_keys = [self.link_key(i, i) for i in range(5)]
+
+        # Do
+        links = link_utils.register_new_links(tool, link_keys)
+
+        # Check
+        assert [link.src_row_id for link in links] == list(range(5))
+        assert None not in link_utils.get_link_ids(tool, link_keys)
+
+    def test_get_link_ids_unregistered(self, tool: Mock):
+        # Setup
+        link = link_utils.register_new_link(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1, self.DST_TABLE_NAME, 10)
+
+        # Do
+        link_ids = link_utils.get_link_ids(tool, [self.link_key(1, 11), self.link_key(1, 10)])
+
+        # Check
+        assert link_ids == [None, link.link_id]
+
+    def test_register_new_links_no_links(self, tool: Mock):
+        # Do/Check
+        assert link_utils.register_new_links(tool, []) == []
+
+    def test_register_new_links_invalid_link_key(self, tool: Mock):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected src_row_id to be an int"):
+            link_utils.register_new_links(tool, [(self.LINK_META_ID, self.SRC_TABLE_NAME, '1', self.DST_TABLE_NAME, 10)])
+
+    def test_get_links_from_and_to(self, tool: Mock):
+        # Setup
+        links = link_utils.register_new_links(
+            tool, [self.link_key(1, 10), self.link_key(1, 11), self.link_key(2, 10)]
+        )
+        other_meta_link = link_utils.register_new_link(
+            tool, self.LINK_META_ID + 1, self.SRC_TABLE_NAME, 1, self.DST_TABLE_NAME, 12
+        )
+
+        # Do
+        links_from = link_utils.get_links_from(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1)
+        links_to = link_utils.get_links_to(tool, self.LINK_META_ID, self.DST_TABLE_NAME, 10)
+
+        # Check
+        assert [link.link_id for link in links_from] == [links[0].link_id, links[1].link_id]
+        assert [link.dst_row_id for link in links_from] == [10, 11]
+        assert [link.link_id for link in links_to] == [links[0].link_id, links[2].link_id]
+        assert [link.src_row_id for link in links_to] == [1, 2]
+        assert link_utils.get_links_from(tool, self.LINK_META_ID + 1, self.SRC_TABLE_NAME, 1)[0].link_id == \
+            other_meta_link.link_id
+        assert link_utils.get_links_from(tool, self.LINK_META_ID, self.DST_TABLE_NAME, 10) == []
+
+    def test_get_links_from_uses_cache(self, tool: Mock):
+        # Setup
+        link_utils.register_new_link(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1, self.DST_TABLE_NAME, 10)
+        link_utils.get_links_from(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1)
+        statements = []
+        sqlalchemy.event.listen(tool.db_engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        # Do
+        links_from = link_utils.get_links_from(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1)
+        links_to = link_utils.get_links_to(tool, self.LINK_META_ID, self.DST_TABLE_NAME, 10)
+
+        # Check
+        assert len(links_from) == len(links_to) == 1
+        assert statements == []
+
+    def test_register_new_links_invalidates_cache(self, tool: Mock):
+        # Setup
+        link_utils.register_new_link(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1, self.DST_TABLE_NAME, 10)
+        link_utils.get_links_from(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1)
+
+        # Do
+        link_utils.register_new_link(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1, self.DST_TABLE_NAME, 11)
+
+        # Check
+        links_from = link_utils.get_links_from(tool, self.LINK_META_ID, self.SRC_TABLE_NAME, 1)
+        assert [link.dst_row_id for link in links_from] == [10, 11]
+
+    def test_register_link_metatype_on_tool_happy_path(self, tool: Mock):
+        # Setup
+        meta_id = link_utils.register_link_metatype_on_tool(tool, 'link_meta_name')
+        statements = []
+        sqlalchemy.event.listen(tool.db_engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        # Do
+        registered_meta_id = link_utils.register_link_metatype_on_tool(tool, 'link_meta_name')
+        got_meta_id = link_utils.get_link_metatype_id_from_metaname(tool, 'link_meta_name')
+
+        # Check
+        assert registered_meta_id == got_meta_id == meta_id
+        assert tool.link_metatype_ids == {'link_meta_name': meta_id}
+        # The id was remembered when the metatype was first registered
+        assert statements == []
+
+    def test_register_link_metatype_on_tool_registered_elsewhere(self, tool: Mock):
+        # Setup
+        meta_id = link_utils.register_link_metatype_on_tool(tool, 'link_meta_name')
+        # As if another Tool sharing the database registered the metatype
+        tool.link_metatype_ids = {}
+
+        # Do
+        registered_meta_id = link_utils.register_link_metatype_on_tool(tool, 'link_meta_name')
+
+        # Check
+        assert registered_meta_id == meta_id
+        assert link_utils.load_link_metatype_ids(tool) == {'link_meta_name': meta_id}
+
+    def test_get_link_metatype_id_from_metaname_unregistered(self, tool: Mock):
+        # Do/Check
+        assert link_utils.get_link_metatype_id_from_metaname(tool, 'link_meta_name') is None
+        assert tool.link_metatype_ids == {}
+
+    def test_load_link_metatype_ids(self, tool: Mock):
+        # Setup
+        first_meta_id = link_utils.register_link_metatype_on_tool(tool, 'first')
+        second_meta_id = link_utils.register_link_metatype_on_tool(tool, 'second')
+
+        # Do
+        link_metatype_ids = link_utils.load_link_metatype_ids(tool)
+
+        # Check
+        assert link_metatype_ids == {'first': first_meta_id, 'second': second_meta_id}
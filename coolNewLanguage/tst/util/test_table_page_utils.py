@@ -0,0 +1,82 @@
+import pathlib
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src.util import table_page_utils
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+
+class TestTablePageUtils:
+    TABLE_NAME = "table name"
+
+    @pytest.fixture
+    def engine(self, tmp_path: pathlib.Path) -> sqlalchemy.Engine:
+        engine = sqlalchemy.create_engine(f'sqlite:///{tmp_path.joinpath("test.db")}')
+        df = pd.DataFrame({'a': [3, 1, 2, 1], 'b': ['x', 'y', None, 'w%']})
+        with engine.connect() as conn:
+            df.to_sql(TestTablePageUtils.TABLE_NAME, conn, index=True, index_label=DB_INTERNAL_COLUMN_ID_NAME)
+            conn.commit()
+        return engine
+
+    @pytest.fixture
+    def table(self, engine: sqlalchemy.Engine) -> sqlalchemy.Table:
+        return sqlalchemy.Table(TestTablePageUtils.TABLE_NAME, sqlalchemy.MetaData(), autoload_with=engine)
+
+    def test_select_table_page_excludes_metadata_columns(self, engine: sqlalchemy.Engine, table: sqlalchemy.Table):
+        # Do
+        with engine.connect() as conn:
+            page = table_page_utils.select_table_page(table, conn)
+
+        # Check
+        assert page.columns == ['a', 'b']
+        assert page.rows == [[3, 'x'], [1, 'y'], [2, None], [1, 'w%']]
+        assert page.total_rows == page.filtered_rows == 4
+
+    def test_select_table_page_sort_ties_broken_by_internal_id(self, engine: sqlalchemy.Engine, table: sqlalchemy.Table):
+        # Do
+        with engine.connect() as conn:
+            page = table_page_utils.select_table_page(table, conn, offset=1, limit=2, sort_column='a')
+
+        # Check
+        assert page.rows == [[1, 'w%'], [2, None]]
+
+    def test_select_table_page_search_escapes_wildcards(self, engine: sqlalchemy.Engine, table: sqlalchemy.Table):
+        # Do
+        with engine.connect() as conn:
+            page = table_page_utils.select_table_page(table, conn, search='%')
+
+        # Check
+        assert page.rows == [[1, 'w%']]
+        assert page.filtered_rows == 1
+        assert page.total_rows == 4
+
+    @patch('coolNewLanguage.src.consts.MAX_TABLE_PAGE_SIZE', 2)
+    def test_select_table_page_limit_capped(self, engine: sqlalchemy.Engine, table: sqlalchemy.Table):
+        # Do
+        with engine.connect() as conn:
+            page = table_page_utils.select_table_page(table, conn, limit=100)
+
+        # Check
+        assert len(page.rows) == 2
+
+    def test_select_table_page_unknown_filter_column(self, engine: sqlalchemy.Engine, table: sqlalchemy.Table):
+        # Do/Check
+        with engine.connect() as conn, pytest.raises(KeyError):
+            table_page_utils.select_table_page(table, conn, column_filters={'c': 'x'})
+
+    def test_select_table_page_negative_offset(self, engine: sqlalchemy.Engine, table: sqlalchemy.Table):
+        # Do/Check
+        with engine.connect() as conn, pytest.raises(ValueError, match="Expected offset to be non-negative"):
+            table_page_utils.select_table_page(table, conn, offset=-1)
+
+    def test_table_page_to_json(self):
+        # Setup
+        page = table_page_utils.TablePage(['a'], [[1]], 5, 1)
+
+        # Do/Check
+        assert page.to_json(draw=3) == {
+            'draw': 3, 'recordsTotal': 5, 'recordsFiltered': 1, 'columns': ['a'], 'data': [[1]]
+        }
@@ -0,0 +1,278 @@
+import pathlib
+
+import numpy as np
+import pandas as pd
+import pytest
+import sqlalchemy
+
+from coolNewLanguage.src.util import table_write_utils
+from coolNewLanguage.src.util.dataframe_diff_utils import diff_rows
+from coolNewLanguage.src.util.sql_alch_csv_utils import DB_INTERNAL_COLUMN_ID_NAME
+
+
+class TestTableWriteUtils:
+    TABLE_NAME = "table name"
+
+    @pytest.fixture
+    def engine(self, tmp_path: pathlib.Path) -> sqlalchemy.Engine:
+        return sqlalchemy.create_engine(f'sqlite:///{tmp_path.joinpath("test.db")}')
+
+    @pytest.fixture
+    def stored_df(self, engine: sqlalchemy.Engine) -> pd.DataFrame:
+        df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', 'y', 'z']})
+        with engine.connect() as conn:
+            table_write_utils.write_full_table(conn, TestTableWriteUtils.TABLE_NAME, df)
+            conn.commit()
+        return self._read(engine)
+
+    @staticmethod
+    def _read(engine: sqlalchemy.Engine) -> pd.DataFrame:
+        with engine.connect() as conn:
+            return pd.read_sql_table(TestTableWriteUtils.TABLE_NAME, conn, index_col=DB_INTERNAL_COLUMN_ID_NAME)
+
+    def test_write_full_table_adds_internal_ids(self, stored_df: pd.DataFrame):
+        # Check
+        assert stored_df.index.name == DB_INTERNAL_COLUMN_ID_NAME
+        assert stored_df.index.tolist() == [0, 1, 2]
+        assert stored_df['b'].tolist() == ['x', 'y', 'z']
+
+    def test_with_internal_ids_non_integer_index(self):
+        # Setup
+        df = pd.DataFrame({'a': [1, 2]}, index=['p', 'q'])
+
+        # Do
+        result = table_write_utils.with_internal_ids(df)
+
+        # Check
+        assert result.index.tolist() == [0, 1]
+        assert result.index.name == DB_INTERNAL_COLUMN_ID_NAME
+
+    def test_with_internal_ids_keeps_existing_ids(self, stored_df: pd.DataFrame):
+        # Setup
+        stored_df = stored_df.drop(index=1)
+        df = pd.concat([stored_df, pd.DataFrame({'a': [4, 5, 6], 'b': ['w', 'v', 'u']}, index=[0, 1, 'p'])])
+
+        # Do
+        result = table_write_utils.with_internal_ids(df, stored_df.index)
+
+        # Check
+        # The stored rows keep their ids, and the other rows, including one labelled with the deleted row's id, get
+        # fresh ids after the largest stored one
+        assert result.index.tolist() == [0, 2, 3, 4, 5]
+        assert result['a'].tolist() == [1, 3, 4, 5, 6]
+
+    def test_with_internal_ids_reordered_rows(self, stored_df: pd.DataFrame):
+        # Setup
+        df = stored_df.sort_values('b', ascending=False)
+
+        # Do
+        result = table_write_utils.with_internal_ids(df, stored_df.index)
+
+        # Check
+        # Every row gets a fresh id, so that the rows are read back in their new order
+        assert result.index.tolist() == [3, 4, 5]
+        assert result['b'].tolist() == ['z', 'y', 'x']
+
+    def test_with_internal_ids_new_table_sorted(self):
+        # Setup
+        df = pd.DataFrame({'a': [3, 1, 2]}).sort_values('a')
+
+        # Do
+        result = table_write_utils.with_internal_ids(df)
+
+        # Check
+        assert result.index.tolist() == [0, 1, 2]
+        assert result['a'].tolist() == [1, 2, 3]
+
+    def test_can_write_diff_happy_path(self, stored_df: pd.DataFrame):
+        # Setup
+        df = stored_df.copy()
+        df.loc[1, 'b'] = 'changed'
+        df.loc[3] = [4, 'w']
+
+        # Do/Check
+        assert table_write_utils.can_write_diff(stored_df, df)
+
+    def test_can_write_diff_no_stored_table(self, stored_df: pd.DataFrame):
+        # Do/Check
+        assert not table_write_utils.can_write_diff(None, stored_df)
+
+    def test_can_write_diff_schema_change(self, stored_df: pd.DataFrame):
+        # Setup
+        df = stored_df.assign(c=[1.0, 2.0, 3.0])
+
+        # Do/Check
+        assert not table_write_utils.can_write_diff(stored_df, df)
+
+    def test_can_write_diff_dtype_change(self, stored_df: pd.DataFrame):
+        # Setup
+        df = stored_df.astype({'a': float})
+
+        # Do/Check
+        assert not table_write_utils.can_write_diff(stored_df, df)
+
+    def test_can_write_diff_reordered_rows(self, stored_df: pd.DataFrame):
+        # Setup
+        df = stored_df.iloc[::-1]
+
+        # Do/Check
+        assert not table_write_utils.can_write_diff(stored_df, df)
+
+    def test_write_table_diff_update_only(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Setup
+        df = stored_df.copy()
+        df.loc[1, 'b'] = 'changed'
+        statements = []
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        # Do
+        with engine.connect() as conn:
+            table_write_utils.write_table_diff(conn, TestTableWriteUtils.TABLE_NAME, stored_df, df)
+
+        # Check
+        writes = [s for s in statements if not s.lstrip().upper().startswith('SELECT')]
+        assert len(writes) == 1
+        assert writes[0].lstrip().upper().startswith('UPDATE')
+        pd.testing.assert_frame_equal(self._read(engine), df)
+
+    def test_write_table_diff_inserts_and_deletes(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Setup
+        df = stored_df.drop(index=0)
+        df.loc[3] = [4, None]
+
+        # Do
+        with engine.connect() as conn:
+            table_write_utils.write_table_diff(conn, TestTableWriteUtils.TABLE_NAME, stored_df, df, batch_size=1)
+
+        # Check
+        result = self._read(engine)
+        assert result.index.tolist() == [1, 2, 3]
+        assert result['a'].tolist() == [2, 3, 4]
+        assert result['b'].tolist() == ['y', 'z', None]
+
+    def test_write_table_diff_no_changes(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Setup
+        statements = []
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        # Do
+        with engine.connect() as conn:
+            table_write_utils.write_table_diff(conn, TestTableWriteUtils.TABLE_NAME, stored_df, stored_df.copy())
+
+        # Check
+        assert statements == []
+
+    @staticmethod
+    def _reflect(engine: sqlalchemy.Engine) -> sqlalchemy.Table:
+        return sqlalchemy.Table(TestTableWriteUtils.TABLE_NAME, sqlalchemy.MetaData(), autoload_with=engine)
+
+    def test_can_append_rows_happy_path(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Setup
+        df = pd.DataFrame({'b': ['w'], 'a': [4]})
+
+        # Do/Check
+        assert table_write_utils.can_append_rows(self._reflect(engine), df)
+
+    def test_can_append_rows_no_stored_table(self):
+        # Do/Check
+        assert not table_write_utils.can_append_rows(None, pd.DataFrame({'a': [4]}))
+
+    def test_can_append_rows_schema_change(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Setup
+        df = pd.DataFrame({'a': [4]})
+
+        # Do/Check
+        assert not table_write_utils.can_append_rows(self._reflect(engine), df)
+
+    def test_can_append_rows_dtype_change(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Setup
+        df = pd.DataFrame({'a': ['four'], 'b': ['w']})
+
+        # Do/Check
+        assert not table_write_utils.can_append_rows(self._reflect(engine), df)
+
+    def test_append_rows_keeps_ids(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Setup
+        df = pd.DataFrame({'a': [4, 5], 'b': ['w', None]}, index=[3, 7])
+        statements = []
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        # Do
+        with engine.connect() as conn:
+            appended_df = table_write_utils.append_rows(conn, TestTableWriteUtils.TABLE_NAME, df)
+
+        # Check
+        writes = [s for s in statements if not s.lstrip().upper().startswith('SELECT')]
+        assert len(writes) == 1
+        assert writes[0].lstrip().upper().startswith('INSERT')
+        assert appended_df.index.tolist() == [3, 7]
+        result = self._read(engine)
+        assert result.index.tolist() == [0, 1, 2, 3, 7]
+        assert result['a'].tolist() == [1, 2, 3, 4, 5]
+        assert result['b'].tolist() == ['x', 'y', 'z', 'w', None]
+
+    def test_append_rows_renumbers_clashing_ids(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Setup
+        df = pd.DataFrame({'a': [4, 5], 'b': ['w', 'v']})
+
+        # Do
+        with engine.connect() as conn:
+            appended_df = table_write_utils.append_rows(conn, TestTableWriteUtils.TABLE_NAME, df, batch_size=1)
+
+        # Check
+        assert appended_df.index.tolist() == [3, 4]
+        result = self._read(engine)
+        assert result.index.tolist() == [0, 1, 2, 3, 4]
+        assert result['b'].tolist() == ['x', 'y', 'z', 'w', 'v']
+
+    def test_update_rows_coalesces_by_columns(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Setup
+        updates = {0: {'a': 10}, 1: {'b': 'q', 'a': 20}, 2: {'a': 30, 'b': 'r'}}
+        statements = []
+        sqlalchemy.event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+
+        # Do
+        with engine.connect() as conn:
+            table_write_utils.update_rows(conn, TestTableWriteUtils.TABLE_NAME, updates)
+
+        # Check
+        # One statement per set of updated columns
+        writes = [s for s in statements if not s.lstrip().upper().startswith('SELECT')]
+        assert len(writes) == 2
+        assert all(s.lstrip().upper().startswith('UPDATE') for s in writes)
+        result = self._read(engine)
+        assert result['a'].tolist() == [10, 20, 30]
+        assert result['b'].tolist() == ['x', 'q', 'r']
+
+    def test_update_rows_in_callers_transaction(self, engine: sqlalchemy.Engine, stored_df: pd.DataFrame):
+        # Do
+        with engine.connect() as conn:
+            conn.begin()
+            table_write_utils.update_rows(conn, TestTableWriteUtils.TABLE_NAME, {0: {'a': 10}, 1: {'a': 20}}, 1)
+            conn.rollback()
+
+        # Check
+        # The caller's rollback discards the updates
+        assert self._read(engine)['a'].tolist() == [1, 2, 3]
+
+
+class TestDataframeDiffUtils:
+    def test_diff_rows_happy_path(self):
+        # Setup
+        old_df = pd.DataFrame({'a': [1, 2, 3], 'b': ['x', np.nan, 'z']})
+        new_df = pd.DataFrame({'a': [1, 20, 4], 'b': ['x', np.nan, 'w']}, index=[0, 1, 3])
+
+        # Do
+        diff = diff_rows(old_df, new_df)
+
+        # Check
+        assert diff.inserted.tolist() == [3]
+        assert diff.deleted.tolist() == [2]
+        assert diff.updated.tolist() == [1]
+        assert diff.changed_cells.loc[1].tolist() == [True, False]
+        assert not diff.is_empty()
+
+    def test_diff_rows_non_dataframe_old_df(self):
+        # Do/Check
+        with pytest.raises(TypeError, match="Expected old_df to be a pandas DataFrame"):
+            diff_rows(None, pd.DataFrame())
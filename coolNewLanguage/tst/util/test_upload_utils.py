@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import io
+import pathlib
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from multidict import MultiDict
+
+from coolNewLanguage.src.util import upload_utils
+from coolNewLanguage.src.util.upload_utils import UploadedFile
+
+
+class TestUploadUtils:
+    FILE_CONTENTS = b"a,b\n1,2\n" * 1000
+    FILENAME = 'upload.csv'
+
+    @staticmethod
+    def post_form(upload_dir: pathlib.Path, max_upload_bytes: Optional[int] = None,
+                  hash_algorithm: Optional[str] = None) -> tuple[int, Optional[MultiDict]]:
+        """
+        Posts a form with a text field and a file to a handler which reads it with read_multipart_post_body
+        :return: The response status and the POST body the handler read, if it read one
+        """
+        post_bodies = []
+
+        async def handler(request: web.Request) -> web.Response:
+            post_bodies.append(await upload_utils.read_multipart_post_body(
+                request, upload_dir, max_upload_bytes, hash_algorithm
+            ))
+            return web.Response()
+
+        async def post() -> int:
+            app = web.Application()
+            app.router.add_post('/', handler)
+            async with TestClient(TestServer(app)) as client:
+                form = aiohttp.FormData()
+                form.add_field('name', 'table')
+                form.add_field('file', io.BytesIO(TestUploadUtils.FILE_CONTENTS), filename=TestUploadUtils.FILENAME,
+                               content_type='text/csv')
+                response = await client.post('/', data=form)
+                return response.status
+
+        status = asyncio.run(post())
+        return status, post_bodies[0] if post_bodies else None
+
+    def test_read_multipart_post_body(self, tmp_path: pathlib.Path):
+        # Do
+        status, post_body = TestUploadUtils.post_form(tmp_path, hash_algorithm='sha256')
+
+        # Check
+        assert status == 200
+        assert post_body['name'] == 'table'
+        uploaded_file = post_body['file']
+        assert isinstance(uploaded_file, UploadedFile)
+        assert uploaded_file.filename == TestUploadUtils.FILENAME
+        assert uploaded_file.content_type == 'text/csv'
+        assert uploaded_file.size == len(TestUploadUtils.FILE_CONTENTS)
+        assert uploaded_file.content_hash == hashlib.sha256(TestUploadUtils.FILE_CONTENTS).hexdigest()
+        assert uploaded_file.path.parent == tmp_path
+        assert uploaded_file.path.read_bytes() == TestUploadUtils.FILE_CONTENTS
+
+    def test_read_multipart_post_body_without_hash(self, tmp_path: pathlib.Path):
+        # Do
+        _, post_body = TestUploadUtils.post_form(tmp_path)
+
+        # Check
+        assert post_body['file'].content_hash is None
+
+    def test_read_multipart_post_body_file_too_large(self, tmp_path: pathlib.Path):
+        # Do
+        status, post_body = TestUploadUtils.post_form(tmp_path, max_upload_bytes=100)
+
+        # Check
+        assert status == 413
+        assert post_body is None
+        # The partially written file was removed
+        assert list(tmp_path.iterdir()) == []
+
+    def test_discard_uploads(self, tmp_path: pathlib.Path):
+        # Setup
+        path = tmp_path.joinpath('.upload-file')
+        path.write_bytes(TestUploadUtils.FILE_CONTENTS)
+        post_body = MultiDict(name='table', file=UploadedFile(TestUploadUtils.FILENAME, path, 0, 'text/csv'))
+
+        # Do
+        upload_utils.discard_uploads(post_body)
+
+        # Check
+        assert not path.exists()
@@ -1,20 +1,91 @@
-function approveAll() {
-    const allApproveRadios = document.querySelectorAll(
-        'input[type="radio"][value="approve"]'
+// Decisions are recorded on the server as they're made, since the approval tables only hold the page of rows being
+// shown. The requests still in flight, which the form waits for before it's submitted.
+const pendingDecisions = new Set();
+
+function recordDecisions(decisions) {
+    const form = document.querySelector('form.approval_form');
+    if (form === null || !form.dataset.decisionsUrl) {
+        return;
+    }
+    const request = fetch(form.dataset.decisionsUrl, {
+        method: "POST",
+        body: new URLSearchParams(decisions),
+    }).then(response => {
+        if (!response.ok) {
+            response.text().then(text => console.error(`Failed to record decisions: ${text}`));
+        }
+    }).finally(() => pendingDecisions.delete(request));
+    pendingDecisions.add(request);
+}
+
+function setAll(value) {
+    const allRadios = document.querySelectorAll(
+        `input[type="radio"][value="${value}"]`
     );
-    allApproveRadios.forEach(radio => { radio.checked = true });
+    allRadios.forEach(radio => { radio.checked = true });
+    // Record the decision once per result, so it also covers rows which aren't currently shown
+    const bulkDecisions = {};
+    const allBulkDecisions = document.querySelectorAll('input.bulk_decision');
+    allBulkDecisions.forEach(input => {
+        input.value = value;
+        bulkDecisions[input.name] = value;
+    });
+    recordDecisions(bulkDecisions);
+}
+
+function approveAll() {
+    setAll("approve");
 }
 
 function rejectAll() {
-    const allRejectRadios = document.querySelectorAll(
-        'input[type="radio"][value="reject"]'
-    );
-    allRejectRadios.forEach(radio => { radio.checked = true });
+    setAll("reject");
 }
 
 function pendAll() {
-    const allPendingRadios = document.querySelectorAll(
-        'input[type="radio"][value="pending"]'
-    );
-    allPendingRadios.forEach(radio => { radio.checked = true });
-}
\ No newline at end of file
+    setAll("pending");
+}
+
+function recordRowDecision(event) {
+    const radio = event.target;
+    if (radio.type === "radio" && radio.closest('table.approval_rows') !== null) {
+        recordDecisions({ [radio.name]: radio.value });
+    }
+}
+
+function omitBulkDecidedRows() {
+    // Rows whose decision matches their result's bulk decision don't need their own field
+    document.querySelectorAll('.approve_result').forEach(approveResult => {
+        const bulkDecision = approveResult.querySelector('input.bulk_decision');
+        if (bulkDecision === null) {
+            return;
+        }
+        approveResult.querySelectorAll('input[type="radio"]:checked').forEach(radio => {
+            if (radio.value === bulkDecision.value) {
+                radio.disabled = true;
+            }
+        });
+    });
+}
+
+async function submitApprovalForm(event) {
+    event.preventDefault();
+    const form = event.target;
+    await Promise.allSettled(pendingDecisions);
+    omitBulkDecidedRows();
+    // Unlike dispatching a submit event, this doesn't call this handler again
+    form.submit();
+}
+
+function registerApprovalForm() {
+    const form = document.querySelector('form.approval_form');
+    if (form !== null) {
+        form.addEventListener('change', recordRowDecision);
+        form.addEventListener('submit', submitApprovalForm);
+    }
+}
+
+if (document.readyState === "loading") {
+    document.addEventListener("DOMContentLoaded", registerApprovalForm);
+} else {
+    registerApprovalForm();
+}
@@ -10,7 +10,7 @@ async function col_sel_show_table(
 	// get the html for the table
 	console.log(table_transient_id);
 	const response = await fetch(
-		`/_get_table?table=${table_name}&context=${context}&component_id=${component_id}&table_transient_id=${table_transient_id}`
+		`/_get_table?table=${table_name}&context=${context}&component_id=${component_id}&table_transient_id=${table_transient_id}&server_side=true`
 	);
 	const table_html = await response.text();
 	// if a table is already being shown, unstyle its preview and delete it from the dom
@@ -33,7 +33,16 @@ async function col_sel_show_table(
 	table_selector_div.insertAdjacentHTML("afterend", table_html);
 	// convert the table to a dataTable
 	console.log("Trying to convert full table to dataTable");
-	$("div.table_select_full_table table").DataTable();
+	// rows are paged in from the server, so give each cell the column selection classes and handlers as it's created
+	cnl_make_data_tables("div.table_select_full_table table", {
+		columnDefs: [
+			{
+				targets: "_all",
+				createdCell: (td, cell_data, row_data, row_index, col_index) =>
+					col_sel_init_table_cell(td, col_index, component_id, table_transient_id),
+			},
+		],
+	});
 	// Add display: flex and flex-direction: row to pagination elements
 	$('nav[aria-label="pagination"]').css({
 		display: "flex",
@@ -46,6 +55,22 @@ async function col_sel_show_table(
 	temp_col_sel_choices.get(component_id).set("table", table_name);
 }
 
+// Gives a body cell of a column selector's full table view the same classes and handlers as its column's header cell,
+// marking it as selected if its column is one of the temporary column choices
+function col_sel_init_table_cell(td, col_index, component_id, table_transient_id) {
+	const th = document.querySelector(
+		`#column_select_full_table_${component_id}_table_${table_transient_id} th.col_${col_index}`
+	);
+	td.classList.add(`col_${col_index}`, "col_sel_full_table_cell");
+	td.onclick = th.onclick;
+	td.onpointerenter = th.onpointerenter;
+	td.onpointerout = th.onpointerout;
+	const columns = temp_col_sel_choices.get(component_id)?.get("columns");
+	if (columns?.has(th.dataset.colName)) {
+		td.classList.add("col_sel_selected_column");
+	}
+}
+
 function col_sel_hide_full_table(component_id, table_transient_id) {
 	const full_table_div = document.getElementById(
 		`column_select_full_table_${component_id}_table_${table_transient_id}`
@@ -0,0 +1,45 @@
+// Converts a table element into a DataTable.
+// Tables rendered with a data-url attribute are in server-side processing mode: only their header is rendered, and
+// DataTables fetches one page of rows at a time from the url (e.g. the /_get_table_data route, which does the paging,
+// sorting and searching in SQL).
+// options are passed through to DataTables.
+function cnl_make_data_table(table, options = {}) {
+	const data_url = table.dataset.url;
+	if (!data_url) {
+		return new DataTable(table, options);
+	}
+	const header_cells = table.tHead.rows[0].cells;
+	return new DataTable(table, {
+		...options,
+		serverSide: true,
+		processing: true,
+		ajax: async function (data, callback) {
+			const params = new URLSearchParams({
+				offset: data.start,
+				limit: data.length,
+				search: data.search.value,
+				draw: data.draw,
+			});
+			if (data.order.length > 0) {
+				const order = data.order[0];
+				params.set("sort", header_cells[order.column].dataset.colName);
+				params.set("order", order.dir);
+			}
+			const separator = data_url.includes("?") ? "&" : "?";
+			const response = await fetch(`${data_url}${separator}${params}`);
+			if (!response.ok) {
+				console.error(`Failed to fetch table page: ${await response.text()}`);
+				callback({ draw: data.draw, recordsTotal: 0, recordsFiltered: 0, data: [] });
+				return;
+			}
+			callback(await response.json());
+		},
+	});
+}
+
+// Converts every table element matching selector into a DataTable
+function cnl_make_data_tables(selector, options = {}) {
+	for (const table of document.querySelectorAll(selector)) {
+		cnl_make_data_table(table, options);
+	}
+}
@@ -7,7 +7,7 @@ async function table_sel_show_table(
 	// get the html for the table
 	console.log(table_transient_id);
 	const response = await fetch(
-		`/_get_table?table=${table_name}&context=${context}&component_id=${component_id}&table_transient_id=${table_transient_id}`
+		`/_get_table?table=${table_name}&context=${context}&component_id=${component_id}&table_transient_id=${table_transient_id}&server_side=true`
 	);
 	const table_html = await response.text();
 	// if a table is already being shown, unstyle its preview and delete it from the dom
@@ -30,7 +30,7 @@ async function table_sel_show_table(
 	table_selector_div.insertAdjacentHTML("afterend", table_html);
 	// convert the table to a dataTable
 	console.log("Trying to convert full table to dataTable");
-	$("div.table_select_full_table table").DataTable();
+	cnl_make_data_tables("div.table_select_full_table table");
 	// Add display: flex and flex-direction: row to pagination elements
 	$('nav[aria-label="pagination"]').css({
 		display: "flex",
@@ -0,0 +1,103 @@
+"""
+Compares the throughput of bulk Tables writes and reads under SQLite's default settings and under HiLT's default
+EngineProfile (WAL, synchronous=NORMAL, larger page cache, memory-mapped I/O).
+
+Run from the repository root: python -m util_scripts.benchmark_engine_profile [--rows N] [--tables N] [--edits N]
+"""
+import argparse
+import pathlib
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from coolNewLanguage.src.engine_profile import EngineProfile
+import coolNewLanguage.src.tool as tool_module
+from coolNewLanguage.src.tool import Tool
+
+
+def make_dataframe(num_rows: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'id': np.arange(num_rows),
+        'value': rng.random(num_rows),
+        'category': rng.choice(['a', 'b', 'c', 'd'], num_rows),
+        'label': [f'row {i}' for i in range(num_rows)]
+    })
+
+
+def run(profile_name: str, profile: EngineProfile, num_rows: int, num_tables: int, num_edits: int) -> dict[str, float]:
+    df = make_dataframe(num_rows)
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Keep the benchmark's databases out of the data directory
+        data_dir = tool_module.DATA_DIR
+        tool_module.DATA_DIR = pathlib.Path(tmp_dir)
+        try:
+            tool = Tool(f'benchmark_{profile_name}', file_dir_path=tmp_dir, engine_profile=profile)
+
+            start = time.perf_counter()
+            for i in range(num_tables):
+                tool.tables._save_table(f'table_{i}', df)
+            timings['bulk writes'] = time.perf_counter() - start
+
+            # Many small commits, as when users approve changes to a table one stage at a time
+            start = time.perf_counter()
+            for i in range(num_edits):
+                edited = tool.tables['table_0']
+                edited.loc[edited.index[i % num_rows], 'value'] = float(i)
+                tool.tables._save_table('table_0', edited)
+            timings['small edits'] = time.perf_counter() - start
+
+            # Single-row commits, where the cost of syncing to disk on every commit dominates
+            rows = df.head(1)
+            start = time.perf_counter()
+            for i in range(num_edits):
+                with tool.db_engine.connect() as conn:
+                    rows.to_sql('appended', conn, if_exists='append', index=False)
+                    conn.commit()
+            timings['row commits'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(num_tables):
+                tool.tables._cache.clear()
+                tool.tables[f'table_{i}']
+            timings['full reads'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for i in range(num_tables):
+                tool.tables.lazy(f'table_{i}').filter_rows('category', '==', 'a')[['value']].materialize()
+            timings['filtered reads'] = time.perf_counter() - start
+
+            tool.db_engine.dispose()
+        finally:
+            tool_module.DATA_DIR = data_dir
+
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000, help="The number of rows in each table")
+    parser.add_argument('--tables', type=int, default=5, help="The number of tables to write and read")
+    parser.add_argument('--edits', type=int, default=200, help="The number of single-cell edits to save")
+    args = parser.parse_args()
+
+    profiles = {
+        'sqlite_defaults': EngineProfile.sqlite_defaults(),
+        'hilt_default': EngineProfile()
+    }
+    results = {name: run(name, profile, args.rows, args.tables, args.edits) for name, profile in profiles.items()}
+
+    print(f"{args.tables} tables of {args.rows} rows, {args.edits} single-cell edits")
+    print(f"{'':<16}" + "".join(f"{name:>18}" for name in profiles) + f"{'speedup':>10}")
+    for operation in results['sqlite_defaults']:
+        baseline = results['sqlite_defaults'][operation]
+        tuned = results['hilt_default'][operation]
+        print(f"{operation:<16}{baseline:>17.3f}s{tuned:>17.3f}s{baseline / tuned:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()